@@ -1,9 +1,30 @@
 # ai_interviewer/api/main.py
 
+import asyncio
+import logging
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from ai_interviewer.api import routes
+from ai_interviewer.config import (
+    GRAPH_RELOAD_INTERVAL_SECONDS,
+    MODEL_WORKERS_ENABLED,
+    MODEL_LOAD_MODE,
+    READINESS_REQUIRED_MODELS,
+    RECORDING_ENABLED,
+    RECORDING_SHUTDOWN_TIMEOUT_SECONDS,
+    STT_BATCHING_ENABLED,
+)
+from ai_interviewer.core_logic.admission import get_admission_controller
+from ai_interviewer.core_logic.analysis_queue import get_analysis_queue
+from ai_interviewer.core_logic.llm_client import get_llm_client
+from ai_interviewer.core_logic.model_registry import get_model_registry
+from ai_interviewer.core_logic.session_store import get_session_store
+from ai_interviewer.knowledge_graph.graph_loader import get_graph_registry
+from ai_interviewer.utils.metrics import get_metrics, labels
+
+logger = logging.getLogger(__name__)
 
 # --- Path Setup ---
 # This code figures out where your frontend/index.html file is located
@@ -13,17 +34,190 @@ PROJECT_ROOT = os.path.abspath(os.path.join(API_DIR, "..", ".."))
 FRONTEND_DIR = os.path.join(PROJECT_ROOT, "ai_interviewer/frontend")
 
 
+async def watch_knowledge_graphs() -> None:
+    """
+    Polls the knowledge graph directory and hot-reloads edited graphs.
+    Running interviews keep the graph version they started on.
+    """
+    registry = get_graph_registry()
+    while True:
+        await asyncio.sleep(GRAPH_RELOAD_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(registry.reload_changed)
+        except Exception as e:
+            logger.error(f"Knowledge graph reload failed: {e}")
+
+
+async def start_models() -> None:
+    """
+    Loads and warms up the STT/TTS models, in this process or in the model
+    worker processes, according to MODEL_LOAD_MODE.
+    """
+    if MODEL_WORKERS_ENABLED:
+        from ai_interviewer.core_logic.model_workers import get_model_worker_pool
+        await get_model_worker_pool().start()
+    elif MODEL_LOAD_MODE != "lazy":
+        await get_model_registry().load_all()
+
+
+def models_ready() -> bool:
+    """True if the models required to serve an interview are loaded."""
+    if MODEL_WORKERS_ENABLED:
+        from ai_interviewer.core_logic.model_workers import get_model_worker_pool
+        return get_model_worker_pool().is_ready(READINESS_REQUIRED_MODELS)
+    if MODEL_LOAD_MODE == "lazy":
+        return True
+    return get_model_registry().is_ready(READINESS_REQUIRED_MODELS)
+
+
+def register_metric_collectors() -> None:
+    """
+    Exposes the queue depths and cache statistics of the background services
+    as gauges on /metrics. They are read when the endpoint is scraped.
+    """
+    from ai_interviewer.audio_processing.tts_cache import get_tts_cache
+    from ai_interviewer.core_logic.admission import get_admission_controller
+    from ai_interviewer.core_logic.inference_executor import get_inference_executor
+    from ai_interviewer.core_logic.llm_client import get_llm_client
+    from ai_interviewer.core_logic.triage_cache import get_triage_cache
+
+    metrics = get_metrics()
+    metrics.add_collector(
+        "ai_interviewer_executor_queue_depth", "Pending calls per model executor lane.",
+        lambda: {labels(lane=lane): depth for lane, depth in get_inference_executor().queue_depths().items()},
+    )
+    metrics.add_collector(
+        "ai_interviewer_llm_in_flight", "LLM requests in flight per model.",
+        lambda: {labels(model=model): count for model, count in get_llm_client().in_flight.items()},
+    )
+    metrics.add_collector(
+        "ai_interviewer_admission", "Admission control: running and waiting interviews, load signals.",
+        lambda: {labels(stat=stat): value for stat, value in get_admission_controller().stats().items()},
+    )
+    metrics.add_collector(
+        "ai_interviewer_analysis_queue_depth", "In-depth analysis jobs waiting to run.",
+        lambda: {labels(): get_analysis_queue().depth},
+    )
+    metrics.add_collector(
+        "ai_interviewer_sessions", "Session store statistics.",
+        lambda: {labels(stat=stat): value for stat, value in get_session_store().stats().items()},
+    )
+    metrics.add_collector(
+        "ai_interviewer_tts_cache", "Speech cache statistics.",
+        lambda: {labels(stat=stat): value for stat, value in get_tts_cache().stats().items()},
+    )
+    metrics.add_collector(
+        "ai_interviewer_triage_cache", "Semantic triage cache statistics.",
+        lambda: {labels(stat=stat): value for stat, value in get_triage_cache().stats().items()},
+    )
+    if STT_BATCHING_ENABLED and not MODEL_WORKERS_ENABLED:
+        from ai_interviewer.audio_processing.stt_batcher import get_stt_batcher
+        metrics.add_collector(
+            "ai_interviewer_stt_batcher", "Batched transcription scheduler statistics.",
+            lambda: {labels(stat=stat): value for stat, value in get_stt_batcher().stats().items()},
+        )
+    if RECORDING_ENABLED:
+        from ai_interviewer.audio_processing.recording_store import get_recording_writer
+        metrics.add_collector(
+            "ai_interviewer_recordings", "Session recording writer statistics.",
+            lambda: {labels(stat=stat): value for stat, value in get_recording_writer().stats().items()},
+        )
+    if MODEL_WORKERS_ENABLED:
+        from ai_interviewer.core_logic.model_workers import get_model_worker_pool
+        metrics.add_collector(
+            "ai_interviewer_model_worker_in_flight", "Requests in flight per model worker process.",
+            lambda: {labels(worker=index): load for index, load in get_model_worker_pool().loads().items()},
+        )
+
+
+register_metric_collectors()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts the background services on startup and stops them on shutdown.
+    """
+    # Load and validate the graphs up front so a broken graph fails startup.
+    get_graph_registry()
+    graph_watcher = asyncio.create_task(watch_knowledge_graphs()) if GRAPH_RELOAD_INTERVAL_SECONDS > 0 else None
+    # In "background" mode the server accepts connections (and answers the
+    # health checks) while the models load; /health/ready flips once they can serve.
+    model_loader = None
+    if MODEL_LOAD_MODE == "background":
+        model_loader = asyncio.create_task(start_models())
+    else:
+        await start_models()
+    session_store = get_session_store()
+    await session_store.start()
+    analysis_queue = get_analysis_queue()
+    await analysis_queue.start()
+    admission = get_admission_controller()
+    await admission.start()
+    yield
+    await admission.stop()
+    await analysis_queue.stop()
+    await get_llm_client().aclose()
+    if RECORDING_ENABLED:
+        # The writer thread is a daemon; write out its queue before the process exits.
+        from ai_interviewer.audio_processing.recording_store import get_recording_writer
+        if not await asyncio.to_thread(get_recording_writer().close, RECORDING_SHUTDOWN_TIMEOUT_SECONDS):
+            logger.warning("Recording writer did not finish writing before shutdown.")
+    await session_store.stop()
+    if model_loader is not None and not model_loader.done():
+        model_loader.cancel()
+    if MODEL_WORKERS_ENABLED:
+        from ai_interviewer.core_logic.model_workers import get_model_worker_pool
+        await get_model_worker_pool().stop()
+    if graph_watcher is not None:
+        graph_watcher.cancel()
+
+
 # Create the main FastAPI application instance
 app = FastAPI(
     title="AI Interviewer API",
     description="Real-time technical interviews with an AI.",
-    version="3.0"
+    version="3.0",
+    lifespan=lifespan
 )
 
 # Include the WebSocket router from the routes module.
 app.include_router(routes.router)
 
 
+@app.get("/health/live")
+async def liveness():
+    """
+    Liveness probe: the process is up and its event loop is responsive.
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe: 200 once the required models are loaded, 503 before that,
+    so a restarting worker only receives interviews it can serve.
+    """
+    if MODEL_WORKERS_ENABLED:
+        from ai_interviewer.core_logic.model_workers import get_model_worker_pool
+        models = get_model_worker_pool().status()
+    else:
+        models = get_model_registry().status()
+    ready = models_ready()
+    body = {"status": "ready" if ready else "starting", "load_mode": MODEL_LOAD_MODE, "models": models}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    Prometheus scrape endpoint: per-stage and end-of-speech-to-first-audio
+    latency histograms (with recent p50/p95/p99), queue depths and cache statistics.
+    """
+    return PlainTextResponse(get_metrics().render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def serve_frontend():
     """
@@ -0,0 +1,451 @@
+# ai_interviewer/api/protocol.py
+
+"""
+Wire protocols of the interview WebSocket.
+
+Protocol 0 (the default) is the original one: JSON text messages for control,
+and raw binary messages for audio. Inbound audio is WebM/Opus or 16 kHz int16
+PCM. Outbound speech is int16 PCM frames between "audio_start" and
+"audio_end" messages, or one WAV file per utterance.
+
+Protocol 1 is requested with `?protocol=1`. Every message is a binary frame:
+
+    offset  size  field
+    0       1     protocol version (1)
+    1       1     frame type: FRAME_AUDIO, FRAME_CONTROL, FRAME_TRANSCRIPT or FRAME_TRIAGE
+    2       2     flags
+    4       4     sequence number, counted separately in each direction
+    8       ...   payload
+
+All integers are little-endian.
+
+- Audio payloads start with the codec (1 byte), the channel count (1 byte)
+  and the sample rate (4 bytes).
+  - Opus audio is a run of packets, each prefixed with its length (2 bytes).
+  - PCM audio is int16 samples.
+  - FLAG_START and FLAG_END mark the first and the last frame of an
+    utterance. An inbound frame with FLAG_END also ends the answer, even if
+    its audio has to be dropped (e.g. an unsupported codec).
+- Control, transcript and triage payloads are UTF-8 JSON.
+
+The client negotiates in the query string, which costs no round trip:
+
+- `codecs`: the codecs it can play, in order of preference (`opus`, `pcm_s16le`).
+- `sample_rate`: the output rate it wants.
+- `input_rate`: the rate of the raw PCM it sends.
+
+The server's first frame is a "session" control message that states what it
+chose.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import struct
+import wave
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import numpy as np
+from fastapi import WebSocket
+
+from ai_interviewer.config import (
+    STT_SAMPLE_RATE,
+    TTS_STREAMING_ENABLED,
+    WS_OPUS_ENABLED,
+    WS_OPUS_FRAME_MS,
+    WS_OPUS_SAMPLE_RATE,
+    WS_PROTOCOL_VERSIONS,
+    WS_TRANSCRIPT_EVENTS,
+    WS_TRIAGE_EVENTS,
+)
+from ai_interviewer.audio_processing.audio_decoder import StreamingResampler
+from ai_interviewer.audio_processing.opus_encoder import StreamingOpusEncoder, nearest_opus_rate, opus_available
+from ai_interviewer.models.schemas import TriageResult
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+
+HEADER = struct.Struct("<BBHI")       # version, frame type, flags, sequence number
+AUDIO_HEADER = struct.Struct("<BBI")  # codec, channels, sample rate
+PACKET_LENGTH = struct.Struct("<H")
+
+# Frame types.
+FRAME_AUDIO = 1
+FRAME_CONTROL = 2
+FRAME_TRANSCRIPT = 3
+FRAME_TRIAGE = 4
+
+# Flags.
+FLAG_START = 0x1  # First audio frame of an utterance.
+FLAG_END = 0x2    # Last audio frame of an utterance; a final transcript.
+
+# Audio codecs.
+CODEC_PCM_S16LE = 0
+CODEC_OPUS = 1
+CODEC_WEBM_OPUS = 2
+CODEC_NAMES = {CODEC_PCM_S16LE: "pcm_s16le", CODEC_OPUS: "opus", CODEC_WEBM_OPUS: "webm_opus"}
+
+_MIN_SAMPLE_RATE = 8000
+_MAX_SAMPLE_RATE = 48000
+# Longer PCM chunks (e.g. a cached question) are encoded and sent in slices of
+# this length, so the first packets do not wait for the whole utterance.
+_ENCODE_SLICE_SECONDS = 1.0
+
+
+# --- Framing ---
+
+def pack_frame(frame_type: int, payload: bytes, flags: int = 0, sequence: int = 0) -> bytes:
+    return HEADER.pack(PROTOCOL_VERSION, frame_type, flags, sequence & 0xFFFFFFFF) + payload
+
+
+def unpack_frame(data: bytes) -> Tuple[int, int, int, int, memoryview]:
+    """
+    Splits a frame into its header fields and payload.
+
+    Returns:
+        A (version, frame type, flags, sequence number, payload) tuple.
+
+    Raises:
+        ValueError: If the frame is shorter than its header.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError(f"Frame of {len(data)} bytes is shorter than the header.")
+    version, frame_type, flags, sequence = HEADER.unpack_from(data)
+    return version, frame_type, flags, sequence, memoryview(data)[HEADER.size:]
+
+
+def pack_audio(codec: int, sample_rate: int, audio: bytes, channels: int = 1) -> bytes:
+    return AUDIO_HEADER.pack(codec, channels, sample_rate) + audio
+
+
+def unpack_audio(payload: memoryview) -> Tuple[int, int, int, memoryview]:
+    """
+    Returns:
+        The (codec, channels, sample rate, audio) of an audio frame's payload.
+
+    Raises:
+        ValueError: If the payload is shorter than the audio header.
+    """
+    if len(payload) < AUDIO_HEADER.size:
+        raise ValueError("Audio frame is shorter than the audio header.")
+    codec, channels, sample_rate = AUDIO_HEADER.unpack_from(payload)
+    return codec, channels, sample_rate, payload[AUDIO_HEADER.size:]
+
+
+def join_opus_packets(packets: List[bytes]) -> bytes:
+    return b"".join(PACKET_LENGTH.pack(len(packet)) + packet for packet in packets)
+
+
+def split_opus_packets(audio: memoryview) -> List[bytes]:
+    packets = []
+    pos = 0
+    while pos + PACKET_LENGTH.size <= len(audio):
+        (length,) = PACKET_LENGTH.unpack_from(audio, pos)
+        pos += PACKET_LENGTH.size
+        packets.append(bytes(audio[pos:pos + length]))
+        pos += length
+    return packets
+
+
+def _parse_control(text: str) -> Optional[dict]:
+    try:
+        control = json.loads(text)
+    except ValueError:
+        logger.warning("Ignoring a control message that is not valid JSON.")
+        return None
+    return control if isinstance(control, dict) else None
+
+
+def _parse_rate(value: Optional[str]) -> Optional[int]:
+    if value is None or not value.isdigit():
+        return None
+    rate = int(value)
+    return rate if _MIN_SAMPLE_RATE <= rate <= _MAX_SAMPLE_RATE else None
+
+
+# --- Channels ---
+
+class ClientMessage:
+    """One inbound message: audio for the transcriber, or a control message."""
+
+    __slots__ = ("audio", "control")
+
+    def __init__(self, audio: Optional[bytes] = None, control: Optional[dict] = None):
+        self.audio = audio
+        self.control = control
+
+    @property
+    def control_type(self) -> Optional[str]:
+        return self.control.get("type") if self.control is not None else None
+
+
+class ClientChannel(ABC):
+    """
+    One connection's wire protocol: turns inbound WebSocket messages into
+    ClientMessages, and events and speech into outbound messages.
+    """
+
+    version = 0
+    # Whether speech is sent as it is synthesized, rather than as one WAV file.
+    streams_audio = True
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+
+    async def open(self) -> None:
+        """Sends whatever the protocol starts with."""
+
+    @abstractmethod
+    def parse(self, message: dict) -> List[ClientMessage]:
+        """Decodes one ASGI "websocket.receive" message."""
+
+    @abstractmethod
+    async def send_event(self, event: dict) -> None:
+        """Sends a control message, e.g. {"type": "end_of_utterance"}."""
+
+    @abstractmethod
+    async def start_audio(self, sample_rate: int) -> None:
+        """Starts an utterance of int16 PCM at `sample_rate`."""
+
+    @abstractmethod
+    async def send_audio(self, pcm: bytes) -> None:
+        """Sends the next chunk of the current utterance."""
+
+    @abstractmethod
+    async def end_audio(self) -> None:
+        """Ends the current utterance."""
+
+    @abstractmethod
+    async def send_wav(self, wav: bytes) -> None:
+        """Sends a complete utterance given as a 16-bit mono WAV file."""
+
+    async def send_transcript(self, text: str, final: bool) -> None:
+        """Sends the transcript of the answer so far."""
+
+    async def send_triage(self, node_id: str, triage: TriageResult) -> None:
+        """Sends the triage signal of an answer."""
+
+
+class LegacyChannel(ClientChannel):
+    """Protocol 0: JSON text messages and raw audio."""
+
+    version = 0
+    streams_audio = TTS_STREAMING_ENABLED
+
+    def parse(self, message: dict) -> List[ClientMessage]:
+        if message.get("bytes") is not None:
+            return [ClientMessage(audio=message["bytes"])]
+        if message.get("text") is not None:
+            control = _parse_control(message["text"])
+            return [ClientMessage(control=control)] if control is not None else []
+        return []
+
+    async def send_event(self, event: dict) -> None:
+        await self.websocket.send_json(event)
+
+    async def start_audio(self, sample_rate: int) -> None:
+        await self.websocket.send_json({"type": "audio_start", "format": "pcm_s16le",
+                                        "sample_rate": sample_rate, "channels": 1})
+
+    async def send_audio(self, pcm: bytes) -> None:
+        await self.websocket.send_bytes(pcm)
+
+    async def end_audio(self) -> None:
+        await self.websocket.send_json({"type": "audio_end"})
+
+    async def send_wav(self, wav: bytes) -> None:
+        await self.websocket.send_bytes(wav)
+
+
+class FramedChannel(ClientChannel):
+    """
+    Protocol 1: typed, sequenced binary frames, with speech as Opus or PCM at
+    the negotiated sample rate.
+
+    Args:
+        codec: CODEC_OPUS or CODEC_PCM_S16LE for outbound speech.
+        sample_rate: Outbound sample rate; 0 keeps the voice's own rate (PCM only).
+        input_rate: Sample rate of inbound raw PCM.
+    """
+
+    version = PROTOCOL_VERSION
+    streams_audio = True
+
+    def __init__(self, websocket: WebSocket, codec: int, sample_rate: int, input_rate: int = STT_SAMPLE_RATE):
+        super().__init__(websocket)
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.input_rate = input_rate
+        self._sent = 0
+        self._last_received: Optional[int] = None
+        self._utterance_rate = 0
+        self._start_flag = 0
+        self._encoder: Optional[StreamingOpusEncoder] = None
+        self._output_resampler: Optional[StreamingResampler] = None
+        self._input_resampler: Optional[StreamingResampler] = None
+
+    async def _send(self, frame_type: int, payload: bytes, flags: int = 0) -> None:
+        frame = pack_frame(frame_type, payload, flags, self._sent)
+        self._sent += 1
+        await self.websocket.send_bytes(frame)
+
+    async def open(self) -> None:
+        await self.send_event({
+            "type": "session",
+            "protocol": PROTOCOL_VERSION,
+            "codec": CODEC_NAMES[self.codec],
+            "sample_rate": self.sample_rate or None,
+            "channels": 1,
+            "frame_ms": WS_OPUS_FRAME_MS if self.codec == CODEC_OPUS else None,
+            "input_rate": self.input_rate,
+        })
+
+    # --- Inbound ---
+
+    def parse(self, message: dict) -> List[ClientMessage]:
+        data = message.get("bytes")
+        if data is None:
+            # Control messages are also accepted as plain JSON text.
+            control = _parse_control(message["text"]) if message.get("text") is not None else None
+            return [ClientMessage(control=control)] if control is not None else []
+        try:
+            version, frame_type, flags, sequence, payload = unpack_frame(data)
+            if version != PROTOCOL_VERSION:
+                raise ValueError(f"protocol version {version}")
+            if self._last_received is not None and sequence != (self._last_received + 1) & 0xFFFFFFFF:
+                logger.warning(f"Inbound frames {self._last_received + 1}..{sequence - 1} are missing.")
+            self._last_received = sequence
+
+            if frame_type == FRAME_CONTROL:
+                control = _parse_control(bytes(payload).decode("utf-8"))
+                return [ClientMessage(control=control)] if control is not None else []
+            if frame_type != FRAME_AUDIO:
+                raise ValueError(f"unexpected frame type {frame_type}")
+
+            codec, channels, sample_rate, audio = unpack_audio(payload)
+            messages = []
+            if len(audio) == 0:
+                pass
+            elif codec == CODEC_WEBM_OPUS:
+                messages.append(ClientMessage(audio=bytes(audio)))
+            elif codec == CODEC_PCM_S16LE:
+                messages.append(ClientMessage(audio=self._to_stt_pcm(audio, sample_rate or self.input_rate, channels)))
+            else:
+                # Only the audio is lost; the answer still ends on FLAG_END.
+                logger.warning(f"Dropping audio with unsupported inbound codec {codec}.")
+            if flags & FLAG_END:
+                messages.append(ClientMessage(control={"type": "end_of_utterance"}))
+            return messages
+        except (ValueError, UnicodeDecodeError, struct.error) as e:
+            logger.warning(f"Dropping an invalid frame: {e}")
+            return []
+
+    def _to_stt_pcm(self, audio: memoryview, sample_rate: int, channels: int) -> bytes:
+        """Converts inbound PCM to the mono 16 kHz int16 PCM the transcriber expects."""
+        if sample_rate == STT_SAMPLE_RATE and channels <= 1:
+            return bytes(audio)
+        samples = np.frombuffer(audio, dtype="<i2", count=len(audio) // 2).astype(np.float32) / 32768.0
+        if channels > 1:
+            samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+        if self._input_resampler is None or self._input_resampler.in_rate != sample_rate:
+            self._input_resampler = StreamingResampler(sample_rate, STT_SAMPLE_RATE)
+        resampled = self._input_resampler.process(samples)
+        return (np.clip(resampled, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+    # --- Outbound ---
+
+    async def send_event(self, event: dict) -> None:
+        await self._send(FRAME_CONTROL, json.dumps(event).encode("utf-8"))
+
+    async def start_audio(self, sample_rate: int) -> None:
+        self._utterance_rate = sample_rate
+        self._start_flag = FLAG_START
+        self._encoder = None
+        self._output_resampler = None
+        if self.codec == CODEC_OPUS:
+            self._encoder = StreamingOpusEncoder(sample_rate, self.sample_rate)
+        elif self.sample_rate and self.sample_rate != sample_rate:
+            self._output_resampler = StreamingResampler(sample_rate, self.sample_rate)
+
+    async def _send_audio(self, audio: bytes, flags: int = 0) -> None:
+        flags |= self._start_flag
+        self._start_flag = 0
+        rate = self.sample_rate or self._utterance_rate
+        await self._send(FRAME_AUDIO, pack_audio(self.codec, rate, audio), flags)
+
+    async def send_audio(self, pcm: bytes) -> None:
+        if self._encoder is not None:
+            # Encoding takes about 10 ms per second of speech; keep it off the event loop.
+            slice_bytes = 2 * int(self._utterance_rate * _ENCODE_SLICE_SECONDS)
+            for offset in range(0, len(pcm), slice_bytes):
+                packets = await asyncio.to_thread(self._encoder.encode, pcm[offset:offset + slice_bytes])
+                if packets:
+                    await self._send_audio(join_opus_packets(packets))
+            return
+        if self._output_resampler is not None:
+            samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2).astype(np.float32) / 32768.0
+            resampled = self._output_resampler.process(samples)
+            pcm = (np.clip(resampled, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        await self._send_audio(pcm)
+
+    async def end_audio(self) -> None:
+        audio = b""
+        if self._encoder is not None:
+            audio = join_opus_packets(await asyncio.to_thread(self._encoder.flush))
+            self._encoder = None
+        await self._send_audio(audio, FLAG_END)
+
+    async def send_wav(self, wav: bytes) -> None:
+        # Sent as one framed utterance in the negotiated codec, like live speech.
+        with wave.open(io.BytesIO(wav), "rb") as reader:
+            if reader.getsampwidth() != 2 or reader.getnchannels() != 1:
+                raise ValueError("Only 16-bit mono WAV audio can be sent.")
+            sample_rate = reader.getframerate()
+            pcm = reader.readframes(reader.getnframes())
+        await self.start_audio(sample_rate)
+        await self.send_audio(pcm)
+        await self.end_audio()
+
+    async def send_transcript(self, text: str, final: bool) -> None:
+        if WS_TRANSCRIPT_EVENTS:
+            payload = json.dumps({"text": text, "final": final}).encode("utf-8")
+            await self._send(FRAME_TRANSCRIPT, payload, FLAG_END if final else 0)
+
+    async def send_triage(self, node_id: str, triage: TriageResult) -> None:
+        if WS_TRIAGE_EVENTS:
+            payload = json.dumps({"node_id": node_id, "signal": triage.signal, "confidence": triage.confidence})
+            await self._send(FRAME_TRIAGE, payload.encode("utf-8"))
+
+
+def negotiate(websocket: WebSocket) -> ClientChannel:
+    """
+    Picks the protocol, codec and sample rates from the connection's query string.
+
+    Raises:
+        ValueError: If the client asks for a protocol version this server does not speak.
+    """
+    params = websocket.query_params
+    version = params.get("protocol", "0")
+    if version == "0":
+        return LegacyChannel(websocket)
+    if not version.isdigit() or int(version) not in WS_PROTOCOL_VERSIONS:
+        raise ValueError(f"Unsupported protocol version: {version}")
+
+    codec = CODEC_PCM_S16LE
+    for name in (name.strip() for name in params.get("codecs", "pcm_s16le").split(",")):
+        if name == "opus" and WS_OPUS_ENABLED and opus_available():
+            codec = CODEC_OPUS
+            break
+        if name == "pcm_s16le":
+            break
+
+    requested_rate = _parse_rate(params.get("sample_rate"))
+    if codec == CODEC_OPUS:
+        sample_rate = nearest_opus_rate(requested_rate or WS_OPUS_SAMPLE_RATE)
+    else:
+        sample_rate = requested_rate or 0
+    input_rate = _parse_rate(params.get("input_rate")) or STT_SAMPLE_RATE
+    return FramedChannel(websocket, codec, sample_rate, input_rate)
@@ -4,14 +4,49 @@
 Manages the real-time, bidirectional flow of an interview session using WebSockets.
 This is the core integration point that orchestrates all other modules.
 """
+import asyncio
 import logging
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, BackgroundTasks
-from ai_interviewer.audio_processing.speech_to_text import transcribe_audio
-from ai_interviewer.audio_processing.text_to_speech import synthesize_speech
-from ai_interviewer.core_logic.session_manager import get_or_create_session, remove_session
-from ai_interviewer.core_logic.response_analyzer import run_triage_analysis, run_in_depth_analysis
-from ai_interviewer.core_logic.question_engine import select_next_question, mock_knowledge_graph
-from ai_interviewer.models.schemas import SessionState, TriageResult
+import time
+from typing import Awaitable, Optional, TypeVar
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from ai_interviewer.config import (
+    BARGE_IN_ENABLED,
+    TTS_SATURATION_RETRIES,
+    TTS_SAMPLE_RATE,
+    REPEAT_PROMPT_TEXT,
+    DEFAULT_GRAPH_ID,
+    MODEL_WORKERS_ENABLED,
+    RECORDING_ENABLED,
+)
+from ai_interviewer.api.protocol import ClientChannel, ClientMessage, negotiate
+from ai_interviewer.audio_processing.streaming_stt import StreamingTranscriber
+from ai_interviewer.audio_processing.text_to_speech import (
+    SpeechSynthesisError,
+    synthesize_speech_async,
+    synthesize_speech_stream,
+)
+from ai_interviewer.audio_processing.tts_cache import CachedAudio, get_tts_cache
+from ai_interviewer.audio_processing.recording_store import (
+    SessionRecorder,
+    current_recorder,
+    get_recording_writer,
+    record_outbound,
+)
+from ai_interviewer.core_logic.admission import AdmissionRejectedError, AdmissionTicket, get_admission_controller
+from ai_interviewer.core_logic.inference_executor import ExecutorSaturatedError
+from ai_interviewer.core_logic.session_manager import (
+    get_or_create_session_async,
+    save_session_async,
+    release_session_async,
+)
+from ai_interviewer.core_logic.analysis_queue import get_analysis_queue
+from ai_interviewer.core_logic.triage_cache import triage_with_cache
+from ai_interviewer.core_logic.speculative_prefetch import SpeculativePrefetcher
+from ai_interviewer.core_logic.question_engine import select_next_question, get_current_node, get_session_graph
+from ai_interviewer.core_logic.context_builder import build_analysis_context
+from ai_interviewer.models.schemas import SessionState, TriageResult, AnalysisJob, TurnRecord
+from ai_interviewer.utils.wav_helper import add_wav_header
+from ai_interviewer.utils.metrics import TurnTrace, current_trace, finish_turn, get_metrics, mark
 
 # --- Logger Setup ---
 # Configure basic logging to print INFO level messages to the console.
@@ -21,69 +56,482 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+T = TypeVar("T")
+
+INTERRUPTIONS_METRIC = "ai_interviewer_interruptions_total"
+
+
+class TurnInterrupted(Exception):
+    """Raised when the candidate interrupts the stage of a turn that was running."""
+
+
+class TurnControl:
+    """
+    Reads the connection in the background while a turn is being processed,
+    so the candidate can interrupt it and a disconnect cancels it at once.
+
+    Inbound messages are decoded by the connection's channel and handed to the
+    handler in order through `receive`. An
+    "interrupt" message or a disconnect cancels the stage that is running
+    (see `run`), and with it all of that stage's in-flight transcription, LLM
+    and synthesis work. An interrupt that arrives between two stages of a turn
+    stops the next one before it starts.
+    """
+
+    def __init__(self, channel: ClientChannel, session_id: str):
+        self.channel = channel
+        self.session_id = session_id
+        self.disconnect_code: Optional[int] = None
+        # Set from an interrupt's arrival until the handler has read it.
+        self.interrupted = False
+        self._inbound: asyncio.Queue = asyncio.Queue()
+        self._stage: Optional[asyncio.Task] = None
+        self._stage_interruptible = True
+        self._reader: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._reader = asyncio.create_task(self._read())
+
+    def stop(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._stage is not None:
+            self._stage.cancel()
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                message = await self.channel.websocket.receive()
+            except RuntimeError:  # The socket is already closed.
+                message = {"type": "websocket.disconnect", "code": 1006}
+            if message["type"] == "websocket.disconnect":
+                self.disconnect_code = message.get("code", 1000)
+                self._cancel_stage()
+                self._inbound.put_nowait(None)
+                return
+            for item in self.channel.parse(message):
+                if BARGE_IN_ENABLED and item.control_type == "interrupt":
+                    self.interrupted = True
+                    if self._stage_interruptible:
+                        self._cancel_stage()
+                self._inbound.put_nowait(item)
+
+    def _cancel_stage(self) -> None:
+        if self._stage is not None and not self._stage.done():
+            self._stage.cancel()
+
+    async def receive(self) -> ClientMessage:
+        """
+        Returns the next inbound message.
+
+        Raises:
+            WebSocketDisconnect: Once the client has disconnected.
+        """
+        item = await self._inbound.get()
+        if item is None:
+            self._inbound.put_nowait(None)
+            raise WebSocketDisconnect(self.disconnect_code)
+        if item.control_type == "interrupt":
+            self.interrupted = False
+        return item
+
+    async def run(self, stage: Awaitable[T], interruptible: bool = True) -> T:
+        """
+        Runs one stage of a turn. A stage that is not interruptible is only
+        cancelled by a disconnect.
+
+        Raises:
+            TurnInterrupted: If the candidate interrupted it.
+            WebSocketDisconnect: If the client disconnected.
+        """
+        if self.disconnect_code is not None or (interruptible and self.interrupted):
+            stage.close()
+            if self.disconnect_code is not None:
+                raise WebSocketDisconnect(self.disconnect_code)
+            raise TurnInterrupted()
+        task = self._stage = asyncio.ensure_future(stage)
+        self._stage_interruptible = interruptible
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            self._stage = None
+            self._stage_interruptible = True
+        if task.cancelled():
+            if self.disconnect_code is not None:
+                raise WebSocketDisconnect(self.disconnect_code)
+            raise TurnInterrupted()
+        return task.result()
+
+
+def record_interruption(session_id: str, stage: str) -> None:
+    logger.info(f"Candidate {session_id} interrupted the {stage} stage.")
+    get_metrics().increment(INTERRUPTIONS_METRIC, help_text="Turn stages cancelled by a candidate interruption.",
+                            stage=stage)
+
+
+async def admit_session(channel: ClientChannel, control: TurnControl, session_id: str,
+                        resumed: bool) -> Optional[AdmissionTicket]:
+    """
+    Waits until the admission controller lets the interview start. A waiting
+    candidate is sent {"type": "queued", "position": ..., "estimated_wait": ...}
+    whenever their place in the queue changes. A candidate who is turned away
+    gets a "busy" notice with a retry hint, and the connection is closed with
+    code 1013 (try again later).
+
+    Returns:
+        The interview's admission ticket, or None if it was turned away.
+
+    Raises:
+        WebSocketDisconnect: If the client disconnected while waiting.
+    """
+    async def on_wait(position: int, estimated_wait: float) -> None:
+        logger.info(f"Session {session_id} is waiting for admission at position {position}.")
+        await channel.send_event({"type": "queued", "position": position, "estimated_wait": estimated_wait})
+
+    try:
+        return await control.run(get_admission_controller().admit(session_id, resumed, on_wait),
+                                 interruptible=False)
+    except AdmissionRejectedError as e:
+        logger.warning(f"Turning {session_id} away: {e}")
+        await channel.send_event({"type": "busy", "stage": "admission", "retry_after": e.retry_after})
+        await channel.websocket.close(code=1013, reason="Server at capacity")
+        return None
+
+
+async def send_busy_notice(channel: ClientChannel, error: ExecutorSaturatedError) -> None:
+    """
+    Tells the client that the server is saturated and when to try again.
+    """
+    await channel.send_event({
+        "type": "busy",
+        "stage": error.lane,
+        "retry_after": error.retry_after,
+    })
+
+
+async def stream_speech(channel: ClientChannel, text: str) -> None:
+    """
+    Streams synthesized speech to the client sentence by sentence.
+
+    Each synthesized chunk is sent as soon as it is ready, framed as one
+    utterance by the channel (see `ai_interviewer.api.protocol`), so the client
+    can start playback with the first sentence. The utterance is added to the
+    speech cache afterwards, but only if synthesis finished cleanly.
+    """
+    chunks = []
+    sample_rate = TTS_SAMPLE_RATE
+    complete = False
+    try:
+        async for pcm, sample_rate in synthesize_speech_stream(text):
+            if not chunks:
+                await channel.start_audio(sample_rate)
+            chunks.append(pcm)
+            mark("first_audio")
+            await channel.send_audio(pcm)
+            record_outbound(pcm, sample_rate)
+        complete = True
+    except ExecutorSaturatedError:
+        raise
+    except Exception as e:
+        # The candidate keeps what was already spoken, but a truncated
+        # utterance must never become the cached audio for this text.
+        logger.error(f"Speech synthesis failed partway through {text[:40]!r}: {e}")
+
+    if not chunks:
+        # Nothing was synthesized; still frame an (empty) utterance so the
+        # client knows it is the candidate's turn.
+        await channel.start_audio(TTS_SAMPLE_RATE)
+    await channel.end_audio()
+
+    if complete and chunks:
+        await asyncio.to_thread(get_tts_cache().put, text, b"".join(chunks), sample_rate)
+
+
+async def send_cached_speech(channel: ClientChannel, audio: CachedAudio) -> None:
+    """
+    Sends previously synthesized audio, using the same framing as live synthesis.
+    """
+    if channel.streams_audio:
+        await channel.start_audio(audio.sample_rate)
+        pcm = bytes(audio.pcm)
+        mark("first_audio")
+        await channel.send_audio(pcm)
+        record_outbound(pcm, audio.sample_rate)
+        await channel.end_audio()
+    else:
+        wav = audio.to_wav()
+        mark("first_audio")
+        await channel.send_wav(wav)
+        record_outbound(wav, audio.sample_rate, wav=True)
+
+
+async def send_speech(channel: ClientChannel, session_id: str, text: str) -> None:
+    """
+    Synthesizes `text` on the inference executor and sends the audio to the client.
+
+    If the TTS lane is saturated, the client is notified and the synthesis is
+    retried after the suggested delay, up to TTS_SATURATION_RETRIES times.
+    Static prompts are usually served from the speech cache without touching
+    the TTS model at all.
+    """
+    cached = await asyncio.to_thread(get_tts_cache().get, text)
+    if cached is not None:
+        await send_cached_speech(channel, cached)
+        return
+
+    for attempt in range(TTS_SATURATION_RETRIES + 1):
+        try:
+            if channel.streams_audio:
+                await stream_speech(channel, text)
+            else:
+                try:
+                    audio = await synthesize_speech_async(text)
+                except SpeechSynthesisError as e:
+                    # As in `stream_speech`: an empty utterance still hands the
+                    # turn to the candidate, and nothing is cached.
+                    logger.error(f"Speech synthesis failed for {text[:40]!r}: {e}")
+                    await channel.send_wav(add_wav_header(b"", sample_rate=TTS_SAMPLE_RATE))
+                    return
+                mark("first_audio")
+                await channel.send_wav(audio)
+                record_outbound(audio, wav=True)
+                await asyncio.to_thread(get_tts_cache().put_wav, text, audio)
+            return
+        except ExecutorSaturatedError as e:
+            if attempt == TTS_SATURATION_RETRIES:
+                raise
+            logger.warning(f"TTS saturated for {session_id}; retrying in {e.retry_after}s.")
+            await send_busy_notice(channel, e)
+            await asyncio.sleep(e.retry_after)
+
+
+async def ask_question(channel: ClientChannel, session_id: str, prefetcher: SpeculativePrefetcher,
+                       node_id: str, text: str) -> None:
+    """
+    Sends the next question, from its speculative render if there is one.
+    """
+    audio = await prefetcher.take(node_id)
+    if audio is not None:
+        await send_cached_speech(channel, audio)
+    else:
+        await send_speech(channel, session_id, text)
+
 
 @router.websocket("/interview/{session_id}")
-async def interview_session(websocket: WebSocket, session_id: str, background_tasks: BackgroundTasks):
+async def interview_session(websocket: WebSocket, session_id: str, role: str = DEFAULT_GRAPH_ID):
     """
     Handles the entire interview flow over a single WebSocket connection.
+    The optional `role` query parameter selects the knowledge graph, and
+    `protocol` the wire protocol (see `ai_interviewer.api.protocol`).
+    Under overload a new interview first waits for admission (see `admit_session`).
+
+    The client may send {"type": "interrupt"} at any time to barge in; the
+    server cancels the running stage of the turn and answers with
+    {"type": "interrupted"} once no more audio of it will follow.
     """
     await websocket.accept()
-    session = get_or_create_session(session_id)
-    logger.info(f"Client connected: {session_id}")
+    try:
+        channel = negotiate(websocket)
+    except ValueError as e:
+        logger.warning(f"Rejecting {session_id}: {e}")
+        await websocket.close(code=1002, reason=str(e))
+        return
+    try:
+        session = await get_or_create_session_async(session_id, role)
+    except KeyError:
+        logger.warning(f"Unknown knowledge graph '{role}' requested by {session_id}.")
+        await websocket.close(code=1008, reason=f"Unknown role: {role}")
+        return
+    logger.info(f"Client connected: {session_id} (protocol {channel.version})")
+
+    # --- Admission ---
+    # Under overload new interviews wait here, so running ones keep their latency.
+    control = TurnControl(channel, session_id)
+    control.start()
+    ticket = None
+    try:
+        await channel.open()
+        ticket = await admit_session(channel, control, session_id, resumed=bool(session.interview_history))
+    except WebSocketDisconnect:
+        logger.info(f"Client {session_id} disconnected while waiting for admission.")
+    finally:
+        if ticket is None:
+            control.stop()
+            await release_session_async(session)
+    if ticket is None:
+        return
 
     # --- Initial Question ---
-    initial_question_node = mock_knowledge_graph["nodes"][session.current_node_id]
-    initial_question_text = initial_question_node["question_text"]
+    initial_question_node = get_current_node(session)
+    initial_question_text = initial_question_node.question_text
     
     # Log the question being asked
     logger.info(f"AI ASKING (session {session_id}): {initial_question_text}")
-    initial_audio = synthesize_speech(initial_question_text)
-    await websocket.send_bytes(initial_audio)
-    
-
+    prefetcher = SpeculativePrefetcher(session_id)
+    interview_finished = False
+    recorder = None
+    if RECORDING_ENABLED:
+        recorder = SessionRecorder(get_recording_writer(), session_id)
+        recorder.writer.start_session(session_id, {"graph_id": session.graph_id,
+                                                   "graph_version": session.graph_version,
+                                                   "started_at": time.time()})
+        current_recorder.set(recorder)
     try:
+        try:
+            await control.run(send_speech(channel, session_id, initial_question_text))
+        except TurnInterrupted:
+            record_interruption(session_id, "synthesize")
+        prefetcher.prefetch(session)
+
+        transcriber = StreamingTranscriber(session_id)
+        trace = None
+        # An answer whose evaluation the candidate interrupted by speaking on.
+        carried_answer = ""
+        partial_text = ""
         while True:
-            # 1. Receive audio answer from client
-            audio_data = await websocket.receive_bytes()
-            logger.info(f"Received audio from {session_id}. Length: {len(audio_data)} bytes.")
+            # 1. Receive audio chunks until the candidate stops speaking
+            message = await control.receive()
+
+            if message.control_type == "interrupt":
+                # Everything sent for the interrupted stage precedes this, so
+                # the client can drop audio frames until it sees it.
+                await channel.send_event({"type": "interrupted"})
+                continue
 
-            # 2. Transcribe and log the candidate's response
-            transcribed_text = transcribe_audio(audio_data)
+            if trace is None:
+                # A turn's trace starts with the first message of the answer.
+                trace = TurnTrace(session_id, len(session.interview_history))
+                current_trace.set(trace)
+
+            if message.audio is not None:
+                if recorder is not None:
+                    recorder.inbound(message.audio)
+                with trace.span("decode"):
+                    utterance_ended = transcriber.feed(message.audio)
+                if transcriber.partial_text != partial_text:
+                    partial_text = transcriber.partial_text
+                    await channel.send_transcript(partial_text, final=False)
+                if not utterance_ended:
+                    continue
+            elif message.control_type != "end_of_utterance":
+                # The client can also mark the end of an answer explicitly.
+                continue
+            logger.info(f"End of utterance detected for {session_id}.")
+            trace.mark("end_of_speech")
+            trace.add("receive", trace.marks["end_of_speech"])
+            if recorder is not None:
+                recorder.turn += 1
+            await channel.send_event({"type": "end_of_utterance"})
+
+            # 2. Transcribe the remaining audio and log the candidate's response.
+            # Until the turn is committed (step 4), an interruption means the
+            # candidate is still answering: the answer continues with the next audio.
+            try:
+                with trace.span("transcribe"):
+                    transcribed_text = await control.run(transcriber.finalize())
+            except ExecutorSaturatedError as e:
+                logger.warning(f"STT saturated; asking {session_id} to retry in {e.retry_after}s.")
+                await send_busy_notice(channel, e)
+                continue
+            except TurnInterrupted:
+                record_interruption(session_id, "transcribe")
+                transcriber.resume()
+                if recorder is not None:
+                    recorder.turn -= 1
+                trace = None
+                continue
+            if carried_answer:
+                if transcribed_text and transcribed_text != "[Transcription Error]":
+                    transcribed_text = f"{carried_answer} {transcribed_text}"
+                else:
+                    transcribed_text = carried_answer
+                carried_answer = ""
+            partial_text = ""
             logger.info(f"CANDIDATE SAID (session {session_id}): {transcribed_text}")
 
             if not transcribed_text or transcribed_text == "[Transcription Error]":
                 logger.warning(f"Transcription failed or empty for {session_id}. Asking to repeat.")
-                repeat_audio = synthesize_speech("I'm sorry, I didn't catch that. Could you please repeat your answer?")
-                await websocket.send_bytes(repeat_audio)
+                try:
+                    with trace.span("synthesize"):
+                        await control.run(send_speech(channel, session_id, REPEAT_PROMPT_TEXT))
+                    get_admission_controller().observe_latency(finish_turn(trace))
+                except TurnInterrupted:
+                    record_interruption(session_id, "synthesize")
+                trace = None
                 continue
             
-            current_question_text = mock_knowledge_graph["nodes"][session.current_node_id]["question_text"]
+            await channel.send_transcript(transcribed_text, final=True)
+
+            graph = get_session_graph(session)
+            current_node = get_current_node(session)
+            current_node_id = current_node.node_id
+            current_question_text = current_node.question_text
 
             # 3. Fast Triage
-            triage_result = await run_triage_analysis(transcribed_text, current_question_text)
+            try:
+                with trace.span("triage"):
+                    triage_result = await control.run(
+                        triage_with_cache(graph.graph_id, graph.version, current_node_id,
+                                          current_question_text, transcribed_text))
+            except TurnInterrupted:
+                record_interruption(session_id, "triage")
+                carried_answer = transcribed_text
+                if recorder is not None:
+                    recorder.turn -= 1
+                trace = None
+                continue
             logger.info(f"Triage result for {session_id}: {triage_result.signal}")
+            await channel.send_triage(current_node_id, triage_result)
 
-            # 4. Run in-depth analysis in the background
-            background_tasks.add_task(run_in_depth_analysis, session, current_question_text, transcribed_text)
-
-            # 5. Select next question
-            next_question_obj = select_next_question(session, triage_result)
-            next_question_text = next_question_obj['question_text']
+            # 4. Select next question
+            with trace.span("select"):
+                next_question_obj = select_next_question(session, triage_result)
+            next_question_text = next_question_obj.question_text
             
             # Update history before sending the next question
-            session.interview_history.append({
-                "question": current_question_text,
-                "answer": transcribed_text,
-                "triage": triage_result.model_dump()
-            })
+            turn_index = len(session.interview_history)
+            session.interview_history.append(TurnRecord(
+                node_id=current_node_id,
+                answer=transcribed_text,
+                signal=triage_result.signal,
+                confidence=triage_result.confidence,
+            ))
+
+            # 5. Queue the in-depth analysis; its score is written back into the session
+            with trace.span("enqueue_analysis"):
+                await get_analysis_queue().submit(AnalysisJob(
+                    session_id=session_id,
+                    session_start=session.start_time,
+                    turn_index=turn_index,
+                    node_id=current_node_id,
+                    skill=current_node.skill,
+                    question=current_question_text,
+                    answer=transcribed_text,
+                    context=build_analysis_context(session, turn_index),
+                ))
+            # Persist the turn, so a reconnect (to any worker) resumes from here.
+            with trace.span("persist"):
+                await save_session_async(session)
 
-            # 6. Synthesize and send next question
+            # 6. Synthesize and send next question. An interruption now stops the
+            # question's audio; what the candidate says next answers it.
             logger.info(f"AI ASKING (session {session_id}): {next_question_text}")
-            next_audio = synthesize_speech(next_question_text)
-            await websocket.send_bytes(next_audio)
+            try:
+                with trace.span("synthesize"):
+                    await control.run(ask_question(channel, session_id, prefetcher,
+                                                   session.current_node_id, next_question_text))
+                get_admission_controller().observe_latency(finish_turn(trace))
+            except TurnInterrupted:
+                record_interruption(session_id, "synthesize")
+            trace = None
+            prefetcher.prefetch(session)
 
-            if session.current_node_id == "end_node":
+            if session.current_node_id == get_session_graph(session).end_node.node_id:
                 logger.info(f"Interview ended for {session_id}. Closing connection.")
+                interview_finished = True
                 break
 
     except WebSocketDisconnect:
@@ -91,6 +539,21 @@ async def interview_session(websocket: WebSocket, session_id: str, background_ta
     except Exception as e:
         logger.error(f"An unexpected error occurred in session {session_id}: {e}", exc_info=True)
     finally:
-        remove_session(session_id)
-        logger.info(f"Session {session_id} cleaned up.")
+        control.stop()
+        ticket.release()
+        prefetcher.cancel()
+        if recorder is not None:
+            recorder.writer.close_session(session_id)
+        if MODEL_WORKERS_ENABLED:
+            from ai_interviewer.core_logic.model_workers import get_model_worker_pool
+            get_model_worker_pool().forget(session_id)
+        if interview_finished:
+            # Archived and removed once the analysis of its last answers has
+            # landed; the queue takes over this connection's hold on the session.
+            get_analysis_queue().finish_session(session_id)
+            logger.info(f"Session {session_id} finished; archiving it once its analysis completes.")
+        else:
+            # An interrupted interview stays resumable until it expires.
+            await release_session_async(session)
+            logger.info(f"Session {session_id} released; it can be resumed by reconnecting.")
     
\ No newline at end of file
@@ -0,0 +1,406 @@
+# ai_interviewer/audio_processing/audio_decoder.py
+
+"""
+Decodes the audio the browser sends into 16 kHz float32 samples for Whisper.
+
+The frontend records with `MediaRecorder` as `audio/webm;codecs=opus`, and every
+500 ms chunk is a continuation of one WebM stream. This module demuxes that
+stream incrementally (a minimal EBML parser that only extracts audio blocks),
+decodes each Opus packet as soon as it arrives, and resamples 48 kHz output to
+16 kHz with a vectorized polyphase filter. Decoding therefore happens while the
+candidate is still talking instead of in one pass after the answer ends.
+
+Raw little-endian int16 PCM at 16 kHz is still accepted for clients that send it.
+"""
+
+import logging
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from ai_interviewer.config import STT_SAMPLE_RATE
+
+try:
+    import av
+except ImportError:  # PyAV is only needed for WebM/Opus input.
+    av = None
+
+logger = logging.getLogger(__name__)
+
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+OPUS_SAMPLE_RATE = 48000
+
+# --- EBML element IDs used by WebM ---
+_ID_SEGMENT = 0x18538067
+_ID_CLUSTER = 0x1F43B675
+_ID_TRACKS = 0x1654AE6B
+_ID_TRACK_ENTRY = 0xAE
+_ID_AUDIO = 0xE1
+_ID_BLOCK_GROUP = 0xA0
+_ID_SIMPLE_BLOCK = 0xA3
+_ID_BLOCK = 0xA1
+_ID_TRACK_NUMBER = 0xD7
+_ID_TRACK_TYPE = 0x83
+_ID_CODEC_ID = 0x86
+_ID_CODEC_PRIVATE = 0x63A2
+_ID_CHANNELS = 0x9F
+_ID_SAMPLING_FREQUENCY = 0xB5
+
+# Master elements whose children we need; they are entered rather than skipped.
+_MASTER_IDS = {_ID_SEGMENT, _ID_CLUSTER, _ID_TRACKS, _ID_TRACK_ENTRY, _ID_AUDIO, _ID_BLOCK_GROUP}
+# Leaf elements whose payload we read.
+_LEAF_IDS = {_ID_SIMPLE_BLOCK, _ID_BLOCK, _ID_TRACK_NUMBER, _ID_TRACK_TYPE, _ID_CODEC_ID,
+             _ID_CODEC_PRIVATE, _ID_CHANNELS, _ID_SAMPLING_FREQUENCY}
+_TRACK_TYPE_AUDIO = 2
+
+# Largest leaf element held in memory until complete. Opus blocks are a few
+# hundred bytes; anything near this size is a corrupt or hostile stream.
+MAX_ELEMENT_BYTES = 1024 * 1024
+
+
+def pcm16_to_float32(audio_bytes: bytes) -> np.ndarray:
+    """
+    Converts raw little-endian int16 PCM bytes into float32 samples in [-1, 1).
+    """
+    usable = len(audio_bytes) - (len(audio_bytes) % 2)
+    return np.frombuffer(audio_bytes, dtype=np.int16, count=usable // 2).astype(np.float32) / 32768.0
+
+
+def _read_vint(data, pos: int, keep_marker: bool = False):
+    """
+    Reads an EBML variable-length integer.
+
+    Returns:
+        A (value, length) tuple, or (None, 0) if more bytes are needed. An
+        all-ones size ("unknown size") is returned as -1.
+    """
+    if pos >= len(data):
+        return None, 0
+    first = data[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ValueError("Invalid EBML variable-length integer.")
+    if pos + length > len(data):
+        return None, 0
+
+    value = first if keep_marker else first & (mask - 1)
+    all_ones = (first & (mask - 1)) == mask - 1
+    for b in data[pos + 1:pos + length]:
+        value = (value << 8) | b
+        all_ones = all_ones and b == 0xFF
+    if all_ones and not keep_marker:
+        return -1, length
+    return value, length
+
+
+class WebMDemuxer:
+    """
+    An incremental WebM demuxer that yields the frames of the first audio track.
+
+    Bytes are fed in arbitrary pieces. Master elements are entered without being
+    buffered, uninteresting elements are skipped (even when they span several
+    chunks), and only leaf elements we need are held until complete. A leaf
+    larger than MAX_ELEMENT_BYTES is rejected rather than buffered.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._skip = 0
+        self._current_track: dict = {}
+        self.audio_track: Optional[int] = None
+        self.codec_id: Optional[str] = None
+        self.codec_private: Optional[bytes] = None
+        self.channels = 1
+        self.sample_rate = OPUS_SAMPLE_RATE
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Adds bytes to the stream.
+
+        Returns:
+            The audio frames (encoded packets) completed by this chunk.
+
+        Raises:
+            ValueError: If the stream is malformed or a needed element is too large.
+        """
+        self._buf += data
+        frames: List[bytes] = []
+        pos = 0
+
+        while True:
+            if self._skip:
+                skipped = min(self._skip, len(self._buf) - pos)
+                pos += skipped
+                self._skip -= skipped
+                if self._skip:
+                    break
+
+            element_id, id_len = _read_vint(self._buf, pos, keep_marker=True)
+            if element_id is None:
+                break
+            size, size_len = _read_vint(self._buf, pos + id_len)
+            if size is None:
+                break
+            body = pos + id_len + size_len
+
+            if element_id in _MASTER_IDS:
+                if element_id == _ID_TRACK_ENTRY:
+                    self._current_track = {}
+                pos = body
+                continue
+            if size < 0:
+                raise ValueError(f"Unknown-size leaf element 0x{element_id:X} in WebM stream.")
+            if element_id not in _LEAF_IDS:
+                pos = body
+                self._skip = size
+                continue
+            if size > MAX_ELEMENT_BYTES:
+                raise ValueError(f"WebM element 0x{element_id:X} of {size} bytes exceeds the size limit.")
+            if body + size > len(self._buf):
+                break
+
+            payload = bytes(self._buf[body:body + size])
+            pos = body + size
+            if element_id in (_ID_SIMPLE_BLOCK, _ID_BLOCK):
+                frames.extend(self._parse_block(payload))
+            else:
+                self._handle_track_field(element_id, payload)
+
+        del self._buf[:pos]
+        return frames
+
+    def _handle_track_field(self, element_id: int, payload: bytes) -> None:
+        track = self._current_track
+        if element_id == _ID_TRACK_NUMBER:
+            track["number"] = int.from_bytes(payload, "big")
+        elif element_id == _ID_TRACK_TYPE:
+            track["type"] = int.from_bytes(payload, "big")
+        elif element_id == _ID_CODEC_ID:
+            track["codec_id"] = payload.decode("ascii", "replace").rstrip("\x00")
+        elif element_id == _ID_CODEC_PRIVATE:
+            track["codec_private"] = payload
+        elif element_id == _ID_CHANNELS:
+            track["channels"] = int.from_bytes(payload, "big")
+        elif element_id == _ID_SAMPLING_FREQUENCY:
+            track["sample_rate"] = int(np.frombuffer(payload, dtype=">f8" if len(payload) == 8 else ">f4")[0])
+
+        is_audio = track.get("type") == _TRACK_TYPE_AUDIO or str(track.get("codec_id", "")).startswith("A_")
+        if self.audio_track is None and is_audio and "number" in track:
+            self.audio_track = track["number"]
+        if self.audio_track is not None and track.get("number") == self.audio_track:
+            self.codec_id = track.get("codec_id", self.codec_id)
+            self.codec_private = track.get("codec_private", self.codec_private)
+            self.channels = track.get("channels", self.channels)
+            self.sample_rate = track.get("sample_rate", self.sample_rate)
+
+    def _parse_block(self, payload: bytes) -> List[bytes]:
+        track, track_len = _read_vint(payload, 0)
+        if self.audio_track is not None and track != self.audio_track:
+            return []
+        header = track_len + 3  # Track number, int16 timecode, flags.
+        lacing = (payload[track_len + 2] >> 1) & 0x03
+        if lacing == 0:
+            return [payload[header:]]
+        return self._unlace(payload, header, lacing)
+
+    @staticmethod
+    def _unlace(payload: bytes, pos: int, lacing: int) -> List[bytes]:
+        count = payload[pos] + 1
+        pos += 1
+        sizes: List[int] = []
+        if lacing == 1:  # Xiph lacing.
+            for _ in range(count - 1):
+                size = 0
+                while payload[pos] == 0xFF:
+                    size += 0xFF
+                    pos += 1
+                size += payload[pos]
+                pos += 1
+                sizes.append(size)
+        elif lacing == 3:  # EBML lacing: first size, then signed differences.
+            size, n = _read_vint(payload, pos)
+            pos += n
+            sizes.append(size)
+            for _ in range(count - 2):
+                raw, n = _read_vint(payload, pos)
+                pos += n
+                size += raw - ((1 << (7 * n - 1)) - 1)
+                sizes.append(size)
+        else:  # Fixed-size lacing.
+            sizes = [(len(payload) - pos) // count] * (count - 1)
+        sizes.append(len(payload) - pos - sum(sizes))
+
+        frames = []
+        for size in sizes:
+            frames.append(payload[pos:pos + size])
+            pos += size
+        return frames
+
+
+class StreamingResampler:
+    """
+    Converts a mono float32 stream between sample rates, chunk by chunk.
+
+    Integer decimation (e.g. 48 kHz to 16 kHz) uses a windowed-sinc low-pass
+    filter evaluated only at the kept output positions. Other ratios fall back
+    to vectorized linear interpolation. Filter history is carried across chunks
+    so chunk boundaries introduce no clicks.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, taps_per_phase: int = 16):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self._factor = in_rate // out_rate if in_rate % out_rate == 0 else 0
+        self._history = np.zeros(0, dtype=np.float32)
+        self._offset = 0.0  # Fractional read position for interpolation.
+
+        if self._factor > 1:
+            n_taps = taps_per_phase * self._factor
+            t = np.arange(n_taps) - (n_taps - 1) / 2
+            cutoff = 0.9 / self._factor
+            kernel = cutoff * np.sinc(cutoff * t) * np.hamming(n_taps)
+            self._kernel = (kernel / kernel.sum()).astype(np.float32)[::-1].copy()
+            self._history = np.zeros(n_taps - 1, dtype=np.float32)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resamples one chunk; returns the output samples it produced."""
+        if self.in_rate == self.out_rate:
+            return samples.astype(np.float32, copy=False)
+        if self._factor > 1:
+            return self._decimate(samples)
+        return self._interpolate(samples)
+
+    def _decimate(self, samples: np.ndarray) -> np.ndarray:
+        x = np.concatenate((self._history, samples))
+        n_taps = len(self._kernel)
+        n_out = max(0, (len(x) - n_taps) // self._factor + 1)
+        if n_out == 0:
+            self._history = x
+            return np.zeros(0, dtype=np.float32)
+
+        # Gather only the windows at the kept positions and apply the filter as
+        # one matrix-vector product.
+        windows = np.lib.stride_tricks.sliding_window_view(x, n_taps)[::self._factor][:n_out]
+        out = windows @ self._kernel
+
+        # The next output window starts right after the last one we used.
+        self._history = x[n_out * self._factor:]
+        return out.astype(np.float32, copy=False)
+
+    def _interpolate(self, samples: np.ndarray) -> np.ndarray:
+        step = self.in_rate / self.out_rate
+        x = np.concatenate((self._history, samples))
+        positions = np.arange(self._offset, len(x) - 1, step)
+        out = np.interp(positions, np.arange(len(x)), x).astype(np.float32)
+        next_pos = self._offset + len(positions) * step
+        keep_from = min(int(next_pos), len(x))
+        self._history = x[keep_from:]
+        self._offset = next_pos - keep_from
+        return out
+
+
+class StreamingAudioDecoder:
+    """
+    Turns inbound audio chunks into 16 kHz float32 samples as they arrive.
+
+    The format is detected per stream: a chunk starting with the EBML magic
+    number begins a new WebM/Opus stream (MediaRecorder starts a fresh file every
+    time recording restarts); anything else is treated as raw int16 PCM.
+
+    After a WebM stream is abandoned with `resync`, continuation chunks (which
+    carry no magic number) are dropped until the next stream header arrives,
+    rather than being mistaken for PCM.
+    """
+
+    def __init__(self, out_rate: int = STT_SAMPLE_RATE):
+        self.out_rate = out_rate
+        self._demuxer: Optional[WebMDemuxer] = None
+        self._codec = None
+        self._resampler: Optional[StreamingResampler] = None
+        self._awaiting_header = False
+
+    @property
+    def awaiting_header(self) -> bool:
+        """True while chunks are dropped until the next WebM stream header."""
+        return self._awaiting_header
+
+    def _start_webm_stream(self) -> None:
+        if av is None:
+            raise RuntimeError("PyAV is required to decode WebM/Opus audio (pip install av).")
+        self._demuxer = WebMDemuxer()
+        self._awaiting_header = False
+        self._codec = None
+        self._resampler = StreamingResampler(OPUS_SAMPLE_RATE, self.out_rate)
+
+    def _open_codec(self) -> None:
+        codec_name = "opus" if (self._demuxer.codec_id or "A_OPUS") == "A_OPUS" else "vorbis"
+        self._codec = av.CodecContext.create(codec_name, "r")
+        if self._demuxer.codec_private:
+            self._codec.extradata = self._demuxer.codec_private
+        if self._demuxer.sample_rate != OPUS_SAMPLE_RATE:
+            self._resampler = StreamingResampler(self._demuxer.sample_rate, self.out_rate)
+
+    def _decode_packets(self, packets: List[bytes]) -> Iterator[np.ndarray]:
+        for packet in packets:
+            if self._codec is None:
+                self._open_codec()
+            for frame in self._codec.decode(av.Packet(packet)):
+                pcm = frame.to_ndarray()
+                if pcm.dtype != np.float32:
+                    pcm = pcm.astype(np.float32) / 32768.0
+                if pcm.ndim == 2:
+                    # Planar (channels, samples) or packed (1, samples * channels).
+                    channels = len(frame.layout.channels)
+                    pcm = pcm.reshape(channels, -1) if pcm.shape[0] == channels else pcm.reshape(-1, channels).T
+                    pcm = pcm.mean(axis=0) if channels > 1 else pcm[0]
+                yield pcm
+
+    def decode(self, chunk: bytes) -> np.ndarray:
+        """
+        Decodes one inbound chunk.
+
+        Returns:
+            The float32 samples at `out_rate` completed by this chunk (possibly empty).
+        """
+        if chunk[:4] == EBML_MAGIC:
+            self._start_webm_stream()
+        elif self._awaiting_header:
+            return np.zeros(0, dtype=np.float32)
+        if self._demuxer is None:
+            return pcm16_to_float32(chunk)
+
+        decoded = list(self._decode_packets(self._demuxer.feed(chunk)))
+        if not decoded:
+            return np.zeros(0, dtype=np.float32)
+        return self._resampler.process(np.concatenate(decoded) if len(decoded) > 1 else decoded[0])
+
+    def reset(self) -> None:
+        """Forgets the current stream; the next chunk re-detects the format."""
+        self._demuxer = None
+        self._codec = None
+        self._resampler = None
+        self._awaiting_header = False
+
+    def resync(self) -> None:
+        """
+        Abandons the current stream after a decoding error. A WebM stream
+        cannot be resumed mid-cluster, so its remaining chunks are dropped
+        until the next EBML header; a PCM stream simply continues.
+        """
+        was_webm = self._demuxer is not None or self._awaiting_header
+        self.reset()
+        self._awaiting_header = was_webm
+
+
+def decode_audio_bytes(audio_bytes: bytes, out_rate: int = STT_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes a complete recording (WebM/Opus or raw int16 PCM) in one call.
+
+    - Input: The full audio payload.
+    - Output: Mono float32 samples at `out_rate`.
+    """
+    return StreamingAudioDecoder(out_rate).decode(audio_bytes)
@@ -0,0 +1,118 @@
+# ai_interviewer/audio_processing/opus_encoder.py
+
+"""
+Opus encoding of synthesized speech for the WebSocket binary protocol.
+
+Piper produces 16-bit mono PCM at the voice's native rate (22.05 kHz for the
+default voice), which is about 350 kbit/s per speaking interviewer when sent
+raw. As 24 kbit/s Opus the same speech needs less than a tenth of that.
+
+The encoder resamples to an Opus rate and cuts the stream into fixed frames
+(20 ms by default), one packet each. Samples that do not fill a frame are
+carried over to the next chunk, so sentence boundaries add no gaps; only the
+end of the utterance is padded with silence.
+"""
+
+import functools
+from typing import List
+
+import numpy as np
+
+from ai_interviewer.config import WS_OPUS_BITRATE, WS_OPUS_FRAME_MS
+from ai_interviewer.audio_processing.audio_decoder import StreamingResampler
+
+try:
+    import av
+except ImportError:  # PyAV is only needed for Opus output.
+    av = None
+
+# Sample rates the Opus encoder accepts.
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+@functools.lru_cache(maxsize=1)
+def opus_available() -> bool:
+    """True if PyAV and its libopus encoder are installed."""
+    if av is None:
+        return False
+    try:
+        av.codec.Codec("libopus", "w")
+    except Exception:
+        return False
+    return True
+
+
+def nearest_opus_rate(sample_rate: int) -> int:
+    """The lowest Opus sample rate at or above `sample_rate` (at most 48 kHz)."""
+    return next((rate for rate in OPUS_SAMPLE_RATES if rate >= sample_rate), OPUS_SAMPLE_RATES[-1])
+
+
+class StreamingOpusEncoder:
+    """
+    Encodes one utterance of mono int16 PCM into Opus packets as it is synthesized.
+
+    Args:
+        in_rate: Sample rate of the PCM passed to `encode`.
+        out_rate: Opus sample rate, one of OPUS_SAMPLE_RATES.
+        bitrate: Target bitrate in bits per second.
+        frame_ms: Duration of each packet (2.5, 5, 10, 20, 40 or 60 ms).
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, bitrate: int = WS_OPUS_BITRATE,
+                 frame_ms: int = WS_OPUS_FRAME_MS):
+        if av is None:
+            raise RuntimeError("PyAV is required to encode Opus audio (pip install av).")
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.frame_size = out_rate * frame_ms // 1000
+        self._resampler = StreamingResampler(in_rate, out_rate) if in_rate != out_rate else None
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._pts = 0
+
+        codec = av.CodecContext.create("libopus", "w")
+        codec.sample_rate = out_rate
+        codec.layout = "mono"
+        codec.format = "s16"
+        codec.bit_rate = bitrate
+        codec.options = {"application": "voip", "frame_duration": str(frame_ms)}
+        codec.open()
+        self._codec = codec
+
+    def _encode_frame(self, samples: np.ndarray) -> List[bytes]:
+        frame = av.AudioFrame.from_ndarray(samples.reshape(1, -1), format="s16", layout="mono")
+        frame.sample_rate = self.out_rate
+        frame.pts = self._pts
+        self._pts += len(samples)
+        return [bytes(packet) for packet in self._codec.encode(frame)]
+
+    def encode(self, pcm: bytes) -> List[bytes]:
+        """
+        Encodes a chunk of little-endian int16 PCM at `in_rate`.
+
+        Returns:
+            The Opus packets completed by this chunk (possibly none).
+        """
+        samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2)
+        if self._resampler is not None:
+            resampled = self._resampler.process(samples.astype(np.float32) / 32768.0)
+            samples = (np.clip(resampled, -1.0, 1.0) * 32767).astype(np.int16)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+
+        n_frames = len(samples) // self.frame_size
+        self._pending = samples[n_frames * self.frame_size:].copy()
+        packets: List[bytes] = []
+        for i in range(n_frames):
+            packets.extend(self._encode_frame(samples[i * self.frame_size:(i + 1) * self.frame_size]))
+        return packets
+
+    def flush(self) -> List[bytes]:
+        """Encodes the last partial frame, padded with silence, and drains the encoder."""
+        packets: List[bytes] = []
+        if len(self._pending):
+            frame = np.zeros(self.frame_size, dtype=np.int16)
+            frame[:len(self._pending)] = self._pending
+            self._pending = np.zeros(0, dtype=np.int16)
+            packets.extend(self._encode_frame(frame))
+        packets.extend(bytes(packet) for packet in self._codec.encode(None))
+        return packets
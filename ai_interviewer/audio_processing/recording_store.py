@@ -0,0 +1,478 @@
+# ai_interviewer/audio_processing/recording_store.py
+
+"""
+Append-only recordings of interview audio, for audits and replay.
+
+Layout, per session, under RECORDINGS_DIR/<session_id>/:
+
+- `seg-00000.bin`, `seg-00001.bin`, ...: raw audio payloads back to back, exactly
+  as received from the browser or sent to it. A segment holds at most
+  RECORDING_SEGMENT_BYTES.
+- `index.bin`: one fixed-size record (INDEX_DTYPE) per payload, holding its turn,
+  kind, segment, offset, length, sample rate and timestamp.
+- `meta.json`: the knowledge graph the interview ran on.
+
+Writing: the WebSocket handler only puts references to the payload bytes on a
+queue, which never blocks. A single writer thread drains the queue and writes
+each session's payloads with one gathered `os.writev` call, without copying
+them into a buffer. If the disk falls behind by more than
+RECORDING_MAX_BACKLOG_BYTES, new audio is dropped and counted instead of
+slowing the interview down.
+
+Reading: `SessionRecording` loads the index as a NumPy structured array and
+mmaps the segments, so any payload is a zero-copy memoryview slice.
+
+Replay: `replay_recording` feeds a recording's answers back through streaming
+transcription, triage and question selection, turn by turn and with the
+recorded turn boundaries, so a session can be reprocessed deterministically:
+
+    python -m ai_interviewer.audio_processing.recording_store list
+    python -m ai_interviewer.audio_processing.recording_store replay <session_id>
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import mmap
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from ai_interviewer.config import (
+    DEFAULT_GRAPH_ID,
+    RECORDINGS_DIR,
+    RECORDING_SEGMENT_BYTES,
+    RECORDING_MAX_BACKLOG_BYTES,
+    RECORDING_MAX_OPEN_FILES,
+)
+
+# Payload kinds.
+INBOUND = 0        # Candidate audio as received (WebM/Opus or int16 PCM).
+OUTBOUND_PCM = 1   # Synthesized int16 PCM sent to the client.
+OUTBOUND_WAV = 2   # A complete synthesized WAV file sent to the client.
+
+INDEX_DTYPE = np.dtype([
+    ("turn", "<u4"),
+    ("kind", "u1"),
+    ("segment", "<u2"),
+    ("sample_rate", "<u4"),
+    ("offset", "<u8"),
+    ("length", "<u4"),
+    ("timestamp", "<f8"),
+])
+
+INDEX_FILE = "index.bin"
+META_FILE = "meta.json"
+
+# Most buffers passed to one writev call (IOV_MAX is 1024 on Linux).
+_MAX_IOV = 512
+
+
+def _session_dir(root: str, session_id: str) -> str:
+    safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in session_id)
+    return os.path.join(root, safe_id)
+
+
+def _segment_path(directory: str, segment: int) -> str:
+    return os.path.join(directory, f"seg-{segment:05d}.bin")
+
+
+class _SessionFiles:
+    """The open segment and index files of one session, and the write position."""
+
+    __slots__ = ("directory", "segment", "offset", "segment_fd", "index_fd")
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        # Continue after the existing audio, e.g. when a session is resumed.
+        segments = sorted(name for name in os.listdir(directory) if name.startswith("seg-"))
+        self.segment = len(segments) - 1 if segments else 0
+        self.segment_fd = self._open_segment()
+        self.offset = os.fstat(self.segment_fd).st_size
+        self.index_fd = os.open(os.path.join(directory, INDEX_FILE), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def _open_segment(self) -> int:
+        return os.open(_segment_path(self.directory, self.segment), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def next_segment(self) -> None:
+        os.close(self.segment_fd)
+        self.segment += 1
+        self.segment_fd = self._open_segment()
+        self.offset = 0
+
+    def close(self) -> None:
+        os.close(self.segment_fd)
+        os.close(self.index_fd)
+
+
+class RecordingWriter:
+    """
+    Appends audio payloads of many sessions to their recordings from one
+    background thread.
+    """
+
+    def __init__(self, root: str = RECORDINGS_DIR, segment_bytes: int = RECORDING_SEGMENT_BYTES,
+                 max_backlog_bytes: int = RECORDING_MAX_BACKLOG_BYTES, max_open: int = RECORDING_MAX_OPEN_FILES):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self.max_backlog_bytes = max_backlog_bytes
+        # Each open session uses two descriptors.
+        self.max_open_sessions = max(1, max_open // 2)
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._files: "OrderedDict[str, _SessionFiles]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._backlog = 0
+        self._thread: Optional[threading.Thread] = None
+        self.written_bytes = 0
+        self.dropped = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="recording-writer", daemon=True)
+                    self._thread.start()
+
+    def start_session(self, session_id: str, meta: dict) -> None:
+        """Records the session's metadata (graph, start time)."""
+        self._ensure_started()
+        self._queue.put(("meta", session_id, meta))
+
+    def append(self, session_id: str, turn: int, kind: int, payload: bytes, sample_rate: int = 0) -> bool:
+        """
+        Queues a payload for writing. Never blocks.
+
+        Returns:
+            False if the payload was dropped because the writer is too far behind.
+        """
+        size = len(payload)
+        with self._lock:
+            if self._backlog + size > self.max_backlog_bytes:
+                self.dropped += 1
+                return False
+            self._backlog += size
+        self._ensure_started()
+        self._queue.put(("audio", session_id, (turn, kind, sample_rate, time.time(), payload)))
+        return True
+
+    def close_session(self, session_id: str) -> None:
+        """Closes the session's files once its queued audio is written."""
+        self._ensure_started()
+        self._queue.put(("close", session_id, None))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until everything queued so far is on disk."""
+        self._ensure_started()
+        done = threading.Event()
+        self._queue.put(("flush", "", done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Writes everything queued so far and closes every open session's files.
+        Called on shutdown, since the writer thread is a daemon.
+
+        Returns:
+            False if the writer did not finish within `timeout` seconds.
+        """
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(("close_all", "", done))
+        return done.wait(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            backlog = self._backlog
+        return {
+            "backlog_bytes": backlog,
+            "written_bytes": self.written_bytes,
+            "dropped": self.dropped,
+            "open_sessions": len(self._files),
+        }
+
+    # --- Writer thread ---
+
+    def _run(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            # Drain what is already queued, so each session gets one gathered write.
+            while len(items) < 4096:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            pending: "OrderedDict[str, list]" = OrderedDict()
+            for op, session_id, data in items:
+                if op == "audio":
+                    pending.setdefault(session_id, []).append(data)
+                    continue
+                # Keep the order of audio relative to the other operations.
+                self._write_pending(pending)
+                pending.clear()
+                try:
+                    if op == "meta":
+                        directory = _session_dir(self.root, session_id)
+                        os.makedirs(directory, exist_ok=True)
+                        with open(os.path.join(directory, META_FILE), "w") as f:
+                            json.dump(data, f)
+                    elif op == "close":
+                        files = self._files.pop(session_id, None)
+                        if files is not None:
+                            files.close()
+                    elif op == "flush":
+                        data.set()
+                    elif op == "close_all":
+                        try:
+                            while self._files:
+                                self._files.popitem()[1].close()
+                        finally:
+                            data.set()
+                except OSError as e:
+                    print(f"Recording {op} failed for session {session_id}: {e}")
+            self._write_pending(pending)
+
+    def _open(self, session_id: str) -> _SessionFiles:
+        files = self._files.get(session_id)
+        if files is not None:
+            self._files.move_to_end(session_id)
+            return files
+        while len(self._files) >= self.max_open_sessions:
+            _, oldest = self._files.popitem(last=False)
+            oldest.close()
+        files = self._files[session_id] = _SessionFiles(_session_dir(self.root, session_id))
+        return files
+
+    def _write_pending(self, pending: "OrderedDict[str, list]") -> None:
+        for session_id, entries in pending.items():
+            size = sum(len(entry[4]) for entry in entries)
+            try:
+                self._write_session(session_id, entries)
+                self.written_bytes += size
+            except OSError as e:
+                print(f"Recording write failed for session {session_id}: {e}")
+                files = self._files.pop(session_id, None)
+                if files is not None:
+                    files.close()
+            finally:
+                with self._lock:
+                    self._backlog -= size
+
+    def _write_session(self, session_id: str, entries: list) -> None:
+        files = self._open(session_id)
+        records = np.zeros(len(entries), dtype=INDEX_DTYPE)
+        buffers: List[bytes] = []
+
+        def write_buffers() -> None:
+            for i in range(0, len(buffers), _MAX_IOV):
+                chunk = buffers[i:i + _MAX_IOV]
+                written = os.writev(files.segment_fd, chunk)
+                expected = sum(len(b) for b in chunk)
+                if written != expected:  # Short write (e.g. a signal); finish it.
+                    rest = b"".join(chunk)[written:]
+                    while rest:
+                        rest = rest[os.write(files.segment_fd, rest):]
+            buffers.clear()
+
+        for i, (turn, kind, sample_rate, timestamp, payload) in enumerate(entries):
+            if files.offset and files.offset + len(payload) > self.segment_bytes:
+                write_buffers()
+                files.next_segment()
+            records[i] = (turn, kind, files.segment, sample_rate, files.offset, len(payload), timestamp)
+            buffers.append(payload)
+            files.offset += len(payload)
+        write_buffers()
+        # The index is written after the audio it points to.
+        os.write(files.index_fd, records.tobytes())
+
+
+# --- Per-connection Recorder ---
+
+class SessionRecorder:
+    """
+    Records one connection's audio; `turn` is advanced by the WebSocket handler
+    after every answer, so a turn holds a question and the answer to it.
+    """
+
+    def __init__(self, writer: RecordingWriter, session_id: str):
+        self.writer = writer
+        self.session_id = session_id
+        self.turn = 0
+
+    def inbound(self, payload: bytes) -> None:
+        self.writer.append(self.session_id, self.turn, INBOUND, payload)
+
+    def outbound(self, payload: bytes, sample_rate: int = 0, wav: bool = False) -> None:
+        self.writer.append(self.session_id, self.turn, OUTBOUND_WAV if wav else OUTBOUND_PCM, payload, sample_rate)
+
+
+# The recorder of the connection the current task is serving.
+current_recorder: contextvars.ContextVar[Optional[SessionRecorder]] = contextvars.ContextVar(
+    "current_recorder", default=None)
+
+
+def record_outbound(payload: bytes, sample_rate: int = 0, wav: bool = False) -> None:
+    """Records audio sent to the client, if the current connection is being recorded."""
+    recorder = current_recorder.get()
+    if recorder is not None:
+        recorder.outbound(payload, sample_rate, wav)
+
+
+# --- Reading ---
+
+class SessionRecording:
+    """
+    Random access to a recorded session: the index as a structured NumPy array
+    and the payloads as memoryviews into memory-mapped segments.
+    """
+
+    def __init__(self, session_id: str, root: str = RECORDINGS_DIR):
+        self.session_id = session_id
+        self.directory = _session_dir(root, session_id)
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"No recording for session {session_id} in {root}.")
+        # Ignore a partially written last record.
+        count = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+        self.index = (np.memmap(index_path, dtype=INDEX_DTYPE, mode="r", shape=(count,))
+                      if count else np.zeros(0, dtype=INDEX_DTYPE))
+        meta_path = os.path.join(self.directory, META_FILE)
+        self.meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        self._segments: Dict[int, mmap.mmap] = {}
+
+    def _segment(self, segment: int) -> mmap.mmap:
+        mapped = self._segments.get(segment)
+        if mapped is None:
+            with open(_segment_path(self.directory, segment), "rb") as f:
+                mapped = self._segments[segment] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mapped
+
+    def payload(self, i: int) -> memoryview:
+        """Returns payload `i` of the index without copying it."""
+        record = self.index[i]
+        offset = int(record["offset"])
+        return memoryview(self._segment(int(record["segment"])))[offset:offset + int(record["length"])]
+
+    def turns(self) -> List[int]:
+        """The turns that have recorded answer audio."""
+        return [int(t) for t in np.unique(self.index["turn"][self.index["kind"] == INBOUND])]
+
+    def payloads(self, turn: Optional[int] = None, kind: Optional[int] = None) -> Iterator[memoryview]:
+        """Iterates the payloads of a turn and/or kind, in recording order."""
+        mask = np.ones(len(self.index), dtype=bool)
+        if turn is not None:
+            mask &= self.index["turn"] == turn
+        if kind is not None:
+            mask &= self.index["kind"] == kind
+        for i in np.flatnonzero(mask):
+            yield self.payload(int(i))
+
+    def close(self) -> None:
+        for mapped in self._segments.values():
+            try:
+                mapped.close()
+            except BufferError:  # A payload view is still referenced; the GC unmaps it.
+                pass
+        self._segments.clear()
+
+
+def list_recordings(root: str = RECORDINGS_DIR) -> List[str]:
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if os.path.exists(os.path.join(root, name, INDEX_FILE)))
+
+
+# --- Replay ---
+
+async def replay_recording(recording: SessionRecording) -> List[dict]:
+    """
+    Feeds a recorded session back through the pipeline: streaming transcription
+    of each turn's answer (ending at the recorded turn boundary), triage, and
+    question selection on a fresh session.
+
+    Returns:
+        One dict per turn with the transcript, triage signal and next question.
+    """
+    from ai_interviewer.audio_processing.streaming_stt import StreamingTranscriber
+    from ai_interviewer.core_logic.question_engine import get_current_node, select_next_question
+    from ai_interviewer.core_logic.response_analyzer import run_triage_analysis
+    from ai_interviewer.knowledge_graph.graph_loader import get_graph_registry
+    from ai_interviewer.models.schemas import SessionState, TurnRecord
+
+    graph = get_graph_registry().get(recording.meta.get("graph_id", DEFAULT_GRAPH_ID),
+                                     recording.meta.get("graph_version"))
+    session = SessionState(session_id=f"replay-{recording.session_id}", current_node_id=graph.start_node.node_id,
+                           graph_id=graph.graph_id, graph_version=graph.version)
+    transcriber = StreamingTranscriber(session.session_id)
+    results = []
+    for turn in recording.turns():
+        for payload in recording.payloads(turn, INBOUND):
+            transcriber.feed(bytes(payload))
+        text = await transcriber.finalize()
+        node = get_current_node(session)
+        entry = {"turn": turn, "node_id": node.node_id, "transcript": text}
+        if text and text != "[Transcription Error]":
+            triage = await run_triage_analysis(text, node.question_text)
+            next_node = select_next_question(session, triage)
+            session.interview_history.append(TurnRecord(
+                node_id=node.node_id, answer=text, signal=triage.signal, confidence=triage.confidence))
+            entry.update(signal=triage.signal, confidence=triage.confidence, next_node_id=next_node.node_id)
+        results.append(entry)
+    return results
+
+
+# --- Shared Writer ---
+
+_writer: Optional[RecordingWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_recording_writer() -> RecordingWriter:
+    """Returns the process-wide recording writer, creating it on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = RecordingWriter()
+        return _writer
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("list", "replay"))
+    parser.add_argument("session_id", nargs="?")
+    parser.add_argument("--root", default=RECORDINGS_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for session_id in list_recordings(args.root):
+            recording = SessionRecording(session_id, args.root)
+            size = int(recording.index["length"].sum())
+            print(f"{session_id}: {len(recording.turns())} turn(s), {len(recording.index)} payload(s), {size} bytes")
+            recording.close()
+        return 0
+
+    if not args.session_id:
+        parser.error("replay needs a session id")
+    recording = SessionRecording(args.session_id, args.root)
+    try:
+        for entry in asyncio.run(replay_recording(recording)):
+            print(json.dumps(entry))
+    finally:
+        recording.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,16 +1,148 @@
 # ai_interviewer/audio_processing/speech_to_text.py
 
-from faster_whisper import WhisperModel
+import threading
+from typing import List, Optional, Tuple
+
 import numpy as np
-from ai_interviewer.config import STT_MODEL
+from ai_interviewer.config import (
+    STT_MODEL,
+    STT_SAMPLE_RATE,
+    MODEL_WORKERS_ENABLED,
+    STT_BATCHING_ENABLED,
+    STT_GREEDY_MAX_SECONDS,
+)
+from ai_interviewer.audio_processing.audio_decoder import decode_audio_bytes
+from ai_interviewer.core_logic.inference_executor import cancellation_requested, get_inference_executor, STT_LANE
+from ai_interviewer.core_logic.model_registry import get_model_registry
+
+STT_MODEL_KEY = "stt"
+
+# Whisper decodes fixed 30-second windows.
+WHISPER_WINDOW_SAMPLES = 30 * STT_SAMPLE_RATE
+
+
+def _load_stt_model():
+    # faster-whisper (and CTranslate2) are imported here rather than at module
+    # import, so importing the app stays fast.
+    from faster_whisper import WhisperModel
+    try:
+        print(f"Loading STT model: {STT_MODEL}...")
+        model = WhisperModel(STT_MODEL, device="cuda", compute_type="float16")
+        print("STT model loaded successfully.")
+    except Exception as e:
+        print(f"Error loading STT model: {e}. Falling back to CPU.")
+        model = WhisperModel(STT_MODEL, device="cpu", compute_type="int8")
+    return model
+
+
+def _warm_up_stt_model(model) -> None:
+    # One second of silence; consuming the generator is what runs the decoder.
+    segments, _ = model.transcribe(np.zeros(STT_SAMPLE_RATE, dtype=np.float32), beam_size=1)
+    list(segments)
+
+
+get_model_registry().register(STT_MODEL_KEY, _load_stt_model, _warm_up_stt_model)
+
+
+def get_stt_model():
+    """Returns the Whisper model, loading it on the first call if it is not loaded yet."""
+    return get_model_registry().get(STT_MODEL_KEY)
+
+
+def transcribe_segments(audio_np: np.ndarray, beam_size: int = 5) -> List[Tuple[float, float, str]]:
+    """
+    Transcribes 16 kHz float32 audio and keeps Whisper's segment boundaries.
+
+    - Input: A float32 NumPy array of samples and the decoding beam size.
+    - Output: A list of (start_seconds, end_seconds, text) tuples. Decoding stops
+      early (with the segments so far) if the call was cancelled.
+    """
+    segments, _ = get_stt_model().transcribe(audio_np, beam_size=beam_size)
+    results = []
+    # Segments are decoded lazily, so a cancelled call stops at the next one.
+    for seg in segments:
+        results.append((seg.start, seg.end, seg.text.strip()))
+        if cancellation_requested():
+            break
+    return results
+
+
+# The batched pipeline wrapping the current model, as (model, pipeline).
+_batched_pipeline: Optional[tuple] = None
+_batched_pipeline_lock = threading.Lock()
+
+
+def _get_batched_pipeline(model):
+    """Returns a BatchedInferencePipeline for `model`, or None if it cannot batch."""
+    global _batched_pipeline
+    with _batched_pipeline_lock:
+        if _batched_pipeline is None or _batched_pipeline[0] is not model:
+            try:
+                from faster_whisper import BatchedInferencePipeline, WhisperModel
+                pipeline = BatchedInferencePipeline(model=model) if isinstance(model, WhisperModel) else None
+            except ImportError:  # faster-whisper < 1.1, or a stand-in model.
+                pipeline = None
+            _batched_pipeline = (model, pipeline)
+        return _batched_pipeline[1]
 
-try:
-    print(f"Loading STT model: {STT_MODEL}...")
-    stt_model = WhisperModel(STT_MODEL, device="cuda", compute_type="float16")
-    print("STT model loaded successfully.")
-except Exception as e:
-    print(f"Error loading STT model: {e}. Falling back to CPU.")
-    stt_model = WhisperModel(STT_MODEL, device="cpu", compute_type="int8")
+
+def batching_supported() -> Optional[bool]:
+    """Whether the loaded model can decode batches (None until the first batch ran)."""
+    current = _batched_pipeline
+    return None if current is None else current[1] is not None
+
+
+def transcribe_batch(audios: List[np.ndarray], beam_size: int = 5) -> List[List[Tuple[float, float, str]]]:
+    """
+    Transcribes several utterances (each at most 30 seconds) in one batched pass.
+
+    - Method: Each utterance is placed at the start of its own 30-second window
+      in one buffer, and the windows are passed as clip timestamps to
+      faster-whisper's batched pipeline, which runs their encoder and decoder
+      passes as one batch. Clips spanning a whole window keep the pipeline from
+      merging neighbouring utterances. Timestamps are decoded as in
+      `transcribe_segments`, so each utterance comes back as Whisper's
+      segments rather than one segment per window; partial streaming passes
+      need them to commit a stable prefix. Segments are mapped back to their
+      utterance by window. Models without batching support transcribe the
+      utterances one after another.
+    - Input: float32 16 kHz utterances and the beam size for all of them.
+    - Output: One list of (start_seconds, end_seconds, text) tuples per utterance.
+    """
+    model = get_stt_model()
+    pipeline = _get_batched_pipeline(model)
+    if len(audios) == 1:
+        pipeline = None
+    if pipeline is None:
+        return [transcribe_segments(audio, beam_size) for audio in audios]
+
+    buffer = np.zeros(WHISPER_WINDOW_SAMPLES * len(audios), dtype=np.float32)
+    clips = []
+    for i, audio in enumerate(audios):
+        start = i * WHISPER_WINDOW_SAMPLES
+        buffer[start:start + len(audio)] = audio
+        clips.append({"start": start, "end": start + WHISPER_WINDOW_SAMPLES})
+
+    segments, _ = pipeline.transcribe(buffer, beam_size=beam_size, batch_size=len(audios),
+                                      clip_timestamps=clips, vad_filter=False, without_timestamps=False)
+    window_seconds = WHISPER_WINDOW_SAMPLES / STT_SAMPLE_RATE
+    results: List[List[Tuple[float, float, str]]] = [[] for _ in audios]
+    for seg in segments:
+        if cancellation_requested():
+            break
+        i = min(int(seg.start // window_seconds), len(audios) - 1)
+        offset = i * window_seconds
+        duration = len(audios[i]) / STT_SAMPLE_RATE
+        results[i].append((seg.start - offset, min(seg.end - offset, duration), seg.text.strip()))
+    return results
+
+
+def answer_beam_size(n_samples: int, beam_size: int) -> int:
+    """
+    The beam size for decoding a whole answer of `n_samples`: answers up to
+    STT_GREEDY_MAX_SECONDS are decoded greedily, longer ones with `beam_size`.
+    """
+    return 1 if n_samples <= STT_GREEDY_MAX_SECONDS * STT_SAMPLE_RATE else beam_size
 
 
 def transcribe_audio(audio_bytes: bytes) -> str:
@@ -18,10 +150,52 @@ def transcribe_audio(audio_bytes: bytes) -> str:
     if not audio_bytes:
         return ""
     try:
-        audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-        segments, _ = stt_model.transcribe(audio_np, beam_size=5)
-        transcription = " ".join([seg.text.strip() for seg in segments])
+        audio_np = decode_audio_bytes(audio_bytes)
+        segments = transcribe_segments(audio_np, beam_size=5)
+        transcription = " ".join([text for _, _, text in segments])
         return transcription
     except Exception as e:
         print(f"Error during audio transcription: {e}")
         return "[Transcription Error]"
+
+
+async def transcribe_segments_async(audio_np: np.ndarray, beam_size: int = 5,
+                                    session_id: Optional[str] = None) -> List[Tuple[float, float, str]]:
+    """
+    Awaitable version of `transcribe_segments`. Runs on the inference executor,
+    batched with other sessions' requests when STT_BATCHING_ENABLED is set, or
+    on a model worker process (preferring the session's worker) when
+    MODEL_WORKERS_ENABLED is set.
+
+    Raises:
+        ExecutorSaturatedError: If too many transcriptions are already pending.
+    """
+    executor = get_inference_executor()
+    if MODEL_WORKERS_ENABLED:
+        from ai_interviewer.core_logic.model_workers import get_model_worker_pool
+        return await executor.run_async(STT_LANE, get_model_worker_pool().transcribe, audio_np, beam_size, session_id)
+    if STT_BATCHING_ENABLED:
+        from ai_interviewer.audio_processing.stt_batcher import get_stt_batcher
+        return await get_stt_batcher().transcribe(audio_np, beam_size)
+    return await executor.run(STT_LANE, transcribe_segments, audio_np, beam_size)
+
+
+async def transcribe_audio_async(audio_bytes: bytes) -> str:
+    """
+    Awaitable version of `transcribe_audio` that runs on the inference executor,
+    keeping the event loop free while Whisper decodes.
+
+    Raises:
+        ExecutorSaturatedError: If too many transcriptions are already pending.
+    """
+    if not MODEL_WORKERS_ENABLED and not STT_BATCHING_ENABLED:
+        return await get_inference_executor().run(STT_LANE, transcribe_audio, audio_bytes)
+    if not audio_bytes:
+        return ""
+    try:
+        audio_np = decode_audio_bytes(audio_bytes)
+    except Exception as e:
+        print(f"Error during audio transcription: {e}")
+        return "[Transcription Error]"
+    segments = await transcribe_segments_async(audio_np, beam_size=answer_beam_size(len(audio_np), 5))
+    return " ".join(text for _, _, text in segments)
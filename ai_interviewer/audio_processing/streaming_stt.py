@@ -0,0 +1,326 @@
+# ai_interviewer/audio_processing/streaming_stt.py
+
+"""
+Incremental speech-to-text for a live interview answer.
+
+The browser streams small audio chunks while the candidate speaks. Instead of
+waiting for the whole answer and decoding it from scratch, each session keeps
+its audio in a ring buffer, runs voice-activity detection (VAD) on every chunk
+to find the end of the utterance, and periodically transcribes the audio that
+has not been committed yet. Segments that come out identical in two consecutive
+passes are committed and dropped from the buffer, so the final pass only has to
+decode the last few hundred milliseconds of speech.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ai_interviewer.config import (
+    STT_SAMPLE_RATE,
+    STREAMING_MAX_UTTERANCE_SECONDS,
+    STREAMING_PARTIAL_INTERVAL_SECONDS,
+    STREAMING_PARTIAL_BEAM_SIZE,
+    STREAMING_FINAL_BEAM_SIZE,
+    VAD_FRAME_MS,
+    VAD_ENERGY_THRESHOLD,
+    VAD_NOISE_RATIO,
+    VAD_END_SILENCE_MS,
+    VAD_MIN_SPEECH_MS,
+)
+from ai_interviewer.audio_processing.audio_decoder import StreamingAudioDecoder
+from ai_interviewer.audio_processing.speech_to_text import answer_beam_size, transcribe_segments_async
+from ai_interviewer.core_logic.admission import is_degraded
+from ai_interviewer.core_logic.inference_executor import ExecutorSaturatedError
+
+logger = logging.getLogger(__name__)
+
+# A segment with absolute sample positions: (start_sample, end_sample, text).
+Segment = Tuple[int, int, str]
+
+
+class AudioRingBuffer:
+    """
+    A fixed-capacity float32 ring buffer addressed by absolute sample index.
+
+    Samples are written once into a preallocated array. Reading a range that
+    does not wrap around the end of the array returns a view, not a copy.
+    """
+
+    def __init__(self, capacity_samples: int):
+        self._buf = np.zeros(capacity_samples, dtype=np.float32)
+        self._capacity = capacity_samples
+        self._start = 0  # Oldest retained absolute sample index.
+        self._end = 0    # Absolute index of the next sample to be written.
+
+    @property
+    def start(self) -> int:
+        return self._start
+
+    @property
+    def end(self) -> int:
+        return self._end
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def write(self, samples: np.ndarray) -> None:
+        """Appends samples, overwriting the oldest audio if the buffer is full."""
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self._capacity:
+            # Only the most recent `capacity` samples can be kept.
+            self._end += n - self._capacity
+            samples = samples[-self._capacity:]
+            n = self._capacity
+
+        pos = self._end % self._capacity
+        first = min(n, self._capacity - pos)
+        self._buf[pos:pos + first] = samples[:first]
+        if first < n:
+            self._buf[:n - first] = samples[first:]
+        self._end += n
+
+        if self._end - self._start > self._capacity:
+            self._start = self._end - self._capacity
+
+    def read(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the samples in [start, end) as a float32 array.
+
+        The range is clamped to the retained audio. A view is returned when the
+        range is contiguous in memory; a wrapped range is copied.
+        """
+        start = max(start, self._start)
+        end = self._end if end is None else min(end, self._end)
+        if end <= start:
+            return self._buf[:0]
+
+        lo = start % self._capacity
+        hi = lo + (end - start)
+        if hi <= self._capacity:
+            return self._buf[lo:hi]
+        return np.concatenate((self._buf[lo:], self._buf[:hi - self._capacity]))
+
+    def discard_until(self, index: int) -> None:
+        """Releases every sample before `index` so its space can be reused."""
+        self._start = max(self._start, min(index, self._end))
+
+    def clear(self) -> None:
+        self._start = self._end
+
+
+class EnergyVAD:
+    """
+    A lightweight energy-based voice-activity detector.
+
+    Audio is split into fixed-size frames and the RMS energy of all frames in a
+    chunk is computed in one vectorized pass. A frame counts as speech when its
+    energy exceeds both an absolute floor and a multiple of the running noise
+    estimate. The utterance ends after enough trailing silence.
+    """
+
+    def __init__(self, sample_rate: int = STT_SAMPLE_RATE):
+        self.frame_len = int(sample_rate * VAD_FRAME_MS / 1000)
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._noise_floor = VAD_ENERGY_THRESHOLD / VAD_NOISE_RATIO
+        self.speech_ms = 0.0
+        self.trailing_silence_ms = 0.0
+
+    @property
+    def speech_started(self) -> bool:
+        return self.speech_ms >= VAD_MIN_SPEECH_MS
+
+    @property
+    def end_of_utterance(self) -> bool:
+        return self.speech_started and self.trailing_silence_ms >= VAD_END_SILENCE_MS
+
+    def process(self, samples: np.ndarray) -> None:
+        """Updates the speech/silence state with a new chunk of samples."""
+        if len(self._carry):
+            samples = np.concatenate((self._carry, samples))
+        n_frames = len(samples) // self.frame_len
+        self._carry = samples[n_frames * self.frame_len:].copy()
+        if n_frames == 0:
+            return
+
+        frames = samples[:n_frames * self.frame_len].reshape(n_frames, self.frame_len)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        threshold = max(VAD_ENERGY_THRESHOLD, self._noise_floor * VAD_NOISE_RATIO)
+        is_speech = rms > threshold
+
+        # Track the noise floor from non-speech frames only.
+        if not is_speech.all():
+            self._noise_floor = 0.9 * self._noise_floor + 0.1 * float(np.median(rms[~is_speech]))
+
+        speech_idx = np.flatnonzero(is_speech)
+        if len(speech_idx):
+            self.speech_ms += len(speech_idx) * VAD_FRAME_MS
+            self.trailing_silence_ms = (n_frames - 1 - speech_idx[-1]) * VAD_FRAME_MS
+        else:
+            self.trailing_silence_ms += n_frames * VAD_FRAME_MS
+
+    def reset(self) -> None:
+        self._carry = np.zeros(0, dtype=np.float32)
+        self.speech_ms = 0.0
+        self.trailing_silence_ms = 0.0
+
+
+class StreamingTranscriber:
+    """
+    Per-session streaming transcription with VAD endpointing.
+
+    Usage: call `feed` for every inbound audio chunk; when it returns True the
+    candidate has finished speaking and `finalize` returns the full answer.
+    """
+
+    def __init__(self, session_id: str, sample_rate: int = STT_SAMPLE_RATE):
+        self.session_id = session_id
+        self.sample_rate = sample_rate
+        self.ring = AudioRingBuffer(int(STREAMING_MAX_UTTERANCE_SECONDS * sample_rate))
+        self.vad = EnergyVAD(sample_rate)
+        self.decoder = StreamingAudioDecoder(sample_rate)
+        self._committed: List[str] = []
+        self._committed_until = 0
+        self._utterance_start = 0
+        self._hypothesis: List[Segment] = []
+        self._last_pass_at = 0
+        self._partial_task: Optional[asyncio.Task] = None
+
+    @property
+    def partial_text(self) -> str:
+        """The committed text followed by the latest unconfirmed hypothesis."""
+        return " ".join(self._committed + [text for _, _, text in self._hypothesis])
+
+    def push_samples(self, samples: np.ndarray) -> bool:
+        """
+        Adds decoded float32 samples to the buffer and updates the VAD.
+
+        Returns:
+            True once the end of the utterance has been detected.
+        """
+        self.ring.write(samples)
+        self.vad.process(samples)
+        if self.vad.end_of_utterance:
+            return True
+
+        interval = int(STREAMING_PARTIAL_INTERVAL_SECONDS * self.sample_rate)
+        idle = self._partial_task is None or self._partial_task.done()
+        if self.vad.speech_started and idle and self.ring.end - self._last_pass_at >= interval:
+            self._last_pass_at = self.ring.end
+            if is_degraded():
+                # Partial passes are an optimization; an overloaded server skips them.
+                return False
+            self._partial_task = asyncio.create_task(self._run_partial_pass())
+        return False
+
+    def feed(self, audio_bytes: bytes) -> bool:
+        """
+        Decodes a chunk of inbound audio (WebM/Opus or raw int16 PCM) as it
+        arrives and adds it to the buffer. See `push_samples`.
+        """
+        try:
+            samples = self.decoder.decode(audio_bytes)
+        except Exception as e:
+            # A corrupt chunk should not end the interview; drop it and the
+            # rest of its stream until the next stream header.
+            logger.warning(f"Dropping undecodable audio chunk for {self.session_id}: {e}")
+            self.decoder.resync()
+            return False
+        return self.push_samples(samples)
+
+    async def _transcribe_from(self, start: int, beam_size: int, copy: bool = True) -> List[Segment]:
+        # A partial pass runs while new chunks keep arriving, so it gets its own
+        # copy of the audio. The final pass hands the ring buffer view straight
+        # to the model, since nothing is written while it runs.
+        audio = self.ring.read(start)
+        if copy:
+            audio = audio.copy()
+        if len(audio) == 0:
+            return []
+        segments = await transcribe_segments_async(audio, beam_size, session_id=self.session_id)
+        return [
+            (start + int(seg_start * self.sample_rate), start + int(seg_end * self.sample_rate), text)
+            for seg_start, seg_end, text in segments
+        ]
+
+    async def _run_partial_pass(self) -> None:
+        try:
+            segments = await self._transcribe_from(self._committed_until, STREAMING_PARTIAL_BEAM_SIZE)
+        except ExecutorSaturatedError:
+            # Partial passes are an optimization; skip them under load.
+            return
+        except Exception as e:
+            logger.warning(f"Partial transcription failed for {self.session_id}: {e}")
+            return
+
+        # Commit the leading segments that match the previous pass. The last
+        # segment is never committed because the speaker may still be in it.
+        stable = 0
+        for previous, current in zip(self._hypothesis, segments[:-1]):
+            if previous[2] != current[2]:
+                break
+            stable += 1
+
+        if stable:
+            self._committed.extend(text for _, _, text in segments[:stable])
+            self._committed_until = min(segments[stable - 1][1], self.ring.end)
+            self.ring.discard_until(self._committed_until)
+        self._hypothesis = segments[stable:]
+
+    async def finalize(self) -> str:
+        """
+        Transcribes the uncommitted tail of the utterance and resets for the next one.
+
+        Returns:
+            The complete transcription, or "[Transcription Error]" on failure.
+
+        Raises:
+            ExecutorSaturatedError: If the STT lane cannot accept the final pass.
+
+        If the call is cancelled (the candidate kept talking), the utterance is
+        kept; see `resume`.
+        """
+        if self._partial_task is not None and not self._partial_task.done():
+            await self._partial_task
+        try:
+            # An overloaded server decodes greedily, and so does a short answer.
+            # The answer's length counts, not the tail left by partial passes.
+            beam_size = 1 if is_degraded() else answer_beam_size(
+                self.ring.end - self._utterance_start, STREAMING_FINAL_BEAM_SIZE)
+            tail = await self._transcribe_from(self._committed_until, beam_size, copy=False)
+            text = " ".join(self._committed + [t for _, _, t in tail if t])
+        except asyncio.CancelledError:
+            raise
+        except ExecutorSaturatedError:
+            self.reset()
+            raise
+        except Exception as e:
+            logger.error(f"Final transcription failed for {self.session_id}: {e}")
+            text = "[Transcription Error]"
+        self.reset()
+        return text.strip()
+
+    def resume(self) -> None:
+        """
+        Continues the current utterance after the end-of-utterance was retracted
+        (the candidate went on speaking while it was being finalized), so the
+        next `finalize` covers the whole answer.
+        """
+        self.vad.trailing_silence_ms = 0.0
+
+    def reset(self) -> None:
+        """Discards all buffered audio and transcription state."""
+        if self._partial_task is not None and not self._partial_task.done():
+            self._partial_task.cancel()
+        self._partial_task = None
+        self.ring.clear()
+        self.vad.reset()
+        self._committed = []
+        self._committed_until = self.ring.end
+        self._utterance_start = self.ring.end
+        self._hypothesis = []
+        self._last_pass_at = self.ring.end
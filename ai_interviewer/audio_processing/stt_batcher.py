@@ -0,0 +1,243 @@
+# ai_interviewer/audio_processing/stt_batcher.py
+
+"""
+Micro-batching scheduler for Whisper transcription across sessions.
+
+Transcribing one utterance at a time leaves most of the encoder's vector width
+unused and makes concurrent candidates queue behind each other. Instead, every
+session's request goes into one shared queue. A dispatcher takes a free STT lane
+slot, gathers the waiting requests with the same beam size (up to
+STT_BATCH_MAX_SIZE), and runs them as one batched pass on the inference executor
+(`transcribe_batch`). Each request's result is then fanned back out to its caller.
+
+When the lane is idle a request is dispatched at once, so a lone interview pays
+no batching delay. Under load, requests pile up while the running batches
+finish and are picked up together, which is where batching pays off.
+
+Each request keeps the beam size its caller asked for; only requests with the
+same beam size share a batch. Utterances longer than Whisper's 30-second
+window are transcribed on their own, as is everything when the model has no
+batched pipeline.
+
+Waiting requests count against the STT lane's queue cap (STT_MAX_QUEUE_DEPTH),
+so the lane's utilization, admission control and degraded mode see the backlog,
+and a request is rejected as saturated once the lane is full.
+
+A request whose caller gives up is dropped if it is still waiting; a running
+batch is cancelled once every request in it has been abandoned.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ai_interviewer.config import (
+    STT_BATCH_MAX_SIZE,
+    STT_BATCH_MAX_WAIT_MS,
+    STT_MAX_CONCURRENCY,
+)
+from ai_interviewer.audio_processing.speech_to_text import (
+    WHISPER_WINDOW_SAMPLES,
+    batching_supported,
+    transcribe_batch,
+    transcribe_segments,
+)
+from ai_interviewer.core_logic.inference_executor import get_inference_executor, STT_LANE
+
+logger = logging.getLogger(__name__)
+
+Segments = List[Tuple[float, float, str]]
+
+
+class _Request:
+    __slots__ = ("audio", "beam_size", "future", "enqueued_at", "queued")
+
+    def __init__(self, audio: np.ndarray, beam_size: int, future: asyncio.Future):
+        self.audio = audio
+        self.beam_size = beam_size
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+        self.queued = True  # Still counted against the STT lane.
+
+
+class STTBatchScheduler:
+    """
+    Collects transcription requests from all sessions and runs them in batches.
+
+    Args:
+        max_batch_size: Most utterances decoded in one pass.
+        max_wait: Seconds a batch waits for more requests while others are running.
+        max_concurrency: Batches running at the same time (one STT lane slot each).
+    """
+
+    def __init__(self, max_batch_size: int = STT_BATCH_MAX_SIZE, max_wait: float = STT_BATCH_MAX_WAIT_MS / 1000,
+                 max_concurrency: int = STT_MAX_CONCURRENCY):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_concurrency = max_concurrency
+        self._pending: Deque[_Request] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._running = 0
+        self.batches = 0
+        self.requests = 0
+        self.wait_seconds = 0.0
+        self.abandoned = 0
+
+    def _ensure_started(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def transcribe(self, audio: np.ndarray, beam_size: int = 5) -> Segments:
+        """
+        Transcribes one utterance as part of the next batch.
+
+        Returns:
+            The utterance's (start_seconds, end_seconds, text) segments.
+
+        Raises:
+            ExecutorSaturatedError: If the STT lane is full.
+        """
+        executor = get_inference_executor()
+        if len(audio) > WHISPER_WINDOW_SAMPLES:
+            return await executor.run(STT_LANE, transcribe_segments, audio, beam_size)
+        executor.enqueue(STT_LANE)
+
+        self._ensure_started()
+        request = _Request(audio, beam_size, asyncio.get_running_loop().create_future())
+        self._pending.append(request)
+        self._wakeup.set()
+        try:
+            return await request.future
+        finally:
+            self._unqueue(request)
+
+    @staticmethod
+    def _unqueue(request: _Request) -> None:
+        """Stops counting a request against the STT lane, once."""
+        if request.queued:
+            request.queued = False
+            get_inference_executor().dequeue(STT_LANE)
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            while not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            if self._running:
+                # Other batches are decoding; give this one a moment to fill up.
+                deadline = self._pending[0].enqueued_at + self.max_wait
+                while len(self._pending) < self.max_batch_size and time.perf_counter() < deadline:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), deadline - time.perf_counter())
+                    except asyncio.TimeoutError:
+                        break
+
+            batch = self._take_batch()
+            if not batch:
+                self._slots.release()
+                continue
+            self._running += 1
+            task = loop.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    def _take_batch(self) -> List[_Request]:
+        """Removes up to max_batch_size live requests sharing the oldest request's beam size."""
+        # A model without batching support would decode the batch serially.
+        max_size = self.max_batch_size if batching_supported() is not False else 1
+        batch: List[_Request] = []
+        rest: Deque[_Request] = deque()
+        beam_size = None
+        while self._pending:
+            request = self._pending.popleft()
+            if request.future.done():  # The caller gave up (e.g. a cancelled partial pass).
+                continue
+            if beam_size is None:
+                beam_size = request.beam_size
+            if request.beam_size == beam_size and len(batch) < max_size:
+                batch.append(request)
+            else:
+                rest.append(request)
+        self._pending = rest
+        return batch
+
+    async def _run_batch(self, batch: List[_Request]) -> None:
+        now = time.perf_counter()
+        self.batches += 1
+        self.requests += len(batch)
+        self.wait_seconds += sum(now - request.enqueued_at for request in batch)
+
+        async def call():
+            # The batch's lane call takes over the requests' places in the lane
+            # (no await in between, so nothing else can take them first).
+            for request in batch:
+                self._unqueue(request)
+            return await get_inference_executor().run(
+                STT_LANE, transcribe_batch, [request.audio for request in batch], batch[0].beam_size)
+
+        run = asyncio.ensure_future(call())
+
+        def abandon_if_unwanted(_: asyncio.Future) -> None:
+            if all(request.future.cancelled() for request in batch):
+                run.cancel()
+
+        for request in batch:
+            request.future.add_done_callback(abandon_if_unwanted)
+        try:
+            results = await run
+        except asyncio.CancelledError:
+            if not all(request.future.cancelled() for request in batch):
+                raise
+            self.abandoned += 1
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        else:
+            for request, segments in zip(batch, results):
+                if not request.future.done():
+                    request.future.set_result(segments)
+        finally:
+            self._running -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the queue length, running batches and average batch size and wait."""
+        return {
+            "pending": len(self._pending),
+            "running": self._running,
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch_size": round(self.requests / self.batches, 3) if self.batches else 0.0,
+            "avg_wait_seconds": round(self.wait_seconds / self.requests, 4) if self.requests else 0.0,
+            "abandoned_batches": self.abandoned,
+        }
+
+
+# --- Shared Scheduler ---
+
+_batcher: Optional[STTBatchScheduler] = None
+_batcher_lock = threading.Lock()
+
+
+def get_stt_batcher() -> STTBatchScheduler:
+    """Returns the process-wide STT batch scheduler, creating it on first use."""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = STTBatchScheduler()
+        return _batcher
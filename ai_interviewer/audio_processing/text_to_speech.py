@@ -1,16 +1,64 @@
 # ai_interviewer/audio_processing/text_to_speech.py
 
-from piper.voice import PiperVoice
-from ai_interviewer.config import TTS_VOICE_MODEL
+from typing import AsyncIterator, Iterator, Tuple
+
+from ai_interviewer.config import TTS_VOICE_MODEL, TTS_SAMPLE_RATE, MODEL_WORKERS_ENABLED
 from ai_interviewer.utils.wav_helper import add_wav_header
+from ai_interviewer.core_logic.inference_executor import (
+    cancellation_requested, get_inference_executor, ExecutorSaturatedError, TTS_LANE,
+)
+from ai_interviewer.core_logic.model_registry import get_model_registry, ModelLoadError
+
+TTS_MODEL_KEY = "tts"
+
+
+class SpeechSynthesisError(RuntimeError):
+    """Raised when the voice fails while synthesizing a complete utterance."""
+
 
-try:
+def _load_voice():
+    # Piper (and onnxruntime) are imported here to keep module import fast.
+    from piper.voice import PiperVoice
     print(f"Loading TTS voice model: {TTS_VOICE_MODEL}...")
     voice = PiperVoice.load(TTS_VOICE_MODEL)
     print("TTS voice model loaded successfully.")
-except Exception as e:
-    print(f"Failed to load TTS voice model: {e}.")
-    voice = None
+    return voice
+
+
+def _warm_up_voice(voice) -> None:
+    for _ in voice.synthesize("Hello."):
+        pass
+
+
+get_model_registry().register(TTS_MODEL_KEY, _load_voice, _warm_up_voice)
+
+
+def get_voice():
+    """Returns the Piper voice, loading it on the first call (None if it failed to load)."""
+    try:
+        return get_model_registry().get(TTS_MODEL_KEY)
+    except ModelLoadError as e:
+        print(f"Failed to load TTS voice model: {e}.")
+        return None
+
+
+def synthesize_speech_chunks(text: str) -> Iterator[Tuple[bytes, int]]:
+    """
+    Synthesizes text incrementally, one Piper audio chunk (roughly one sentence) at a time.
+
+    - Input: A string of text to be spoken.
+    - Output: Yields (raw 16-bit mono PCM bytes, sample rate) tuples as they are produced.
+    - Raises: Whatever Piper raises. Errors are not swallowed, so callers can
+      tell a truncated utterance from a complete one and never cache the former.
+    """
+    voice = get_voice()
+    if not voice or not text:
+        return
+    # The synthesize method returns AudioChunk objects.
+    # We need to access the raw bytes via the `.audio` attribute of each chunk.
+    for chunk in voice.synthesize(text):
+        yield chunk.audio, getattr(chunk, "sample_rate", TTS_SAMPLE_RATE)
+
 
 def synthesize_speech(text: str) -> bytes:
     """
@@ -19,24 +67,68 @@ def synthesize_speech(text: str) -> bytes:
     - Method: Uses Piper TTS to generate raw PCM audio, then adds a WAV header.
     - Input: A string of text to be spoken.
     - Output: A bytes object containing a complete and playable WAV file.
+    - Raises: SpeechSynthesisError if Piper fails, so the error never reaches
+      the client (or the speech cache) as audio.
     """
-    if not voice or not text:
+    if not get_voice() or not text:
         return b''
     try:
         # 1. Synthesize the raw PCM audio data
         audio_chunks = []
-        # CORRECTED: The synthesize method returns AudioChunk objects.
-        # We need to access the raw bytes via the `.audio` attribute of each chunk.
-        for chunk in voice.synthesize(text):
-            audio_chunks.append(chunk.audio)
-        
+        sample_rate = TTS_SAMPLE_RATE
+        for pcm, sample_rate in synthesize_speech_chunks(text):
+            audio_chunks.append(pcm)
+            if cancellation_requested():
+                break
+
         raw_pcm_data = b"".join(audio_chunks)
 
         # 2. Add the WAV header to the raw data
-        # The 'lessac' model uses a 16000Hz sample rate.
-        wav_data = add_wav_header(raw_pcm_data, sample_rate=16000)
-        
+        wav_data = add_wav_header(raw_pcm_data, sample_rate=sample_rate)
+
         return wav_data
     except Exception as e:
-        print(f"Error during speech synthesis: {e}")
-        return b'[Speech Synthesis Error]'
+        raise SpeechSynthesisError(f"Error during speech synthesis: {e}") from e
+
+
+async def synthesize_speech_async(text: str) -> bytes:
+    """
+    Awaitable version of `synthesize_speech` that runs on the inference executor.
+
+    Raises:
+        ExecutorSaturatedError: If too many syntheses are already pending.
+        SpeechSynthesisError: If synthesis fails.
+    """
+    if not MODEL_WORKERS_ENABLED:
+        return await get_inference_executor().run(TTS_LANE, synthesize_speech, text)
+    chunks = []
+    sample_rate = TTS_SAMPLE_RATE
+    try:
+        async for pcm, sample_rate in synthesize_speech_stream(text):
+            chunks.append(pcm)
+    except ExecutorSaturatedError:
+        raise
+    except Exception as e:
+        raise SpeechSynthesisError(f"Error during speech synthesis: {e}") from e
+    return add_wav_header(b"".join(chunks), sample_rate=sample_rate) if chunks else b''
+
+
+async def synthesize_speech_stream(text: str, background: bool = False) -> AsyncIterator[Tuple[bytes, int]]:
+    """
+    Async generator over `synthesize_speech_chunks`, run on the inference executor.
+    The first chunk is available as soon as the first sentence is synthesized.
+    Speculative syntheses pass `background=True`, so they never delay live ones.
+
+    Raises:
+        ExecutorSaturatedError: If too many syntheses are already pending (for
+            background syntheses: if the TTS lane is near capacity).
+    """
+    executor = get_inference_executor()
+    if MODEL_WORKERS_ENABLED:
+        from ai_interviewer.core_logic.model_workers import get_model_worker_pool
+        stream = executor.stream_async(TTS_LANE, get_model_worker_pool().synthesize_stream, text,
+                                       background=background)
+    else:
+        stream = executor.stream(TTS_LANE, synthesize_speech_chunks, text, background=background)
+    async for item in stream:
+        yield item
@@ -0,0 +1,222 @@
+# ai_interviewer/audio_processing/tts_cache.py
+
+"""
+A content-addressed cache for synthesized speech.
+
+Knowledge-graph questions and the fixed interviewer prompts never change, so
+their audio only has to be synthesized once. Entries are keyed on the text, the
+voice model and the sample rate. Recently used audio lives in an in-memory LRU
+tier; every entry is also written to disk as a WAV file that is memory-mapped
+on lookup, so a cold process serves cached audio straight from the page cache.
+
+Run `python -m ai_interviewer.audio_processing.tts_cache warm` at deploy time to
+pre-render every question of the knowledge graph.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+from ai_interviewer.config import (
+    TTS_CACHE_DIR,
+    TTS_CACHE_MEMORY_BYTES,
+    TTS_VOICE_MODEL,
+    TTS_SAMPLE_RATE,
+    REPEAT_PROMPT_TEXT,
+)
+from ai_interviewer.utils.wav_helper import add_wav_header
+
+WAV_HEADER_SIZE = 44
+
+
+class CachedAudio:
+    """Raw 16-bit mono PCM for one utterance plus its sample rate."""
+
+    __slots__ = ("pcm", "sample_rate")
+
+    def __init__(self, pcm: Union[bytes, memoryview], sample_rate: int):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+
+    def __len__(self) -> int:
+        return len(self.pcm)
+
+    def to_wav(self) -> bytes:
+        return add_wav_header(bytes(self.pcm), sample_rate=self.sample_rate)
+
+
+def cache_key(text: str, voice_model: str = TTS_VOICE_MODEL, sample_rate: int = TTS_SAMPLE_RATE) -> str:
+    """Returns the content address of an utterance."""
+    material = f"{voice_model}\0{sample_rate}\0{text}".encode("utf-8")
+    return hashlib.sha256(material).hexdigest()
+
+
+class TTSAudioCache:
+    """
+    Two-tier (memory LRU + memory-mapped disk) cache of synthesized speech.
+
+    Safe to use from the event loop and from inference worker threads.
+    """
+
+    def __init__(self, cache_dir: str, memory_budget_bytes: int):
+        self.cache_dir = cache_dir
+        self.memory_budget_bytes = memory_budget_bytes
+        self._memory: "OrderedDict[str, CachedAudio]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def get(self, text: str) -> Optional[CachedAudio]:
+        """
+        Looks up the audio for `text`.
+
+        Returns:
+            The cached audio, or None if it has never been synthesized.
+        """
+        key = cache_key(text)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._load_from_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, text: str, pcm: bytes, sample_rate: int) -> CachedAudio:
+        """
+        Stores synthesized audio in both tiers.
+
+        The disk write goes through a temporary file and an atomic rename, so
+        concurrent readers never observe a partial file.
+        """
+        key = cache_key(text)
+        entry = CachedAudio(pcm, sample_rate)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(add_wav_header(pcm, sample_rate=sample_rate))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write speech cache entry {key}: {e}")
+        with self._lock:
+            self._remember(key, entry)
+        return entry
+
+    def put_wav(self, text: str, wav_data: bytes) -> Optional[CachedAudio]:
+        """Stores a complete WAV file produced by `synthesize_speech`."""
+        if len(wav_data) <= WAV_HEADER_SIZE or wav_data[:4] != b"RIFF":
+            return None
+        sample_rate = struct.unpack_from("<I", wav_data, 24)[0]
+        return self.put(text, wav_data[WAV_HEADER_SIZE:], sample_rate)
+
+    def _load_from_disk(self, key: str) -> Optional[CachedAudio]:
+        try:
+            with open(self._path(key), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # ValueError: empty file, which cannot be mapped.
+            return None
+        if len(mapped) < WAV_HEADER_SIZE:
+            return None
+        sample_rate = struct.unpack_from("<I", mapped, 24)[0]
+        # The memoryview keeps the mapping alive; the audio is never copied onto the heap.
+        return CachedAudio(memoryview(mapped)[WAV_HEADER_SIZE:], sample_rate)
+
+    def _remember(self, key: str, entry: CachedAudio) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = entry
+        self._memory_bytes += len(entry)
+        while self._memory_bytes > self.memory_budget_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and the size of the memory tier."""
+        with self._lock:
+            return {
+                "memory_hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
+
+
+# --- Shared Cache ---
+
+_cache: Optional[TTSAudioCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSAudioCache:
+    """Returns the process-wide speech cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TTSAudioCache(TTS_CACHE_DIR, TTS_CACHE_MEMORY_BYTES)
+        return _cache
+
+
+def warm_cache(graphs) -> int:
+    """
+    Pre-renders every question of the given knowledge graphs plus the fixed prompts.
+
+    Args:
+        graphs: An iterable of CompiledGraph objects.
+
+    Returns:
+        The number of utterances that had to be synthesized.
+    """
+    from ai_interviewer.audio_processing.text_to_speech import synthesize_speech_chunks
+
+    cache = get_tts_cache()
+    texts = [node.question_text for graph in graphs for node in graph.nodes] + [REPEAT_PROMPT_TEXT]
+    rendered = 0
+    for text in dict.fromkeys(texts):
+        if cache.get(text) is not None:
+            continue
+        try:
+            chunks = list(synthesize_speech_chunks(text))
+        except Exception as e:
+            print(f"Skipping (synthesis failed: {e}): {text!r}")
+            continue
+        if not chunks:
+            print(f"Skipping (synthesis produced no audio): {text!r}")
+            continue
+        cache.put(text, b"".join(pcm for pcm, _ in chunks), chunks[0][1])
+        rendered += 1
+        print(f"Cached: {text!r}")
+    return rendered
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["warm"]:
+        print("Usage: python -m ai_interviewer.audio_processing.tts_cache warm")
+        sys.exit(2)
+    from ai_interviewer.knowledge_graph.graph_loader import get_graph_registry
+
+    registry = get_graph_registry()
+    count = warm_cache(registry.get(graph_id) for graph_id in registry.graph_ids())
+    print(f"Speech cache warm: {count} new utterance(s) rendered into {TTS_CACHE_DIR}.")
@@ -0,0 +1,111 @@
+# ai_interviewer/benchmarks/common.py
+
+"""
+Shared pieces of the benchmarks: test audio (synthetic or recorded), latency
+summaries, JSON result files and the comparison against a saved baseline that
+fails a run on regressions.
+"""
+
+import json
+import wave
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from ai_interviewer.config import STT_SAMPLE_RATE
+
+# A metric regresses if its p50 is this much slower than the baseline's.
+DEFAULT_TOLERANCE = 0.2
+# Slowdowns smaller than this are timer noise, whatever their ratio.
+MIN_REGRESSION_MS = 0.05
+
+
+def synthetic_answer(seconds: float = 3.0, seed: int = 0) -> bytes:
+    """
+    Speech-like test audio as 16 kHz int16 PCM: amplitude-modulated tones in
+    syllable-length bursts, loud enough for the VAD to treat as speech.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * STT_SAMPLE_RATE)) / STT_SAMPLE_RATE
+    pitch = 120 + 80 * rng.random()
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * (3 + 2 * rng.random()) * t)
+    audio = 0.3 * envelope * np.sin(2 * np.pi * pitch * t) + 0.01 * rng.standard_normal(len(t))
+    return (np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def load_recording(path: str) -> bytes:
+    """
+    Reads a 16-bit mono WAV recording as 16 kHz int16 PCM, resampling linearly
+    if it was recorded at another rate.
+    """
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"{path}: expected 16-bit mono WAV.")
+        rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+    if rate != STT_SAMPLE_RATE:
+        positions = np.arange(int(len(samples) * STT_SAMPLE_RATE / rate)) * rate / STT_SAMPLE_RATE
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype("<i2")
+    return samples.tobytes()
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarizes latency samples (seconds).
+
+    Returns:
+        count, mean, p50, p95, p99 and max; the times in milliseconds.
+    """
+    if len(samples) == 0:
+        return {"count": 0}
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {
+        "count": int(len(values)),
+        "mean_ms": round(float(values.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(values.max()), 4),
+    }
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]]) -> None:
+    """Prints latency summaries as an aligned table."""
+    print(f"\n{title}")
+    print(f"  {'':34} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for name, row in rows.items():
+        if not row.get("count"):
+            print(f"  {name:34} {0:>7}")
+            continue
+        print(f"  {name:34} {row['count']:>7} {row['p50_ms']:>10.3f} {row['p95_ms']:>10.3f} "
+              f"{row['p99_ms']:>10.3f} {row['max_ms']:>10.3f}")
+
+
+def save_results(path: str, results: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def compare_to_baseline(results: Dict[str, Dict[str, float]], baseline_path: str,
+                        tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compares the p50 of every latency summary with a baseline results file.
+
+    Args:
+        results: Latency summaries keyed by metric name.
+        baseline_path: A JSON file written by a previous run with --output.
+        tolerance: Allowed slowdown as a fraction of the baseline p50.
+
+    Returns:
+        A description of each regression (empty if there are none).
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f).get("latency", {})
+    regressions = []
+    for name, row in results.items():
+        old = baseline.get(name, {}).get("p50_ms")
+        new = row.get("p50_ms")
+        if old and new and new > old * (1 + tolerance) and new - old > MIN_REGRESSION_MS:
+            regressions.append(f"{name}: p50 {new:.3f} ms vs baseline {old:.3f} ms (+{(new / old - 1):.0%})")
+    return regressions
@@ -0,0 +1,401 @@
+# ai_interviewer/benchmarks/load_test.py
+
+"""
+End-to-end load test: simulated candidates interviewing over the WebSocket API.
+
+    python -m ai_interviewer.benchmarks.load_test --candidates 20 [--turns 5]
+        [--audio answer1.wav answer2.wav ...] [--speed 1.0] [--real-models] [--real-llm]
+        [--url ws://host:port] [--protocol 1 --codec opus]
+        [--output results.json] [--baseline baseline.json]
+
+By default the app runs in this process, in a background thread with its own
+event loop, with stub STT/TTS models and the mock Ollama server (see stubs.py),
+each with a configurable latency. --real-models and --real-llm use the real
+backends instead; --url drives an already running server.
+
+Each candidate connects to /interview/{session_id}, waits for the question
+audio, then streams its answer as 16 kHz PCM chunks (paced at --speed times
+real time; 0 sends as fast as possible) followed by silence, so the server's
+VAD ends the utterance, and repeats until the interview ends or --turns.
+Answers are recorded WAV files (--audio) or synthetic speech-like audio.
+--protocol 1 uses the framed wire protocol, with questions sent as --codec.
+
+Reported:
+- throughput in turns and interviews per second;
+- per-turn latency percentiles: end of utterance to first audio byte of the
+  next question, end of the answer's speech to first audio, and the whole
+  question playback transfer;
+- question audio bytes on the wire;
+- candidates queued or turned away by admission control;
+- memory per session (session store estimate and process RSS growth);
+- event-loop lag of the server loop (in-process only).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple, Union
+
+from ai_interviewer.benchmarks.common import (
+    DEFAULT_TOLERANCE,
+    compare_to_baseline,
+    load_recording,
+    print_table,
+    save_results,
+    summarize,
+    synthetic_answer,
+)
+from ai_interviewer.api import protocol
+from ai_interviewer.config import STT_SAMPLE_RATE, VAD_END_SILENCE_MS
+
+# How often the event-loop probe wakes up on the server loop.
+LAG_PROBE_INTERVAL = 0.01
+
+
+class LoadStats:
+    """Samples collected by the simulated candidates."""
+
+    def __init__(self):
+        self.eou_to_first_audio: List[float] = []
+        self.speech_end_to_first_audio: List[float] = []
+        self.question_transfer: List[float] = []
+        self.turns = 0
+        self.interviews_finished = 0
+        self.busy_notices = 0
+        self.queued_notices = 0
+        self.rejected = 0
+        self.questions = 0
+        self.question_audio_bytes = 0
+        self.errors: List[str] = []
+
+
+class WireClient:
+    """A candidate's side of the WebSocket wire protocol (see ai_interviewer.api.protocol)."""
+
+    def __init__(self, version: int, codec: str):
+        self.version = version
+        self.codec = codec
+        self._sent = 0
+
+    def query(self) -> str:
+        return f"?protocol={self.version}&codecs={self.codec}" if self.version else ""
+
+    def _frame(self, frame_type: int, payload: bytes, flags: int = 0) -> bytes:
+        frame = protocol.pack_frame(frame_type, payload, flags, self._sent)
+        self._sent += 1
+        return frame
+
+    def audio(self, pcm: bytes) -> bytes:
+        if not self.version:
+            return pcm
+        return self._frame(protocol.FRAME_AUDIO, protocol.pack_audio(protocol.CODEC_PCM_S16LE, STT_SAMPLE_RATE, pcm))
+
+    def control(self, event: dict) -> Union[str, bytes]:
+        if not self.version:
+            return json.dumps(event)
+        return self._frame(protocol.FRAME_CONTROL, json.dumps(event).encode("utf-8"))
+
+    def decode(self, message: Union[str, bytes]) -> Tuple[Optional[dict], int]:
+        """
+        Returns:
+            The control event in the message (an "audio_end" for the last audio
+            of a question) and the number of audio bytes it carried.
+        """
+        if not self.version:
+            if isinstance(message, str):
+                return json.loads(message), 0
+            # Without streaming, the question is one complete WAV frame.
+            return ({"type": "audio_end"} if message.startswith(b"RIFF") else None), len(message)
+        _, frame_type, flags, _, payload = protocol.unpack_frame(message)
+        if frame_type == protocol.FRAME_AUDIO:
+            return ({"type": "audio_end"} if flags & protocol.FLAG_END else None), len(message)
+        if frame_type == protocol.FRAME_CONTROL:
+            return json.loads(bytes(payload)), 0
+        return None, 0
+
+
+async def receive_question(ws, wire: WireClient, stats: LoadStats) -> Optional[float]:
+    """
+    Reads one spoken question from the server.
+
+    Returns:
+        The perf_counter time its first audio byte arrived, or None if the
+        server closed the connection (the interview is over).
+    """
+    from websockets.exceptions import ConnectionClosed
+
+    start = time.perf_counter()
+    first_audio = None
+    audio_bytes = 0
+    try:
+        while True:
+            control, size = wire.decode(await ws.recv())
+            if size:
+                audio_bytes += size
+                if first_audio is None:
+                    first_audio = time.perf_counter()
+            if control is None:
+                continue
+            if control.get("type") == "busy":
+                stats.busy_notices += 1
+            elif control.get("type") == "queued":
+                stats.queued_notices += 1
+            elif control.get("type") == "audio_end":
+                if first_audio is None:
+                    first_audio = time.perf_counter()
+                break
+    except ConnectionClosed as e:
+        if e.rcvd is not None and e.rcvd.code == 1013:
+            # Turned away by admission control.
+            stats.rejected += 1
+        return None
+    stats.question_transfer.append(time.perf_counter() - start)
+    stats.questions += 1
+    stats.question_audio_bytes += audio_bytes
+    return first_audio
+
+
+async def wait_for_end_of_utterance(ws, wire: WireClient, stats: LoadStats) -> float:
+    """Waits for the server to acknowledge the end of the answer."""
+    while True:
+        control, _ = wire.decode(await ws.recv())
+        if control is not None:
+            if control.get("type") == "end_of_utterance":
+                return time.perf_counter()
+            if control.get("type") == "busy":
+                stats.busy_notices += 1
+
+
+async def run_candidate(url: str, session_id: str, answers: List[bytes], max_turns: int,
+                        chunk_ms: int, speed: float, wire: WireClient, stats: LoadStats) -> None:
+    """One simulated candidate: answers every question until the interview ends."""
+    from websockets.asyncio.client import connect
+    from websockets.exceptions import ConnectionClosed
+
+    chunk_bytes = 2 * STT_SAMPLE_RATE * chunk_ms // 1000
+    silence = bytes(2 * STT_SAMPLE_RATE * (VAD_END_SILENCE_MS + 3 * chunk_ms) // 1000)
+    eou_waiter = None
+    try:
+        async with connect(f"{url}/interview/{session_id}{wire.query()}", max_size=None) as ws:
+            if await receive_question(ws, wire, stats) is None:
+                return
+            for turn in range(max_turns):
+                answer = answers[(hash(session_id) + turn) % len(answers)]
+                eou_waiter = asyncio.create_task(wait_for_end_of_utterance(ws, wire, stats))
+                speech_end = None
+                for offset in range(0, len(answer) + len(silence), chunk_bytes):
+                    audio = (answer + silence)[offset:offset + chunk_bytes]
+                    await ws.send(wire.audio(audio))
+                    if speech_end is None and offset + chunk_bytes >= len(answer):
+                        speech_end = time.perf_counter()
+                    if eou_waiter.done():
+                        break
+                    if speed > 0:
+                        await asyncio.sleep(chunk_ms / 1000 / speed)
+                if not eou_waiter.done():
+                    # Fall back to an explicit end of answer if the VAD did not end it.
+                    done, _ = await asyncio.wait({eou_waiter}, timeout=5)
+                    if not done:
+                        await ws.send(wire.control({"type": "end_of_utterance"}))
+                eou = await eou_waiter
+                first_audio = await receive_question(ws, wire, stats)
+                stats.turns += 1
+                if first_audio is None:
+                    stats.interviews_finished += 1
+                    return
+                stats.eou_to_first_audio.append(first_audio - eou)
+                stats.speech_end_to_first_audio.append(first_audio - speech_end)
+    except ConnectionClosed:
+        # The server closes the connection after the closing remarks.
+        stats.interviews_finished += 1
+    except Exception as e:
+        stats.errors.append(f"{session_id}: {type(e).__name__}: {e}")
+    finally:
+        if eou_waiter is not None:
+            eou_waiter.cancel()
+            await asyncio.gather(eou_waiter, return_exceptions=True)
+
+
+# --- Server-side probes (in-process only) ---
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def probe_server(stop: asyncio.Event, lags: List[float], memory: Dict[str, float]) -> None:
+    """
+    Runs on the server's event loop: measures how late short sleeps wake up
+    (event-loop lag) and samples the session store's size.
+    """
+    from ai_interviewer.core_logic.session_store import get_session_store
+
+    store = get_session_store()
+    last_sample = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - start - LAG_PROBE_INTERVAL))
+        if start - last_sample > 0.25:
+            last_sample = start
+            stats = store.stats()
+            if stats["sessions"] >= memory.get("peak_sessions", 0):
+                memory["peak_sessions"] = stats["sessions"]
+                memory["store_bytes_at_peak"] = stats["memory_bytes"]
+            memory["peak_rss"] = max(memory.get("peak_rss", 0), _rss_bytes())
+
+
+def start_in_process_server(args) -> tuple:
+    """Starts the app (with stubs unless disabled) and waits until it is ready."""
+    import httpx
+
+    from ai_interviewer.benchmarks.stubs import install_stub_models, serve_in_thread, start_mock_ollama
+
+    if not args.real_models:
+        install_stub_models(args.stt_ms, args.stt_per_second_ms, args.tts_ms, args.tts_per_char_ms)
+    if not args.real_llm:
+        start_mock_ollama(args.llm_ms, args.llm_token_ms)
+
+    from ai_interviewer.api.main import app
+    server, _ = serve_in_thread(app, "127.0.0.1", args.port)
+    deadline = time.monotonic() + 600
+    while httpx.get(f"http://127.0.0.1:{args.port}/health/ready").status_code != 200:
+        if time.monotonic() > deadline:
+            raise RuntimeError("The server did not become ready.")
+        time.sleep(0.2)
+    return server, f"ws://127.0.0.1:{args.port}"
+
+
+async def drive(url: str, args, answers: List[bytes], stats: LoadStats) -> float:
+    run_id = uuid.uuid4().hex[:8]
+    start = time.perf_counter()
+    tasks = []
+    for i in range(args.candidates):
+        tasks.append(asyncio.create_task(run_candidate(
+            url, f"bench-{run_id}-{i}", answers, args.turns, args.chunk_ms, args.speed,
+            WireClient(args.protocol, args.codec), stats)))
+        if args.ramp_seconds > 0:
+            await asyncio.sleep(args.ramp_seconds / args.candidates)
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=10, help="Concurrent simulated candidates.")
+    parser.add_argument("--turns", type=int, default=5, help="Maximum answers per candidate.")
+    parser.add_argument("--audio", nargs="*", default=[], help="16-bit mono WAV answers to send.")
+    parser.add_argument("--answer-seconds", type=float, default=3.0, help="Length of synthetic answers.")
+    parser.add_argument("--chunk-ms", type=int, default=500, help="Audio sent per WebSocket frame.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Audio pacing relative to real time (0: no pacing).")
+    parser.add_argument("--ramp-seconds", type=float, default=0.0, help="Spread candidate arrivals over this long.")
+    parser.add_argument("--url", help="Drive a running server (ws://host:port) instead of an in-process one.")
+    parser.add_argument("--protocol", type=int, choices=(0, 1), default=0, help="WebSocket wire protocol.")
+    parser.add_argument("--codec", choices=("opus", "pcm_s16le"), default="opus",
+                        help="Question audio codec with --protocol 1.")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the in-process server.")
+    parser.add_argument("--real-models", action="store_true", help="Use the real Whisper and Piper models.")
+    parser.add_argument("--real-llm", action="store_true", help="Use the Ollama server in the config.")
+    parser.add_argument("--stt-ms", type=float, default=30.0, help="Stub STT base latency.")
+    parser.add_argument("--stt-per-second-ms", type=float, default=20.0, help="Stub STT latency per audio second.")
+    parser.add_argument("--tts-ms", type=float, default=20.0, help="Stub TTS latency per sentence.")
+    parser.add_argument("--tts-per-char-ms", type=float, default=0.5, help="Stub TTS latency per character.")
+    parser.add_argument("--llm-ms", type=float, default=50.0, help="Mock Ollama latency per request.")
+    parser.add_argument("--llm-token-ms", type=float, default=5.0, help="Mock Ollama latency per streamed token.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Fail if slower than the results in this JSON file.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        print("The load test needs the websockets package (pip install websockets).")
+        return 2
+
+    answers = [load_recording(path) for path in args.audio] or \
+              [synthetic_answer(args.answer_seconds, seed) for seed in range(5)]
+
+    server = None
+    lags: List[float] = []
+    memory: Dict[str, float] = {}
+    if args.url:
+        url = args.url.rstrip("/")
+    else:
+        server, url = start_in_process_server(args)
+        rss_before = _rss_bytes()
+        stop = asyncio.Event()
+        probe = asyncio.run_coroutine_threadsafe(probe_server(stop, lags, memory), server.loop)
+
+    stats = LoadStats()
+    elapsed = asyncio.run(drive(url, args, answers, stats))
+
+    if server is not None:
+        server.loop.call_soon_threadsafe(stop.set)
+        probe.result(timeout=5)
+        server.should_exit = True
+
+    latency = {
+        "end_of_utterance_to_first_audio": summarize(stats.eou_to_first_audio),
+        "end_of_speech_to_first_audio": summarize(stats.speech_end_to_first_audio),
+        "question_transfer": summarize(stats.question_transfer),
+    }
+    if lags:
+        latency["event_loop_lag"] = summarize(lags)
+    results = {
+        "mode": {"models": "real" if args.real_models else "stub", "llm": "real" if args.real_llm else "mock",
+                 "protocol": args.protocol, "codec": args.codec if args.protocol else "pcm_s16le"},
+        "candidates": args.candidates,
+        "elapsed_seconds": round(elapsed, 3),
+        "turns": stats.turns,
+        "turns_per_second": round(stats.turns / elapsed, 3),
+        "interviews_finished": stats.interviews_finished,
+        "busy_notices": stats.busy_notices,
+        "queued_notices": stats.queued_notices,
+        "rejected": stats.rejected,
+        "question_audio_bytes": int(stats.question_audio_bytes / max(stats.questions, 1)),
+        "errors": stats.errors,
+        "latency": latency,
+    }
+    if memory.get("peak_sessions"):
+        results["memory"] = {
+            "peak_sessions": int(memory["peak_sessions"]),
+            "store_bytes_per_session": int(memory["store_bytes_at_peak"] / memory["peak_sessions"]),
+            "rss_growth_per_candidate": int(max(0, memory["peak_rss"] - rss_before) / args.candidates),
+        }
+
+    print(f"\n{args.candidates} candidates, {stats.turns} turns in {elapsed:.1f}s "
+          f"({results['turns_per_second']} turns/s), {stats.interviews_finished} interviews finished, "
+          f"{stats.busy_notices} busy notices, {stats.queued_notices} queued notices, {stats.rejected} rejected, "
+          f"{len(stats.errors)} errors")
+    print(f"Question audio: {results['question_audio_bytes'] / 1024:.1f} KiB per question "
+          f"({results['mode']['codec']}, protocol {args.protocol})")
+    print_table("Turn latency", latency)
+    if "memory" in results:
+        m = results["memory"]
+        print(f"\nMemory: peak {m['peak_sessions']} sessions, ~{m['store_bytes_per_session']} B/session in the store, "
+              f"RSS growth ~{m['rss_growth_per_candidate'] / 1024:.0f} KiB/candidate")
+    for error in stats.errors[:10]:
+        print(f"ERROR {error}")
+
+    if args.output:
+        save_results(args.output, results)
+    if args.baseline:
+        regressions = compare_to_baseline(latency, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
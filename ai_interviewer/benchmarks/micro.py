@@ -0,0 +1,125 @@
+# ai_interviewer/benchmarks/micro.py
+
+"""
+Micro-benchmarks of the per-turn building blocks:
+
+    python -m ai_interviewer.benchmarks.micro [--real-models] [--iterations N]
+        [--output results.json] [--baseline baseline.json] [--tolerance 0.2]
+
+- `add_wav_header` on three seconds of PCM.
+- `transcribe_audio` on a three-second answer (stub or real Whisper).
+- `synthesize_speech` of a typical question (stub or real Piper).
+- `select_next_question` at the start and in the middle of an interview.
+
+With --baseline, the run exits with status 1 if any p50 is slower than the
+baseline's by more than the tolerance, so it can gate a deploy.
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from typing import Callable, Dict, List
+
+from ai_interviewer.benchmarks.common import (
+    DEFAULT_TOLERANCE,
+    compare_to_baseline,
+    print_table,
+    save_results,
+    summarize,
+    synthetic_answer,
+)
+from ai_interviewer.benchmarks.stubs import install_stub_models
+from ai_interviewer.config import DEFAULT_GRAPH_ID, STT_SAMPLE_RATE
+from ai_interviewer.core_logic.response_analyzer import TRIAGE_SIGNALS
+from ai_interviewer.knowledge_graph.graph_loader import get_graph_registry
+from ai_interviewer.models.schemas import SessionState, TriageResult, TurnRecord
+
+QUESTION = "Can you explain the difference between a list and a tuple in Python? When would you use each?"
+
+
+def time_calls(fn: Callable[[], object], iterations: int, warm_up: int = 3) -> List[float]:
+    """Runs `fn` a few times untimed, then returns the duration of each timed call."""
+    for _ in range(warm_up):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _new_state(graph_id: str) -> SessionState:
+    graph = get_graph_registry().get(graph_id)
+    return SessionState(session_id="bench", current_node_id=graph.start_node.node_id,
+                        graph_id=graph.graph_id, graph_version=graph.version)
+
+
+def bench_select_next_question(iterations: int, turns_before: int, graph_id: str = DEFAULT_GRAPH_ID) -> List[float]:
+    """
+    Times `select_next_question` on a session that has already answered
+    `turns_before` questions. Each sample uses a fresh session, as the call
+    advances it.
+    """
+    from ai_interviewer.core_logic.question_engine import select_next_question
+
+    signals = itertools.cycle(TRIAGE_SIGNALS)
+    samples = []
+    for _ in range(iterations):
+        state = _new_state(graph_id)
+        for _ in range(turns_before):
+            node_id = state.current_node_id
+            signal = next(signals)
+            select_next_question(state, TriageResult(signal=signal, confidence=0.9))
+            state.interview_history.append(TurnRecord(node_id=node_id, answer="...", signal=signal, confidence=0.9))
+        triage = TriageResult(signal=next(signals), confidence=0.9)
+        start = time.perf_counter()
+        select_next_question(state, triage)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(iterations: int) -> Dict[str, Dict[str, float]]:
+    from ai_interviewer.audio_processing.speech_to_text import transcribe_audio
+    from ai_interviewer.audio_processing.text_to_speech import synthesize_speech
+    from ai_interviewer.utils.wav_helper import add_wav_header
+
+    answer = synthetic_answer(3.0)
+    return {
+        "add_wav_header": summarize(time_calls(lambda: add_wav_header(answer, sample_rate=STT_SAMPLE_RATE),
+                                               iterations * 10)),
+        "transcribe_audio": summarize(time_calls(lambda: transcribe_audio(answer), iterations)),
+        "synthesize_speech": summarize(time_calls(lambda: synthesize_speech(QUESTION), iterations)),
+        "select_next_question[start]": summarize(bench_select_next_question(iterations * 10, 0)),
+        "select_next_question[turn 6]": summarize(bench_select_next_question(iterations * 10, 6)),
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--real-models", action="store_true", help="Use the real Whisper and Piper models.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Fail if slower than the results in this JSON file.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if not args.real_models:
+        install_stub_models()
+    latency = run(args.iterations)
+    print_table(f"Micro-benchmarks ({'real' if args.real_models else 'stub'} models)", latency)
+
+    if args.output:
+        save_results(args.output, {"mode": "real" if args.real_models else "stub", "latency": latency})
+    if args.baseline:
+        regressions = compare_to_baseline(latency, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,162 @@
+# ai_interviewer/benchmarks/stubs.py
+
+"""
+Deterministic stand-ins for the STT, TTS and LLM backends, so the benchmarks
+measure the server itself (scheduling, buffering, serialization) rather than
+the models, and run on machines without a GPU or model files.
+
+- `StubWhisperModel` and `StubVoice` mimic the faster-whisper and Piper APIs the
+  app uses, sleeping for a configurable time that scales with the input. They
+  block their thread like the real models do, so executor limits still apply.
+- `install_stub_models()` swaps them into the model registry.
+- `start_mock_ollama()` serves `ai_interviewer.utils.mock_ollama` on the
+  configured Ollama address in a background thread.
+
+The stubs run in the API process, so they apply with MODEL_WORKERS_ENABLED off.
+"""
+
+import asyncio
+import hashlib
+import os
+import socket
+import threading
+import time
+import types
+from typing import Iterator, List, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from ai_interviewer.config import OLLAMA_API_URL, STT_SAMPLE_RATE, TTS_SAMPLE_RATE
+
+SAMPLE_ANSWERS = (
+    "A list is mutable and a tuple is immutable, so tuples can be dictionary keys.",
+    "I would add an index on the column and check the query plan first.",
+    "Decorators wrap a function to add behaviour without changing its code.",
+    "I am not sure, maybe it has something to do with the garbage collector.",
+    "REST uses resources and HTTP verbs, and each request is stateless.",
+)
+
+
+class StubWhisperModel:
+    """
+    Mimics `faster_whisper.WhisperModel.transcribe`.
+
+    Takes `base_ms` plus `per_audio_second_ms` for every second of audio, and
+    returns one segment whose text depends only on the audio content.
+    """
+
+    def __init__(self, base_ms: float = 30.0, per_audio_second_ms: float = 20.0):
+        self.base_ms = base_ms
+        self.per_audio_second_ms = per_audio_second_ms
+
+    def transcribe(self, audio: np.ndarray, beam_size: int = 5, **kwargs):
+        seconds = len(audio) / STT_SAMPLE_RATE
+        time.sleep((self.base_ms + self.per_audio_second_ms * seconds) / 1000)
+        if len(audio) == 0:
+            return iter(()), None
+        digest = int.from_bytes(hashlib.sha256(np.ascontiguousarray(audio).tobytes()).digest()[:4], "big")
+        segment = types.SimpleNamespace(start=0.0, end=seconds, text=" " + SAMPLE_ANSWERS[digest % len(SAMPLE_ANSWERS)])
+        return iter([segment]), None
+
+
+class StubVoice:
+    """
+    Mimics `piper.voice.PiperVoice.synthesize`: one chunk of silence-level PCM per
+    sentence, after `base_ms` plus `per_char_ms` for every character of it.
+    Each chunk is as long as the sentence would take to speak (~15 chars/s).
+    """
+
+    def __init__(self, base_ms: float = 20.0, per_char_ms: float = 0.5):
+        self.base_ms = base_ms
+        self.per_char_ms = per_char_ms
+
+    def synthesize(self, text: str) -> Iterator[types.SimpleNamespace]:
+        for sentence in _sentences(text):
+            time.sleep((self.base_ms + self.per_char_ms * len(sentence)) / 1000)
+            samples = int(TTS_SAMPLE_RATE * len(sentence) / 15)
+            yield types.SimpleNamespace(audio=bytes(2 * samples), sample_rate=TTS_SAMPLE_RATE)
+
+
+def _sentences(text: str) -> List[str]:
+    parts, current = [], []
+    for word in text.split():
+        current.append(word)
+        if word[-1] in ".?!":
+            parts.append(" ".join(current))
+            current = []
+    if current:
+        parts.append(" ".join(current))
+    return parts
+
+
+def install_stub_models(stt_base_ms: float = 30.0, stt_per_second_ms: float = 20.0,
+                        tts_base_ms: float = 20.0, tts_per_char_ms: float = 0.5) -> None:
+    """Replaces the "stt" and "tts" models in the registry with the stubs."""
+    # Importing the modules registers the real loaders first, so they are replaced.
+    from ai_interviewer.audio_processing.speech_to_text import STT_MODEL_KEY
+    from ai_interviewer.audio_processing.text_to_speech import TTS_MODEL_KEY
+    from ai_interviewer.core_logic.model_registry import get_model_registry
+
+    registry = get_model_registry()
+    registry.register(STT_MODEL_KEY, lambda: StubWhisperModel(stt_base_ms, stt_per_second_ms), replace=True)
+    registry.register(TTS_MODEL_KEY, lambda: StubVoice(tts_base_ms, tts_per_char_ms), replace=True)
+
+
+def _port_in_use(host: str, port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex((host, port)) == 0
+
+
+def start_mock_ollama(latency_ms: float = 50.0, token_latency_ms: float = 5.0):
+    """
+    Serves the mock Ollama API at the host and port of OLLAMA_API_URL.
+
+    Returns:
+        The uvicorn server; set its `should_exit` to stop it.
+
+    Raises:
+        RuntimeError: If something (e.g. a real Ollama) already listens there.
+    """
+    url = urlparse(OLLAMA_API_URL)
+    host, port = url.hostname or "localhost", url.port or 11434
+    if _port_in_use(host, port):
+        raise RuntimeError(f"{host}:{port} is already in use; stop Ollama or run with --real-llm.")
+
+    # The mock reads its latency from the environment at import time.
+    os.environ["MOCK_OLLAMA_LATENCY_MS"] = str(latency_ms)
+    os.environ["MOCK_OLLAMA_TOKEN_LATENCY_MS"] = str(token_latency_ms)
+    from ai_interviewer.utils.mock_ollama import app
+
+    server, _ = serve_in_thread(app, host, port)
+    return server
+
+
+def serve_in_thread(app, host: str, port: int) -> Tuple[object, threading.Thread]:
+    """
+    Runs a uvicorn server for `app` on its own event loop in a daemon thread and
+    waits until it accepts connections.
+
+    Returns:
+        The uvicorn server (set `should_exit` to stop it) and its thread. The
+        server's event loop is available as `server.loop` once started.
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="on"))
+    server.loop = None
+
+    def run() -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        server.loop = loop
+        loop.run_until_complete(server.serve())
+
+    thread = threading.Thread(target=run, name=f"uvicorn-{port}", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError(f"Server on {host}:{port} failed to start.")
+        time.sleep(0.05)
+    return server, thread
@@ -70,3 +70,434 @@ TTS_VOICE_MODEL = "extern/voices/en_US-lessac-high.onnx"
 # The logging level for the application.
 # Can be set to "DEBUG", "INFO", "WARNING", "ERROR", or "CRITICAL".
 LOG_LEVEL = "INFO"
+
+
+# --- Inference Executor Configuration ---
+# Number of threads available for blocking model calls. faster-whisper and piper
+# release the GIL during inference, so threads give real parallelism here.
+INFERENCE_THREAD_WORKERS = 8
+
+# Run model calls in a separate process pool instead of threads. Each process
+# loads its own copy of the models, so only enable this when RAM allows it.
+INFERENCE_USE_PROCESS_POOL = False
+INFERENCE_PROCESS_WORKERS = 2
+
+# Maximum number of simultaneous inference calls per model.
+STT_MAX_CONCURRENCY = 2
+TTS_MAX_CONCURRENCY = 4
+
+# Maximum number of calls (running + waiting) per model before new work is
+# rejected and the client is asked to retry. Utterances waiting for an STT
+# batch count as calls too.
+STT_MAX_QUEUE_DEPTH = 16
+TTS_MAX_QUEUE_DEPTH = 32
+
+# How many times a rejected speech synthesis call is retried before giving up.
+TTS_SATURATION_RETRIES = 3
+
+# Speculative question synthesis (see core_logic/speculative_prefetch.py) waits
+# behind every live synthesis, may hold at most this many TTS slots at once, and
+# is skipped once this fraction of TTS_MAX_QUEUE_DEPTH is pending.
+TTS_SPECULATIVE_MAX_CONCURRENCY = 2
+TTS_SPECULATIVE_MAX_LOAD = 0.5
+
+
+# --- Batched Transcription ---
+# Transcription requests from all sessions are collected into micro-batches and
+# decoded in one batched Whisper pass (faster-whisper's BatchedInferencePipeline),
+# so concurrent answers share encoder passes instead of queuing one by one.
+# Applies to in-process inference (not MODEL_WORKERS_ENABLED).
+STT_BATCHING_ENABLED = True
+STT_BATCH_MAX_SIZE = 8
+
+# While other batches are running, wait up to this long for more requests to
+# join a batch. When the STT lane is idle, a request is dispatched immediately.
+STT_BATCH_MAX_WAIT_MS = 20
+
+# Answers up to this long are decoded greedily (beam size 1); longer ones keep
+# the requested beam size. The whole answer's length counts, not the tail the
+# final streaming pass decodes after partial passes committed the rest.
+STT_GREEDY_MAX_SECONDS = 5.0
+
+
+# --- Model Worker Processes ---
+# Scale-out mode for one box: a single front process (one uvicorn worker) owns
+# every WebSocket, and STT/TTS run in a fixed set of model worker processes.
+# Audio is handed over through shared memory, requests go over local pipes.
+# This uses every core without loading one copy of the models per uvicorn worker.
+MODEL_WORKERS_ENABLED = False
+MODEL_WORKER_COUNT = 2
+
+# Concurrent calls one worker process serves (one shared-memory audio slot each).
+MODEL_WORKER_SLOTS = 2
+
+# A session's transcriptions go to the same worker, unless that worker has this
+# many more calls in flight than the least loaded one.
+MODEL_WORKER_AFFINITY_SLACK = 2
+
+# Seconds to wait for a worker process to load its models at startup.
+MODEL_WORKER_START_TIMEOUT = 300
+
+
+# --- Streaming Transcription Configuration ---
+# Sample rate expected by Whisper and used for all inbound audio buffers.
+STT_SAMPLE_RATE = 16000
+
+# Longest answer (in seconds) kept in a session's audio ring buffer.
+STREAMING_MAX_UTTERANCE_SECONDS = 120
+
+# Run an incremental transcription pass after this much new speech (seconds).
+STREAMING_PARTIAL_INTERVAL_SECONDS = 2.0
+
+# Beam size for incremental passes; the final pass uses the regular beam size.
+STREAMING_PARTIAL_BEAM_SIZE = 1
+STREAMING_FINAL_BEAM_SIZE = 5
+
+# Voice activity detection: frame length, minimum RMS energy that counts as
+# speech, and how far above the measured noise floor speech must be.
+VAD_FRAME_MS = 30
+VAD_ENERGY_THRESHOLD = 0.01
+VAD_NOISE_RATIO = 3.0
+
+# An utterance ends after this much silence following at least
+# VAD_MIN_SPEECH_MS of detected speech.
+VAD_END_SILENCE_MS = 700
+VAD_MIN_SPEECH_MS = 250
+
+
+# --- Streaming Speech Synthesis Configuration ---
+# Send synthesized speech sentence by sentence (header frame + PCM frames)
+# instead of one complete WAV file per question.
+TTS_STREAMING_ENABLED = True
+
+# Sample rate assumed when the voice model does not report one.
+TTS_SAMPLE_RATE = 16000
+
+
+# --- Barge-in and Cancellation ---
+# Let the candidate interrupt the interviewer. The client sends an "interrupt"
+# message when it hears the candidate over the interviewer's speech (or over
+# the thinking pause); the server cancels the turn's in-flight transcription,
+# LLM calls and speech synthesis and stops sending audio. An answer that was
+# still being evaluated is continued rather than lost.
+BARGE_IN_ENABLED = True
+
+
+# --- WebSocket Protocol ---
+# Clients that connect with `?protocol=1` get the binary frame protocol (typed,
+# sequenced frames; see api/protocol.py). Other clients keep the original JSON
+# text messages and raw audio frames.
+WS_PROTOCOL_VERSIONS = [1]
+
+# Speech is sent as Opus to protocol 1 clients that accept it (needs PyAV with
+# libopus), at this rate and bitrate unless the client asks for another rate.
+WS_OPUS_ENABLED = True
+WS_OPUS_SAMPLE_RATE = 24000
+WS_OPUS_BITRATE = 24000
+WS_OPUS_FRAME_MS = 20
+
+# Optional protocol 1 events: live transcripts of the answer, and the triage
+# signal of each answer (off by default, as it tells the candidate their grade).
+WS_TRANSCRIPT_EVENTS = True
+WS_TRIAGE_EVENTS = False
+
+
+# --- Speech Synthesis Cache Configuration ---
+# Directory for pre-rendered question audio (one WAV file per text/voice/rate).
+TTS_CACHE_DIR = "extern/tts_cache"
+
+# Memory budget for the in-process LRU tier of the speech cache, in bytes.
+TTS_CACHE_MEMORY_BYTES = 64 * 1024 * 1024
+
+
+# --- Fixed Interviewer Prompts ---
+# Spoken when a candidate's answer could not be transcribed.
+REPEAT_PROMPT_TEXT = "I'm sorry, I didn't catch that. Could you please repeat your answer?"
+
+
+# --- LLM Client Configuration ---
+# The Ollama embeddings endpoint and the embedding model used to compare answers.
+OLLAMA_EMBEDDINGS_URL = "http://localhost:11434/api/embeddings"
+EMBEDDING_MODEL_NAME = "nomic-embed-text"
+
+# Maximum number of requests in flight against the Ollama server. Keep this in
+# line with the server's OLLAMA_NUM_PARALLEL so concurrent requests are decoded
+# together by the server instead of queueing inside it.
+OLLAMA_MAX_CONCURRENCY = 4
+
+# Per-model limits. The analysis model is capped below OLLAMA_MAX_CONCURRENCY
+# so that a pile-up of background analyses can never take every server slot
+# away from live triage calls.
+LLM_MODEL_CONCURRENCY = {
+    TRIAGE_MODEL_NAME: 4,
+    ANALYSIS_MODEL_NAME: 1,
+    EMBEDDING_MODEL_NAME: 4,
+}
+
+# Per-attempt request timeouts, in seconds.
+LLM_MODEL_TIMEOUTS = {
+    TRIAGE_MODEL_NAME: 10.0,
+    ANALYSIS_MODEL_NAME: 60.0,
+    EMBEDDING_MODEL_NAME: 5.0,
+}
+LLM_DEFAULT_TIMEOUT = 30.0
+
+# Retries for transient failures (connection errors, timeouts, 5xx responses),
+# with exponential backoff and full jitter starting at LLM_RETRY_BASE_DELAY.
+LLM_MAX_RETRIES = 2
+LLM_RETRY_BASE_DELAY = 0.25
+
+# Connection pool of the shared HTTP client.
+LLM_MAX_CONNECTIONS = 16
+LLM_KEEPALIVE_EXPIRY = 60.0
+
+
+# --- Streaming Triage Configuration ---
+# Consume the triage model's token stream and stop generation as soon as the
+# "signal" field is decided, instead of waiting for the full JSON response.
+TRIAGE_STREAMING_ENABLED = True
+
+# Keep reading until "confidence" has also been emitted. The streaming prompt
+# asks for "confidence" before "signal", so this normally costs nothing; it only
+# matters if a model ignores the key order. When False, triage returns on the
+# signal alone and reports TRIAGE_EARLY_EXIT_CONFIDENCE if the model had not
+# produced a confidence yet. The semantic triage cache only stores results with
+# a real model confidence, so keep this on while it is used.
+TRIAGE_STREAM_WAIT_FOR_CONFIDENCE = True
+TRIAGE_EARLY_EXIT_CONFIDENCE = 0.5
+
+# Sampling options for the constrained streaming triage prompt.
+TRIAGE_STREAM_OPTIONS = {"temperature": 0.0, "num_predict": 24}
+
+
+# --- Semantic Triage Cache Configuration ---
+# Answers are embedded and compared with previously triaged answers to the same
+# question; a close enough match reuses the earlier triage instead of calling the LLM.
+TRIAGE_CACHE_ENABLED = True
+
+# Minimum cosine similarity for a cache hit, and minimum triage confidence for
+# a result to be stored in (and served from) the cache.
+TRIAGE_CACHE_SIMILARITY_THRESHOLD = 0.92
+TRIAGE_CACHE_MIN_CONFIDENCE = 0.8
+
+# Upper bound on cached answers per question node, and on the memory of all
+# node indexes together (least recently used indexes are evicted beyond it).
+TRIAGE_CACHE_MAX_ENTRIES_PER_NODE = 5000
+TRIAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Fraction of cache hits that are re-triaged by the LLM in the background to
+# measure how often the cached answer disagrees with a fresh one.
+TRIAGE_CACHE_AUDIT_RATE = 0.05
+
+
+# --- Background Analysis Queue Configuration ---
+# "inprocess": async workers inside the API process run the analysis jobs.
+# "external": the API process only records jobs in the SQLite database and a
+#             separate worker process (python -m ai_interviewer.core_logic.analysis_queue worker)
+#             runs them; results are applied to live sessions as they land.
+ANALYSIS_QUEUE_MODE = "inprocess"
+
+# SQLite file used to persist jobs and results so they survive a restart.
+# Set to None to keep the queue in memory only ("inprocess" mode).
+ANALYSIS_QUEUE_DB_PATH = "extern/analysis_jobs.sqlite3"
+
+# Number of concurrent analysis workers. Matches the analysis model's
+# concurrency limit so the model stays busy without queueing inside the client.
+ANALYSIS_WORKERS = 1
+
+# Up to this many answers are analysed in a single LLM call; a worker waits at
+# most ANALYSIS_BATCH_WINDOW_SECONDS for a batch to fill.
+ANALYSIS_BATCH_SIZE = 4
+ANALYSIS_BATCH_WINDOW_SECONDS = 0.5
+
+# Poll interval for the database-backed modes, and the age after which a
+# claimed-but-unfinished job is considered abandoned and re-queued.
+ANALYSIS_POLL_INTERVAL_SECONDS = 1.0
+ANALYSIS_STALE_JOB_SECONDS = 300
+
+# Delay before a failed job is retried by the in-process workers.
+ANALYSIS_RETRY_DELAY_SECONDS = 5.0
+
+# A concluded interview is archived once the analysis of all its answers has
+# been applied (or has failed for good), but after this many seconds at most.
+ANALYSIS_DRAIN_TIMEOUT_SECONDS = 600
+
+
+# --- Interview Archive and Re-scoring ---
+# Finished interviews are appended to this JSONL file (one SessionState per
+# line) so they can be re-scored offline with
+# `python -m ai_interviewer.core_logic.rescoring`. Empty disables archiving.
+INTERVIEW_ARCHIVE_PATH = "extern/interviews.jsonl"
+
+# Triage and analysis calls the re-scoring pipeline keeps in flight.
+RESCORE_CONCURRENCY = 4
+
+# Interviews per output part; progress is checkpointed after every part.
+RESCORE_PART_SIZE = 1000
+
+
+# --- Session Recording ---
+# Record every interview's inbound answer audio and outbound question audio to
+# an append-only store under RECORDINGS_DIR/<session_id>/, for audits and for
+# replaying a session through the pipeline
+# (`python -m ai_interviewer.audio_processing.recording_store replay <session_id>`).
+RECORDING_ENABLED = False
+RECORDINGS_DIR = "extern/recordings"
+
+# Audio is appended to segment files of at most this size.
+RECORDING_SEGMENT_BYTES = 64 * 1024 * 1024
+
+# Audio waiting to be written; beyond this, new audio is dropped (and counted)
+# rather than slowing down the interview.
+RECORDING_MAX_BACKLOG_BYTES = 64 * 1024 * 1024
+
+# File descriptors the writer keeps open; the least recently used are closed.
+RECORDING_MAX_OPEN_FILES = 256
+
+# On shutdown, wait up to this long for queued audio to be written.
+RECORDING_SHUTDOWN_TIMEOUT_SECONDS = 10.0
+
+
+# --- Knowledge Graph Configuration ---
+# Directory scanned for interview graphs (*.json, and *.yaml/*.yml if PyYAML is installed).
+KNOWLEDGE_GRAPH_DIR = "ai_interviewer/knowledge_graph/graphs"
+
+# The graph used for sessions that do not ask for a specific role.
+DEFAULT_GRAPH_ID = "python_backend_junior"
+
+# Compiled graphs are cached here in a binary form keyed on the source file's hash.
+GRAPH_CACHE_DIR = "extern/graph_cache"
+
+# How often graph files are checked for changes and hot-reloaded (0 disables it).
+GRAPH_RELOAD_INTERVAL_SECONDS = 5.0
+
+# Previous versions of a graph kept alive for sessions that started on them.
+GRAPH_VERSIONS_RETAINED = 8
+
+
+# --- Adaptive Question Selection ---
+# When enabled, the next question is the unasked node that is expected to tell
+# us the most about the candidate, given a running ability estimate per skill.
+# Follow-up nodes linked by an explicit transition still take precedence.
+ADAPTIVE_SELECTION_ENABLED = True
+
+# Node difficulty labels on the ability scale (a logistic/Rasch scale where an
+# ability equal to the difficulty means a 50% chance of a correct answer).
+DIFFICULTY_LEVELS = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+
+# Prior belief about a candidate's ability in a skill they have not answered yet.
+ABILITY_PRIOR_MEAN = 0.0
+ABILITY_PRIOR_VARIANCE = 1.0
+
+# Score assigned to each triage signal when updating the ability estimate.
+TRIAGE_SIGNAL_SCORES = {"correct": 1.0, "partial": 0.5, "incorrect": 0.0}
+
+# The interview ends once no remaining question would reduce the uncertainty
+# of an ability estimate by at least this much, or after ADAPTIVE_MAX_QUESTIONS.
+ADAPTIVE_MIN_INFORMATION_GAIN = 0.02
+ADAPTIVE_MAX_QUESTIONS = 12
+
+
+# --- Session Store ---
+# Sessions live in memory in SESSION_STORE_SHARDS lock-striped shards and are
+# written through to a persistence backend after every turn, so an interview
+# can resume after a reconnect or on another worker process.
+SESSION_STORE_SHARDS = 16
+
+# Persistence backend: "sqlite" (a local file shared by the workers of one
+# machine), "redis" (SESSION_REDIS_URL; needs the `redis` package), "memory"
+# (an in-process Redis stand-in, not shared between workers) or "none".
+SESSION_BACKEND = "sqlite"
+SESSION_DB_PATH = "extern/sessions.sqlite3"
+SESSION_REDIS_URL = "redis://localhost:6379/0"
+
+# A session with no open connection is evicted from memory after this much
+# idle time, and deleted from the backend after SESSION_PERSIST_TTL_SECONDS.
+SESSION_IDLE_TTL_SECONDS = 30 * 60
+SESSION_PERSIST_TTL_SECONDS = 24 * 60 * 60
+SESSION_REAPER_INTERVAL_SECONDS = 60
+
+# Approximate memory budget for in-memory sessions. Above it, the least
+# recently used idle sessions are evicted early (they stay in the backend).
+SESSION_MEMORY_LIMIT_BYTES = 256 * 1024 * 1024
+
+
+# --- Admission Control ---
+# New interviews start only while the server has capacity, so a traffic spike
+# makes new candidates wait instead of slowing down every running interview.
+ADMISSION_ENABLED = True
+
+# Interviews served at once by this process.
+ADMISSION_MAX_SESSIONS = 40
+
+# Candidates that may wait for a slot, and for how long, before they are
+# turned away with a retry hint (WebSocket close code 1013). Reconnecting
+# candidates resuming an interview go ahead of new ones.
+ADMISSION_MAX_WAITING = 100
+ADMISSION_MAX_WAIT_SECONDS = 300
+
+# Waiting candidates re-check for capacity at least this often.
+ADMISSION_POLL_SECONDS = 1.0
+
+# Latency objective of running interviews: the p95 time from the end of an
+# answer to the first audio of the next question, over a sliding window.
+ADMISSION_LATENCY_SLO_SECONDS = 2.0
+ADMISSION_LATENCY_WINDOW_SECONDS = 60
+
+# Load is the highest of: STT and TTS executor queue fill, triage-path LLM
+# requests waiting per slot, and p95 latency over the objective. New
+# interviews wait while it is at or above 1.0. From ADMISSION_DEGRADE_LOAD
+# until it falls below ADMISSION_RECOVER_LOAD, interviews run cheaper:
+# greedy final transcription without partial passes, no speculative speech
+# synthesis (pre-rendered audio only), and the triage model below if set.
+ADMISSION_DEGRADE_LOAD = 0.8
+ADMISSION_RECOVER_LOAD = 0.5
+ADMISSION_DEGRADED_TRIAGE_MODEL = None  # e.g. "llama3.2:3b-instruct-q4_K_M"
+
+# The degraded mode is re-evaluated this often, and after every finished turn.
+ADMISSION_LOAD_CHECK_SECONDS = 1.0
+
+# Assumed interview length for wait estimates until one has been measured.
+ADMISSION_DEFAULT_SESSION_SECONDS = 600
+
+
+# --- Analysis Context ---
+# The analysis prompt carries a bounded summary of the interview so far instead
+# of the full history: the last CONTEXT_RECENT_TURNS turns verbatim (answers
+# truncated), and a rolling per-skill summary of everything older.
+CONTEXT_RECENT_TURNS = 3
+CONTEXT_TOKEN_BUDGET = 400
+CONTEXT_MAX_ANSWER_CHARS = 300
+# Rough characters-per-token ratio used to estimate prompt size without a tokenizer.
+CONTEXT_CHARS_PER_TOKEN = 4
+
+
+# --- Model Loading and Health ---
+# When the STT/TTS models are loaded in a process that runs them:
+#   "background": startup returns immediately and the models load and warm up
+#                 in the background; /health/ready reports 503 until they are done.
+#   "eager":      startup waits until the models are loaded and warmed up.
+#   "lazy":       each model loads on its first use (no warm-up).
+MODEL_LOAD_MODE = "background"
+
+# Models that must be loaded for /health/ready to report the server as ready.
+READINESS_REQUIRED_MODELS = ["stt", "tts"]
+
+# Upper bound on the time to import the API, checked by
+# `python -m ai_interviewer.utils.import_profiler`.
+IMPORT_TIME_BUDGET_SECONDS = 3.0
+
+
+# --- Metrics and Tracing ---
+# Per-turn stage timings feed latency histograms served in the Prometheus text
+# format at /metrics, alongside queue depths and cache statistics.
+METRICS_ENABLED = True
+
+# Histogram bucket upper bounds in seconds (roughly log-spaced).
+METRICS_HISTOGRAM_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+# The p50/p95/p99 quantiles are computed over this many most recent samples.
+METRICS_RESERVOIR_SIZE = 2048
+
+# If set, every finished turn's trace (stage timings and marks) is appended
+# to <METRICS_TRACE_DIR>/<session_id>.jsonl. Empty disables trace dumps.
+METRICS_TRACE_DIR = ""
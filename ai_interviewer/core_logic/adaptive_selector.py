@@ -0,0 +1,111 @@
+# ai_interviewer/core_logic/adaptive_selector.py
+
+"""
+Adaptive question selection based on per-skill ability estimates.
+
+Each skill has an ability estimate kept as a mean and a variance on a logistic
+(Rasch / Elo-style) scale. The chance of a good answer to a node with
+difficulty b is sigmoid(ability - b). After every answer the estimate for the
+node's skill is moved towards the observed triage score, with a step that
+shrinks as the estimate becomes more certain (a Gaussian approximation of the
+Bayesian update, like Glicko).
+
+The next question is the unasked node whose answer is expected to shrink the
+uncertainty of its skill the most. This is computed for every node of the
+graph at once with NumPy over the compiled item arrays. The interview stops
+when no remaining node is informative enough, so confident assessments are
+reached in fewer turns.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from ai_interviewer.config import (
+    ABILITY_PRIOR_MEAN,
+    ABILITY_PRIOR_VARIANCE,
+    TRIAGE_SIGNAL_SCORES,
+    ADAPTIVE_MIN_INFORMATION_GAIN,
+)
+from ai_interviewer.knowledge_graph.graph_loader import CompiledGraph, GraphNode, difficulty_value
+
+# A skill's ability estimate: (mean, variance).
+Ability = Tuple[float, float]
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def updated_ability(ability: Ability, difficulty: float, score: float) -> Ability:
+    """
+    Updates one skill's ability estimate with an observed answer score.
+
+    Args:
+        ability: The current (mean, variance).
+        difficulty: The answered node's difficulty on the ability scale.
+        score: The observed score in [0, 1].
+
+    Returns:
+        The new (mean, variance).
+    """
+    mean, variance = ability
+    p = float(_sigmoid(mean - difficulty))
+    information = p * (1.0 - p)
+    variance = 1.0 / (1.0 / variance + information)
+    return mean + variance * (score - p), variance
+
+
+def record_answer(abilities: Dict[str, float], variances: Dict[str, float], node: GraphNode, signal: str) -> bool:
+    """
+    Applies a triaged answer to the per-skill estimates, in place.
+
+    Returns:
+        True if the signal carried a score (e.g. not a clarification request).
+    """
+    score = TRIAGE_SIGNAL_SCORES.get(signal)
+    if score is None:
+        return False
+    ability = (abilities.get(node.skill, ABILITY_PRIOR_MEAN), variances.get(node.skill, ABILITY_PRIOR_VARIANCE))
+    abilities[node.skill], variances[node.skill] = updated_ability(ability, difficulty_value(node.difficulty), score)
+    return True
+
+
+def information_gain(graph: CompiledGraph, abilities: Dict[str, float], variances: Dict[str, float]) -> np.ndarray:
+    """
+    Expected reduction of the ability variance from asking each node of the graph.
+
+    Returns:
+        A float array indexed like `graph.nodes`.
+    """
+    mean = np.array([abilities.get(skill, ABILITY_PRIOR_MEAN) for skill in graph.skills])
+    variance = np.array([variances.get(skill, ABILITY_PRIOR_VARIANCE) for skill in graph.skills])
+    item_variance = variance[graph.item_skill]
+    p = _sigmoid(mean[graph.item_skill] - graph.item_difficulty)
+    information = p * (1.0 - p)
+    return item_variance * item_variance * information / (1.0 + item_variance * information)
+
+
+def select_adaptive_node(graph: CompiledGraph, abilities: Dict[str, float], variances: Dict[str, float],
+                         asked: Iterable[str]) -> Optional[GraphNode]:
+    """
+    Picks the most informative node that has not been asked yet.
+
+    - Method: Scores every pooled node by its expected information gain and
+              takes the best one; ties go to the node closest to the start.
+    - Input: The session's graph, its ability estimates and the asked node ids.
+    - Output: The next GraphNode, or None when the assessment is confident
+              enough (or the pool is exhausted) and the interview should end.
+    """
+    gain = information_gain(graph, abilities, variances)
+    available = graph.item_pooled.copy()
+    for node_id in asked:
+        index = graph.node_index.get(node_id)
+        if index is not None:
+            available[index] = False
+    gain[~available] = -np.inf
+
+    best = int(np.argmax(gain))
+    if not available[best] or gain[best] < ADAPTIVE_MIN_INFORMATION_GAIN:
+        return None
+    return graph.nodes[best]
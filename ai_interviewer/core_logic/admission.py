@@ -0,0 +1,340 @@
+# ai_interviewer/core_logic/admission.py
+
+"""
+Admission control for interview sessions.
+
+Every interview adds steady load on STT, the triage LLM and TTS. Once those are
+saturated, one more interview makes every running interview slower. The
+controller admits a new interview only while there is capacity: fewer than
+ADMISSION_MAX_SESSIONS are running and the measured load is below 1.0. The
+other candidates wait in a queue and are told their position and estimated
+wait. Reconnecting candidates go ahead of new ones. Once the queue is full, or
+a candidate has waited ADMISSION_MAX_WAIT_SECONDS, the candidate is turned
+away with a retry hint.
+
+Load is the highest of these signals, each normalized so 1.0 is the limit:
+
+- "stt", "tts": pending calls per executor lane / the lane's queue cap.
+- "llm": requests waiting for a triage-path model / that model's slots.
+- "latency": the p95 time from the end of an answer to the next question's
+  first audio, over a sliding window / ADMISSION_LATENCY_SLO_SECONDS.
+
+Above ADMISSION_DEGRADE_LOAD the server is "degraded" until the load drops
+below ADMISSION_RECOVER_LOAD. While degraded, interviews use cheaper settings
+(see `is_degraded`) to protect the latency of the running interviews. The load
+is sampled every ADMISSION_LOAD_CHECK_SECONDS and after every finished turn;
+`is_degraded` only reads the result, so it is cheap on the audio path.
+"""
+
+import asyncio
+import bisect
+import collections
+import itertools
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from ai_interviewer.config import (
+    ADMISSION_ENABLED,
+    ADMISSION_MAX_SESSIONS,
+    ADMISSION_MAX_WAITING,
+    ADMISSION_MAX_WAIT_SECONDS,
+    ADMISSION_POLL_SECONDS,
+    ADMISSION_LATENCY_SLO_SECONDS,
+    ADMISSION_LATENCY_WINDOW_SECONDS,
+    ADMISSION_DEGRADE_LOAD,
+    ADMISSION_RECOVER_LOAD,
+    ADMISSION_DEGRADED_TRIAGE_MODEL,
+    ADMISSION_DEFAULT_SESSION_SECONDS,
+    ADMISSION_LOAD_CHECK_SECONDS,
+    EMBEDDING_MODEL_NAME,
+    LLM_MODEL_CONCURRENCY,
+    OLLAMA_MAX_CONCURRENCY,
+    TRIAGE_MODEL_NAME,
+)
+from ai_interviewer.core_logic.inference_executor import get_inference_executor
+from ai_interviewer.core_logic.llm_client import get_llm_client
+from ai_interviewer.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+ADMISSIONS_METRIC = "ai_interviewer_admissions_total"
+ADMISSION_WAIT_METRIC = "ai_interviewer_admission_wait_seconds"
+
+# The latency signal needs a few turns in the window before it counts.
+_MIN_LATENCY_SAMPLES = 5
+
+# Queue priorities: lower values are admitted first.
+_PRIORITY_RESUMED = 0
+_PRIORITY_NEW = 1
+
+# Called while a candidate waits, with their position (1 = next) and the
+# estimated wait in seconds.
+WaitCallback = Callable[[int, float], Awaitable[None]]
+
+
+class AdmissionRejectedError(RuntimeError):
+    """
+    Raised when a new interview is turned away.
+
+    Attributes:
+        reason: "queue_full" or "timeout".
+        retry_after: A rough estimate, in seconds, of when to try again.
+    """
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Interview not admitted ({reason}); retry in {retry_after}s.")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """A running interview's slot. Release it when the interview ends."""
+
+    __slots__ = ("session_id", "admitted_at", "waited", "_controller", "_released")
+
+    def __init__(self, controller: "AdmissionController", session_id: str, waited: float):
+        self.session_id = session_id
+        self.admitted_at = time.monotonic()
+        self.waited = waited
+        self._controller = controller
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self)
+
+
+class AdmissionController:
+    """
+    Admits interviews while there is capacity and queues the rest.
+
+    Args:
+        max_sessions: Interviews served at once.
+        max_waiting: Candidates that may wait for a slot.
+        max_wait_seconds: Longest wait before a candidate is turned away.
+        enabled: When False, every interview is admitted at once (and counted).
+    """
+
+    def __init__(self, max_sessions: int = ADMISSION_MAX_SESSIONS, max_waiting: int = ADMISSION_MAX_WAITING,
+                 max_wait_seconds: float = ADMISSION_MAX_WAIT_SECONDS, enabled: bool = ADMISSION_ENABLED):
+        self.max_sessions = max_sessions
+        self.max_waiting = max_waiting
+        self.max_wait_seconds = max_wait_seconds
+        self.enabled = enabled
+        self.active = 0
+        self.avg_session_seconds = 0.0
+        self._degraded = False
+        self._queue: List[Tuple[int, int, str]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._latencies: Deque[Tuple[float, float]] = collections.deque()
+        self._latency_lock = threading.Lock()
+        self._monitor: Optional[asyncio.Task] = None
+
+    # --- Load ---
+
+    def observe_latency(self, seconds: Optional[float]) -> None:
+        """Records the response latency of a finished turn and re-evaluates the load."""
+        if seconds is None:
+            return
+        now = time.monotonic()
+        with self._latency_lock:
+            self._latencies.append((now, seconds))
+            self._expire_latencies(now)
+        self.update_degraded()
+
+    def _expire_latencies(self, now: float) -> None:
+        while self._latencies and now - self._latencies[0][0] > ADMISSION_LATENCY_WINDOW_SECONDS:
+            self._latencies.popleft()
+
+    def latency_p95(self) -> Optional[float]:
+        """p95 response latency over the window, or None with too few turns."""
+        with self._latency_lock:
+            self._expire_latencies(time.monotonic())
+            samples = sorted(seconds for _, seconds in self._latencies)
+        if len(samples) < _MIN_LATENCY_SAMPLES:
+            return None
+        return samples[int(0.95 * (len(samples) - 1))]
+
+    def load(self) -> Dict[str, float]:
+        """The load signals, each normalized so that 1.0 is the limit."""
+        load = dict(get_inference_executor().utilization())
+
+        client = get_llm_client()
+        waiting = client.waiting()
+        models = [TRIAGE_MODEL_NAME, EMBEDDING_MODEL_NAME]
+        if ADMISSION_DEGRADED_TRIAGE_MODEL:
+            models.append(ADMISSION_DEGRADED_TRIAGE_MODEL)
+        load["llm"] = max(waiting.get(model, 0) / LLM_MODEL_CONCURRENCY.get(model, OLLAMA_MAX_CONCURRENCY)
+                          for model in models)
+
+        p95 = self.latency_p95()
+        load["latency"] = p95 / ADMISSION_LATENCY_SLO_SECONDS if p95 is not None else 0.0
+        return load
+
+    @property
+    def degraded(self) -> bool:
+        """True while interviews should run in their cheaper mode, as of the last load check."""
+        return self._degraded
+
+    def update_degraded(self) -> bool:
+        """Samples the load and enters or leaves the degraded mode accordingly."""
+        if not self.enabled:
+            return False
+        peak = max(self.load().values())
+        if not self._degraded and peak >= ADMISSION_DEGRADE_LOAD:
+            self._degraded = True
+            logger.warning(f"Load {peak:.2f}: switching interviews to degraded mode.")
+        elif self._degraded and peak < ADMISSION_RECOVER_LOAD:
+            self._degraded = False
+            logger.info(f"Load {peak:.2f}: leaving degraded mode.")
+        return self._degraded
+
+    def _has_capacity(self) -> bool:
+        if self.active == 0:
+            # An idle server always takes an interview, whatever stale signals say.
+            return True
+        return self.active < self.max_sessions and max(self.load().values()) < 1.0
+
+    def estimate_wait(self, position: int) -> float:
+        """Estimated seconds until the candidate at `position` (0 = next) is admitted."""
+        session_seconds = self.avg_session_seconds or ADMISSION_DEFAULT_SESSION_SECONDS
+        # With N interviews running, one ends every session_seconds / N on average.
+        return round((position + 1) * session_seconds / max(self.active, 1), 1)
+
+    # --- Admission ---
+
+    def _grant(self, session_id: str, waited: float) -> AdmissionTicket:
+        self.active += 1
+        metrics = get_metrics()
+        metrics.increment(ADMISSIONS_METRIC, help_text="Interview admission decisions.", outcome="admitted")
+        metrics.observe(ADMISSION_WAIT_METRIC, waited, "Time new interviews waited for admission.")
+        return AdmissionTicket(self, session_id, waited)
+
+    def _release(self, ticket: AdmissionTicket) -> None:
+        self.active -= 1
+        duration = time.monotonic() - ticket.admitted_at
+        self.avg_session_seconds = (duration if self.avg_session_seconds == 0.0
+                                    else 0.8 * self.avg_session_seconds + 0.2 * duration)
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wakes every waiter; each one re-checks its position and the capacity.
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def _reject(self, reason: str, retry_after: float) -> AdmissionRejectedError:
+        get_metrics().increment(ADMISSIONS_METRIC, help_text="Interview admission decisions.", outcome="rejected")
+        return AdmissionRejectedError(reason, retry_after)
+
+    async def admit(self, session_id: str, resumed: bool = False,
+                    on_wait: Optional[WaitCallback] = None) -> AdmissionTicket:
+        """
+        Waits until the interview may start.
+
+        Args:
+            session_id: The interview's session id.
+            resumed: The candidate is reconnecting to an interview in progress.
+            on_wait: Called when the candidate starts waiting and whenever
+                their position in the queue changes.
+
+        Returns:
+            The ticket holding the interview's slot.
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait timed out.
+        """
+        if not self.enabled or (not self._queue and self._has_capacity()):
+            return self._grant(session_id, 0.0)
+        if len(self._queue) >= self.max_waiting:
+            raise self._reject("queue_full", self.estimate_wait(len(self._queue)))
+
+        get_metrics().increment(ADMISSIONS_METRIC, help_text="Interview admission decisions.", outcome="queued")
+        entry = (_PRIORITY_RESUMED if resumed else _PRIORITY_NEW, next(self._seq), session_id)
+        bisect.insort(self._queue, entry)
+        if entry is not self._queue[-1]:
+            self._notify()  # It went ahead of others; their positions changed.
+        start = time.monotonic()
+        last_position = None
+        try:
+            while True:
+                position = self._queue.index(entry)
+                if position == 0 and self._has_capacity():
+                    break
+                if time.monotonic() - start >= self.max_wait_seconds:
+                    raise self._reject("timeout", self.estimate_wait(position))
+                if on_wait is not None and position != last_position:
+                    last_position = position
+                    await on_wait(position + 1, self.estimate_wait(position))
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), ADMISSION_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._queue.remove(entry)
+            self._notify()
+        logger.info(f"Admitted {session_id} after waiting {time.monotonic() - start:.1f}s.")
+        return self._grant(session_id, time.monotonic() - start)
+
+    # --- Background Load Check ---
+
+    async def _monitor_forever(self) -> None:
+        while True:
+            await asyncio.sleep(ADMISSION_LOAD_CHECK_SECONDS)
+            try:
+                self.update_degraded()
+            except Exception as e:
+                logger.error(f"Load check failed: {e}")
+
+    async def start(self) -> None:
+        if self.enabled and self._monitor is None:
+            self._monitor = asyncio.create_task(self._monitor_forever())
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+
+    def stats(self) -> Dict[str, float]:
+        stats = {
+            "active": self.active,
+            "waiting": len(self._queue),
+            "degraded": float(self.degraded),
+            "avg_session_seconds": round(self.avg_session_seconds, 1),
+        }
+        stats.update({f"load_{signal}": round(value, 3) for signal, value in self.load().items()})
+        return stats
+
+
+# --- Shared Controller ---
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Returns the process-wide admission controller, creating it on first use."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
+
+
+def is_degraded() -> bool:
+    """
+    True while the server is overloaded and interviews should run cheaper:
+    greedy final transcription without partial passes, no speculative speech
+    synthesis and, if configured, the smaller triage model.
+    """
+    return ADMISSION_ENABLED and get_admission_controller().degraded
+
+
+def triage_model() -> str:
+    """The model live triage uses right now."""
+    if ADMISSION_DEGRADED_TRIAGE_MODEL and is_degraded():
+        return ADMISSION_DEGRADED_TRIAGE_MODEL
+    return TRIAGE_MODEL_NAME
@@ -0,0 +1,550 @@
+# ai_interviewer/core_logic/analysis_queue.py
+
+"""
+The background job queue for in-depth answer analysis.
+
+Every answer is submitted as an AnalysisJob once its turn is complete. Workers
+pull jobs, group up to ANALYSIS_BATCH_SIZE of them into a single call to the
+analysis model, and write the resulting scores back into the session
+(`interview_history[turn].score` and `skill_scores`). Analysis calls run at
+background priority in the LLM client, so they never delay live triage. A
+concluded interview is archived only once its jobs have settled (see
+`AnalysisJobQueue.finish_session`), so the archive carries the final scores.
+
+Two modes are supported:
+
+- "inprocess": async workers in the API process. With ANALYSIS_QUEUE_DB_PATH
+  set, jobs and results are also persisted to SQLite; pending and interrupted
+  jobs are picked up again when the process restarts.
+- "external": the API process only records jobs in SQLite. One or more worker
+  processes started with `python -m ai_interviewer.core_logic.analysis_queue worker`
+  claim and run them, and the API process applies finished results to its live
+  sessions.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set
+
+from ai_interviewer.config import (
+    ANALYSIS_QUEUE_MODE,
+    ANALYSIS_QUEUE_DB_PATH,
+    ANALYSIS_WORKERS,
+    ANALYSIS_BATCH_SIZE,
+    ANALYSIS_BATCH_WINDOW_SECONDS,
+    ANALYSIS_POLL_INTERVAL_SECONDS,
+    ANALYSIS_STALE_JOB_SECONDS,
+    ANALYSIS_RETRY_DELAY_SECONDS,
+    ANALYSIS_DRAIN_TIMEOUT_SECONDS,
+)
+from ai_interviewer.core_logic.response_analyzer import run_batch_in_depth_analysis
+from ai_interviewer.core_logic.session_manager import (
+    archive_session,
+    get_session_async,
+    remove_session_async,
+    save_session_async,
+)
+from ai_interviewer.knowledge_graph.graph_loader import get_graph_registry
+from ai_interviewer.models.schemas import AnalysisJob, AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+# A job that fails this many times is marked as failed instead of re-queued.
+MAX_ATTEMPTS = 3
+
+
+class SQLiteJobStore:
+    """
+    Durable storage of analysis jobs and their results.
+
+    Methods are blocking; async callers run them with `asyncio.to_thread`.
+    Claims use an immediate transaction, so several worker processes can share
+    one database without running a job twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit mode: every statement outside an explicit BEGIN is its own transaction.
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def init(self) -> None:
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    claimed_by TEXT,
+                    claimed_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    applied INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status ON analysis_jobs (status, applied)")
+
+    def add(self, job: AnalysisJob) -> bool:
+        """Inserts a pending job. Returns False if the job id already exists."""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO analysis_jobs (job_id, payload, status, updated_at) VALUES (?, ?, 'pending', ?)",
+                (job.job_id, job.model_dump_json(), time.time()),
+            )
+            return cursor.rowcount == 1
+
+    def claim(self, worker_id: str, limit: int) -> List[AnalysisJob]:
+        """Atomically marks up to `limit` pending jobs as running for a worker."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT job_id, payload FROM analysis_jobs WHERE status = 'pending' ORDER BY rowid LIMIT ?",
+                (limit,),
+            ).fetchall()
+            now = time.time()
+            conn.executemany(
+                "UPDATE analysis_jobs SET status = 'running', claimed_by = ?, claimed_at = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                [(worker_id, now, now, row["job_id"]) for row in rows],
+            )
+            conn.execute("COMMIT")
+            return [AnalysisJob.model_validate_json(row["payload"]) for row in rows]
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def mark_running(self, job_ids: List[str], worker_id: str) -> None:
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                "UPDATE analysis_jobs SET status = 'running', claimed_by = ?, claimed_at = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                [(worker_id, now, now, job_id) for job_id in job_ids],
+            )
+
+    def complete(self, result: AnalysisResult) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE analysis_jobs SET status = 'done', result = ?, updated_at = ? WHERE job_id = ?",
+                (result.model_dump_json(), time.time(), result.job_id),
+            )
+
+    def fail(self, job_id: str) -> bool:
+        """
+        Returns a job to the queue, or marks it failed after MAX_ATTEMPTS.
+
+        Returns:
+            True if the job is pending again and should be retried.
+        """
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE analysis_jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "claimed_by = NULL, updated_at = ? WHERE job_id = ?",
+                (MAX_ATTEMPTS, time.time(), job_id),
+            )
+            row = conn.execute("SELECT status FROM analysis_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row is not None and row["status"] == "pending"
+
+    def statuses(self, job_ids: List[str]) -> Dict[str, str]:
+        """Returns the status of each of the given jobs that exists."""
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT job_id, status FROM analysis_jobs WHERE job_id IN ({','.join('?' * len(job_ids))})",
+                job_ids,
+            ).fetchall()
+        return {row["job_id"]: row["status"] for row in rows}
+
+    def requeue_stale(self, max_age_seconds: float) -> int:
+        """Re-queues running jobs claimed more than `max_age_seconds` ago."""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE analysis_jobs SET status = 'pending', claimed_by = NULL, updated_at = ? "
+                "WHERE status = 'running' AND claimed_at <= ?",
+                (time.time(), time.time() - max_age_seconds),
+            )
+            return cursor.rowcount
+
+    def load_pending(self) -> List[AnalysisJob]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM analysis_jobs WHERE status = 'pending' ORDER BY rowid"
+            ).fetchall()
+        return [AnalysisJob.model_validate_json(row["payload"]) for row in rows]
+
+    def unapplied_results(self, limit: int = 500) -> List[AnalysisResult]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT result FROM analysis_jobs WHERE status = 'done' AND applied = 0 ORDER BY updated_at LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [AnalysisResult.model_validate_json(row["result"]) for row in rows]
+
+    def mark_applied(self, job_ids: List[str]) -> None:
+        with self._connection() as conn:
+            conn.executemany("UPDATE analysis_jobs SET applied = 1 WHERE job_id = ?", [(j,) for j in job_ids])
+
+
+async def analyze_jobs(jobs: List[AnalysisJob]) -> Dict[str, AnalysisResult]:
+    """
+    Analyses a batch of jobs, retrying individually any job the batched call
+    did not return a result for.
+
+    Returns:
+        A mapping from job id to AnalysisResult for every job that succeeded.
+    """
+    raw = await run_batch_in_depth_analysis(jobs)
+    if len(jobs) > 1:
+        for job in jobs:
+            if job.job_id not in raw:
+                raw.update(await run_batch_in_depth_analysis([job]))
+
+    results = {}
+    for job in jobs:
+        entry = raw.get(job.job_id)
+        if entry is None:
+            continue
+        try:
+            score = float(entry.get("score"))
+        except (TypeError, ValueError):
+            continue
+        results[job.job_id] = AnalysisResult(
+            job_id=job.job_id,
+            session_id=job.session_id,
+            session_start=job.session_start,
+            turn_index=job.turn_index,
+            skill=job.skill,
+            score=score,
+            analysis_text=str(entry.get("analysis_text", "")),
+        )
+    return results
+
+
+async def apply_result(result: AnalysisResult) -> bool:
+    """
+    Writes an analysis result into its session, if the session still exists,
+    and persists the session. A session that was evicted from memory (the
+    candidate disconnected) is loaded back from the session backend.
+
+    The score is stored on the history entry of the analysed turn, and the
+    session's skill score becomes the mean of all analysed answers for that skill.
+
+    Returns:
+        True if the session was found and updated.
+    """
+    session = await get_session_async(result.session_id)
+    if session is None or result.turn_index >= len(session.interview_history):
+        return False
+    if result.session_start and result.session_start != session.start_time:
+        # The session id now belongs to a newer interview.
+        return False
+
+    turn = session.interview_history[result.turn_index]
+    turn.score = result.score
+    turn.analysis_text = result.analysis_text
+    graph = get_graph_registry().get(session.graph_id, session.graph_version)
+    scores = [
+        entry.score
+        for entry in session.interview_history
+        if entry.score is not None and getattr(graph.get(entry.node_id), "skill", None) == result.skill
+    ]
+    session.skill_scores[result.skill] = sum(scores) / len(scores)
+    await save_session_async(session)
+    return True
+
+
+class AnalysisJobQueue:
+    """
+    Accepts analysis jobs from the interview route and runs them in the background.
+    """
+
+    def __init__(self, mode: str = ANALYSIS_QUEUE_MODE, db_path: Optional[str] = ANALYSIS_QUEUE_DB_PATH):
+        if mode not in ("inprocess", "external"):
+            raise ValueError(f"Unknown analysis queue mode: {mode}")
+        if mode == "external" and not db_path:
+            raise ValueError("The external analysis queue mode requires ANALYSIS_QUEUE_DB_PATH.")
+        self.mode = mode
+        self.worker_id = f"api-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._store = SQLiteJobStore(db_path) if db_path else None
+        self._queue: Optional[asyncio.Queue] = None
+        self._known: Set[str] = set()
+        # Unsettled job ids per session, and the concluded sessions waiting for them.
+        self._outstanding: Dict[str, Set[str]] = {}
+        self._drained: Dict[str, asyncio.Event] = {}
+        self._attempts: Dict[str, int] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._finishing: Set[asyncio.Task] = set()
+
+    @property
+    def depth(self) -> int:
+        """The number of jobs waiting to be picked up by this process."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        """Recovers persisted jobs and starts the workers (or the result applier)."""
+        self._queue = asyncio.Queue()
+        if self._store is not None:
+            await asyncio.to_thread(self._store.init)
+
+        if self.mode == "inprocess":
+            if self._store is not None:
+                # Only this process runs jobs in this mode, so anything still
+                # marked as running was interrupted by a restart.
+                recovered = await asyncio.to_thread(self._store.requeue_stale, 0)
+                for job in await asyncio.to_thread(self._store.load_pending):
+                    self._enqueue_local(job)
+                if self.depth:
+                    logger.info(f"Recovered {self.depth} analysis job(s) ({recovered} interrupted).")
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(ANALYSIS_WORKERS)]
+        else:
+            self._tasks = [asyncio.create_task(self._apply_external_results())]
+
+    async def stop(self) -> None:
+        """
+        Stops the workers. Unfinished jobs stay pending in the database, and
+        concluded interviews still waiting for them are archived as they are.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for event in self._drained.values():
+            event.set()
+        await asyncio.gather(*self._finishing, return_exceptions=True)
+
+    async def submit(self, job: AnalysisJob) -> bool:
+        """
+        Queues a job for analysis.
+
+        Returns:
+            False if the same job (session and turn) was already submitted.
+        """
+        if job.job_id in self._known:
+            return False
+        if self._store is not None and not await asyncio.to_thread(self._store.add, job):
+            return False
+        if self.mode == "inprocess":
+            self._enqueue_local(job)
+        else:
+            self._track(job.session_id, job.job_id)
+        return True
+
+    def _enqueue_local(self, job: AnalysisJob) -> None:
+        self._track(job.session_id, job.job_id)
+        self._queue.put_nowait(job)
+
+    def _track(self, session_id: str, job_id: str) -> None:
+        self._known.add(job_id)
+        self._outstanding.setdefault(session_id, set()).add(job_id)
+
+    def _settle(self, session_id: str, job_id: str) -> None:
+        """Marks a job as finished for good: its result was applied, or it failed."""
+        self._known.discard(job_id)
+        self._attempts.pop(job_id, None)
+        jobs = self._outstanding.get(session_id)
+        if jobs is None:
+            return
+        jobs.discard(job_id)
+        if not jobs:
+            del self._outstanding[session_id]
+            event = self._drained.pop(session_id, None)
+            if event is not None:
+                event.set()
+
+    def finish_session(self, session_id: str) -> None:
+        """
+        Archives and removes a concluded interview once every analysis job of
+        it has settled, so the archive carries the final scores. Waits at most
+        ANALYSIS_DRAIN_TIMEOUT_SECONDS. The caller hands over its hold on the
+        session, which keeps it from being evicted in the meantime.
+        """
+        if session_id in self._outstanding:
+            self._drained.setdefault(session_id, asyncio.Event())
+        task = asyncio.create_task(self._finish_session(session_id))
+        self._finishing.add(task)
+        task.add_done_callback(self._finishing.discard)
+
+    async def _finish_session(self, session_id: str) -> None:
+        event = self._drained.get(session_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), ANALYSIS_DRAIN_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+        if session_id in self._outstanding:
+            logger.warning(f"Archiving {session_id} before all of its answers were analysed.")
+        try:
+            session = await get_session_async(session_id)
+            if session is not None:
+                await asyncio.to_thread(archive_session, session, session.model_dump_json())
+            await remove_session_async(session_id)
+            logger.info(f"Session {session_id} archived and cleaned up.")
+        except Exception as e:
+            logger.error(f"Archiving session {session_id} failed: {e}", exc_info=True)
+
+    async def _next_batch(self) -> List[AnalysisJob]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ANALYSIS_BATCH_WINDOW_SECONDS
+        while len(batch) < ANALYSIS_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            results: Dict[str, AnalysisResult] = {}
+            try:
+                if self._store is not None:
+                    await asyncio.to_thread(self._store.mark_running, [job.job_id for job in batch], self.worker_id)
+                results = await analyze_jobs(batch)
+                logger.info(f"Analysed {len(results)}/{len(batch)} answer(s) in one batch.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Analysis batch failed: {e}", exc_info=True)
+            for job in batch:
+                try:
+                    await self._finish_job(job, results.get(job.job_id))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Recording analysis job {job.job_id} failed: {e}", exc_info=True)
+
+    async def _finish_job(self, job: AnalysisJob, result: Optional[AnalysisResult]) -> None:
+        """Applies a job's result, or schedules a retry until MAX_ATTEMPTS."""
+        if result is not None:
+            await apply_result(result)
+            if self._store is not None:
+                await asyncio.to_thread(self._store.complete, result)
+            self._settle(job.session_id, job.job_id)
+            return
+
+        if self._store is not None:
+            retry = await asyncio.to_thread(self._store.fail, job.job_id)
+        else:
+            self._attempts[job.job_id] = self._attempts.get(job.job_id, 0) + 1
+            retry = self._attempts[job.job_id] < MAX_ATTEMPTS
+        if retry:
+            asyncio.get_running_loop().call_later(ANALYSIS_RETRY_DELAY_SECONDS, self._queue.put_nowait, job)
+        else:
+            logger.warning(f"Giving up on analysis job {job.job_id} after {MAX_ATTEMPTS} attempts.")
+            self._settle(job.session_id, job.job_id)
+
+    async def _apply_external_results(self) -> None:
+        while True:
+            try:
+                results = await asyncio.to_thread(self._store.unapplied_results)
+                for result in results:
+                    await apply_result(result)
+                if results:
+                    await asyncio.to_thread(self._store.mark_applied, [r.job_id for r in results])
+                for result in results:
+                    self._settle(result.session_id, result.job_id)
+                await self._settle_failed_external()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Applying analysis results failed: {e}", exc_info=True)
+            await asyncio.sleep(ANALYSIS_POLL_INTERVAL_SECONDS)
+
+    async def _settle_failed_external(self) -> None:
+        # Failed jobs never produce a result; find the ones this process waits for.
+        owners = {job_id: session_id for session_id, jobs in self._outstanding.items() for job_id in jobs}
+        if not owners:
+            return
+        statuses = await asyncio.to_thread(self._store.statuses, list(owners))
+        for job_id, status in statuses.items():
+            if status == "failed":
+                self._settle(owners[job_id], job_id)
+
+
+# --- Shared Queue ---
+
+_queue: Optional[AnalysisJobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_analysis_queue() -> AnalysisJobQueue:
+    """Returns the process-wide analysis queue, creating it on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = AnalysisJobQueue()
+        return _queue
+
+
+# --- Standalone Worker Process ---
+
+async def run_worker(db_path: str = ANALYSIS_QUEUE_DB_PATH) -> None:
+    """
+    Runs analysis jobs from the SQLite queue until interrupted ("external" mode).
+    Several worker processes may share the same database.
+    """
+    store = SQLiteJobStore(db_path)
+    await asyncio.to_thread(store.init)
+    worker_id = f"worker-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    requeued = await asyncio.to_thread(store.requeue_stale, ANALYSIS_STALE_JOB_SECONDS)
+    logger.info(f"Analysis worker {worker_id} started ({requeued} stale job(s) re-queued).")
+
+    while True:
+        jobs = await asyncio.to_thread(store.claim, worker_id, ANALYSIS_BATCH_SIZE)
+        if not jobs:
+            await asyncio.sleep(ANALYSIS_POLL_INTERVAL_SECONDS)
+            continue
+        try:
+            results = await analyze_jobs(jobs)
+        except Exception as e:
+            # Hand the claimed jobs back rather than leaving them running until
+            # they go stale.
+            logger.error(f"Analysis batch failed: {e}", exc_info=True)
+            results = {}
+        for job in jobs:
+            result = results.get(job.job_id)
+            if result is not None:
+                await asyncio.to_thread(store.complete, result)
+            else:
+                await asyncio.to_thread(store.fail, job.job_id)
+        logger.info(f"Analysed {len(results)}/{len(jobs)} answer(s) in one batch.")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["worker"]:
+        print("Usage: python -m ai_interviewer.core_logic.analysis_queue worker")
+        sys.exit(2)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(run_worker())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,110 @@
+# ai_interviewer/core_logic/context_builder.py
+
+"""
+Builds the bounded interview context that goes into analysis prompts.
+
+Sending the whole history with every analysis call makes each prompt longer
+than the last, so the total cost of an interview grows quadratically. Instead,
+the context has two parts of bounded size:
+
+- A rolling summary of older turns: per skill, how many answers were correct,
+  partial or incorrect, plus the skill's current analysis score. Turns are
+  folded into it one at a time as they leave the recent window, so updating
+  it costs O(1) per turn.
+- The most recent turns verbatim (answers truncated), newest first, for as many
+  as fit into CONTEXT_TOKEN_BUDGET.
+"""
+
+from typing import List, Optional
+
+from ai_interviewer.config import (
+    CONTEXT_RECENT_TURNS,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_MAX_ANSWER_CHARS,
+    CONTEXT_CHARS_PER_TOKEN,
+)
+from ai_interviewer.knowledge_graph.graph_loader import CompiledGraph, get_graph_registry
+from ai_interviewer.models.schemas import SessionState, TurnRecord
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a prompt fragment."""
+    return len(text) // CONTEXT_CHARS_PER_TOKEN + 1
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+def fold_old_turns(state: SessionState, graph: CompiledGraph, upto_turn: int) -> None:
+    """
+    Folds every turn older than the recent window (relative to `upto_turn`)
+    into the session's rolling summary, in place.
+    """
+    while state.summarized_turns < upto_turn - CONTEXT_RECENT_TURNS:
+        turn = state.interview_history[state.summarized_turns]
+        node = graph.get(turn.node_id)
+        skill = node.skill if node is not None else "unknown"
+        tally = state.history_summary.setdefault(skill, {})
+        tally[turn.signal] = tally.get(turn.signal, 0) + 1
+        state.summarized_turns += 1
+
+
+def _summary_lines(state: SessionState) -> List[str]:
+    lines = []
+    for skill, tally in state.history_summary.items():
+        counts = ", ".join(f"{count} {signal}" for signal, count in sorted(tally.items()))
+        line = f"{skill}: {sum(tally.values())} answer(s) ({counts})"
+        if skill in state.skill_scores:
+            line += f", mean score {state.skill_scores[skill]:.1f}/10"
+        lines.append(line)
+    return lines
+
+
+def _turn_line(index: int, turn: TurnRecord, graph: CompiledGraph) -> str:
+    node = graph.get(turn.node_id)
+    question = node.question_text if node is not None else turn.node_id
+    line = f"Turn {index + 1} - Q: {question} A: {_truncate(turn.answer, CONTEXT_MAX_ANSWER_CHARS)} [triage: {turn.signal}"
+    if turn.score is not None:
+        line += f", score {turn.score:g}/10"
+    return line + "]"
+
+
+def build_analysis_context(state: SessionState, upto_turn: Optional[int] = None) -> str:
+    """
+    Returns a token-budgeted summary of the interview before `upto_turn`.
+
+    - Method: Folds turns that left the recent window into the rolling summary,
+              then adds recent turns newest first while they fit the budget.
+    - Input: The session and the index of the turn being analysed (default:
+             the end of the history).
+    - Output: The context text, of at most about CONTEXT_TOKEN_BUDGET tokens.
+    """
+    if upto_turn is None:
+        upto_turn = len(state.interview_history)
+    if upto_turn == 0:
+        return "This is the first question of the interview."
+
+    graph = get_graph_registry().get(state.graph_id, state.graph_version)
+    fold_old_turns(state, graph, upto_turn)
+
+    budget = CONTEXT_TOKEN_BUDGET
+    parts: List[str] = []
+    summary = _summary_lines(state)
+    if summary:
+        header = f"Earlier answers (turns 1-{state.summarized_turns}) by skill:"
+        text = _truncate("\n".join([header] + summary), budget * CONTEXT_CHARS_PER_TOKEN)
+        parts.append(text)
+        budget -= estimate_tokens(text)
+
+    recent: List[str] = []
+    for index in range(upto_turn - 1, state.summarized_turns - 1, -1):
+        line = _turn_line(index, state.interview_history[index], graph)
+        cost = estimate_tokens(line)
+        if cost > budget:
+            break
+        recent.append(line)
+        budget -= cost
+    if recent:
+        parts.append("Most recent answers:\n" + "\n".join(reversed(recent)))
+    return "\n".join(parts)
@@ -0,0 +1,415 @@
+# ai_interviewer/core_logic/inference_executor.py
+
+"""
+Runs blocking model inference (STT, TTS) off the asyncio event loop.
+
+The faster-whisper and piper calls release the GIL for most of their work, so a
+thread pool lets several interviews transcribe and synthesize in parallel while
+the event loop keeps serving every other WebSocket. Each model gets its own
+"lane" with a concurrency limit and a cap on queued calls, so an overloaded
+server pushes back on new work instead of letting latency grow without bound.
+
+Background calls (e.g. speculative synthesis) are admitted only while the lane
+has headroom, may hold only a reserved share of its slots, and wait behind
+every live call, so they never delay or push out live work.
+
+Callers that queue work themselves before handing it to a lane (the STT
+batcher) count each queued item against the lane with `enqueue`, so the lane's
+cap, queue depth and utilization cover that backlog too.
+
+Calls are cancellable. A call that is cancelled while it waits for its lane is
+simply dropped. One that is already running cannot be interrupted from
+outside, so it is asked to stop at its next checkpoint (see
+`cancellation_requested`) and keeps its lane slot until it has actually
+returned, so abandoned work does not let the lane over-admit new calls.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+from ai_interviewer.config import (
+    INFERENCE_THREAD_WORKERS,
+    INFERENCE_USE_PROCESS_POOL,
+    INFERENCE_PROCESS_WORKERS,
+    STT_MAX_CONCURRENCY,
+    TTS_MAX_CONCURRENCY,
+    STT_MAX_QUEUE_DEPTH,
+    TTS_MAX_QUEUE_DEPTH,
+    TTS_SPECULATIVE_MAX_CONCURRENCY,
+    TTS_SPECULATIVE_MAX_LOAD,
+)
+from ai_interviewer.core_logic.llm_client import PrioritySemaphore
+
+logger = logging.getLogger(__name__)
+
+# Lane names used by the audio processing modules.
+STT_LANE = "stt"
+TTS_LANE = "tts"
+
+# Marks the end of a streamed generator.
+_END_OF_STREAM = object()
+
+# Lane slot priorities: lower values are served first.
+_PRIORITY_LIVE = 0
+_PRIORITY_BACKGROUND = 10
+
+# The stop flag of the call running on the current worker thread.
+_call_state = threading.local()
+
+
+def cancellation_requested() -> bool:
+    """
+    True if the executor call running on this thread has been cancelled.
+    Long-running model code checks this between steps (segments, sentences)
+    and returns early; the result is discarded anyway.
+    """
+    stop = getattr(_call_state, "stop", None)
+    return stop is not None and stop.is_set()
+
+
+def run_cancellable(stop: threading.Event, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Runs `fn` with `stop` as the flag behind `cancellation_requested`."""
+    previous = getattr(_call_state, "stop", None)
+    _call_state.stop = stop
+    try:
+        if stop.is_set():  # Cancelled before a worker picked it up.
+            return None
+        return fn(*args, **kwargs)
+    finally:
+        _call_state.stop = previous
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """
+    Raised when a model lane already holds its maximum number of pending calls.
+
+    Attributes:
+        lane: The name of the saturated lane.
+        queue_depth: The number of pending calls at the time of rejection.
+        retry_after: A rough estimate, in seconds, of when capacity frees up.
+    """
+
+    def __init__(self, lane: str, queue_depth: int, retry_after: float):
+        super().__init__(f"Inference lane '{lane}' is saturated ({queue_depth} pending calls).")
+        self.lane = lane
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+
+
+class _Lane:
+    """Bookkeeping for a single model: concurrency limit, queue cap and latency."""
+
+    __slots__ = ("name", "max_concurrency", "max_queue_depth", "use_process_pool", "semaphore",
+                 "background_slots", "background_max_pending", "pending", "queued", "running", "avg_latency")
+
+    def __init__(self, name: str, max_concurrency: int, max_queue_depth: int, use_process_pool: bool,
+                 background_concurrency: int, background_max_load: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.use_process_pool = use_process_pool
+        self.semaphore = PrioritySemaphore(max_concurrency)
+        # At least one slot always stays free of background work.
+        self.background_slots = asyncio.Semaphore(max(0, min(background_concurrency, max_concurrency - 1)))
+        self.background_max_pending = int(max_queue_depth * background_max_load) if background_concurrency > 0 else 0
+        self.pending = 0
+        self.queued = 0  # Items waiting in a caller's own queue (see `InferenceExecutor.enqueue`).
+        self.running = 0
+        self.avg_latency = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self.pending + self.queued
+
+    def admit(self, background: bool, queued: bool = False) -> None:
+        """Counts a new call as pending (or queued), or rejects it if the lane is too full for it."""
+        limit = self.background_max_pending if background else self.max_queue_depth
+        if self.depth >= limit:
+            raise ExecutorSaturatedError(self.name, self.depth, self.estimate_wait())
+        if queued:
+            self.queued += 1
+        else:
+            self.pending += 1
+
+    async def acquire(self, background: bool) -> None:
+        """Waits for a slot. Background calls first take one of their reserved share."""
+        if background:
+            await self.background_slots.acquire()
+        try:
+            await self.semaphore.acquire(_PRIORITY_BACKGROUND if background else _PRIORITY_LIVE)
+        except BaseException:
+            if background:
+                self.background_slots.release()
+            raise
+
+    def release(self, background: bool) -> None:
+        self.semaphore.release()
+        if background:
+            self.background_slots.release()
+
+    def record_latency(self, seconds: float) -> None:
+        # Exponential moving average; the first sample seeds the estimate.
+        self.avg_latency = seconds if self.avg_latency == 0.0 else 0.8 * self.avg_latency + 0.2 * seconds
+
+    def estimate_wait(self) -> float:
+        waves = (self.depth // self.max_concurrency) + 1
+        return round(waves * max(self.avg_latency, 0.5), 2)
+
+
+class InferenceExecutor:
+    """
+    A bounded worker pool for blocking model calls, awaited from async code.
+
+    Calls are admitted per lane: at most `max_concurrency` run at once and at most
+    `max_queue_depth` may be pending (running or waiting). Beyond that the call is
+    rejected with ExecutorSaturatedError so the caller can apply backpressure.
+    """
+
+    def __init__(self, thread_workers: int, use_process_pool: bool = False, process_workers: int = 1):
+        self._thread_pool = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="inference")
+        self._process_pool: Optional[ProcessPoolExecutor] = (
+            ProcessPoolExecutor(max_workers=process_workers) if use_process_pool else None
+        )
+        self._lanes: Dict[str, _Lane] = {}
+
+    def register_lane(self, name: str, max_concurrency: int, max_queue_depth: int,
+                      use_process_pool: bool = False, background_concurrency: int = 0,
+                      background_max_load: float = 0.0) -> None:
+        """
+        Declares a model lane and its limits.
+
+        Args:
+            name: The lane identifier (e.g. "stt").
+            max_concurrency: Maximum number of calls executing at the same time.
+            max_queue_depth: Maximum number of running plus waiting calls.
+            use_process_pool: Route this lane's calls to the process pool, if one exists.
+            background_concurrency: Slots background calls may hold at once (0
+                rejects every background call). At least one slot stays live-only.
+            background_max_load: Background calls are rejected once this fraction
+                of `max_queue_depth` is pending.
+        """
+        max_queue_depth = max(max_queue_depth, max_concurrency)
+        self._lanes[name] = _Lane(name, max_concurrency, max_queue_depth,
+                                  use_process_pool and self._process_pool is not None,
+                                  background_concurrency, background_max_load)
+
+    def enqueue(self, lane_name: str) -> None:
+        """
+        Counts one item waiting in the caller's own queue against a lane. Call
+        `dequeue` once the item is handed to the lane (or dropped).
+
+        Raises:
+            ExecutorSaturatedError: If the lane's queue is full.
+        """
+        self._lanes[lane_name].admit(background=False, queued=True)
+
+    def dequeue(self, lane_name: str, count: int = 1) -> None:
+        """Stops counting `count` items queued with `enqueue`."""
+        self._lanes[lane_name].queued -= count
+
+    async def run(self, lane_name: str, fn: Callable[..., Any], *args: Any,
+                  background: bool = False, **kwargs: Any) -> Any:
+        """
+        Runs `fn(*args, **kwargs)` on the worker pool within the limits of a lane.
+
+        Args:
+            lane_name: The lane the call belongs to.
+            fn: The blocking callable. Must be picklable when the lane uses processes.
+            background: Run as background work (see the module docstring).
+
+        Returns:
+            Whatever `fn` returns.
+
+        Raises:
+            ExecutorSaturatedError: If the lane's queue is full (for background
+                work: too full to take it).
+        """
+        lane = self._lanes[lane_name]
+        lane.admit(background)
+        try:
+            await lane.acquire(background)
+        except BaseException:
+            lane.pending -= 1
+            raise
+        lane.running += 1
+        start = time.perf_counter()
+        stop = threading.Event()
+        if lane.use_process_pool:
+            future = self._process_pool.submit(functools.partial(fn, *args, **kwargs))
+        else:
+            future = self._thread_pool.submit(run_cancellable, stop, fn, *args, **kwargs)
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            stop.set()
+            self._release_when_done(lane, future, start, background)
+
+    def _release_when_done(self, lane: _Lane, future: Future, start: float, background: bool) -> None:
+        """Frees the lane slot of a call once its worker is no longer busy with it."""
+        loop = asyncio.get_running_loop()
+
+        def release() -> None:
+            lane.running -= 1
+            lane.pending -= 1
+            lane.record_latency(time.perf_counter() - start)
+            lane.release(background)
+
+        # A cancelled call that has not started yet is dropped by the pool;
+        # one that is running holds its slot until it returns.
+        if future.done() or future.cancel():
+            release()
+        else:
+            future.add_done_callback(lambda _: loop.is_closed() or loop.call_soon_threadsafe(release))
+
+    async def run_async(self, lane_name: str, coro_fn: Callable[..., Awaitable[Any]], *args: Any,
+                        background: bool = False, **kwargs: Any) -> Any:
+        """
+        Awaits `coro_fn(*args, **kwargs)` within the limits of a lane. Used when
+        the inference itself runs elsewhere (e.g. in a model worker process) but
+        should be admitted and accounted like a local call.
+
+        Raises:
+            ExecutorSaturatedError: If the lane's queue is full.
+        """
+        lane = self._lanes[lane_name]
+        lane.admit(background)
+        try:
+            await lane.acquire(background)
+            lane.running += 1
+            start = time.perf_counter()
+            try:
+                return await coro_fn(*args, **kwargs)
+            finally:
+                lane.running -= 1
+                lane.record_latency(time.perf_counter() - start)
+                lane.release(background)
+        finally:
+            lane.pending -= 1
+
+    async def stream_async(self, lane_name: str, agen_fn: Callable[..., AsyncIterator[Any]],
+                           *args: Any, background: bool = False, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Like `stream`, for an async generator whose work runs elsewhere.
+
+        Raises:
+            ExecutorSaturatedError: If the lane's queue is full.
+        """
+        lane = self._lanes[lane_name]
+        lane.admit(background)
+        try:
+            await lane.acquire(background)
+            lane.running += 1
+            start = time.perf_counter()
+            agen = agen_fn(*args, **kwargs)
+            try:
+                async for item in agen:
+                    yield item
+            finally:
+                await agen.aclose()
+                lane.running -= 1
+                lane.record_latency(time.perf_counter() - start)
+                lane.release(background)
+        finally:
+            lane.pending -= 1
+
+    async def stream(self, lane_name: str, gen_fn: Callable[..., Iterator[Any]],
+                     *args: Any, background: bool = False, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Runs a blocking generator on the thread pool and yields its items as they
+        are produced, holding one slot of the lane for the whole iteration.
+
+        Streams always use threads, since generators cannot cross process
+        boundaries. If the consumer stops early, the producer is told to stop
+        after its current item, and the slot is held until it has.
+
+        Raises:
+            ExecutorSaturatedError: If the lane's queue is full.
+        """
+        lane = self._lanes[lane_name]
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce() -> None:
+            error: Optional[BaseException] = None
+            try:
+                for item in gen_fn(*args, **kwargs):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+            except BaseException as e:
+                error = e
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(queue.put_nowait, (_END_OF_STREAM, error))
+
+        lane.admit(background)
+        try:
+            await lane.acquire(background)
+        except BaseException:
+            lane.pending -= 1
+            raise
+        lane.running += 1
+        start = time.perf_counter()
+        future = self._thread_pool.submit(run_cancellable, stop, produce)
+        try:
+            while True:
+                item, error = await queue.get()
+                if item is _END_OF_STREAM:
+                    if error is not None:
+                        raise error
+                    break
+                yield item
+        finally:
+            stop.set()
+            self._release_when_done(lane, future, start, background)
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Returns the number of pending and queued calls per lane."""
+        return {name: lane.depth for name, lane in self._lanes.items()}
+
+    def utilization(self) -> Dict[str, float]:
+        """Returns each lane's pending and queued calls as a fraction of its queue cap."""
+        return {name: lane.depth / lane.max_queue_depth for name, lane in self._lanes.items()}
+
+    def shutdown(self) -> None:
+        """Stops accepting work and releases the worker pools."""
+        self._thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+# --- Shared Executor ---
+
+_executor: Optional[InferenceExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """
+    Returns the process-wide inference executor, creating it on first use.
+
+    Returns:
+        The shared InferenceExecutor with the STT and TTS lanes registered.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            executor = InferenceExecutor(
+                thread_workers=INFERENCE_THREAD_WORKERS,
+                use_process_pool=INFERENCE_USE_PROCESS_POOL,
+                process_workers=INFERENCE_PROCESS_WORKERS,
+            )
+            executor.register_lane(STT_LANE, STT_MAX_CONCURRENCY, STT_MAX_QUEUE_DEPTH,
+                                   use_process_pool=INFERENCE_USE_PROCESS_POOL)
+            executor.register_lane(TTS_LANE, TTS_MAX_CONCURRENCY, TTS_MAX_QUEUE_DEPTH,
+                                   use_process_pool=INFERENCE_USE_PROCESS_POOL,
+                                   background_concurrency=TTS_SPECULATIVE_MAX_CONCURRENCY,
+                                   background_max_load=TTS_SPECULATIVE_MAX_LOAD)
+            logger.info(f"Inference executor started with {INFERENCE_THREAD_WORKERS} threads.")
+            _executor = executor
+        return _executor
@@ -0,0 +1,276 @@
+# ai_interviewer/core_logic/llm_client.py
+
+"""
+A shared client for every call to the local Ollama server.
+
+All LLM traffic goes through one pooled, keep-alive `httpx.AsyncClient`, so
+turns no longer pay connection setup. Access to the server is scheduled: each
+model has its own concurrency limit, the server as a whole has a limit, and
+waiting requests are served by priority, so live triage calls always go ahead
+of queued background analysis. Transient failures are retried with jittered
+exponential backoff and each model has its own timeout.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import random
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from ai_interviewer.config import (
+    OLLAMA_API_URL,
+    OLLAMA_EMBEDDINGS_URL,
+    OLLAMA_MAX_CONCURRENCY,
+    LLM_MODEL_CONCURRENCY,
+    LLM_MODEL_TIMEOUTS,
+    LLM_DEFAULT_TIMEOUT,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_DELAY,
+    LLM_MAX_CONNECTIONS,
+    LLM_KEEPALIVE_EXPIRY,
+)
+
+logger = logging.getLogger(__name__)
+
+# Lower values are scheduled first.
+PRIORITY_TRIAGE = 0
+PRIORITY_ANALYSIS = 10
+
+
+class LLMRequestError(RuntimeError):
+    """Raised when an LLM request fails after all retries."""
+
+
+class PrioritySemaphore:
+    """
+    An asyncio semaphore whose waiters are woken in priority order
+    (lowest value first, FIFO within the same priority).
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: int = 0) -> None:
+        if self._value > 0 and not self.waiting:
+            self._value -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed to us just as we were cancelled; pass it on.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._value += 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = 0) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class LLMClient:
+    """
+    Pooled, priority-scheduled access to the Ollama generate API.
+    """
+
+    def __init__(self, api_url: str = OLLAMA_API_URL, embeddings_url: str = OLLAMA_EMBEDDINGS_URL):
+        self.api_url = api_url
+        self.embeddings_url = embeddings_url
+        self._http: Optional[httpx.AsyncClient] = None
+        self._server_slots = PrioritySemaphore(OLLAMA_MAX_CONCURRENCY)
+        self._model_slots: Dict[str, PrioritySemaphore] = {}
+        self.in_flight: Dict[str, int] = {}
+
+    def _get_http(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                    keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+                ),
+                timeout=LLM_DEFAULT_TIMEOUT,
+            )
+        return self._http
+
+    def _model_slot(self, model: str) -> PrioritySemaphore:
+        if model not in self._model_slots:
+            limit = LLM_MODEL_CONCURRENCY.get(model, OLLAMA_MAX_CONCURRENCY)
+            self._model_slots[model] = PrioritySemaphore(limit)
+        return self._model_slots[model]
+
+    @asynccontextmanager
+    async def _scheduled(self, model: str, priority: int) -> AsyncIterator[None]:
+        # The model slot is taken first, so a model that is at its own limit
+        # does not hold a server slot while it waits.
+        async with self._model_slot(model).slot(priority):
+            async with self._server_slots.slot(priority):
+                self.in_flight[model] = self.in_flight.get(model, 0) + 1
+                try:
+                    yield
+                finally:
+                    self.in_flight[model] -= 1
+
+    def waiting(self) -> Dict[str, int]:
+        """Returns the number of requests waiting for a slot, per model."""
+        return {model: slots.waiting for model, slots in self._model_slots.items()}
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        return isinstance(error, httpx.TransportError)
+
+    async def _backoff(self, attempt: int) -> None:
+        # Full jitter: sleep a random amount up to the exponential bound.
+        await asyncio.sleep(random.uniform(0, LLM_RETRY_BASE_DELAY * (2 ** attempt)))
+
+    @staticmethod
+    def build_payload(model: str, prompt: str, stream: bool, format: Optional[str],
+                      options: Optional[dict]) -> dict:
+        payload = {"model": model, "prompt": prompt, "stream": stream}
+        if format:
+            payload["format"] = format
+        if options:
+            payload["options"] = options
+        return payload
+
+    async def generate(self, model: str, prompt: str, priority: int = PRIORITY_ANALYSIS,
+                       format: Optional[str] = "json", options: Optional[dict] = None) -> str:
+        """
+        Runs a non-streaming generation request.
+
+        Args:
+            model: The Ollama model name.
+            prompt: The full prompt.
+            priority: Scheduling priority (PRIORITY_TRIAGE or PRIORITY_ANALYSIS).
+            format: The response format requested from Ollama ("json" or None).
+            options: Optional Ollama sampling options.
+
+        Returns:
+            The model's `response` text.
+
+        Raises:
+            LLMRequestError: If the request fails after all retries.
+        """
+        payload = self.build_payload(model, prompt, False, format, options)
+        data = await self._post_json(self.api_url, model, payload, priority)
+        return data.get("response", "")
+
+    async def embed(self, model: str, text: str, priority: int = PRIORITY_TRIAGE) -> List[float]:
+        """
+        Computes an embedding vector for `text`.
+
+        Raises:
+            LLMRequestError: If the request fails after all retries.
+        """
+        data = await self._post_json(self.embeddings_url, model, {"model": model, "prompt": text}, priority)
+        embedding = data.get("embedding")
+        if not embedding:
+            raise LLMRequestError(f"Embedding model {model} returned no vector.")
+        return embedding
+
+    async def _post_json(self, url: str, model: str, payload: dict, priority: int) -> Dict[str, Any]:
+        timeout = LLM_MODEL_TIMEOUTS.get(model, LLM_DEFAULT_TIMEOUT)
+        last_error: Optional[Exception] = None
+
+        async with self._scheduled(model, priority):
+            for attempt in range(LLM_MAX_RETRIES + 1):
+                try:
+                    response = await self._get_http().post(url, json=payload, timeout=timeout)
+                    response.raise_for_status()
+                    return response.json()
+                except (httpx.HTTPError, ValueError) as e:
+                    last_error = e
+                    if not self._is_retryable(e) or attempt == LLM_MAX_RETRIES:
+                        break
+                    logger.warning(f"LLM call to {model} failed ({e!r}); retrying.")
+                    await self._backoff(attempt)
+
+        raise LLMRequestError(f"Request to {model} failed: {last_error!r}") from last_error
+
+    async def stream_generate(self, model: str, prompt: str, priority: int = PRIORITY_ANALYSIS,
+                              format: Optional[str] = "json",
+                              options: Optional[dict] = None) -> AsyncIterator[str]:
+        """
+        Runs a streaming generation request and yields response tokens as they arrive.
+
+        Closing the generator early (e.g. with `contextlib.aclosing`) closes the
+        HTTP stream, which makes Ollama abandon the rest of the generation.
+        Failures are only retried before the first token has been yielded.
+
+        Raises:
+            LLMRequestError: If the request fails.
+        """
+        payload = self.build_payload(model, prompt, True, format, options)
+        timeout = LLM_MODEL_TIMEOUTS.get(model, LLM_DEFAULT_TIMEOUT)
+
+        async with self._scheduled(model, priority):
+            for attempt in range(LLM_MAX_RETRIES + 1):
+                received = False
+                try:
+                    async with self._get_http().stream("POST", self.api_url, json=payload,
+                                                       timeout=timeout) as response:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if not line:
+                                continue
+                            chunk = json.loads(line)
+                            token = chunk.get("response", "")
+                            if token:
+                                received = True
+                                yield token
+                            if chunk.get("done"):
+                                return
+                    return
+                except (httpx.HTTPError, ValueError) as e:
+                    if received or not self._is_retryable(e) or attempt == LLM_MAX_RETRIES:
+                        raise LLMRequestError(f"Streaming request to {model} failed: {e!r}") from e
+                    logger.warning(f"LLM stream to {model} failed ({e!r}); retrying.")
+                    await self._backoff(attempt)
+
+    async def aclose(self) -> None:
+        """Closes the pooled HTTP connections."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+# --- Shared Client ---
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Returns the process-wide LLM client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
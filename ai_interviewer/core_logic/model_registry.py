@@ -0,0 +1,163 @@
+# ai_interviewer/core_logic/model_registry.py
+
+"""
+A registry of the heavy models (Whisper, Piper) and their loading state.
+
+Modules register a loader (and optionally a warm-up function) at import time,
+which costs nothing; the model itself is loaded either lazily on first use or
+in the background from the API lifespan. Warm-up runs one tiny inference right
+after loading, so the first real request does not pay for kernel selection,
+memory allocation and cache population.
+
+The registry reports every model's state ("unloaded", "loading", "ready",
+"failed") and timings, which the readiness endpoint uses so a restarting
+worker only receives traffic once its models can serve it.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+UNLOADED = "unloaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelLoadError(RuntimeError):
+    """Raised when a model is requested but could not be loaded."""
+
+
+class _ModelEntry:
+    __slots__ = ("name", "loader", "warm_up", "lock", "model", "state", "error",
+                 "load_seconds", "warm_up_seconds")
+
+    def __init__(self, name: str, loader: Callable[[], Any], warm_up: Optional[Callable[[Any], None]]):
+        self.name = name
+        self.loader = loader
+        self.warm_up = warm_up
+        self.lock = threading.Lock()
+        self.model: Any = None
+        self.state = UNLOADED
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warm_up_seconds: Optional[float] = None
+
+
+class ModelRegistry:
+    """
+    Named models, each loaded at most once, on demand or ahead of time.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _ModelEntry] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], warm_up: Optional[Callable[[Any], None]] = None,
+                 replace: bool = False) -> None:
+        """
+        Declares a model without loading it.
+
+        Args:
+            name: The model's key (e.g. "stt").
+            loader: Returns the loaded model; may raise on failure.
+            warm_up: Runs a small inference on the loaded model.
+            replace: Swap out an existing registration (and any loaded model),
+                e.g. to run the benchmarks against stub models.
+        """
+        if replace or name not in self._entries:
+            self._entries[name] = _ModelEntry(name, loader, warm_up)
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def load(self, name: str, warm_up: bool = True) -> Any:
+        """
+        Loads (and optionally warms up) a model, blocking until it is available.
+        Concurrent callers wait for the same load.
+
+        Raises:
+            ModelLoadError: If the model failed to load, now or earlier.
+        """
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.state == READY:
+                return entry.model
+            if entry.state == FAILED:
+                raise ModelLoadError(f"Model '{name}' failed to load: {entry.error}")
+
+            entry.state = LOADING
+            start = time.perf_counter()
+            try:
+                entry.model = entry.loader()
+            except Exception as e:
+                entry.state = FAILED
+                entry.error = f"{type(e).__name__}: {e}"
+                logger.error(f"Model '{name}' failed to load: {entry.error}")
+                raise ModelLoadError(f"Model '{name}' failed to load: {entry.error}") from e
+            entry.load_seconds = round(time.perf_counter() - start, 3)
+
+            if warm_up and entry.warm_up is not None:
+                start = time.perf_counter()
+                try:
+                    entry.warm_up(entry.model)
+                except Exception as e:
+                    # A failed warm-up is not fatal; the first request warms it instead.
+                    logger.warning(f"Warm-up of model '{name}' failed: {e}")
+                entry.warm_up_seconds = round(time.perf_counter() - start, 3)
+
+            entry.state = READY
+            logger.info(f"Model '{name}' ready (load {entry.load_seconds}s, warm-up {entry.warm_up_seconds}s).")
+            return entry.model
+
+    def get(self, name: str) -> Any:
+        """
+        Returns a model, loading it without warm-up if nobody has loaded it yet.
+
+        Raises:
+            ModelLoadError: If the model could not be loaded.
+        """
+        entry = self._entries[name]
+        if entry.state == READY:
+            return entry.model
+        return self.load(name, warm_up=False)
+
+    async def load_all(self) -> None:
+        """Loads and warms up every registered model concurrently in threads."""
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.load, name) for name in self._entries),
+            return_exceptions=True,
+        )
+        failed = [name for name, result in zip(self._entries, results) if isinstance(result, Exception)]
+        if failed:
+            logger.error(f"Models not available: {', '.join(failed)}")
+
+    def is_ready(self, names: Optional[List[str]] = None) -> bool:
+        """True if every named (default: every registered) model is loaded."""
+        names = self._entries if names is None else names
+        return all(name in self._entries and self._entries[name].state == READY for name in names)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the state, error and load/warm-up timings of every model."""
+        return {
+            entry.name: {
+                "state": entry.state,
+                "error": entry.error,
+                "load_seconds": entry.load_seconds,
+                "warm_up_seconds": entry.warm_up_seconds,
+            }
+            for entry in self._entries.values()
+        }
+
+
+# --- Shared Registry ---
+
+_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Returns the process-wide model registry."""
+    return _registry
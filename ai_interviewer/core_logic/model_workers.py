@@ -0,0 +1,448 @@
+# ai_interviewer/core_logic/model_workers.py
+
+"""
+Model worker processes for running STT and TTS outside the front process.
+
+With MODEL_WORKERS_ENABLED, the API runs as a single front process that owns
+every WebSocket, and a fixed set of MODEL_WORKER_COUNT worker processes each
+load Whisper and Piper once. Together they use all the cores of a box without
+one model copy per uvicorn worker.
+
+- Audio to transcribe is written into a shared-memory slot of the chosen
+  worker, so only a few integers cross the process boundary. Requests, results
+  and synthesized audio chunks travel over a local pipe.
+- Dispatch is load-aware: each call goes to the worker with the fewest calls in
+  flight. A session's transcriptions stick to one worker (session affinity)
+  unless that worker is MODEL_WORKER_AFFINITY_SLACK calls busier than the least
+  loaded one.
+- A worker that dies fails its in-flight calls and is restarted. Calls still
+  waiting for one of its slots are served by the restarted worker.
+- A call whose caller gave up (e.g. the candidate interrupted or hung up) is
+  cancelled in the worker too: it is skipped if it has not started, and
+  otherwise stops at its next segment or sentence.
+
+Run the API with one uvicorn worker in this mode; the processes here provide
+the parallelism.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ai_interviewer.config import (
+    MODEL_WORKER_COUNT,
+    MODEL_WORKER_SLOTS,
+    MODEL_WORKER_AFFINITY_SLACK,
+    MODEL_WORKER_START_TIMEOUT,
+    STT_SAMPLE_RATE,
+    STREAMING_MAX_UTTERANCE_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Message kinds. Requests: front -> worker. Replies: worker -> front.
+_TRANSCRIBE = "transcribe"
+_SYNTHESIZE = "synthesize"
+_CANCEL = "cancel"
+_STOP = "stop"
+_READY = "ready"
+_RESULT = "result"
+_CHUNK = "chunk"
+_END = "end"
+_ERROR = "error"
+
+# Every slot holds the longest utterance the streaming transcriber can buffer.
+SLOT_SAMPLES = int(STREAMING_MAX_UTTERANCE_SECONDS * STT_SAMPLE_RATE)
+SLOT_BYTES = SLOT_SAMPLES * np.dtype(np.float32).itemsize
+
+
+class ModelWorkerError(RuntimeError):
+    """Raised when a model worker fails a call or dies while serving it."""
+
+
+# --- Worker Process ---
+
+def _worker_main(index: int, conn, shm_name: str, slots: int) -> None:
+    """Entry point of a model worker process."""
+    from ai_interviewer.audio_processing.speech_to_text import transcribe_segments
+    from ai_interviewer.audio_processing.text_to_speech import synthesize_speech_chunks
+    from ai_interviewer.core_logic.model_registry import get_model_registry, ModelLoadError
+    from ai_interviewer.core_logic.inference_executor import run_cancellable
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    registry = get_model_registry()
+    for name in registry.names():
+        try:
+            registry.load(name)
+        except ModelLoadError:
+            pass  # Reported to the front process with the ready message.
+
+    send_lock = threading.Lock()
+    # Stop flags of the requests received and not finished yet.
+    stops: Dict[int, threading.Event] = {}
+
+    def send(message: tuple) -> None:
+        with send_lock:
+            conn.send(message)
+
+    def transcribe(request_id: int, slot: int, n_samples: int, beam_size: int) -> None:
+        try:
+            audio = np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf, offset=slot * SLOT_BYTES)
+            try:
+                # A cancelled request still replies, so the front process frees the slot.
+                send((_RESULT, request_id, run_cancellable(stops[request_id], transcribe_segments, audio, beam_size)))
+            finally:
+                del audio  # Release the buffer export so the segment can be closed.
+        except Exception as e:
+            send((_ERROR, request_id, f"{type(e).__name__}: {e}"))
+        finally:
+            stops.pop(request_id, None)
+
+    def synthesize(request_id: int, text: str) -> None:
+        stop = stops[request_id]
+        try:
+            if not stop.is_set():
+                for item in synthesize_speech_chunks(text):
+                    if stop.is_set():
+                        break
+                    send((_CHUNK, request_id, item))
+            send((_END, request_id, None))
+        except Exception as e:
+            send((_ERROR, request_id, f"{type(e).__name__}: {e}"))
+        finally:
+            stops.pop(request_id, None)
+
+    pool = ThreadPoolExecutor(max_workers=slots, thread_name_prefix=f"model-worker-{index}")
+    send((_READY, index, (os.getpid(), registry.status())))
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            kind = message[0]
+            if kind == _TRANSCRIBE:
+                stops[message[1]] = threading.Event()
+                pool.submit(transcribe, *message[1:])
+            elif kind == _SYNTHESIZE:
+                stops[message[1]] = threading.Event()
+                pool.submit(synthesize, *message[1:])
+            elif kind == _CANCEL:
+                stop = stops.get(message[1])
+                if stop is not None:
+                    stop.set()
+            elif kind == _STOP:
+                break
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        shm.close()
+
+
+# --- Front Process ---
+
+class _Pending:
+    """An in-flight call: a Future for transcriptions, a Queue for syntheses."""
+
+    __slots__ = ("worker", "waiter", "slot")
+
+    def __init__(self, worker: "_WorkerHandle", waiter: Any, slot: Optional[int] = None):
+        self.worker = worker
+        self.waiter = waiter
+        self.slot = slot
+
+
+class _WorkerHandle:
+    __slots__ = ("index", "process", "conn", "shm", "free_slots", "waiting", "in_flight", "alive", "ready",
+                 "reader", "model_status")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        # Outlives restarts: callers may be waiting on it while the worker dies.
+        self.free_slots: Optional[asyncio.Queue] = None
+        self.waiting = 0  # Calls waiting for a free slot.
+        self.in_flight = 0
+        self.alive = False
+        self.ready: Optional[asyncio.Event] = None
+        self.reader: Optional[threading.Thread] = None
+        self.model_status: Dict[str, Dict[str, Any]] = {}
+
+
+class ModelWorkerPool:
+    """
+    Dispatches STT and TTS calls from the front process to model worker processes.
+    All public methods must be called from the event loop thread.
+    """
+
+    def __init__(self, workers: int = MODEL_WORKER_COUNT, slots: int = MODEL_WORKER_SLOTS):
+        self._ctx = multiprocessing.get_context("spawn")
+        self._slots = slots
+        self._workers = [_WorkerHandle(i) for i in range(workers)]
+        self._pending: Dict[int, _Pending] = {}
+        self._affinity: Dict[str, int] = {}
+        self._request_ids = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    # --- Lifecycle ---
+
+    def _spawn(self, worker: _WorkerHandle) -> None:
+        worker.shm = shared_memory.SharedMemory(create=True, size=SLOT_BYTES * self._slots)
+        front_conn, worker_conn = self._ctx.Pipe(duplex=True)
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker.index, worker_conn, worker.shm.name, self._slots),
+            name=f"model-worker-{worker.index}",
+            daemon=True,
+        )
+        worker.process.start()
+        worker_conn.close()
+        worker.conn = front_conn
+        if worker.free_slots is None:
+            worker.free_slots = asyncio.Queue()
+            for slot in range(self._slots):
+                worker.free_slots.put_nowait(slot)
+        worker.ready = asyncio.Event()
+        worker.reader = threading.Thread(target=self._read_replies, args=(worker, front_conn),
+                                         name=f"model-worker-{worker.index}-reader", daemon=True)
+        worker.reader.start()
+
+    async def start(self) -> None:
+        """Starts every worker process and waits until they have loaded their models."""
+        self._loop = asyncio.get_running_loop()
+        for worker in self._workers:
+            self._spawn(worker)
+        await asyncio.wait_for(asyncio.gather(*(w.ready.wait() for w in self._workers)),
+                               MODEL_WORKER_START_TIMEOUT)
+        logger.info(f"{len(self._workers)} model worker process(es) ready.")
+
+    async def stop(self) -> None:
+        """Stops every worker process and releases the shared memory."""
+        self._stopping = True
+        for worker in self._workers:
+            if worker.process is None:
+                continue
+            try:
+                worker.conn.send((_STOP,))
+            except (OSError, ValueError):
+                pass
+            await asyncio.to_thread(worker.process.join, 10)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            self._release(worker)
+
+    def _release(self, worker: _WorkerHandle) -> None:
+        worker.alive = False
+        if worker.conn is not None:
+            worker.conn.close()
+        if worker.shm is not None:
+            worker.shm.close()
+            worker.shm.unlink()
+            worker.shm = None
+
+    # --- Replies ---
+
+    def _read_replies(self, worker: _WorkerHandle, conn) -> None:
+        # Runs in a thread per worker; hands every reply to the event loop.
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            self._loop.call_soon_threadsafe(self._dispatch, worker, message)
+        self._loop.call_soon_threadsafe(self._on_worker_exit, worker)
+
+    def _dispatch(self, worker: _WorkerHandle, message: tuple) -> None:
+        kind, key, payload = message
+        if kind == _READY:
+            pid, worker.model_status = payload
+            worker.alive = True
+            worker.ready.set()
+            logger.info(f"Model worker {key} ready (pid {pid}).")
+            return
+
+        pending = self._pending.get(key)
+        if pending is None:
+            return
+        if isinstance(pending.waiter, asyncio.Queue):
+            pending.waiter.put_nowait((kind, payload))
+            if kind != _CHUNK:
+                del self._pending[key]
+            return
+
+        # A transcription: the slot is only reused once the worker has replied,
+        # even if the caller stopped waiting.
+        del self._pending[key]
+        worker.free_slots.put_nowait(pending.slot)
+        if pending.waiter.done():
+            return
+        if kind == _RESULT:
+            pending.waiter.set_result(payload)
+        else:
+            pending.waiter.set_exception(ModelWorkerError(payload))
+
+    def _on_worker_exit(self, worker: _WorkerHandle) -> None:
+        if self._stopping:
+            return
+        # Its in-flight calls fail and their slots go back to the same queue,
+        # so callers waiting for a slot continue on the restarted worker.
+        for key, pending in list(self._pending.items()):
+            if pending.worker is not worker:
+                continue
+            del self._pending[key]
+            error = ModelWorkerError(f"Model worker {worker.index} died.")
+            if isinstance(pending.waiter, asyncio.Queue):
+                pending.waiter.put_nowait((_ERROR, str(error)))
+            else:
+                worker.free_slots.put_nowait(pending.slot)
+                if not pending.waiter.done():
+                    pending.waiter.set_exception(error)
+        self._release(worker)
+        self._affinity = {sid: idx for sid, idx in self._affinity.items() if idx != worker.index}
+        if not worker.ready.is_set():
+            # It died while loading its models; restarting would only loop.
+            logger.error(f"Model worker {worker.index} failed to start (exit code {worker.process.exitcode}).")
+            # No slot will be freed again; wake every caller waiting for one.
+            for _ in range(worker.waiting):
+                worker.free_slots.put_nowait(None)
+            return
+        logger.error(f"Model worker {worker.index} exited unexpectedly; restarting it.")
+        self._spawn(worker)
+
+    # --- Dispatch ---
+
+    def _pick(self, session_id: Optional[str]) -> _WorkerHandle:
+        alive = [w for w in self._workers if w.alive]
+        if not alive:
+            raise ModelWorkerError("No model worker is running.")
+        least = min(alive, key=lambda w: w.in_flight)
+        if session_id is None:
+            return least
+        index = self._affinity.get(session_id)
+        if index is not None:
+            preferred = self._workers[index]
+            if preferred.alive and preferred.in_flight <= least.in_flight + MODEL_WORKER_AFFINITY_SLACK:
+                return preferred
+        self._affinity[session_id] = least.index
+        return least
+
+    async def transcribe(self, audio: np.ndarray, beam_size: int = 5,
+                         session_id: Optional[str] = None) -> List[Tuple[float, float, str]]:
+        """
+        Transcribes 16 kHz float32 audio on a worker process.
+
+        Returns:
+            The same (start_seconds, end_seconds, text) segments as `transcribe_segments`.
+
+        Raises:
+            ModelWorkerError: If the worker failed or died.
+        """
+        if len(audio) > SLOT_SAMPLES:
+            audio = audio[-SLOT_SAMPLES:]
+        worker = self._pick(session_id)
+        worker.in_flight += 1
+        try:
+            worker.waiting += 1
+            try:
+                slot = await worker.free_slots.get()
+            finally:
+                worker.waiting -= 1
+            if worker.shm is None:
+                # The worker died for good while this call waited.
+                if slot is not None:
+                    worker.free_slots.put_nowait(slot)
+                raise ModelWorkerError(f"Model worker {worker.index} is not running.")
+            view = np.ndarray((len(audio),), dtype=np.float32, buffer=worker.shm.buf, offset=slot * SLOT_BYTES)
+            view[:] = audio
+            del view
+            request_id = next(self._request_ids)
+            future = self._loop.create_future()
+            self._pending[request_id] = _Pending(worker, future, slot)
+            worker.conn.send((_TRANSCRIBE, request_id, slot, len(audio), beam_size))
+            try:
+                return await future
+            except asyncio.CancelledError:
+                # The slot stays taken until the worker replies to the cancel.
+                if worker.alive and request_id in self._pending:
+                    worker.conn.send((_CANCEL, request_id))
+                raise
+        finally:
+            worker.in_flight -= 1
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[Tuple[bytes, int]]:
+        """
+        Synthesizes text on a worker process, yielding (PCM bytes, sample rate)
+        chunks as they arrive. Closing the generator early cancels the rest.
+
+        Raises:
+            ModelWorkerError: If the worker failed or died.
+        """
+        worker = self._pick(None)
+        worker.in_flight += 1
+        request_id = next(self._request_ids)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._pending[request_id] = _Pending(worker, queue)
+        finished = False
+        try:
+            worker.conn.send((_SYNTHESIZE, request_id, text))
+            while True:
+                kind, payload = await queue.get()
+                if kind == _CHUNK:
+                    yield payload
+                    continue
+                finished = True
+                if kind == _ERROR:
+                    raise ModelWorkerError(payload)
+                break
+        finally:
+            worker.in_flight -= 1
+            if not finished and worker.alive:
+                worker.conn.send((_CANCEL, request_id))
+
+    def forget(self, session_id: str) -> None:
+        """Drops a finished session's worker affinity."""
+        self._affinity.pop(session_id, None)
+
+    def is_ready(self, models: Optional[List[str]] = None) -> bool:
+        """True if every worker is running and has loaded the named models."""
+        return all(
+            w.alive and all(w.model_status.get(name, {}).get("state") == "ready"
+                            for name in (models if models is not None else w.model_status))
+            for w in self._workers
+        )
+
+    def status(self) -> Dict[int, Dict[str, Any]]:
+        """Returns the liveness, load and model state of every worker."""
+        return {
+            w.index: {"alive": w.alive, "in_flight": w.in_flight, "models": w.model_status}
+            for w in self._workers
+        }
+
+    def loads(self) -> Dict[int, int]:
+        """Returns the number of calls in flight per worker."""
+        return {w.index: w.in_flight for w in self._workers}
+
+
+# --- Shared Pool ---
+
+_pool: Optional[ModelWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_model_worker_pool() -> ModelWorkerPool:
+    """Returns the process-wide model worker pool (started by the API lifespan)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ModelWorkerPool()
+        return _pool
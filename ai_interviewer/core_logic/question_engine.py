@@ -5,87 +5,105 @@ The brain of the interviewer. It selects the next question from the
 knowledge graph based on the candidate's performance on the previous question.
 """
 
+import logging
+from typing import Dict
+
+from ai_interviewer.config import ADAPTIVE_SELECTION_ENABLED, ADAPTIVE_MAX_QUESTIONS
 from ai_interviewer.models.schemas import SessionState, TriageResult
-# from knowledge_graph.graph_loader import load_graph # Assuming a graph loader
-# from utils.logger import get_logger
-
-# logger = get_logger(__name__)
-
-# --- Knowledge Graph Loading ---
-# The knowledge graph is loaded once and cached for performance.
-# knowledge_graph = load_graph("python_backend_junior.json")
-
-# This is a placeholder for the actual knowledge graph logic.
-# In a real implementation, this would be loaded from a JSON file.
-mock_knowledge_graph = {
-    "start_node": "node_1",
-    "nodes": {
-        "node_1": {
-            "question_text": "Hello, let's begin. Please explain the difference between a list and a tuple in Python.",
-            "skill": "Python Fundamentals",
-            "difficulty": "easy",
-            "transitions": {
-                "correct": "node_2",
-                "partial": "node_1_followup",
-                "incorrect": "node_1_clarify"
-            }
-        },
-        "node_1_followup": {
-            "question_text": "You mentioned one is mutable and the other is not. Can you give a practical example of when you would choose a tuple over a list?",
-            "skill": "Python Fundamentals",
-            "difficulty": "easy",
-            "transitions": { "default": "node_2" }
-        },
-        "node_1_clarify": {
-            "question_text": "Let's break it down. What does it mean for an object to be 'mutable' in Python?",
-            "skill": "Python Fundamentals",
-            "difficulty": "easy",
-            "transitions": { "default": "node_2" }
-        },
-        "node_2": {
-            "question_text": "Great. Now, can you explain what a decorator is in Python and provide a simple use case?",
-            "skill": "Python Intermediate",
-            "difficulty": "medium",
-            "transitions": { "default": "end_node" }
-        },
-        "end_node": {
-            "question_text": "Thank you, that concludes our interview.",
-            "skill": "end",
-            "difficulty": "none",
-            "transitions": {}
-        }
-    }
-}
-
-
-def select_next_question(state: SessionState, triage: TriageResult) -> dict:
+from ai_interviewer.knowledge_graph.graph_loader import CompiledGraph, GraphNode, get_graph_registry
+from ai_interviewer.core_logic.adaptive_selector import record_answer, select_adaptive_node
+from ai_interviewer.core_logic.response_analyzer import TRIAGE_SIGNALS
+
+logger = logging.getLogger(__name__)
+
+
+# --- Knowledge Graph Access ---
+# Graphs are loaded, validated and compiled once by the registry (see
+# knowledge_graph/graph_loader.py). A session keeps using the graph version it
+# started on, even if the file is hot-reloaded mid-interview.
+
+def get_session_graph(state: SessionState) -> CompiledGraph:
+    """Returns the graph version pinned by the session."""
+    return get_graph_registry().get(state.graph_id, state.graph_version)
+
+
+def get_current_node(state: SessionState) -> GraphNode:
+    """Returns the node currently being asked, or the end node if it is unknown."""
+    graph = get_session_graph(state)
+    return graph.get(state.current_node_id) or graph.end_node
+
+
+def _asked_node_ids(state: SessionState) -> set:
+    asked = {turn.node_id for turn in state.interview_history}
+    asked.add(state.current_node_id)
+    return asked
+
+
+def _adaptive_next(graph: CompiledGraph, state: SessionState, signal: str,
+                   abilities: Dict[str, float], variances: Dict[str, float]) -> GraphNode:
+    """
+    Updates `abilities`/`variances` with the answer to the current node and
+    returns the node to ask next.
+    """
+    current_node = graph.get(state.current_node_id)
+    if current_node is None:
+        return graph.end_node
+    record_answer(abilities, variances, current_node, signal)
+
+    asked = _asked_node_ids(state)
+    # A follow-up the graph author linked to this exact signal is asked first.
+    target = graph.get(current_node.transitions.get(signal, ""))
+    if target is not None and target.followup and target.node_id not in asked:
+        return target
+    if len(asked) >= ADAPTIVE_MAX_QUESTIONS:
+        return graph.end_node
+    return select_adaptive_node(graph, abilities, variances, asked) or graph.end_node
+
+
+def select_next_question(state: SessionState, triage: TriageResult) -> GraphNode:
     """
     Selects the next question based on the current state and the last answer's triage.
 
-    - Method: Navigates the loaded knowledge graph. If the triage signal is 'correct',
-              it moves to a harder or related node. If 'incorrect', it asks a
-              clarifying or easier follow-up question on the same topic.
+    - Method: With adaptive selection, updates the ability estimate of the
+              answered skill and picks the unasked node expected to be most
+              informative (graph-linked follow-ups first). Otherwise navigates
+              the knowledge graph's fixed transition for the triage signal.
     - Input: The current SessionState and the TriageResult from the last answer.
-    - Output: A dictionary representing the next question node from the knowledge graph.
+    - Output: The next GraphNode of the session's knowledge graph.
     """
+    graph = get_session_graph(state)
     current_node_id = state.current_node_id
-    current_node = mock_knowledge_graph["nodes"].get(current_node_id)
 
-    if not current_node:
-        # logger.error(f"Current node ID '{current_node_id}' not found in knowledge graph.")
-        return mock_knowledge_graph["nodes"]["end_node"]
+    if ADAPTIVE_SELECTION_ENABLED:
+        next_node = _adaptive_next(graph, state, triage.signal, state.skill_ability, state.skill_ability_variance)
+    else:
+        next_node = graph.next_node(current_node_id, triage.signal)
+        if next_node is None:
+            logger.warning(f"No transition for signal '{triage.signal}' from node '{current_node_id}'. Ending interview.")
+            next_node = graph.end_node
 
-    # Determine the next node based on the triage signal
-    transitions = current_node.get("transitions", {})
-    next_node_id = transitions.get(triage.signal) or transitions.get("default")
+    logger.info(f"Transitioning from '{current_node_id}' to '{next_node.node_id}' on signal '{triage.signal}'.")
+    # Update the session state with the new node ID
+    state.current_node_id = next_node.node_id
+    return next_node
 
-    if not next_node_id:
-        # logger.warning(f"No valid transition found for signal '{triage.signal}' from node '{current_node_id}'. Ending interview.")
-        return mock_knowledge_graph["nodes"]["end_node"]
 
-    # Update the session state with the new node ID
-    state.current_node_id = next_node_id
-    
-    # logger.info(f"Transitioning from '{current_node_id}' to '{next_node_id}' based on signal '{triage.signal}'.")
-    
-    return mock_knowledge_graph["nodes"].get(next_node_id)
+def get_reachable_nodes(state: SessionState) -> list:
+    """
+    Lists every node the interview can move to from the current node, whatever the triage signal.
+
+    - Input: The current SessionState.
+    - Output: A list of distinct GraphNodes (empty for a terminal node).
+    """
+    graph = get_session_graph(state)
+    if not ADAPTIVE_SELECTION_ENABLED:
+        return graph.successors(state.current_node_id)
+    if state.current_node_id == graph.end_node.node_id:
+        return []
+    # Run the selection once per possible signal on copies of the estimates;
+    # "" stands for any signal that carries no score (e.g. a triage failure).
+    candidates = {}
+    for signal in (*TRIAGE_SIGNALS, ""):
+        node = _adaptive_next(graph, state, signal, dict(state.skill_ability), dict(state.skill_ability_variance))
+        candidates[node.node_id] = node
+    return list(candidates.values())
@@ -0,0 +1,325 @@
+# ai_interviewer/core_logic/rescoring.py
+
+"""
+Offline re-scoring of archived interviews.
+
+When the rubric, the prompts or the models change, every archived answer can
+be scored again overnight:
+
+    python -m ai_interviewer.core_logic.rescoring extern/interviews.jsonl extern/rescored
+        [--concurrency N] [--part-size N] [--format parquet|npz] [--no-triage] [--limit N]
+
+- Input: the interview archive, one SessionState JSON per line (written by
+  `archive_session` when an interview finishes). It is streamed, never loaded
+  whole.
+- Each answer is triaged again and analysed again with the same prompts and
+  context as in a live interview (`run_triage_analysis`, `analyze_jobs`).
+  Analysis batches ANALYSIS_BATCH_SIZE answers per LLM call, and at most
+  `concurrency` calls are in flight.
+- Output: one columnar file per RESCORE_PART_SIZE interviews, Parquet if
+  pyarrow is installed and compressed NumPy .npz otherwise, with one row per
+  answer. `read_results` loads every part back as columns.
+- A checkpoint is written after every part. Re-running the same command
+  resumes after the last completed part.
+"""
+
+import argparse
+import asyncio
+import glob
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ai_interviewer.config import (
+    ANALYSIS_BATCH_SIZE,
+    ANALYSIS_MODEL_NAME,
+    RESCORE_CONCURRENCY,
+    RESCORE_PART_SIZE,
+    TRIAGE_MODEL_NAME,
+)
+from ai_interviewer.core_logic.analysis_queue import analyze_jobs
+from ai_interviewer.core_logic.context_builder import build_analysis_context
+from ai_interviewer.core_logic.llm_client import get_llm_client
+from ai_interviewer.core_logic.response_analyzer import run_triage_analysis
+from ai_interviewer.knowledge_graph.graph_loader import get_graph_registry
+from ai_interviewer.models.schemas import AnalysisJob, SessionState, TriageResult
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet output is optional; .npz is always available.
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "_checkpoint.json"
+
+# Output columns, in order, and their NumPy dtypes for the .npz format.
+COLUMNS = {
+    "session_id": str,
+    "turn_index": np.int32,
+    "graph_id": str,
+    "node_id": str,
+    "skill": str,
+    "question": str,
+    "answer": str,
+    "live_signal": str,
+    "live_score": np.float32,
+    "signal": str,
+    "confidence": np.float32,
+    "score": np.float32,
+    "analysis_text": str,
+}
+
+
+# --- Input ---
+
+def read_archive(path: str, skip: int = 0) -> Iterator[Tuple[int, Optional[SessionState]]]:
+    """
+    Streams the archive, after skipping `skip` lines.
+
+    Yields:
+        (line_number, session) pairs; the session is None for a malformed line.
+    """
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(itertools.islice(f, skip, None), start=skip):
+            if not line.strip():
+                continue
+            try:
+                yield number, SessionState.model_validate_json(line)
+            except ValueError as e:
+                logger.warning(f"Skipping malformed archive line {number + 1}: {e}")
+                yield number, None
+
+
+def build_jobs(session: SessionState) -> List[AnalysisJob]:
+    """
+    Rebuilds the analysis job of every answer in a finished interview, with
+    the context the live analysis would have seen at that turn.
+
+    Raises:
+        KeyError: If the interview's knowledge graph is not loaded.
+    """
+    graph = get_graph_registry().get(session.graph_id, session.graph_version)
+    # The archived summary covers the whole interview; rebuild it turn by turn.
+    session.history_summary = {}
+    session.summarized_turns = 0
+    jobs = []
+    for index, turn in enumerate(session.interview_history):
+        node = graph.get(turn.node_id)
+        jobs.append(AnalysisJob(
+            session_id=session.session_id,
+            session_start=session.start_time,
+            turn_index=index,
+            node_id=turn.node_id,
+            skill=node.skill if node is not None else "unknown",
+            question=node.question_text if node is not None else "",
+            answer=turn.answer,
+            context=build_analysis_context(session, index),
+        ))
+    return jobs
+
+
+# --- Scoring ---
+
+async def rescore_part(sessions: List[SessionState], concurrency: int, triage: bool) -> Dict[str, list]:
+    """
+    Re-runs triage and in-depth analysis for every answer of a group of
+    interviews.
+
+    Returns:
+        The output columns (see COLUMNS), one entry per answer.
+    """
+    limit = asyncio.Semaphore(concurrency)
+    jobs: List[AnalysisJob] = []
+    live: Dict[str, Tuple[str, str, Optional[float]]] = {}
+    for session in sessions:
+        try:
+            session_jobs = build_jobs(session)
+        except KeyError:
+            logger.warning(f"Skipping {session.session_id}: graph '{session.graph_id}' is not loaded.")
+            continue
+        for job, turn in zip(session_jobs, session.interview_history):
+            live[job.job_id] = (session.graph_id, turn.signal, turn.score)
+        jobs.extend(session_jobs)
+
+    async def run_triage(job: AnalysisJob) -> TriageResult:
+        async with limit:
+            return await run_triage_analysis(job.answer, job.question)
+
+    async def run_analysis(batch: List[AnalysisJob]):
+        async with limit:
+            return await analyze_jobs(batch)
+
+    batches = [jobs[i:i + ANALYSIS_BATCH_SIZE] for i in range(0, len(jobs), ANALYSIS_BATCH_SIZE)]
+    triage_task = asyncio.gather(*(run_triage(job) for job in jobs)) if triage else None
+    analysis_results = {}
+    for results in await asyncio.gather(*(run_analysis(batch) for batch in batches)):
+        analysis_results.update(results)
+    triage_results = await triage_task if triage_task is not None else [None] * len(jobs)
+
+    columns: Dict[str, list] = {name: [] for name in COLUMNS}
+    for job, triage_result in zip(jobs, triage_results):
+        graph_id, live_signal, live_score = live[job.job_id]
+        analysis = analysis_results.get(job.job_id)
+        row = {
+            "session_id": job.session_id,
+            "turn_index": job.turn_index,
+            "graph_id": graph_id,
+            "node_id": job.node_id,
+            "skill": job.skill,
+            "question": job.question,
+            "answer": job.answer,
+            "live_signal": live_signal,
+            "live_score": live_score,
+            "signal": triage_result.signal if triage_result is not None else "",
+            "confidence": triage_result.confidence if triage_result is not None else None,
+            "score": analysis.score if analysis is not None else None,
+            "analysis_text": analysis.analysis_text if analysis is not None else "",
+        }
+        for name, value in row.items():
+            columns[name].append(value)
+    return columns
+
+
+# --- Output ---
+
+def write_part(columns: Dict[str, list], output_dir: str, part: int, fmt: str) -> str:
+    """Writes one part file atomically and returns its path. Missing numbers are stored as NaN/null."""
+    path = os.path.join(output_dir, f"part-{part:05d}.{fmt}")
+    tmp_path = path + ".tmp"
+    if fmt == "parquet":
+        pyarrow.parquet.write_table(pyarrow.table(columns), tmp_path)
+    else:
+        arrays = {}
+        for name, dtype in COLUMNS.items():
+            values = columns[name]
+            if dtype is str:
+                arrays[name] = np.array(values, dtype=str)
+            else:
+                arrays[name] = np.array([np.nan if v is None else v for v in values], dtype=dtype)
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_results(output_dir: str) -> Dict[str, np.ndarray]:
+    """Loads every part of a re-scoring run as one array per column."""
+    parts = sorted(glob.glob(os.path.join(output_dir, "part-*.parquet")) +
+                   glob.glob(os.path.join(output_dir, "part-*.npz")))
+    chunks: Dict[str, List[np.ndarray]] = {name: [] for name in COLUMNS}
+    for path in parts:
+        if path.endswith(".parquet"):
+            table = pyarrow.parquet.read_table(path)
+            for name in COLUMNS:
+                chunks[name].append(table.column(name).to_numpy(zero_copy_only=False))
+        else:
+            with np.load(path) as data:
+                for name in COLUMNS:
+                    chunks[name].append(data[name])
+    return {name: np.concatenate(arrays) if arrays else np.array([]) for name, arrays in chunks.items()}
+
+
+def load_checkpoint(output_dir: str, input_path: str) -> dict:
+    path = os.path.join(output_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return {"input": os.path.abspath(input_path), "lines_done": 0, "parts": 0, "rows": 0}
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint["input"] != os.path.abspath(input_path):
+        raise ValueError(f"{output_dir} holds a run over {checkpoint['input']}; use another output directory.")
+    return checkpoint
+
+
+def save_checkpoint(output_dir: str, checkpoint: dict) -> None:
+    path = os.path.join(output_dir, CHECKPOINT_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+# --- Pipeline ---
+
+async def rescore_archive(input_path: str, output_dir: str, concurrency: int = RESCORE_CONCURRENCY,
+                          part_size: int = RESCORE_PART_SIZE, fmt: Optional[str] = None,
+                          triage: bool = True, limit: Optional[int] = None) -> dict:
+    """
+    Re-scores an interview archive part by part, resuming from the checkpoint.
+
+    Args:
+        input_path: The JSONL archive.
+        output_dir: Where the part files and the checkpoint are written.
+        concurrency: LLM calls in flight.
+        part_size: Interviews per part (and per checkpoint).
+        fmt: "parquet" or "npz" (default: parquet if pyarrow is installed).
+        triage: Also re-run the triage model.
+        limit: Stop after this many interviews in this run.
+
+    Returns:
+        The final checkpoint (lines done, parts and rows written).
+    """
+    fmt = fmt or ("parquet" if pyarrow is not None else "npz")
+    if fmt == "parquet" and pyarrow is None:
+        raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow); use --format npz.")
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = load_checkpoint(output_dir, input_path)
+    checkpoint.update({"triage_model": TRIAGE_MODEL_NAME if triage else None,
+                       "analysis_model": ANALYSIS_MODEL_NAME, "format": fmt})
+    if checkpoint["lines_done"]:
+        logger.info(f"Resuming after line {checkpoint['lines_done']} ({checkpoint['parts']} part(s) done).")
+
+    archive = read_archive(input_path, checkpoint["lines_done"])
+    processed = 0
+    try:
+        while limit is None or processed < limit:
+            take = part_size if limit is None else min(part_size, limit - processed)
+            chunk = list(itertools.islice(archive, take))
+            if not chunk:
+                break
+            start = time.perf_counter()
+            sessions = [session for _, session in chunk if session is not None]
+            columns = await rescore_part(sessions, concurrency, triage)
+            rows = len(columns["session_id"])
+            if rows:
+                write_part(columns, output_dir, checkpoint["parts"], fmt)
+                checkpoint["parts"] += 1
+            checkpoint["lines_done"] = chunk[-1][0] + 1
+            checkpoint["rows"] += rows
+            save_checkpoint(output_dir, checkpoint)
+            processed += len(chunk)
+            logger.info(f"Re-scored {len(sessions)} interview(s), {rows} answer(s) "
+                        f"in {time.perf_counter() - start:.1f}s (through line {checkpoint['lines_done']}).")
+    finally:
+        archive.close()
+        await get_llm_client().aclose()
+    return checkpoint
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Interview archive (JSONL of SessionState).")
+    parser.add_argument("output_dir", help="Directory for the result parts and the checkpoint.")
+    parser.add_argument("--concurrency", type=int, default=RESCORE_CONCURRENCY)
+    parser.add_argument("--part-size", type=int, default=RESCORE_PART_SIZE)
+    parser.add_argument("--format", choices=("parquet", "npz"))
+    parser.add_argument("--no-triage", action="store_true", help="Only re-run the in-depth analysis.")
+    parser.add_argument("--limit", type=int, help="Stop after this many interviews.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    checkpoint = asyncio.run(rescore_archive(args.input, args.output_dir, args.concurrency, args.part_size,
+                                             args.format, not args.no_triage, args.limit))
+    print(f"Done: {checkpoint['rows']} answer(s) in {checkpoint['parts']} part(s), "
+          f"{checkpoint['lines_done']} archive line(s) processed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,12 +1,123 @@
 # ai_interviewer/core_logic/response_analyzer.py
 
-import httpx
 import json
-from ai_interviewer.config import OLLAMA_API_URL, TRIAGE_MODEL_NAME, ANALYSIS_MODEL_NAME
-from ai_interviewer.models.schemas import TriageResult, SessionState
+import re
+from contextlib import aclosing
+from typing import Dict, List, Optional
+from ai_interviewer.config import (
+    TRIAGE_MODEL_NAME,
+    ANALYSIS_MODEL_NAME,
+    TRIAGE_STREAMING_ENABLED,
+    TRIAGE_STREAM_WAIT_FOR_CONFIDENCE,
+    TRIAGE_EARLY_EXIT_CONFIDENCE,
+    TRIAGE_STREAM_OPTIONS,
+)
+from ai_interviewer.core_logic.llm_client import (
+    get_llm_client,
+    LLMRequestError,
+    PRIORITY_TRIAGE,
+    PRIORITY_ANALYSIS,
+)
+from ai_interviewer.models.schemas import TriageResult, SessionState, AnalysisJob
+from ai_interviewer.core_logic.context_builder import build_analysis_context
+
+TRIAGE_SIGNALS = ("correct", "partial", "incorrect")
+
+
+class TriageStreamParser:
+    """
+    Incrementally extracts the triage fields from a JSON object that is still
+    being generated.
+
+    The signal is considered decided as soon as the partial string value can
+    only be one of TRIAGE_SIGNALS (usually after its first character), or when
+    the string is closed. The prompt asks for "confidence" before "signal", so
+    waiting for the confidence (TRIAGE_STREAM_WAIT_FOR_CONFIDENCE) does not
+    delay the early exit.
+    """
+
+    _SIGNAL_RE = re.compile(r'"signal"\s*:\s*"([^"]*)(")?')
+    _CONFIDENCE_RE = re.compile(r'"confidence"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}\s]')
+
+    def __init__(self):
+        self.text = ""
+        self.signal: Optional[str] = None
+        self.confidence: Optional[float] = None
+
+    def feed(self, token: str) -> None:
+        self.text += token
+        if self.signal is None:
+            match = self._SIGNAL_RE.search(self.text)
+            if match:
+                value = match.group(1).strip().lower()
+                candidates = [s for s in TRIAGE_SIGNALS if s.startswith(value)] if value else []
+                if match.group(2):
+                    self.signal = value
+                elif len(candidates) == 1:
+                    self.signal = candidates[0]
+        if self.confidence is None:
+            match = self._CONFIDENCE_RE.search(self.text)
+            if match:
+                self.confidence = float(match.group(1))
+
+    @property
+    def decided(self) -> bool:
+        if self.signal is None:
+            return False
+        return self.confidence is not None or not TRIAGE_STREAM_WAIT_FOR_CONFIDENCE
+
+
+async def run_streaming_triage_analysis(transcribed_text: str, question: str,
+                                        model: str = TRIAGE_MODEL_NAME) -> TriageResult:
+    """
+    Triage variant that streams the model's output and stops the generation as
+    soon as the signal is decided.
+
+    - Method: A short, constrained prompt that puts "confidence" first and
+              "signal" last, parsed token by token with TriageStreamParser, so
+              generation stops right after the signal's first characters.
+    - Input: The candidate's transcribed answer, the question asked and the
+             triage model to use.
+    - Output: A TriageResult (signal "error" on failure).
+    """
+    prompt = (
+        f"Question: {question}\n"
+        f"Candidate answer: {transcribed_text}\n"
+        'Grade the answer. Reply with JSON only, in exactly this key order: '
+        '{"confidence": 0.0-1.0, "signal": "correct" | "partial" | "incorrect"}'
+    )
+    parser = TriageStreamParser()
+
+    try:
+        stream = get_llm_client().stream_generate(
+            model, prompt, priority=PRIORITY_TRIAGE, options=TRIAGE_STREAM_OPTIONS
+        )
+        # Leaving the `aclosing` block closes the HTTP stream, cancelling the
+        # rest of the generation on the server.
+        async with aclosing(stream):
+            async for token in stream:
+                parser.feed(token)
+                if parser.decided:
+                    break
+
+        if parser.signal is None:
+            # The stream ended without a recognizable signal; try the full text.
+            response_data = json.loads(parser.text or '{}')
+            return TriageResult(
+                signal=response_data.get("signal", "error"),
+                confidence=response_data.get("confidence", 0.0)
+            )
+        confidence = parser.confidence if parser.confidence is not None else TRIAGE_EARLY_EXIT_CONFIDENCE
+        return TriageResult(signal=parser.signal, confidence=confidence)
+    except (LLMRequestError, json.JSONDecodeError, KeyError, AttributeError) as e:
+        return TriageResult(signal="error", confidence=0.0)
+
+
+async def run_triage_analysis(transcribed_text: str, question: str,
+                              model: str = TRIAGE_MODEL_NAME) -> TriageResult:
+    if TRIAGE_STREAMING_ENABLED:
+        return await run_streaming_triage_analysis(transcribed_text, question, model)
 
-async def run_triage_analysis(transcribed_text: str, question: str) -> TriageResult:
-    # ... (function content remains the same)
     prompt = f"""
     You are an AI technical interviewer. A candidate was asked the following question:
     '{question}'
@@ -15,35 +126,27 @@ async def run_triage_analysis(transcribed_text: str, question: str) -> TriageRes
     Analyze the response. Is it correct, incorrect, or partially correct?
     Respond ONLY with a JSON object with two keys: 'signal' (string: "correct", "incorrect", or "partial") and 'confidence' (float: 0.0 to 1.0).
     """
-    payload = {
-        "model": TRIAGE_MODEL_NAME,
-        "prompt": prompt,
-        "stream": False,
-        "format": "json"
-    }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(OLLAMA_API_URL, json=payload, timeout=10.0)
-            response.raise_for_status()
-            
-        response_data = json.loads(response.json().get('response', '{}'))
+        response_text = await get_llm_client().generate(
+            model, prompt, priority=PRIORITY_TRIAGE
+        )
+        response_data = json.loads(response_text or '{}')
         
         return TriageResult(
             signal=response_data.get("signal", "error"),
             confidence=response_data.get("confidence", 0.0)
         )
-    except (httpx.RequestError, json.JSONDecodeError, KeyError) as e:
+    except (LLMRequestError, json.JSONDecodeError, KeyError, AttributeError) as e:
         return TriageResult(signal="error", confidence=0.0)
 
 
-async def run_in_depth_analysis(session: SessionState, question: str, transcribed_text: str):
-    # ... (function content remains the same)
-    prompt = f"""
+def _build_analysis_prompt(context: str, question: str, transcribed_text: str) -> str:
+    return f"""
     You are an expert AI technical evaluator. Your task is to provide a detailed analysis
     of a candidate's answer during an interview.
     
-    Interview Context (History): {session.interview_history}
+    Interview Context (History): {context}
     Question Asked: '{question}'
     Candidate's Answer: '{transcribed_text}'
 
@@ -56,16 +159,80 @@ async def run_in_depth_analysis(session: SessionState, question: str, transcribe
 
     Respond ONLY with a JSON object containing keys: "analysis_text", "score".
     """
-    payload = {
-        "model": ANALYSIS_MODEL_NAME,
-        "prompt": prompt,
-        "stream": False,
-        "format": "json"
-    }
+
+
+def _build_batch_analysis_prompt(jobs: List[AnalysisJob]) -> str:
+    answers = "\n".join(
+        f"""
+    [{job.job_id}]
+    Interview Context (History): {job.context}
+    Question Asked: '{job.question}'
+    Candidate's Answer: '{job.answer}'
+    """
+        for job in jobs
+    )
+    return f"""
+    You are an expert AI technical evaluator. Analyse each of the following
+    interview answers independently. Each answer is labelled with an id in brackets.
+    {answers}
+    For each answer consider correctness, completeness, clarity and confidence,
+    and give a numerical score from 1 to 10.
+
+    Respond ONLY with a JSON object of the form
+    {{"results": [{{"id": "<id>", "analysis_text": "...", "score": <1-10>}}, ...]}}
+    containing one entry per answer.
+    """
+
+
+async def run_in_depth_analysis(session: SessionState, question: str, transcribed_text: str) -> Optional[dict]:
+    """
+    Runs the detailed analysis of a single answer.
+
+    - Input: The session (for context), the question and the transcribed answer.
+    - Output: A dict with "analysis_text" and "score", or None on failure.
+    """
+    prompt = _build_analysis_prompt(build_analysis_context(session), question, transcribed_text)
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(OLLAMA_API_URL, json=payload, timeout=60.0)
-            response.raise_for_status()
-    except (httpx.RequestError, json.JSONDecodeError) as e:
+        response_text = await get_llm_client().generate(ANALYSIS_MODEL_NAME, prompt, priority=PRIORITY_ANALYSIS)
+        return json.loads(response_text or '{}')
+    except (LLMRequestError, json.JSONDecodeError) as e:
         print(f"In-depth analysis failed for session {session.session_id}: {e}")
+        return None
+
+
+async def run_batch_in_depth_analysis(jobs: List[AnalysisJob]) -> Dict[str, dict]:
+    """
+    Analyses several answers with a single call to the analysis model.
+
+    - Method: One prompt containing every answer, each labelled with its job id.
+              A single job uses the regular single-answer prompt.
+    - Input: The jobs to analyse.
+    - Output: A mapping from job id to {"analysis_text", "score"} for every job
+              the model answered; missing ids should be retried individually.
+    """
+    if len(jobs) == 1:
+        job = jobs[0]
+        prompt = _build_analysis_prompt(job.context, job.question, job.answer)
+    else:
+        prompt = _build_batch_analysis_prompt(jobs)
+
+    try:
+        response_text = await get_llm_client().generate(ANALYSIS_MODEL_NAME, prompt, priority=PRIORITY_ANALYSIS)
+        response_data = json.loads(response_text or '{}')
+    except (LLMRequestError, json.JSONDecodeError) as e:
+        print(f"In-depth analysis failed for {len(jobs)} job(s): {e}")
+        return {}
+    if not isinstance(response_data, dict):
+        print(f"In-depth analysis of {len(jobs)} job(s) returned JSON that is not an object.")
+        return {}
+
+    if len(jobs) == 1:
+        return {jobs[0].job_id: response_data} if "score" in response_data else {}
+
+    results = {}
+    entries = response_data.get("results")
+    for entry in entries if isinstance(entries, list) else []:
+        if isinstance(entry, dict) and "id" in entry and "score" in entry:
+            results[str(entry["id"])] = entry
+    return results
@@ -3,55 +3,61 @@
 """
 Manages the lifecycle of interview sessions.
 
-This module provides a simple, thread-safe, in-memory storage solution for
-managing active interview sessions. It is responsible for creating, retrieving,
-and cleaning up SessionState objects, ensuring that each WebSocket connection
-is associated with a unique and persistent state.
+This module is the interface the rest of the application uses to create,
+retrieve, persist and clean up SessionState objects, ensuring that each
+WebSocket connection is associated with a unique and persistent state. The
+storage itself (sharded in-memory sessions, idle eviction and the persistence
+backend) lives in session_store.py.
 """
 
+import asyncio
+import os
 import threading
-from typing import Dict, Optional
+from typing import Optional
 
+from ai_interviewer.config import DEFAULT_GRAPH_ID, INTERVIEW_ARCHIVE_PATH
 from ai_interviewer.models.schemas import SessionState
-from ai_interviewer.core_logic.question_engine import mock_knowledge_graph # To get the start node
+from ai_interviewer.core_logic.session_store import get_session_store
+from ai_interviewer.knowledge_graph.graph_loader import get_graph_registry # To get the start node
 
-# --- In-Memory Session Storage ---
 
-# A private dictionary to store active sessions, mapping session_id to a SessionState object.
-# This is suitable for a single-instance deployment. For a multi-instance or
-# production environment, this should be replaced with a distributed cache like Redis.
-_sessions: Dict[str, SessionState] = {}
-
-# A threading.Lock to ensure that concurrent access to the _sessions dictionary
-# is handled safely, preventing race conditions.
-_session_lock = threading.Lock()
-
-
-def get_or_create_session(session_id: str) -> SessionState:
+def get_or_create_session(session_id: str, graph_id: str = DEFAULT_GRAPH_ID) -> SessionState:
     """
     Retrieves an existing session or creates a new one if it doesn't exist.
 
     This is the primary function used by the WebSocket endpoint to manage session state.
-    It ensures that every connection has a valid state object.
+    It ensures that every connection has a valid state object. A session that is no
+    longer in memory (after a reconnect, or on another worker) is resumed from the
+    persistence backend. The session is held until `release_session` is called.
 
     Args:
         session_id: The unique identifier for the interview session.
+        graph_id: The knowledge graph a new session is interviewed on.
 
     Returns:
         The existing or newly created SessionState object.
+
+    Raises:
+        KeyError: If `graph_id` is not a loaded knowledge graph.
     """
-    with _session_lock:
-        if session_id not in _sessions:
-            print(f"Creating new session for session_id: {session_id}")
-            # Create a new session state, starting at the graph's designated start_node
-            _sessions[session_id] = SessionState(
-                session_id=session_id,
-                current_node_id=mock_knowledge_graph.get("start_node", "end_node")
-            )
-        else:
-            print(f"Retrieving existing session for session_id: {session_id}")
-        
-        return _sessions[session_id]
+    def create() -> SessionState:
+        print(f"Creating new session for session_id: {session_id}")
+        # Create a new session state, starting at the graph's designated start_node
+        # and pinned to the graph version that is current right now.
+        graph = get_graph_registry().get(graph_id)
+        return SessionState(
+            session_id=session_id,
+            current_node_id=graph.start_node.node_id,
+            graph_id=graph.graph_id,
+            graph_version=graph.version,
+        )
+
+    return get_session_store().acquire(session_id, create)
+
+
+async def get_or_create_session_async(session_id: str, graph_id: str = DEFAULT_GRAPH_ID) -> SessionState:
+    """Like `get_or_create_session`, but runs the backend lookup in a thread."""
+    return await asyncio.to_thread(get_or_create_session, session_id, graph_id)
 
 
 def get_session(session_id: str) -> Optional[SessionState]:
@@ -64,23 +70,90 @@ def get_session(session_id: str) -> Optional[SessionState]:
     Returns:
         The SessionState object if found, otherwise None.
     """
-    with _session_lock:
-        return _sessions.get(session_id)
+    return get_session_store().get(session_id)
 
 
-def remove_session(session_id: str) -> None:
+async def get_session_async(session_id: str) -> Optional[SessionState]:
+    """Like `get_session`, but runs the backend lookup in a thread."""
+    return await asyncio.to_thread(get_session_store().get, session_id)
+
+
+def save_session(session: SessionState) -> None:
+    """
+    Persists the current state of a session, so it can be resumed elsewhere.
+
+    Args:
+        session: The session to write to the persistence backend.
+    """
+    get_session_store().save(session)
+
+
+async def save_session_async(session: SessionState) -> None:
+    """
+    Like `save_session`, but serializes on the event loop (where the session is
+    mutated) and runs the blocking backend write in a thread.
+    """
+    data = session.model_dump_json()
+    await asyncio.to_thread(get_session_store().save, session, data)
+
+
+def release_session(session_id: str) -> None:
     """
-    Removes a session from the in-memory store after it has concluded.
+    Marks a session as no longer used by a connection, e.g. after a disconnect.
 
-    This is a cleanup utility to prevent the session store from growing indefinitely.
+    The session is persisted and stays resumable; it is evicted from memory once
+    it has been idle for SESSION_IDLE_TTL_SECONDS.
+
+    Args:
+        session_id: The unique identifier for the session.
+    """
+    get_session_store().release(session_id)
+
+
+async def release_session_async(session: SessionState) -> None:
+    """
+    Like `release_session`, but serializes on the event loop and runs the
+    blocking backend write in a thread, as `save_session_async` does.
+    """
+    data = session.model_dump_json()
+    await asyncio.to_thread(get_session_store().release, session.session_id, data)
+
+
+def remove_session(session_id: str) -> None:
+    """
+    Removes a session after it has concluded, from memory and from the backend.
 
     Args:
         session_id: The unique identifier for the session to be removed.
     """
-    with _session_lock:
-        if session_id in _sessions:
-            print(f"Removing session {session_id} from memory.")
-            del _sessions[session_id]
-        else:
-            print(f"Attempted to remove non-existent session: {session_id}")
+    if get_session_store().remove(session_id):
+        print(f"Removing session {session_id} from memory.")
+    else:
+        print(f"Attempted to remove non-existent session: {session_id}")
+
+
+async def remove_session_async(session_id: str) -> None:
+    """Like `remove_session`, but runs the backend delete in a thread."""
+    await asyncio.to_thread(remove_session, session_id)
+
+
+_archive_lock = threading.Lock()
+
+
+def archive_session(session: SessionState, data: Optional[str] = None) -> None:
+    """
+    Appends a finished interview to the archive (INTERVIEW_ARCHIVE_PATH), the
+    input of the offline re-scoring pipeline.
 
+    Args:
+        session: The concluded session.
+        data: The session already serialized to JSON, when the caller did that
+            on the event loop and only the file write runs in a thread.
+    """
+    if not INTERVIEW_ARCHIVE_PATH:
+        return
+    line = (data if data is not None else session.model_dump_json()) + "\n"
+    with _archive_lock:
+        os.makedirs(os.path.dirname(INTERVIEW_ARCHIVE_PATH) or ".", exist_ok=True)
+        with open(INTERVIEW_ARCHIVE_PATH, "a", encoding="utf-8") as f:
+            f.write(line)
@@ -0,0 +1,437 @@
+# ai_interviewer/core_logic/session_store.py
+
+"""
+The session store: sharded in-memory sessions with idle eviction and a
+pluggable persistence backend.
+
+Sessions are spread over SESSION_STORE_SHARDS shards by session id, each with
+its own lock, so concurrent connections rarely contend on the same lock. Every
+entry tracks its last access time, an approximate size in bytes and how many
+connections currently hold it. A background reaper evicts sessions that no
+connection holds once they have been idle for SESSION_IDLE_TTL_SECONDS, and
+evicts the least recently used idle sessions early when the memory budget is
+exceeded.
+
+Sessions are serialized as JSON and written through to a backend:
+
+- SQLiteSessionBackend: a local database file shared by all workers on a machine.
+- RedisSessionBackend: any client with the redis-py `get`/`set(ex=)`/`delete`
+  interface, e.g. `redis.Redis` or the local `utils.mock_redis.MockRedis`.
+
+A session that is not in memory is loaded from the backend, so a candidate
+can reconnect to a different worker and resume the interview. Backend I/O and
+(de)serialization never happen under a shard lock, and the store's methods are
+blocking: async callers go through the `*_async` wrappers in session_manager.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from ai_interviewer.config import (
+    SESSION_STORE_SHARDS,
+    SESSION_BACKEND,
+    SESSION_DB_PATH,
+    SESSION_REDIS_URL,
+    SESSION_IDLE_TTL_SECONDS,
+    SESSION_PERSIST_TTL_SECONDS,
+    SESSION_REAPER_INTERVAL_SECONDS,
+    SESSION_MEMORY_LIMIT_BYTES,
+)
+from ai_interviewer.models.schemas import SessionState
+
+try:
+    import redis
+except ImportError:  # Only needed for SESSION_BACKEND = "redis".
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+# --- Persistence Backends ---
+
+class SessionBackend(ABC):
+    """
+    Durable storage of serialized sessions. Methods are blocking.
+
+    `shared` is False for backends only this process can write to; sessions
+    cached in memory are then never stale and are not reloaded.
+    """
+
+    shared = True
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[str]:
+        """Returns the stored JSON of a session, or None if absent or expired."""
+
+    @abstractmethod
+    def save(self, session_id: str, data: str, ttl_seconds: float) -> None:
+        """Stores the JSON of a session, expiring it after `ttl_seconds`."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+    def purge_expired(self) -> int:
+        """Deletes expired sessions, for backends without native expiry."""
+        return 0
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Sessions in a local SQLite file, safe to share between worker processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            # WAL makes a commit an append to the log; NORMAL skips the fsync per write.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def load(self, session_id: str) -> Optional[str]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ? AND expires_at > ?",
+                (session_id, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, session_id: str, data: str, ttl_seconds: float) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, data, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+                (session_id, data, time.time() + ttl_seconds),
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def purge_expired(self) -> int:
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+class RedisSessionBackend(SessionBackend):
+    """Sessions in Redis (or anything with the same client interface), with native expiry."""
+
+    def __init__(self, client, key_prefix: str = "ai_interviewer:session:", shared: bool = True):
+        self.client = client
+        self.key_prefix = key_prefix
+        self.shared = shared
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisSessionBackend":
+        if redis is None:
+            raise RuntimeError("SESSION_BACKEND = 'redis' requires the redis package (pip install redis).")
+        return cls(redis.Redis.from_url(url))
+
+    def load(self, session_id: str) -> Optional[str]:
+        data = self.client.get(self.key_prefix + session_id)
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        return data
+
+    def save(self, session_id: str, data: str, ttl_seconds: float) -> None:
+        self.client.set(self.key_prefix + session_id, data, ex=int(ttl_seconds))
+
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self.key_prefix + session_id)
+
+
+def create_session_backend(kind: str = SESSION_BACKEND) -> Optional[SessionBackend]:
+    """Builds the configured backend, or returns None for "none"."""
+    if kind == "sqlite":
+        return SQLiteSessionBackend(SESSION_DB_PATH)
+    if kind == "redis":
+        return RedisSessionBackend.from_url(SESSION_REDIS_URL)
+    if kind == "memory":
+        from ai_interviewer.utils.mock_redis import MockRedis
+        return RedisSessionBackend(MockRedis(), shared=False)
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown SESSION_BACKEND: {kind!r}")
+
+
+# --- In-Memory Shards ---
+
+class _Entry:
+    __slots__ = ("state", "last_access", "size", "holders", "digest")
+
+    def __init__(self, state: SessionState, size: int, digest: Optional[int] = None):
+        self.state = state
+        self.last_access = time.monotonic()
+        self.size = size
+        self.holders = 0
+        # hash() of the JSON last read from or written to the backend.
+        self.digest = digest
+
+
+class _Shard:
+    __slots__ = ("entries", "lock")
+
+    def __init__(self):
+        self.entries: Dict[str, _Entry] = {}
+        self.lock = threading.Lock()
+
+
+class SessionStore:
+    """
+    Sharded, lock-striped in-memory sessions backed by a persistence backend.
+
+    A connection `acquire`s its session for as long as it is open and
+    `release`s it afterwards; held sessions are never evicted, so the state
+    object a connection works on is always the one other components see.
+    """
+
+    def __init__(self, backend: Optional[SessionBackend] = None, shards: int = SESSION_STORE_SHARDS):
+        self.backend = backend
+        self._shards = [_Shard() for _ in range(shards)]
+        self._reaper: Optional[asyncio.Task] = None
+        self.evictions = 0
+        self.resumed = 0
+
+    def _shard(self, session_id: str) -> _Shard:
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def _fetch(self, session_id: str) -> Optional[str]:
+        if self.backend is None:
+            return None
+        try:
+            return self.backend.load(session_id)
+        except Exception as e:
+            logger.error(f"Could not load session {session_id} from the backend: {e}")
+            return None
+
+    def _touch(self, entry: _Entry, hold: bool) -> SessionState:
+        entry.last_access = time.monotonic()
+        if hold:
+            entry.holders += 1
+        return entry.state
+
+    def _lookup(self, session_id: str, factory: Optional[Callable[[], SessionState]], hold: bool) -> Optional[SessionState]:
+        shard = self._shard(session_id)
+        with shard.lock:
+            entry = shard.entries.get(session_id)
+            # A connection taking over an idle session on a shared backend may
+            # find that the candidate continued on another worker since this
+            # copy was cached; everything else is served from memory.
+            recheck = hold and self.backend is not None and self.backend.shared
+            if entry is not None and not (recheck and entry.holders == 0):
+                return self._touch(entry, hold)
+
+        # Backend I/O and parsing happen outside the shard lock, so a slow
+        # backend does not stall the other sessions of the shard.
+        data = self._fetch(session_id)
+        digest = hash(data) if data is not None else None
+        state, size, resumed = None, 0, False
+        if data is not None and (entry is None or digest != entry.digest):
+            state, size, resumed = SessionState.model_validate_json(data), len(data), True
+        elif entry is not None:
+            state, size, digest = entry.state, entry.size, entry.digest
+        elif factory is not None:
+            state = factory()
+            size = len(state.model_dump_json())
+
+        with shard.lock:
+            current = shard.entries.get(session_id)
+            if current is not None and (current is not entry or current.holders):
+                # Another connection loaded, created or took the session in the
+                # meantime; there must only ever be one state object per id.
+                return self._touch(current, hold)
+            if state is None:
+                return None
+            if resumed:
+                self.resumed += 1
+            if current is None:
+                current = shard.entries[session_id] = _Entry(state, size, digest)
+            else:
+                current.state, current.size, current.digest = state, size, digest
+            return self._touch(current, hold)
+
+    def acquire(self, session_id: str, factory: Callable[[], SessionState]) -> SessionState:
+        """
+        Returns the session from memory, the backend, or `factory`, and marks
+        it as held by a connection. An idle in-memory copy is reloaded only if
+        the backend is shared and holds a different version of it.
+        """
+        return self._lookup(session_id, factory, hold=True)
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        """Returns the session from memory or the backend, without holding it."""
+        return self._lookup(session_id, None, hold=False)
+
+    def save(self, state: SessionState, data: Optional[str] = None) -> None:
+        """
+        Writes a session through to the backend and refreshes its size.
+        `data` is the session's JSON, when the caller has already serialized it.
+        """
+        if data is None:
+            data = state.model_dump_json()
+        shard = self._shard(state.session_id)
+        with shard.lock:
+            entry = shard.entries.get(state.session_id)
+            if entry is not None:
+                entry.size = len(data)
+                entry.digest = hash(data)
+                entry.last_access = time.monotonic()
+        self._persist(state.session_id, data)
+
+    def _persist(self, session_id: str, data: str) -> None:
+        if self.backend is None:
+            return
+        try:
+            self.backend.save(session_id, data, SESSION_PERSIST_TTL_SECONDS)
+        except Exception as e:
+            logger.error(f"Could not persist session {session_id}: {e}")
+
+    def release(self, session_id: str, data: Optional[str] = None) -> None:
+        """
+        Marks a session as no longer held by a connection and persists it.
+        `data` is the session's JSON, when the caller has already serialized it.
+        """
+        shard = self._shard(session_id)
+        with shard.lock:
+            entry = shard.entries.get(session_id)
+            if entry is None:
+                return
+            entry.holders = max(0, entry.holders - 1)
+            entry.last_access = time.monotonic()
+            state = entry.state
+        self.save(state, data)
+
+    def remove(self, session_id: str) -> bool:
+        """Deletes a session from memory and from the backend."""
+        shard = self._shard(session_id)
+        with shard.lock:
+            removed = shard.entries.pop(session_id, None) is not None
+        if self.backend is not None:
+            try:
+                self.backend.delete(session_id)
+            except Exception as e:
+                logger.error(f"Could not delete session {session_id} from the backend: {e}")
+        return removed
+
+    def reap(self) -> int:
+        """
+        Evicts idle sessions nobody holds, then the least recently used idle
+        sessions while memory use is over budget. Evicted sessions are
+        persisted first, so they can still be resumed.
+
+        Returns:
+            The number of sessions evicted.
+        """
+        now = time.monotonic()
+        evicted: List[SessionState] = []
+        candidates = []
+        total_bytes = 0
+        for shard in self._shards:
+            with shard.lock:
+                for session_id, entry in list(shard.entries.items()):
+                    if entry.holders == 0 and now - entry.last_access >= SESSION_IDLE_TTL_SECONDS:
+                        evicted.append(shard.entries.pop(session_id).state)
+                        continue
+                    total_bytes += entry.size
+                    if entry.holders == 0:
+                        candidates.append((entry.last_access, session_id, entry.size))
+
+        if total_bytes > SESSION_MEMORY_LIMIT_BYTES:
+            for _, session_id, size in sorted(candidates):
+                shard = self._shard(session_id)
+                with shard.lock:
+                    entry = shard.entries.get(session_id)
+                    if entry is None or entry.holders:
+                        continue
+                    evicted.append(shard.entries.pop(session_id).state)
+                total_bytes -= size
+                if total_bytes <= SESSION_MEMORY_LIMIT_BYTES:
+                    break
+
+        for state in evicted:
+            self._persist(state.session_id, state.model_dump_json())
+        if self.backend is not None:
+            self.backend.purge_expired()
+        self.evictions += len(evicted)
+        return len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of sessions in memory, their approximate size and counters."""
+        sessions = held = size = 0
+        for shard in self._shards:
+            with shard.lock:
+                sessions += len(shard.entries)
+                held += sum(1 for e in shard.entries.values() if e.holders)
+                size += sum(e.size for e in shard.entries.values())
+        return {
+            "sessions": sessions,
+            "held": held,
+            "memory_bytes": size,
+            "evictions": self.evictions,
+            "resumed": self.resumed,
+        }
+
+    # --- Background Reaper ---
+
+    async def _reap_forever(self) -> None:
+        while True:
+            await asyncio.sleep(SESSION_REAPER_INTERVAL_SECONDS)
+            try:
+                evicted = await asyncio.to_thread(self.reap)
+                if evicted:
+                    logger.info(f"Session reaper evicted {evicted} session(s); {self.stats()}")
+            except Exception as e:
+                logger.error(f"Session reaper failed: {e}")
+
+    async def start(self) -> None:
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def stop(self) -> None:
+        """Stops the reaper and persists every in-memory session."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for shard in self._shards:
+            with shard.lock:
+                states = [entry.state for entry in shard.entries.values()]
+            for state in states:
+                await asyncio.to_thread(self._persist, state.session_id, state.model_dump_json())
+
+
+# --- Shared Store ---
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Returns the process-wide session store, creating it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore(create_session_backend())
+        return _store
@@ -0,0 +1,114 @@
+# ai_interviewer/core_logic/speculative_prefetch.py
+
+"""
+Speculative synthesis of the next question.
+
+While the candidate is answering, the next question is already constrained to
+the handful of nodes reachable through the current node's transitions. As soon
+as a question is asked, the audio for every reachable node is rendered in the
+background (or fetched from the speech cache). When triage settles, the audio
+for the chosen node is usually ready, so TTS is no longer on the critical path
+between the end of the answer and the next question. The other renders are
+cancelled. While the server is degraded (see `admission.is_degraded`), only
+audio that is already in the speech cache is prefetched.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from ai_interviewer.config import TTS_SAMPLE_RATE
+from ai_interviewer.audio_processing.text_to_speech import synthesize_speech_stream
+from ai_interviewer.audio_processing.tts_cache import CachedAudio, get_tts_cache
+from ai_interviewer.core_logic.admission import is_degraded
+from ai_interviewer.core_logic.inference_executor import ExecutorSaturatedError
+from ai_interviewer.core_logic.question_engine import get_reachable_nodes
+from ai_interviewer.models.schemas import SessionState
+
+logger = logging.getLogger(__name__)
+
+
+async def render_question_audio(text: str, synthesize: bool = True) -> Optional[CachedAudio]:
+    """
+    Returns the audio for `text`, synthesizing and caching it if necessary.
+
+    Args:
+        text: The question text.
+        synthesize: If False, only the speech cache is consulted.
+
+    Returns:
+        The audio, or None if it is not cached and was not synthesized, the
+        TTS lane is near capacity or synthesis failed.
+    """
+    cache = get_tts_cache()
+    cached = await asyncio.to_thread(cache.get, text)
+    if cached is not None or not synthesize:
+        return cached
+
+    chunks = []
+    sample_rate = TTS_SAMPLE_RATE
+    try:
+        # Background work waits behind every live synthesis, may use only a
+        # reserved share of the TTS slots and is refused once the lane is
+        # near capacity, so it never delays or pushes out live synthesis.
+        async for pcm, sample_rate in synthesize_speech_stream(text, background=True):
+            chunks.append(pcm)
+    except ExecutorSaturatedError:
+        return None
+    if not chunks:
+        return None
+    return await asyncio.to_thread(cache.put, text, b"".join(chunks), sample_rate)
+
+
+class SpeculativePrefetcher:
+    """
+    Per-session speculative renders of every possible next question.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def prefetch(self, state: SessionState) -> None:
+        """
+        Starts rendering the audio of every node reachable from the session's
+        current node. Renders from a previous question are cancelled.
+        """
+        self.cancel()
+        synthesize = not is_degraded()
+        for node in get_reachable_nodes(state):
+            self._tasks[node.node_id] = asyncio.create_task(self._render(node.question_text, synthesize))
+
+    async def _render(self, text: str, synthesize: bool) -> Optional[CachedAudio]:
+        try:
+            return await render_question_audio(text, synthesize)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Speculative synthesis failed for {self.session_id}: {e}")
+            return None
+
+    async def take(self, node_id: str) -> Optional[CachedAudio]:
+        """
+        Hands over the audio for the node triage selected, waiting for its
+        render if it is still running, and cancels every other render.
+
+        Returns:
+            The audio, or None if `node_id` was not prefetched or rendering failed.
+        """
+        task = self._tasks.pop(node_id, None)
+        self.cancel()
+        audio = await task if task is not None else None
+        if audio is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return audio
+
+    def cancel(self) -> None:
+        """Cancels every outstanding speculative render."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
@@ -0,0 +1,300 @@
+# ai_interviewer/core_logic/triage_cache.py
+
+"""
+A semantic cache in front of the triage LLM.
+
+Many candidates give nearly the same answer to the same question. Each answer
+is embedded and compared with answers previously triaged for the same node; if
+a stored answer is similar enough and was triaged with high confidence, its
+TriageResult is reused and the LLM call is skipped. Otherwise the LLM triages
+the answer and the result is added to the node's index.
+
+Indexes are keyed on (graph id, graph version, node id): node ids repeat across
+role graphs, and a reloaded graph may change a node's question. The indexes
+share a memory budget (TRIAGE_CACHE_MAX_BYTES); the least recently used ones,
+typically those of retired graph versions, are evicted first.
+
+The vector index is pluggable: `BruteForceIndex` (an exact NumPy dot-product
+search) is the default, and any class implementing `VectorIndex` (for example
+an ANN library wrapper) can be passed as the index factory.
+
+A small fraction of hits is re-triaged by the LLM in the background to measure
+how often the cache disagrees with a fresh triage (accuracy drift).
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ai_interviewer.config import (
+    EMBEDDING_MODEL_NAME,
+    TRIAGE_MODEL_NAME,
+    TRIAGE_CACHE_ENABLED,
+    TRIAGE_CACHE_SIMILARITY_THRESHOLD,
+    TRIAGE_CACHE_MIN_CONFIDENCE,
+    TRIAGE_CACHE_MAX_ENTRIES_PER_NODE,
+    TRIAGE_CACHE_MAX_BYTES,
+    TRIAGE_CACHE_AUDIT_RATE,
+)
+from ai_interviewer.core_logic.admission import is_degraded, triage_model
+from ai_interviewer.core_logic.llm_client import get_llm_client, LLMRequestError, PRIORITY_TRIAGE
+from ai_interviewer.core_logic.response_analyzer import run_triage_analysis, TRIAGE_SIGNALS
+from ai_interviewer.models.schemas import TriageResult
+
+logger = logging.getLogger(__name__)
+
+# Log a stats line every this many lookups.
+_STATS_LOG_INTERVAL = 100
+
+# Identifies one question: (graph id, graph version, node id).
+NodeKey = Tuple[str, str, str]
+
+
+class VectorIndex(ABC):
+    """Interface for a nearest-neighbour index over unit-length vectors."""
+
+    @abstractmethod
+    def add(self, vector: np.ndarray) -> int:
+        """Adds a vector and returns its integer id (ids are dense, starting at 0)."""
+
+    @abstractmethod
+    def search(self, vector: np.ndarray, k: int = 1) -> List[Tuple[float, int]]:
+        """Returns up to `k` (cosine similarity, id) pairs, most similar first."""
+
+    @property
+    @abstractmethod
+    def nbytes(self) -> int:
+        """The memory the index holds, in bytes."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class BruteForceIndex(VectorIndex):
+    """
+    Exact search with one matrix-vector product over a preallocated matrix that
+    doubles in size as it fills up.
+    """
+
+    def __init__(self, dim: int, initial_capacity: int = 64):
+        self._matrix = np.zeros((initial_capacity, dim), dtype=np.float32)
+        self._size = 0
+
+    def add(self, vector: np.ndarray) -> int:
+        if self._size == len(self._matrix):
+            grown = np.zeros((len(self._matrix) * 2, self._matrix.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._matrix
+            self._matrix = grown
+        self._matrix[self._size] = vector
+        self._size += 1
+        return self._size - 1
+
+    def search(self, vector: np.ndarray, k: int = 1) -> List[Tuple[float, int]]:
+        if self._size == 0:
+            return []
+        scores = self._matrix[:self._size] @ vector
+        k = min(k, self._size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), int(i)) for i in top]
+
+    @property
+    def nbytes(self) -> int:
+        return self._matrix.nbytes
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def _normalize(embedding: List[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class SemanticTriageCache:
+    """
+    Per-node answer indexes with their triage results, plus hit-rate,
+    latency-saved and drift statistics.
+
+    Args:
+        index_factory: Builds an empty index for vectors of the given dimension.
+        max_bytes: Memory budget of all indexes together; least recently used
+            indexes are evicted beyond it.
+    """
+
+    def __init__(self, index_factory: Callable[[int], VectorIndex] = BruteForceIndex,
+                 max_bytes: int = TRIAGE_CACHE_MAX_BYTES):
+        self._index_factory = index_factory
+        self.max_bytes = max_bytes
+        # Least recently used first.
+        self._indexes: "OrderedDict[NodeKey, VectorIndex]" = OrderedDict()
+        self._results: Dict[NodeKey, List[TriageResult]] = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.lookups = 0
+        self.hits = 0
+        self.audits = 0
+        self.audit_disagreements = 0
+        self.seconds_saved = 0.0
+        self._avg_llm_latency = 0.0
+
+    def lookup(self, key: NodeKey, vector: np.ndarray) -> Optional[Tuple[TriageResult, float]]:
+        """
+        Finds the closest cached answer for a node.
+
+        Returns:
+            (TriageResult, similarity) if the best match clears the similarity
+            threshold, otherwise None.
+        """
+        with self._lock:
+            self.lookups += 1
+            index = self._indexes.get(key)
+            if index is None:
+                return None
+            self._indexes.move_to_end(key)
+            matches = index.search(vector, k=1)
+            if not matches or matches[0][0] < TRIAGE_CACHE_SIMILARITY_THRESHOLD:
+                return None
+            similarity, entry_id = matches[0]
+            self.hits += 1
+            return self._results[key][entry_id], similarity
+
+    def add(self, key: NodeKey, vector: np.ndarray, triage: TriageResult) -> bool:
+        """
+        Stores a triage result if it is confident and the node has room.
+        Least recently used indexes of other nodes are evicted while the
+        memory budget is exceeded.
+
+        Returns:
+            True if the result was stored.
+        """
+        if triage.signal not in TRIAGE_SIGNALS or triage.confidence < TRIAGE_CACHE_MIN_CONFIDENCE:
+            return False
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = self._index_factory(len(vector))
+                self._results[key] = []
+                self._nbytes += index.nbytes
+            self._indexes.move_to_end(key)
+            if len(index) >= TRIAGE_CACHE_MAX_ENTRIES_PER_NODE:
+                return False
+            before = index.nbytes
+            index.add(vector)
+            self._results[key].append(triage)
+            self._nbytes += index.nbytes - before
+            while self._nbytes > self.max_bytes and len(self._indexes) > 1:
+                evicted_key, evicted = self._indexes.popitem(last=False)
+                del self._results[evicted_key]
+                self._nbytes -= evicted.nbytes
+                self.evictions += 1
+            return True
+
+    def record_llm_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._avg_llm_latency = (seconds if self._avg_llm_latency == 0.0
+                                     else 0.9 * self._avg_llm_latency + 0.1 * seconds)
+
+    def record_hit_latency(self, seconds: float) -> None:
+        with self._lock:
+            self.seconds_saved += max(0.0, self._avg_llm_latency - seconds)
+
+    def record_audit(self, cached: TriageResult, fresh: TriageResult) -> None:
+        with self._lock:
+            self.audits += 1
+            if cached.signal != fresh.signal:
+                self.audit_disagreements += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Returns hit rate, latency saved and measured drift."""
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "seconds_saved": round(self.seconds_saved, 3),
+                "audits": self.audits,
+                "drift_rate": round(self.audit_disagreements / self.audits, 4) if self.audits else 0.0,
+                "entries": sum(len(index) for index in self._indexes.values()),
+                "indexes": len(self._indexes),
+                "memory_bytes": self._nbytes,
+                "evictions": self.evictions,
+            }
+
+
+# --- Shared Cache ---
+
+_cache = SemanticTriageCache()
+
+# Strong references to running audit tasks, so they are not garbage-collected.
+_audit_tasks: set = set()
+
+
+def get_triage_cache() -> SemanticTriageCache:
+    """Returns the process-wide semantic triage cache."""
+    return _cache
+
+
+async def _audit_hit(cached: TriageResult, question: str, transcribed_text: str) -> None:
+    fresh = await run_triage_analysis(transcribed_text, question)
+    if fresh.signal in TRIAGE_SIGNALS:
+        _cache.record_audit(cached, fresh)
+
+
+async def triage_with_cache(graph_id: str, graph_version: str, node_id: str, question: str,
+                            transcribed_text: str) -> TriageResult:
+    """
+    Triage an answer, reusing the result for a semantically equivalent earlier
+    answer to the same question (node of the same graph version) when possible.
+
+    - Method: Embeds the answer, searches the node's index, and falls back to
+              `run_triage_analysis` on a miss (or if embedding fails). While
+              the server is degraded, misses may be triaged by the smaller
+              model; those results are not cached and hits are not audited.
+    - Input: The graph id and version the session is interviewed on, the
+             current node id, the question text and the transcribed answer.
+    - Output: A TriageResult.
+    """
+    model = triage_model()
+    if not TRIAGE_CACHE_ENABLED:
+        return await run_triage_analysis(transcribed_text, question, model)
+
+    start = time.perf_counter()
+    try:
+        vector = _normalize(await get_llm_client().embed(EMBEDDING_MODEL_NAME, transcribed_text,
+                                                         priority=PRIORITY_TRIAGE))
+    except LLMRequestError as e:
+        logger.warning(f"Answer embedding failed, triaging without cache: {e}")
+        return await run_triage_analysis(transcribed_text, question, model)
+
+    key = (graph_id, graph_version, node_id)
+    match = _cache.lookup(key, vector)
+    if _cache.lookups % _STATS_LOG_INTERVAL == 0:
+        logger.info(f"Triage cache stats: {_cache.stats()}")
+
+    if match is not None:
+        cached, similarity = match
+        _cache.record_hit_latency(time.perf_counter() - start)
+        logger.info(f"Triage cache hit for node {node_id} (similarity {similarity:.3f}).")
+        if random.random() < TRIAGE_CACHE_AUDIT_RATE and not is_degraded():
+            task = asyncio.create_task(_audit_hit(cached, question, transcribed_text))
+            _audit_tasks.add(task)
+            task.add_done_callback(_audit_tasks.discard)
+        return cached
+
+    llm_start = time.perf_counter()
+    triage = await run_triage_analysis(transcribed_text, question, model)
+    _cache.record_llm_latency(time.perf_counter() - llm_start)
+    if model == TRIAGE_MODEL_NAME:
+        _cache.add(key, vector, triage)
+    return triage
@@ -0,0 +1,505 @@
+# ai_interviewer/knowledge_graph/graph_loader.py
+
+"""
+Loads, validates and compiles interview knowledge graphs.
+
+A graph file (JSON, or YAML when PyYAML is installed) has the form:
+
+    {
+        "graph_id": "python_backend_junior",
+        "start_node": "node_1",
+        "end_node": "end_node",
+        "nodes": {
+            "node_1": {
+                "question_text": "...",
+                "skill": "Python Fundamentals",
+                "difficulty": "easy",
+                "followup": false,
+                "transitions": {"correct": "node_2", "default": "end_node"}
+            },
+            ...
+        }
+    }
+
+Loading validates the graph (known transition targets, every node reachable
+from the start node, the end node reachable from every node) and compiles it
+into an immutable CompiledGraph: interned node ids, integer node indexes,
+`__slots__` node objects and a flat per-signal transition table with the
+"default" edge already resolved, so a turn is a single array lookup.
+
+Compiled graphs are cached on disk in `marshal` form, keyed on the hash of the
+source file, so restarts skip parsing and validation. The GraphRegistry swaps
+new versions in atomically on reload and keeps recent versions alive for the
+sessions that started on them.
+"""
+
+import hashlib
+import json
+import logging
+import marshal
+import os
+import sys
+import threading
+from array import array
+from collections import deque
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from ai_interviewer.config import (
+    KNOWLEDGE_GRAPH_DIR,
+    DEFAULT_GRAPH_ID,
+    GRAPH_CACHE_DIR,
+    GRAPH_VERSIONS_RETAINED,
+    DIFFICULTY_LEVELS,
+)
+
+try:
+    import yaml
+except ImportError:  # YAML graphs are optional.
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIGNAL = "default"
+# Bump when the compiled layout changes, to invalidate old cache files.
+_CACHE_FORMAT = 2
+_NO_EDGE = -1
+
+
+class GraphValidationError(ValueError):
+    """Raised when a graph file is malformed or structurally invalid."""
+
+    def __init__(self, source: str, problems: List[str]):
+        super().__init__(f"Invalid knowledge graph '{source}':\n  - " + "\n  - ".join(problems))
+        self.problems = problems
+
+
+class GraphNode:
+    """A single, immutable question node of a compiled graph."""
+
+    __slots__ = ("index", "node_id", "question_text", "skill", "difficulty", "followup", "transitions")
+
+    def __init__(self, index: int, node_id: str, question_text: str, skill: str, difficulty: str,
+                 followup: bool, transitions: Mapping[str, str]):
+        self.index = index
+        self.node_id = node_id
+        self.question_text = question_text
+        self.skill = skill
+        self.difficulty = difficulty
+        # Follow-up nodes only make sense right after the question that links
+        # to them, so adaptive selection never picks them from the pool.
+        self.followup = followup
+        self.transitions = transitions
+
+    def __repr__(self) -> str:
+        return f"GraphNode({self.node_id!r})"
+
+
+class CompiledGraph:
+    """
+    An immutable, indexed interview graph.
+
+    `transition_table` is a flat int array of shape (len(nodes), len(signals));
+    entry [i * n_signals + s] is the index of the node reached from node i on
+    signal s (the node's "default" edge when it has no explicit edge for s),
+    or -1 when there is no transition.
+
+    For adaptive selection every node is also an item of an indexed pool:
+    `item_skill[i]` is the index of node i's skill in `skills`,
+    `item_difficulty[i]` its numeric difficulty on the ability scale, and
+    `item_pooled[i]` whether it may be picked outside of a graph transition.
+    """
+
+    __slots__ = ("graph_id", "version", "nodes", "node_index", "signals", "signal_index",
+                 "transition_table", "start_index", "end_index",
+                 "skills", "item_skill", "item_difficulty", "item_pooled")
+
+    def __init__(self, graph_id: str, version: str, nodes: Tuple[GraphNode, ...], signals: Tuple[str, ...],
+                 transition_table: array, start_index: int, end_index: int):
+        self.graph_id = graph_id
+        self.version = version
+        self.nodes = nodes
+        self.node_index: Dict[str, int] = {node.node_id: node.index for node in nodes}
+        self.signals = signals
+        self.signal_index: Dict[str, int] = {signal: i for i, signal in enumerate(signals)}
+        self.transition_table = transition_table
+        self.start_index = start_index
+        self.end_index = end_index
+
+        self.skills = tuple(dict.fromkeys(node.skill for node in nodes))
+        skill_index = {skill: i for i, skill in enumerate(self.skills)}
+        self.item_skill = np.array([skill_index[node.skill] for node in nodes], dtype=np.int32)
+        self.item_difficulty = np.array([difficulty_value(node.difficulty) for node in nodes], dtype=np.float64)
+        self.item_pooled = np.array([not node.followup for node in nodes], dtype=bool)
+        self.item_pooled[end_index] = False
+        for array_ in (self.item_skill, self.item_difficulty, self.item_pooled):
+            array_.flags.writeable = False
+
+    @property
+    def start_node(self) -> GraphNode:
+        return self.nodes[self.start_index]
+
+    @property
+    def end_node(self) -> GraphNode:
+        return self.nodes[self.end_index]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.node_index
+
+    def get(self, node_id: str) -> Optional[GraphNode]:
+        index = self.node_index.get(node_id)
+        return self.nodes[index] if index is not None else None
+
+    def next_index(self, index: int, signal: str) -> int:
+        """Returns the target index for a signal, or -1 if there is none."""
+        s = self.signal_index.get(signal, self.signal_index.get(DEFAULT_SIGNAL))
+        if s is None:
+            return _NO_EDGE
+        return self.transition_table[index * len(self.signals) + s]
+
+    def next_node(self, node_id: str, signal: str) -> Optional[GraphNode]:
+        """Returns the node reached from `node_id` on `signal`, or None."""
+        index = self.node_index.get(node_id)
+        if index is None:
+            return None
+        target = self.next_index(index, signal)
+        return self.nodes[target] if target != _NO_EDGE else None
+
+    def successors(self, node_id: str) -> List[GraphNode]:
+        """Returns every distinct node reachable in one step from `node_id`."""
+        index = self.node_index.get(node_id)
+        if index is None:
+            return []
+        n = len(self.signals)
+        row = self.transition_table[index * n:(index + 1) * n]
+        return [self.nodes[t] for t in dict.fromkeys(row) if t != _NO_EDGE]
+
+
+def difficulty_value(label: str) -> float:
+    """
+    Maps a node's difficulty to the ability scale: a named level from
+    DIFFICULTY_LEVELS, or a number given directly in the graph file.
+    """
+    if label in DIFFICULTY_LEVELS:
+        return DIFFICULTY_LEVELS[label]
+    try:
+        return float(label)
+    except ValueError:
+        return 0.0
+
+
+# --- Parsing and Validation ---
+
+def _read_source(path: str, raw: bytes) -> dict:
+    if path.endswith((".yaml", ".yml")):
+        if yaml is None:
+            raise GraphValidationError(path, ["PyYAML is required to load YAML graphs (pip install pyyaml)."])
+        return yaml.safe_load(raw)
+    return json.loads(raw)
+
+
+def validate_graph(source: str, data: dict) -> List[str]:
+    """
+    Checks a parsed graph definition.
+
+    Returns:
+        A list of human-readable problems (empty when the graph is valid).
+    """
+    problems: List[str] = []
+    nodes = data.get("nodes") if isinstance(data, dict) else None
+    if not isinstance(nodes, dict) or not nodes:
+        return ["'nodes' must be a non-empty mapping of node id to node."]
+
+    start = data.get("start_node")
+    end = data.get("end_node", "end_node")
+    if start not in nodes:
+        problems.append(f"start_node '{start}' is not a node.")
+    if end not in nodes:
+        problems.append(f"end_node '{end}' is not a node.")
+
+    for node_id, node in nodes.items():
+        if not isinstance(node, dict):
+            problems.append(f"Node '{node_id}' must be a mapping.")
+            continue
+        if not isinstance(node.get("question_text"), str) or not node["question_text"].strip():
+            problems.append(f"Node '{node_id}' has no question_text.")
+        transitions = node.get("transitions", {})
+        if not isinstance(transitions, dict):
+            problems.append(f"Node '{node_id}' transitions must be a mapping.")
+            continue
+        for signal, target in transitions.items():
+            if target not in nodes:
+                problems.append(f"Node '{node_id}' transition '{signal}' points to unknown node '{target}'.")
+        if node_id != end and not transitions:
+            problems.append(f"Node '{node_id}' is a dead end (no transitions and not the end node).")
+    if problems:
+        return problems
+
+    # Every node must be reachable from the start node...
+    reachable = _bfs(start, lambda n: nodes[n].get("transitions", {}).values())
+    unreachable = sorted(set(nodes) - reachable)
+    if unreachable:
+        problems.append(f"Unreachable from start_node: {', '.join(unreachable)}.")
+
+    # ...and the end node must be reachable from every node.
+    reverse: Dict[str, List[str]] = {n: [] for n in nodes}
+    for node_id, node in nodes.items():
+        for target in node.get("transitions", {}).values():
+            reverse[target].append(node_id)
+    can_finish = _bfs(end, lambda n: reverse[n])
+    stuck = sorted(set(nodes) - can_finish)
+    if stuck:
+        problems.append(f"Cannot reach end_node from: {', '.join(stuck)}.")
+    return problems
+
+
+def _bfs(origin: str, neighbours) -> set:
+    seen = {origin}
+    queue = deque([origin])
+    while queue:
+        for nxt in neighbours(queue.popleft()):
+            if nxt not in seen:
+                seen.add(nxt)
+                queue.append(nxt)
+    return seen
+
+
+# --- Compilation and Binary Cache ---
+
+def _compile(data: dict, version: str) -> tuple:
+    """
+    Turns a validated graph definition into a flat tuple of primitives, which is
+    both what gets cached on disk and what CompiledGraph objects are built from.
+    """
+    nodes = data["nodes"]
+    start = data["start_node"]
+    end = data.get("end_node", "end_node")
+
+    # Number nodes in breadth-first order from the start node, so an interview
+    # walks through neighbouring rows of the transition table.
+    order: List[str] = []
+    seen = set()
+    queue = deque([start])
+    while queue:
+        node_id = queue.popleft()
+        if node_id in seen:
+            continue
+        seen.add(node_id)
+        order.append(node_id)
+        queue.extend(nodes[node_id].get("transitions", {}).values())
+    index = {node_id: i for i, node_id in enumerate(order)}
+
+    signals = sorted({s for n in nodes.values() for s in n.get("transitions", {})} | {DEFAULT_SIGNAL})
+    table = array("i", [_NO_EDGE]) * (len(order) * len(signals))
+    for node_id in order:
+        transitions = nodes[node_id].get("transitions", {})
+        default = transitions.get(DEFAULT_SIGNAL)
+        for s, signal in enumerate(signals):
+            target = transitions.get(signal, default)
+            if target is not None:
+                table[index[node_id] * len(signals) + s] = index[target]
+
+    records = tuple(
+        (
+            node_id,
+            nodes[node_id]["question_text"],
+            str(nodes[node_id].get("skill", "")),
+            str(nodes[node_id].get("difficulty", "")),
+            bool(nodes[node_id].get("followup", False)),
+            tuple(sorted(nodes[node_id].get("transitions", {}).items())),
+        )
+        for node_id in order
+    )
+    graph_id = str(data.get("graph_id", ""))
+    return (_CACHE_FORMAT, graph_id, version, tuple(signals), table.tobytes(), index[start], index[end], records)
+
+
+def _build(compiled: tuple, fallback_graph_id: str) -> CompiledGraph:
+    _, graph_id, version, signals, table_bytes, start_index, end_index, records = compiled
+    intern = sys.intern
+    nodes = tuple(
+        GraphNode(
+            i,
+            intern(node_id),
+            question_text,
+            intern(skill),
+            intern(difficulty),
+            followup,
+            MappingProxyType({intern(sig): intern(target) for sig, target in transitions}),
+        )
+        for i, (node_id, question_text, skill, difficulty, followup, transitions) in enumerate(records)
+    )
+    table = array("i")
+    table.frombytes(table_bytes)
+    return CompiledGraph(graph_id or fallback_graph_id, version, nodes, tuple(intern(s) for s in signals),
+                         table, start_index, end_index)
+
+
+def _cache_path(version: str) -> str:
+    python = f"py{sys.version_info[0]}{sys.version_info[1]}"
+    return os.path.join(GRAPH_CACHE_DIR, f"{version}-{python}-v{_CACHE_FORMAT}.bin")
+
+
+def load_graph(path: str) -> CompiledGraph:
+    """
+    Loads a graph file, using the compiled binary cache when it is up to date.
+
+    Args:
+        path: Path of a .json/.yaml/.yml graph file.
+
+    Returns:
+        The compiled graph.
+
+    Raises:
+        GraphValidationError: If the graph is malformed or invalid.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    version = hashlib.sha256(raw).hexdigest()[:16]
+    fallback_id = os.path.splitext(os.path.basename(path))[0]
+    cache_path = _cache_path(version)
+
+    try:
+        with open(cache_path, "rb") as f:
+            compiled = marshal.load(f)
+        if compiled[0] == _CACHE_FORMAT:
+            return _build(compiled, fallback_id)
+    except (OSError, EOFError, ValueError, TypeError, IndexError):
+        pass
+
+    try:
+        data = _read_source(path, raw)
+    except (ValueError, TypeError) as e:
+        raise GraphValidationError(path, [f"Could not parse file: {e}"]) from e
+    problems = validate_graph(path, data)
+    if problems:
+        raise GraphValidationError(path, problems)
+
+    compiled = _compile(data, version)
+    try:
+        os.makedirs(GRAPH_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            marshal.dump(compiled, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not write graph cache for {path}: {e}")
+    return _build(compiled, fallback_id)
+
+
+# --- Registry and Hot Reload ---
+
+def _resolve_dir(directory: str) -> str:
+    if os.path.isabs(directory) or os.path.isdir(directory):
+        return directory
+    # Relative paths are relative to the project root when not run from it.
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    return os.path.join(project_root, directory)
+
+
+class GraphRegistry:
+    """
+    Holds the current version of every graph plus recent previous versions.
+
+    Replacing a graph is a single dictionary assignment, so readers always see
+    either the old or the new version, never a partially loaded one. Sessions
+    keep using the version they started on as long as it is retained.
+    """
+
+    def __init__(self, directory: str = KNOWLEDGE_GRAPH_DIR):
+        self.directory = _resolve_dir(directory)
+        self._current: Dict[str, CompiledGraph] = {}
+        self._versions: Dict[str, "deque[CompiledGraph]"] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _graph_files(self) -> Iterable[str]:
+        extensions = (".json", ".yaml", ".yml") if yaml is not None else (".json",)
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(extensions):
+                yield os.path.join(self.directory, name)
+
+    def _install(self, graph: CompiledGraph) -> None:
+        with self._lock:
+            history = self._versions.setdefault(graph.graph_id, deque(maxlen=GRAPH_VERSIONS_RETAINED))
+            if not any(g.version == graph.version for g in history):
+                history.append(graph)
+            self._current[graph.graph_id] = graph
+
+    def load_all(self) -> List[str]:
+        """Loads every graph file in the directory. Returns the loaded graph ids."""
+        loaded = []
+        for path in self._graph_files():
+            graph = load_graph(path)
+            self._mtimes[path] = os.path.getmtime(path)
+            self._install(graph)
+            loaded.append(graph.graph_id)
+        return loaded
+
+    def reload_changed(self) -> List[str]:
+        """
+        Reloads graph files whose modification time changed.
+
+        An invalid file is logged and skipped; the previous version stays active.
+
+        Returns:
+            The ids of the graphs that were replaced.
+        """
+        reloaded = []
+        for path in self._graph_files():
+            mtime = os.path.getmtime(path)
+            if self._mtimes.get(path) == mtime:
+                continue
+            self._mtimes[path] = mtime
+            try:
+                graph = load_graph(path)
+            except (GraphValidationError, OSError) as e:
+                logger.error(f"Keeping the previous version of {path}: {e}")
+                continue
+            previous = self._current.get(graph.graph_id)
+            if previous is None or previous.version != graph.version:
+                self._install(graph)
+                reloaded.append(graph.graph_id)
+                logger.info(f"Knowledge graph '{graph.graph_id}' reloaded (version {graph.version}).")
+        return reloaded
+
+    def get(self, graph_id: str = DEFAULT_GRAPH_ID, version: Optional[str] = None) -> CompiledGraph:
+        """
+        Returns a graph, optionally a specific retained version of it.
+
+        An unknown or no-longer-retained version resolves to the current one.
+
+        Raises:
+            KeyError: If no graph with this id is loaded.
+        """
+        current = self._current[graph_id]
+        if version is None or version == current.version:
+            return current
+        for graph in self._versions.get(graph_id, ()):
+            if graph.version == version:
+                return graph
+        return current
+
+    def graph_ids(self) -> List[str]:
+        return list(self._current)
+
+
+# --- Shared Registry ---
+
+_registry: Optional[GraphRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_graph_registry() -> GraphRegistry:
+    """Returns the process-wide graph registry, loading the graphs on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = GraphRegistry()
+            _registry.load_all()
+        return _registry
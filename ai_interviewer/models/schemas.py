@@ -8,9 +8,27 @@ is consistent and adheres to a predefined structure.
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from pydantic.dataclasses import dataclass
+from typing import List, Dict, Optional
 import time
 
+from ai_interviewer.config import DEFAULT_GRAPH_ID
+
+@dataclass(slots=True)
+class TurnRecord:
+    """
+    One answered question of an interview.
+    The question text and skill are not repeated here; they are looked up from
+    the session's (version-pinned) knowledge graph by `node_id`.
+    """
+    node_id: str
+    answer: str
+    signal: str
+    confidence: float
+    # Filled in asynchronously by the in-depth analysis.
+    score: Optional[float] = None
+    analysis_text: str = ""
+
 class SessionState(BaseModel):
     """
     Represents the complete state of a single interview session.
@@ -19,8 +37,20 @@ class SessionState(BaseModel):
     """
     session_id: str
     current_node_id: str
-    interview_history: List[Dict] = Field(default_factory=list)
+    # The knowledge graph and the exact version of it this session started on.
+    graph_id: str = DEFAULT_GRAPH_ID
+    graph_version: str = ""
+    interview_history: List[TurnRecord] = Field(default_factory=list)
+    # Rolling summary of the turns that have left the recent-context window:
+    # per skill, the number of answers that got each triage signal. Turns
+    # [0, summarized_turns) are folded in (see core_logic/context_builder.py).
+    history_summary: Dict[str, Dict[str, int]] = Field(default_factory=dict)
+    summarized_turns: int = 0
     skill_scores: Dict[str, float] = Field(default_factory=dict)
+    # Running per-skill ability estimates (mean and variance) used for adaptive
+    # question selection; updated from the triage signal after every answer.
+    skill_ability: Dict[str, float] = Field(default_factory=dict)
+    skill_ability_variance: Dict[str, float] = Field(default_factory=dict)
     start_time: float = Field(default_factory=time.time)
 
 class TriageResult(BaseModel):
@@ -31,3 +61,37 @@ class TriageResult(BaseModel):
     """
     signal: str  # e.g., "correct", "incorrect", "partial", "clarification_needed"
     confidence: float
+
+class AnalysisJob(BaseModel):
+    """
+    A queued request for in-depth analysis of one answer.
+    Jobs are identified by session, session start and turn, so submitting the
+    same answer twice does not produce duplicate work, while a new interview
+    that reuses a session id does not collide with the old one.
+    """
+    session_id: str
+    # `SessionState.start_time` of the interview the answer belongs to.
+    session_start: float = 0.0
+    turn_index: int
+    node_id: str
+    skill: str
+    question: str
+    answer: str
+    context: str = ""
+    created_at: float = Field(default_factory=time.time)
+
+    @property
+    def job_id(self) -> str:
+        return f"{self.session_id}:{self.session_start:.6f}:{self.turn_index}"
+
+class AnalysisResult(BaseModel):
+    """
+    The outcome of an in-depth analysis produced by the analysis LLM.
+    """
+    job_id: str
+    session_id: str
+    session_start: float = 0.0
+    turn_index: int
+    skill: str
+    score: float
+    analysis_text: str
@@ -0,0 +1,74 @@
+# ai_interviewer/utils/import_profiler.py
+
+"""
+Measures how long importing the application takes, to keep cold starts bounded.
+
+Runs a fresh interpreter with `-X importtime`, prints the slowest imports and
+exits with status 1 if the total exceeds IMPORT_TIME_BUDGET_SECONDS, so it can
+be used as a CI check:
+
+    python -m ai_interviewer.utils.import_profiler [module] [--top N] [--budget SECONDS]
+
+Heavy libraries (faster-whisper, piper, onnxruntime) should never show up here;
+they are imported by the model registry loaders when the models load.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from typing import List, Tuple
+
+from ai_interviewer.config import IMPORT_TIME_BUDGET_SECONDS
+
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import(module: str) -> List[Tuple[int, int, int, str]]:
+    """
+    Imports `module` in a new interpreter and parses its import timings.
+
+    Returns:
+        (self_us, cumulative_us, depth, name) tuples in import order.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cumulative_us), (len(indent) - 1) // 2, name))
+    return rows
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("module", nargs="?", default="ai_interviewer.api.main")
+    parser.add_argument("--top", type=int, default=15, help="How many of the slowest imports to list.")
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET_SECONDS,
+                        help="Maximum total import time in seconds.")
+    args = parser.parse_args(argv)
+
+    rows = profile_import(args.module)
+    # The top-level module is the last line; its cumulative time is the total.
+    total = next((cumulative for _, cumulative, _, name in reversed(rows) if name == args.module), 0) / 1e6
+
+    print(f"Slowest imports (cumulative) for {args.module}:")
+    for self_us, cumulative_us, depth, name in sorted(rows, key=lambda r: -r[1])[:args.top]:
+        print(f"  {cumulative_us / 1e3:9.1f} ms  (self {self_us / 1e3:7.1f} ms)  {name}")
+    print(f"Total: {total:.3f}s (budget {args.budget:.3f}s)")
+    if total > args.budget:
+        print("Import time budget exceeded.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,298 @@
+# ai_interviewer/utils/metrics.py
+
+"""
+Latency tracing and metrics for the interview pipeline.
+
+- `TurnTrace` times the stages of one question/answer turn (receive, decode,
+  transcribe, triage, select, synthesize, ...) with `span()` blocks and named
+  `mark()`s. Finished turns feed the stage histograms and, when
+  METRICS_TRACE_DIR is set, are appended to a per-session JSONL trace file.
+- `Histogram` keeps cumulative Prometheus buckets plus a ring buffer of recent
+  samples, from which p50/p95/p99 are computed.
+- Gauge collectors are callables evaluated at scrape time (executor queue
+  depths, LLM calls in flight, cache statistics, ...).
+- `render_prometheus()` produces the text exposition format served at /metrics.
+
+The trace of the turn being handled is held in a context variable, so helpers
+deep in the call stack can add marks without passing it around.
+"""
+
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ai_interviewer.config import (
+    METRICS_ENABLED,
+    METRICS_HISTOGRAM_BUCKETS,
+    METRICS_RESERVOIR_SIZE,
+    METRICS_TRACE_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Labels are kept as a sorted tuple of (name, value) pairs.
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels: str) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    """Cumulative buckets for Prometheus plus a reservoir of recent samples for quantiles."""
+
+    __slots__ = ("buckets", "counts", "total", "count", "_recent", "_next", "_lock")
+
+    def __init__(self, buckets=METRICS_HISTOGRAM_BUCKETS, reservoir_size: int = METRICS_RESERVOIR_SIZE):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # The last one is +Inf.
+        self.total = 0.0
+        self.count = 0
+        self._recent = np.full(reservoir_size, np.nan)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.total += value
+            self.count += 1
+            self._recent[self._next % len(self._recent)] = value
+            self._next += 1
+
+    def quantiles(self, qs=QUANTILES) -> Dict[float, float]:
+        """Quantiles over the most recent samples (NaN when there are none)."""
+        with self._lock:
+            recent = self._recent[:min(self._next, len(self._recent))].copy()
+        if len(recent) == 0:
+            return {q: float("nan") for q in qs}
+        return dict(zip(qs, np.quantile(recent, qs).tolist()))
+
+
+class MetricsRegistry:
+    """Histograms, counters and scrape-time gauge collectors."""
+
+    def __init__(self):
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Tuple[str, str, Callable[[], Dict[Labels, float]]]] = []
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, help_text: str = "", **labels: str) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            if help_text:
+                self._help.setdefault(name, help_text)
+        histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1.0, help_text: str = "", **labels: str) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def add_collector(self, name: str, help_text: str, collect: Callable[[], Dict[Labels, float]]) -> None:
+        """
+        Registers a gauge evaluated at scrape time. `collect` returns a mapping
+        of label tuples (see `labels()`) to values.
+        """
+        self._collectors.append((name, help_text, collect))
+
+    def quantiles(self, name: str) -> Dict[str, Dict[float, float]]:
+        """Returns p50/p95/p99 per label set of a histogram, keyed by its formatted labels."""
+        with self._lock:
+            series = dict(self._histograms.get(name, {}))
+        return {_format_labels(key) or "{}": histogram.quantiles() for key, histogram in series.items()}
+
+    def render_prometheus(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            histograms = {name: dict(series) for name, series in self._histograms.items()}
+            counters = {name: dict(series) for name, series in self._counters.items()}
+
+        for name, series in sorted(histograms.items()):
+            lines.append(f"# HELP {name} {self._help.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in series.items():
+                with histogram._lock:
+                    counts, total, count = list(histogram.counts), histogram.total, histogram.count
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {total}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+            # Recent-window quantiles, as a separate gauge.
+            lines.append(f"# HELP {name}_recent Quantiles of the last {METRICS_RESERVOIR_SIZE} samples of {name}.")
+            lines.append(f"# TYPE {name}_recent gauge")
+            for key, histogram in series.items():
+                for q, value in histogram.quantiles().items():
+                    lines.append(f"{name}_recent{_format_labels(key, (('quantile', str(q)),))} {value}")
+
+        for name, series in sorted(counters.items()):
+            lines.append(f"# HELP {name} {self._help.get(name, name)}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in series.items():
+                lines.append(f"{name}{_format_labels(key)} {value}")
+
+        for name, help_text, collect in self._collectors:
+            try:
+                values = collect()
+            except Exception as e:
+                logger.warning(f"Metrics collector {name} failed: {e}")
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in values.items():
+                lines.append(f"{name}{_format_labels(key)} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def labels(**kwargs: str) -> Labels:
+    """Builds the label key used by gauge collectors."""
+    return _labels(**kwargs)
+
+
+# --- Turn Tracing ---
+
+STAGE_METRIC = "ai_interviewer_stage_duration_seconds"
+RESPONSE_METRIC = "ai_interviewer_response_latency_seconds"
+
+
+class TurnTrace:
+    """
+    Stage timings of one interview turn.
+
+    Spans of the same stage add up (e.g. decoding many audio chunks). Marks
+    are timestamps relative to the start of the turn.
+    """
+
+    def __init__(self, session_id: str, turn_index: int):
+        self.session_id = session_id
+        self.turn_index = turn_index
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def mark(self, name: str, once: bool = True) -> None:
+        if once and name in self.marks:
+            return
+        self.marks[name] = time.perf_counter() - self._t0
+
+    def since(self, mark: str) -> Optional[float]:
+        """Seconds elapsed since a mark, or None if it was not set."""
+        if mark not in self.marks:
+            return None
+        return time.perf_counter() - self._t0 - self.marks[mark]
+
+    def to_dict(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "turn": self.turn_index,
+            "started_at": self.started_at,
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+            "marks": {k: round(v, 6) for k, v in self.marks.items()},
+        }
+
+
+# The trace of the turn the current task is handling.
+current_trace: contextvars.ContextVar[Optional[TurnTrace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+def mark(name: str) -> None:
+    """Adds a mark to the current turn's trace, if there is one."""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.mark(name)
+
+
+def finish_turn(trace: TurnTrace) -> Optional[float]:
+    """
+    Records a finished turn: every stage into the stage histogram, the time from
+    end of speech to the first byte of the reply audio into the response
+    histogram, and the trace into the session's trace file if enabled.
+
+    Returns:
+        The turn's response latency (end of speech to first audio), if both were marked.
+    """
+    if current_trace.get() is trace:
+        current_trace.set(None)
+    response = None
+    if "end_of_speech" in trace.marks and "first_audio" in trace.marks:
+        response = trace.marks["first_audio"] - trace.marks["end_of_speech"]
+    if not METRICS_ENABLED:
+        return response
+    for stage, seconds in trace.stages.items():
+        metrics.observe(STAGE_METRIC, seconds, "Time spent per interview turn in each pipeline stage.", stage=stage)
+    if response is not None:
+        metrics.observe(RESPONSE_METRIC, response,
+                        "Time from the end of the candidate's answer to the first byte of the next question's audio.")
+    metrics.increment("ai_interviewer_turns_total", help_text="Completed interview turns.")
+    if METRICS_TRACE_DIR:
+        _dump_trace(trace)
+    return response
+
+
+_dump_lock = threading.Lock()
+
+
+def _dump_trace(trace: TurnTrace) -> None:
+    safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in trace.session_id)
+    try:
+        os.makedirs(METRICS_TRACE_DIR, exist_ok=True)
+        with _dump_lock, open(os.path.join(METRICS_TRACE_DIR, f"{safe_id}.jsonl"), "a") as f:
+            f.write(json.dumps(trace.to_dict()) + "\n")
+    except OSError as e:
+        logger.warning(f"Could not write trace for {trace.session_id}: {e}")
+
+
+# --- Shared Registry ---
+
+metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Returns the process-wide metrics registry."""
+    return metrics
@@ -0,0 +1,104 @@
+# ai_interviewer/utils/mock_ollama.py
+
+"""
+A local stand-in for the Ollama server, for tests, benchmarks and development
+machines without a GPU.
+
+It implements the subset of the Ollama API the interviewer uses (generate and
+embeddings) and returns deterministic answers after a configurable delay:
+
+    MOCK_OLLAMA_LATENCY_MS=200 uvicorn ai_interviewer.utils.mock_ollama:app --port 11434
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ai_interviewer.config import TRIAGE_MODEL_NAME
+
+# Base latency per request and per streamed token, in milliseconds.
+LATENCY_MS = float(os.environ.get("MOCK_OLLAMA_LATENCY_MS", "50"))
+TOKEN_LATENCY_MS = float(os.environ.get("MOCK_OLLAMA_TOKEN_LATENCY_MS", "5"))
+
+SIGNALS = ("correct", "partial", "incorrect")
+EMBEDDING_DIM = 256
+
+app = FastAPI(title="Mock Ollama")
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "big")
+
+
+def fake_response(model: str, prompt: str) -> str:
+    """Returns a deterministic JSON answer for a prompt."""
+    digest = _digest(prompt)
+    if model == TRIAGE_MODEL_NAME or "'signal'" in prompt or '"signal"' in prompt:
+        # Confidence first, in the key order the streaming triage prompt asks for.
+        return json.dumps({
+            "confidence": round(0.5 + (digest % 50) / 100, 2),
+            "signal": SIGNALS[digest % len(SIGNALS)],
+        })
+    batch_ids = re.findall(r"^\s*\[([^\]]+)\]\s*$", prompt, flags=re.MULTILINE)
+    if batch_ids:
+        return json.dumps({"results": [
+            {
+                "id": job_id,
+                "analysis_text": "The answer was reviewed by the mock analysis model.",
+                "score": 1 + _digest(job_id) % 10,
+            }
+            for job_id in batch_ids
+        ]})
+    return json.dumps({
+        "analysis_text": "The answer was reviewed by the mock analysis model.",
+        "score": 1 + digest % 10,
+    })
+
+
+def _tokens(text: str, size: int = 4):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@app.post("/api/generate")
+async def generate(request: Request):
+    body = await request.json()
+    model = body.get("model", "")
+    response_text = fake_response(model, body.get("prompt", ""))
+    await asyncio.sleep(LATENCY_MS / 1000)
+
+    if not body.get("stream", True):
+        return JSONResponse({"model": model, "response": response_text, "done": True})
+
+    async def stream():
+        for token in _tokens(response_text):
+            await asyncio.sleep(TOKEN_LATENCY_MS / 1000)
+            yield json.dumps({"model": model, "response": token, "done": False}) + "\n"
+        yield json.dumps({"model": model, "response": "", "done": True}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def fake_embedding(text: str) -> list:
+    """
+    A hashed bag-of-words embedding: answers sharing most of their words get a
+    high cosine similarity, which is enough to exercise the triage cache.
+    """
+    vector = [0.0] * EMBEDDING_DIM
+    for word in re.findall(r"[a-z0-9']+", text.lower()):
+        digest = _digest(word)
+        vector[digest % EMBEDDING_DIM] += 1.0 if digest & 0x100 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+@app.post("/api/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    await asyncio.sleep(LATENCY_MS / 4000)
+    return JSONResponse({"embedding": fake_embedding(body.get("prompt", ""))})
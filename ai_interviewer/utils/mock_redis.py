@@ -0,0 +1,51 @@
+# ai_interviewer/utils/mock_redis.py
+
+"""
+A local, in-process stand-in for a Redis client, for development machines and
+tests without a Redis server.
+
+It implements the small subset of the redis-py client API the session store
+uses (get, set with an expiry, delete, ping), so it can be passed anywhere a
+`redis.Redis` client is expected:
+
+    RedisSessionBackend(MockRedis())
+
+Data lives in the current process only, so it is not shared between workers.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+
+class MockRedis:
+    """A thread-safe dictionary with Redis-style key expiry."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def ping(self) -> bool:
+        return True
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(name)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[name]
+                return None
+            return value
+
+    def set(self, name: str, value: Union[str, bytes], ex: Optional[float] = None) -> bool:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        with self._lock:
+            self._data[name] = (value, time.time() + ex if ex else None)
+        return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
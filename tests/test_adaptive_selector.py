@@ -0,0 +1,83 @@
+# tests/test_adaptive_selector.py
+
+"""
+Per-skill ability estimates and information-based question selection.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from ai_interviewer.core_logic import adaptive_selector
+from ai_interviewer.core_logic.adaptive_selector import (
+    information_gain,
+    record_answer,
+    select_adaptive_node,
+    updated_ability,
+)
+from ai_interviewer.knowledge_graph import graph_loader
+from ai_interviewer.knowledge_graph.graph_loader import load_graph
+
+
+@pytest.fixture
+def graph(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_loader, "GRAPH_CACHE_DIR", str(tmp_path / "cache"))
+    nodes = {
+        "start": {"question_text": "Hi?", "skill": "python", "difficulty": "easy",
+                  "transitions": {"default": "py_hard"}},
+        "py_hard": {"question_text": "GIL?", "skill": "python", "difficulty": "hard",
+                    "transitions": {"incorrect": "py_hint", "default": "sql_medium"}},
+        "py_hint": {"question_text": "Hint?", "skill": "python", "difficulty": "easy", "followup": True,
+                    "transitions": {"default": "sql_medium"}},
+        "sql_medium": {"question_text": "JOIN?", "skill": "sql", "difficulty": "medium",
+                       "transitions": {"default": "end_node"}},
+        "end_node": {"question_text": "Thanks.", "transitions": {}},
+    }
+    path = tmp_path / "demo.json"
+    path.write_text(json.dumps({"graph_id": "demo", "start_node": "start", "nodes": nodes}))
+    return load_graph(str(path))
+
+
+def test_ability_moves_towards_the_score_and_gets_more_certain():
+    up = updated_ability((0.0, 1.0), 0.0, 1.0)
+    down = updated_ability((0.0, 1.0), 0.0, 0.0)
+    assert up[0] > 0 > down[0] and up[0] == pytest.approx(-down[0])
+    assert up[1] < 1.0
+    # An expected outcome teaches little: a strong candidate acing an easy question.
+    assert abs(updated_ability((3.0, 1.0), -1.0, 1.0)[0] - 3.0) < abs(up[0])
+
+
+def test_record_answer_updates_only_the_nodes_skill(graph):
+    abilities, variances = {}, {}
+    assert record_answer(abilities, variances, graph.get("py_hard"), "correct")
+    assert set(abilities) == set(variances) == {"python"} and abilities["python"] > 0
+    assert not record_answer(abilities, variances, graph.get("sql_medium"), "clarify")
+    assert "sql" not in abilities
+
+
+def test_information_gain_prefers_uncertain_skills_and_matching_difficulty(graph):
+    gain = information_gain(graph, {}, {})
+    index = graph.node_index
+    # At the prior (ability 0) a medium question is the most informative.
+    assert gain[index["sql_medium"]] > gain[index["py_hard"]]
+    gain = information_gain(graph, {"python": 1.0}, {"python": 1.0})
+    assert gain[index["py_hard"]] > gain[index["start"]]
+    gain = information_gain(graph, {}, {"python": 0.05})
+    assert gain[index["py_hard"]] < gain[index["sql_medium"]]
+    assert gain.shape == (len(graph),) and np.all(gain >= 0)
+
+
+def test_selection_skips_asked_follow_up_and_end_nodes(graph):
+    first = select_adaptive_node(graph, {}, {}, asked=["start"])
+    assert first.node_id == "sql_medium"
+    second = select_adaptive_node(graph, {}, {}, asked=["start", "sql_medium"])
+    assert second.node_id == "py_hard"  # Not the follow-up "py_hint".
+    assert select_adaptive_node(graph, {}, {}, asked=["start", "sql_medium", "py_hard"]) is None
+
+
+def test_selection_stops_once_the_assessment_is_confident(graph, monkeypatch):
+    certain = {"python": 0.01, "sql": 0.01}
+    assert select_adaptive_node(graph, {}, certain, asked=[]) is None
+    monkeypatch.setattr(adaptive_selector, "ADAPTIVE_MIN_INFORMATION_GAIN", 0.0)
+    assert select_adaptive_node(graph, {}, certain, asked=[]) is not None
@@ -0,0 +1,151 @@
+# tests/test_admission.py
+
+"""
+The admission queue: capacity, priorities, rejection and the degraded mode.
+"""
+
+import asyncio
+
+import pytest
+
+from ai_interviewer.core_logic import admission
+from ai_interviewer.core_logic.admission import AdmissionController, AdmissionRejectedError
+from ai_interviewer.config import ADMISSION_DEGRADE_LOAD, ADMISSION_RECOVER_LOAD
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_POLL_SECONDS", 0.01)
+
+
+def _controller(**kwargs) -> AdmissionController:
+    kwargs.setdefault("enabled", True)
+    controller = AdmissionController(**kwargs)
+    controller.load = lambda: {"stt": 0.0}
+    return controller
+
+
+async def _until_waiting(controller: AdmissionController, count: int) -> None:
+    while len(controller._queue) < count:
+        await asyncio.sleep(0.005)
+
+
+def test_admits_while_there_is_capacity():
+    async def scenario():
+        controller = _controller(max_sessions=2)
+        first = await controller.admit("a")
+        second = await controller.admit("b")
+        assert controller.active == 2 and first.waited == second.waited == 0.0
+        first.release()
+        first.release()
+        assert controller.active == 1
+
+    asyncio.run(scenario())
+
+
+def test_reconnecting_candidates_go_first():
+    async def scenario():
+        controller = _controller(max_sessions=1)
+        running = await controller.admit("running")
+        positions = {}
+
+        async def admit(session_id, resumed=False):
+            async def on_wait(position, wait):
+                positions.setdefault(session_id, []).append(position)
+            ticket = await controller.admit(session_id, resumed, on_wait)
+            order.append(session_id)
+            return ticket
+
+        order = []
+        new = asyncio.create_task(admit("new"))
+        await _until_waiting(controller, 1)
+        resumed = asyncio.create_task(admit("resumed", resumed=True))
+        await _until_waiting(controller, 2)
+        await asyncio.sleep(0.05)
+        assert positions == {"new": [1, 2], "resumed": [1]}
+
+        running.release()
+        (await resumed).release()
+        (await new).release()
+        assert order == ["resumed", "new"]
+        assert controller.active == 0 and controller._queue == []
+
+    asyncio.run(scenario())
+
+
+def test_rejects_when_the_queue_is_full():
+    async def scenario():
+        controller = _controller(max_sessions=1, max_waiting=1)
+        await controller.admit("running")
+        waiting = asyncio.create_task(controller.admit("waiting"))
+        await _until_waiting(controller, 1)
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            await controller.admit("turned-away")
+        assert rejected.value.reason == "queue_full" and rejected.value.retry_after > 0
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert controller._queue == []
+
+    asyncio.run(scenario())
+
+
+def test_rejects_after_the_maximum_wait():
+    async def scenario():
+        controller = _controller(max_sessions=1, max_wait_seconds=0.05)
+        await controller.admit("running")
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            await controller.admit("late")
+        assert rejected.value.reason == "timeout"
+        assert controller._queue == []
+
+    asyncio.run(scenario())
+
+
+def test_waits_while_the_load_is_at_the_limit():
+    async def scenario():
+        controller = _controller(max_sessions=10)
+        await controller.admit("running")
+        controller.load = lambda: {"stt": 1.0}
+        waiting = asyncio.create_task(controller.admit("next"))
+        await _until_waiting(controller, 1)
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        controller.load = lambda: {"stt": 0.2}
+        await asyncio.wait_for(waiting, 1)
+        assert controller.active == 2
+
+    asyncio.run(scenario())
+
+
+def test_disabled_controller_admits_everyone():
+    async def scenario():
+        controller = _controller(max_sessions=1, enabled=False)
+        for i in range(3):
+            await controller.admit(f"s{i}")
+        assert controller.active == 3
+        assert not controller.update_degraded()
+
+    asyncio.run(scenario())
+
+
+def test_degraded_mode_has_hysteresis_and_is_only_updated_on_checks():
+    controller = _controller()
+    controller.load = lambda: {"stt": ADMISSION_DEGRADE_LOAD}
+    assert not controller.degraded  # Reading the flag does not sample the load.
+    assert controller.update_degraded() and controller.degraded
+
+    controller.load = lambda: {"stt": (ADMISSION_DEGRADE_LOAD + ADMISSION_RECOVER_LOAD) / 2}
+    assert controller.update_degraded()
+    controller.load = lambda: {"stt": ADMISSION_RECOVER_LOAD / 2}
+    assert controller.degraded
+    assert not controller.update_degraded() and not controller.degraded
+
+
+def test_latency_observations_update_the_degraded_mode():
+    controller = _controller()
+    checks = []
+    controller.update_degraded = lambda: checks.append(True)
+    controller.observe_latency(None)
+    controller.observe_latency(0.4)
+    assert checks == [True]
@@ -0,0 +1,164 @@
+# tests/test_audio_decoder.py
+
+"""
+The incremental WebM demuxer and the stream handling of the audio decoder.
+WebM streams are built byte by byte here, so no encoder is needed.
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from ai_interviewer.audio_processing import audio_decoder
+from ai_interviewer.audio_processing.audio_decoder import (
+    EBML_MAGIC,
+    StreamingAudioDecoder,
+    WebMDemuxer,
+    pcm16_to_float32,
+)
+
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+
+# --- WebM Builders ---
+
+def _size(n: int) -> bytes:
+    if n < 0x7F:
+        return bytes([0x80 | n])
+    return struct.pack(">Q", n | (0x01 << 56))
+
+
+def element(element_id: bytes, payload: bytes = b"", unknown_size: bool = False) -> bytes:
+    return element_id + (UNKNOWN_SIZE if unknown_size else _size(len(payload))) + payload
+
+
+def track_entry(number: int, track_type: int, codec_id: bytes, sample_rate: float = 48000.0) -> bytes:
+    return element(b"\xae",
+                   element(b"\xd7", bytes([number]))
+                   + element(b"\x83", bytes([track_type]))
+                   + element(b"\x86", codec_id)
+                   + element(b"\x63\xa2", b"OpusHead")
+                   + element(b"\xe1", element(b"\x9f", b"\x01") + element(b"\xb5", struct.pack(">d", sample_rate))))
+
+
+def simple_block(track: int, frames, lacing: int = 0) -> bytes:
+    header = bytes([0x80 | track]) + b"\x00\x00" + bytes([lacing << 1])
+    if lacing == 0:
+        body = frames[0]
+    elif lacing == 1:  # Xiph.
+        body = bytes([len(frames) - 1])
+        for frame in frames[:-1]:
+            body += b"\xff" * (len(frame) // 255) + bytes([len(frame) % 255])
+        body += b"".join(frames)
+    elif lacing == 2:  # Fixed size.
+        body = bytes([len(frames) - 1]) + b"".join(frames)
+    else:  # EBML: the first size, then signed differences (within +-63 here).
+        body = bytes([len(frames) - 1]) + _size(len(frames[0]))
+        for previous, frame in zip(frames, frames[1:-1]):
+            body += bytes([0x80 | (len(frame) - len(previous) + 63)])
+        body += b"".join(frames)
+    return element(b"\xa3", header + body)
+
+
+def webm_stream(blocks: bytes, extra_tracks: bytes = b"") -> bytes:
+    header = element(EBML_MAGIC, element(b"\x42\x82", b"webm"))
+    tracks = element(b"\x16\x54\xae\x6b", extra_tracks + track_entry(2, 2, b"A_OPUS"))
+    cluster = element(b"\x1f\x43\xb6\x75", element(b"\xe7", b"\x00") + blocks, unknown_size=True)
+    return header + element(b"\x18\x53\x80\x67", tracks + cluster, unknown_size=True)
+
+
+# --- WebMDemuxer ---
+
+def test_demuxer_reads_the_audio_track():
+    video = track_entry(1, 1, b"V_VP8")
+    stream = webm_stream(simple_block(1, [b"video"]) + simple_block(2, [b"opus-1"]) + simple_block(2, [b"opus-2"]),
+                         extra_tracks=video)
+    demuxer = WebMDemuxer()
+    assert demuxer.feed(stream) == [b"opus-1", b"opus-2"]
+    assert (demuxer.audio_track, demuxer.codec_id, demuxer.codec_private) == (2, "A_OPUS", b"OpusHead")
+    assert (demuxer.channels, demuxer.sample_rate) == (1, 48000)
+
+
+def test_demuxer_is_independent_of_chunk_boundaries():
+    frames = [bytes([i]) * (40 + i) for i in range(6)]
+    stream = webm_stream(b"".join(simple_block(2, [frame]) for frame in frames))
+    for piece in (1, 3, 17):
+        demuxer = WebMDemuxer()
+        out = []
+        for offset in range(0, len(stream), piece):
+            out.extend(demuxer.feed(stream[offset:offset + piece]))
+        assert out == frames
+
+
+def test_demuxer_skips_large_unknown_elements_across_chunks():
+    # A Void element bigger than a chunk, between two blocks.
+    blocks = simple_block(2, [b"a"]) + element(b"\xec", b"\x00" * 5000) + simple_block(2, [b"b"])
+    stream = webm_stream(blocks)
+    demuxer = WebMDemuxer()
+    out = []
+    for offset in range(0, len(stream), 512):
+        out.extend(demuxer.feed(stream[offset:offset + 512]))
+    assert out == [b"a", b"b"]
+    assert len(demuxer._buf) < 512
+
+
+@pytest.mark.parametrize("lacing, frames", [
+    (1, [b"x" * 300, b"yy", b"z" * 17]),
+    (2, [b"x" * 30, b"y" * 30, b"z" * 30]),
+    (3, [b"x" * 300, b"y" * 290, b"z" * 17]),
+])
+def test_demuxer_unlaces_blocks(lacing, frames):
+    assert WebMDemuxer().feed(webm_stream(simple_block(2, frames, lacing=lacing))) == frames
+
+
+def test_demuxer_rejects_oversized_elements_without_buffering_them():
+    header = webm_stream(b"")
+    oversized = b"\xa3" + _size(audio_decoder.MAX_ELEMENT_BYTES + 1) + b"\x82\x00\x00\x00"
+    demuxer = WebMDemuxer()
+    with pytest.raises(ValueError):
+        demuxer.feed(header + oversized)
+    # A skipped element of the same size is fine; it is never buffered.
+    skipped = b"\xec" + _size(audio_decoder.MAX_ELEMENT_BYTES + 1)
+    assert WebMDemuxer().feed(header + skipped + b"\x00" * 64) == []
+
+
+def test_demuxer_rejects_an_invalid_vint():
+    with pytest.raises(ValueError):
+        WebMDemuxer().feed(b"\x00\x00\x00\x00\x00\x00\x00\x00\x00")
+
+
+# --- StreamingAudioDecoder ---
+
+def test_raw_pcm_passes_through():
+    pcm = np.array([0, 16384, -32768, 32767], dtype="<i2").tobytes() + b"\x01"
+    decoder = StreamingAudioDecoder()
+    np.testing.assert_allclose(decoder.decode(pcm), [0.0, 0.5, -1.0, 32767 / 32768])
+    np.testing.assert_array_equal(pcm16_to_float32(pcm), decoder.decode(pcm))
+
+
+def test_resync_keeps_a_pcm_stream_going():
+    decoder = StreamingAudioDecoder()
+    decoder.decode(b"\x00\x10" * 8)
+    decoder.resync()
+    assert not decoder.awaiting_header
+    assert len(decoder.decode(b"\x00\x10" * 8)) == 8
+
+
+@pytest.mark.skipif(audio_decoder.av is None, reason="PyAV is not installed")
+def test_resync_drops_webm_continuations_until_the_next_header():
+    stream = webm_stream(b"")
+    decoder = StreamingAudioDecoder()
+    assert len(decoder.decode(stream)) == 0
+    decoder.resync()
+    assert decoder.awaiting_header
+
+    # Cluster bytes of the abandoned stream must not be read as PCM.
+    continuation = element(b"\x1f\x43\xb6\x75", element(b"\xe7", b"\x00") + simple_block(2, [b"\x00" * 64]))
+    assert len(decoder.decode(continuation)) == 0
+    assert decoder.awaiting_header
+
+    assert len(decoder.decode(stream)) == 0
+    assert not decoder.awaiting_header
+    decoder.reset()
+    assert len(decoder.decode(b"\x00\x10" * 4)) == 4
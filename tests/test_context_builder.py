@@ -0,0 +1,86 @@
+# tests/test_context_builder.py
+
+"""
+The bounded analysis context: the rolling summary and the recent-turn window.
+"""
+
+import json
+
+import pytest
+
+from ai_interviewer.config import CONTEXT_CHARS_PER_TOKEN, CONTEXT_RECENT_TURNS, CONTEXT_TOKEN_BUDGET
+from ai_interviewer.core_logic import context_builder
+from ai_interviewer.core_logic.context_builder import build_analysis_context, estimate_tokens
+from ai_interviewer.knowledge_graph import graph_loader
+from ai_interviewer.knowledge_graph.graph_loader import load_graph
+from ai_interviewer.models.schemas import SessionState, TurnRecord
+
+SKILLS = ("python", "sql")
+
+
+@pytest.fixture(autouse=True)
+def graph(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_loader, "GRAPH_CACHE_DIR", str(tmp_path / "cache"))
+    nodes = {f"q{i}": {"question_text": f"Question {i}?", "skill": SKILLS[i % 2],
+                       "transitions": {"default": f"q{i + 1}" if i < 19 else "end_node"}} for i in range(20)}
+    nodes["end_node"] = {"question_text": "Thanks.", "transitions": {}}
+    path = tmp_path / "demo.json"
+    path.write_text(json.dumps({"graph_id": "demo", "start_node": "q0", "nodes": nodes}))
+    graph = load_graph(str(path))
+
+    class Registry:
+        def get(self, graph_id, version=None):
+            return graph
+
+    monkeypatch.setattr(context_builder, "get_graph_registry", lambda: Registry())
+    return graph
+
+
+def _session(turns: int, answer: str = "An answer.") -> SessionState:
+    state = SessionState(session_id="s1", current_node_id="q0", graph_id="demo")
+    for i in range(turns):
+        state.interview_history.append(TurnRecord(node_id=f"q{i}", answer=answer,
+                                                  signal="correct" if i % 3 else "partial", confidence=0.9))
+    return state
+
+
+def test_first_turn_has_no_history():
+    assert build_analysis_context(_session(0)) == "This is the first question of the interview."
+
+
+def test_recent_turns_are_verbatim_and_older_ones_summarized():
+    state = _session(8)
+    state.interview_history[7].score = 7.5
+    state.skill_scores["python"] = 6.0
+    context = build_analysis_context(state)
+    assert state.summarized_turns == 8 - CONTEXT_RECENT_TURNS
+    assert "Earlier answers (turns 1-5) by skill:" in context
+    assert "python: 3 answer(s) (2 correct, 1 partial), mean score 6.0/10" in context
+    assert "sql: 2 answer(s) (1 correct, 1 partial)" in context
+    assert "Turn 6 - Q: Question 5?" in context and "Turn 5 -" not in context
+    assert "Turn 8 - Q: Question 7? A: An answer. [triage: correct, score 7.5/10]" in context
+
+
+def test_context_for_an_earlier_turn_leaves_out_later_ones():
+    state = _session(4)
+    context = build_analysis_context(state, upto_turn=2)
+    assert "Turn 2 -" in context and "Turn 3 -" not in context
+    assert state.summarized_turns == 0
+
+
+def test_folding_is_incremental():
+    state = _session(6)
+    build_analysis_context(state, upto_turn=5)
+    summary = {skill: dict(tally) for skill, tally in state.history_summary.items()}
+    build_analysis_context(state, upto_turn=5)
+    assert state.history_summary == summary  # Already folded turns are not counted twice.
+    build_analysis_context(state)
+    assert sum(sum(t.values()) for t in state.history_summary.values()) == 6 - CONTEXT_RECENT_TURNS
+
+
+def test_context_stays_within_the_token_budget():
+    state = _session(20, answer="word " * 400)
+    context = build_analysis_context(state)
+    assert estimate_tokens(context) <= CONTEXT_TOKEN_BUDGET + 2
+    assert len(context) <= (CONTEXT_TOKEN_BUDGET + 2) * CONTEXT_CHARS_PER_TOKEN
+    assert "Turn 20 -" in context and "..." in context
@@ -0,0 +1,184 @@
+# tests/test_graph_loader.py
+
+"""
+Knowledge graph validation, compilation, the marshal cache and hot reload.
+"""
+
+import json
+import os
+
+import pytest
+
+from ai_interviewer.knowledge_graph import graph_loader
+from ai_interviewer.knowledge_graph.graph_loader import (
+    GraphRegistry,
+    GraphValidationError,
+    load_graph,
+    validate_graph,
+)
+
+
+def _graph(**overrides) -> dict:
+    graph = {
+        "graph_id": "demo",
+        "start_node": "intro",
+        "end_node": "end_node",
+        "nodes": {
+            "intro": {"question_text": "Intro?", "skill": "python", "difficulty": "easy",
+                      "transitions": {"correct": "hard", "default": "followup"}},
+            "followup": {"question_text": "Hint?", "skill": "python", "followup": True,
+                         "transitions": {"default": "end_node"}},
+            "hard": {"question_text": "Hard?", "skill": "sql", "difficulty": "1.5",
+                     "transitions": {"default": "end_node"}},
+            "end_node": {"question_text": "Thanks.", "transitions": {}},
+        },
+    }
+    graph.update(overrides)
+    return graph
+
+
+def _write(directory, data, name: str = "demo.json") -> str:
+    path = os.path.join(str(directory), name)
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(graph_loader, "GRAPH_CACHE_DIR", str(directory))
+    return directory
+
+
+# --- Validation ---
+
+def test_a_valid_graph_has_no_problems():
+    assert validate_graph("demo", _graph()) == []
+
+
+@pytest.mark.parametrize("change, problem", [
+    (lambda g: g.update(start_node="missing"), "start_node 'missing' is not a node"),
+    (lambda g: g["nodes"]["intro"]["transitions"].update(partial="nowhere"), "unknown node 'nowhere'"),
+    (lambda g: g["nodes"]["hard"].update(question_text=" "), "'hard' has no question_text"),
+    (lambda g: g["nodes"]["hard"].update(transitions={}), "'hard' is a dead end"),
+    (lambda g: g["nodes"].update(orphan={"question_text": "?", "transitions": {"default": "end_node"}}),
+     "Unreachable from start_node: orphan"),
+    (lambda g: g["nodes"]["hard"].update(transitions={"default": "intro"}), None),
+    (lambda g: g["nodes"]["followup"].update(transitions={"default": "followup"}),
+     "Cannot reach end_node from: followup"),
+])
+def test_structural_problems_are_reported(change, problem):
+    graph = _graph()
+    change(graph)
+    problems = validate_graph("demo", graph)
+    if problem is None:
+        assert problems == []  # A cycle is fine as long as the end stays reachable.
+    else:
+        assert any(problem in p for p in problems), problems
+
+
+def test_nodes_must_be_a_mapping():
+    assert validate_graph("demo", _graph(nodes=[])) and validate_graph("demo", [])
+
+
+# --- Compilation ---
+
+def test_compiled_graph_resolves_default_edges(tmp_path):
+    graph = load_graph(_write(tmp_path, _graph()))
+    assert [node.node_id for node in graph.nodes] == ["intro", "hard", "followup", "end_node"]
+    assert graph.start_node.node_id == "intro" and graph.end_node.node_id == "end_node"
+    assert graph.next_node("intro", "correct").node_id == "hard"
+    assert graph.next_node("intro", "incorrect").node_id == "followup"  # Via "default".
+    assert graph.next_node("end_node", "correct") is None
+    assert graph.next_node("missing", "correct") is None
+    assert [node.node_id for node in graph.successors("intro")] == ["hard", "followup"]
+    assert graph.skills == ("python", "sql", "")
+    assert list(graph.item_difficulty)[1] == 1.5
+    # Follow-ups and the end node are never picked from the adaptive pool.
+    assert list(graph.item_pooled) == [True, True, False, False]
+    with pytest.raises(TypeError):
+        graph.get("intro").transitions["correct"] = "end_node"
+
+
+# --- Loading and Cache ---
+
+def test_invalid_files_raise(tmp_path):
+    with pytest.raises(GraphValidationError) as invalid:
+        load_graph(_write(tmp_path, _graph(start_node="missing")))
+    assert invalid.value.problems
+    path = os.path.join(str(tmp_path), "broken.json")
+    with open(path, "w") as f:
+        f.write("{not json")
+    with pytest.raises(GraphValidationError):
+        load_graph(path)
+
+
+def test_second_load_comes_from_the_marshal_cache(tmp_path, cache_dir, monkeypatch):
+    path = _write(tmp_path, _graph())
+    first = load_graph(path)
+    assert len(os.listdir(cache_dir)) == 1
+
+    def no_parsing(*args):
+        raise AssertionError("parsed despite a cached compile")
+
+    monkeypatch.setattr(graph_loader, "_read_source", no_parsing)
+    second = load_graph(path)
+    assert second.version == first.version and second is not first
+    assert [n.node_id for n in second.nodes] == [n.node_id for n in first.nodes]
+
+
+def test_changed_content_gets_a_new_version(tmp_path, cache_dir):
+    path = _write(tmp_path, _graph())
+    first = load_graph(path)
+    changed = _graph()
+    changed["nodes"]["intro"]["question_text"] = "Introduce yourself?"
+    _write(tmp_path, changed)
+    second = load_graph(path)
+    assert second.version != first.version
+    assert second.start_node.question_text == "Introduce yourself?"
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_a_corrupt_cache_file_is_rebuilt(tmp_path, cache_dir):
+    path = _write(tmp_path, _graph())
+    load_graph(path)
+    (cache_file,) = os.listdir(cache_dir)
+    with open(os.path.join(cache_dir, cache_file), "wb") as f:
+        f.write(b"\x00garbage")
+    assert load_graph(path).start_node.node_id == "intro"
+
+
+# --- Registry ---
+
+def test_reload_swaps_versions_and_keeps_the_old_one_on_errors(tmp_path):
+    graphs = tmp_path / "graphs"
+    graphs.mkdir()
+    path = _write(graphs, _graph())
+    registry = GraphRegistry(str(graphs))
+    assert registry.load_all() == ["demo"]
+    old = registry.get("demo")
+    assert registry.reload_changed() == []
+
+    changed = _graph()
+    changed["nodes"]["hard"]["question_text"] = "Harder?"
+    _write(graphs, changed)
+    os.utime(path, (1, 1))
+    assert registry.reload_changed() == ["demo"]
+    new = registry.get("demo")
+    assert new.version != old.version
+    # Sessions that started on the old version keep it.
+    assert registry.get("demo", old.version) is old
+    assert registry.get("demo", "retired") is new
+
+    _write(graphs, _graph(start_node="missing"))
+    os.utime(path, (2, 2))
+    assert registry.reload_changed() == []
+    assert registry.get("demo") is new
+    with pytest.raises(KeyError):
+        registry.get("unknown")
+
+
+def test_shipped_graphs_are_valid():
+    registry = GraphRegistry()
+    assert registry.load_all()
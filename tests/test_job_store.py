@@ -0,0 +1,102 @@
+# tests/test_job_store.py
+
+"""
+The durable analysis job store: claiming, retries, results and recovery.
+"""
+
+import asyncio
+
+import pytest
+
+from ai_interviewer.core_logic import response_analyzer
+from ai_interviewer.core_logic.analysis_queue import MAX_ATTEMPTS, SQLiteJobStore
+from ai_interviewer.models.schemas import AnalysisJob, AnalysisResult
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs" / "analysis.sqlite3"))
+    store.init()
+    return store
+
+
+def _job(turn: int, session_id: str = "s1", session_start: float = 100.0) -> AnalysisJob:
+    return AnalysisJob(session_id=session_id, session_start=session_start, turn_index=turn, node_id=f"n{turn}",
+                       skill="python", question="Q?", answer="A.")
+
+
+def _result(job: AnalysisJob, score: float = 7.0) -> AnalysisResult:
+    return AnalysisResult(job_id=job.job_id, session_id=job.session_id, session_start=job.session_start,
+                          turn_index=job.turn_index, skill=job.skill, score=score, analysis_text="ok")
+
+
+def test_jobs_are_deduplicated_by_id(store):
+    assert store.add(_job(0))
+    assert not store.add(_job(0))
+    # The same turn of a newer interview under the same session id is a new job.
+    assert store.add(_job(0, session_start=200.0))
+    assert len(store.load_pending()) == 2
+
+
+def test_claims_are_exclusive_and_in_order(store):
+    for turn in range(5):
+        store.add(_job(turn))
+    first = store.claim("worker-a", 3)
+    second = store.claim("worker-b", 3)
+    assert [job.turn_index for job in first] == [0, 1, 2]
+    assert [job.turn_index for job in second] == [3, 4]
+    assert store.claim("worker-c", 3) == []
+    assert set(store.statuses([job.job_id for job in first + second]).values()) == {"running"}
+
+
+def test_failed_jobs_are_retried_until_max_attempts(store):
+    job = _job(0)
+    store.add(job)
+    for _ in range(MAX_ATTEMPTS - 1):
+        assert store.claim("w", 1) == [job]
+        assert store.fail(job.job_id)
+        assert store.statuses([job.job_id]) == {job.job_id: "pending"}
+    assert store.claim("w", 1) == [job]
+    assert not store.fail(job.job_id)
+    assert store.statuses([job.job_id]) == {job.job_id: "failed"}
+    assert store.claim("w", 1) == []
+    assert not store.fail("unknown")
+
+
+def test_results_are_applied_once(store):
+    jobs = [_job(0), _job(1)]
+    for job in jobs:
+        store.add(job)
+    store.claim("w", 2)
+    store.complete(_result(jobs[0], 9.0))
+    assert [r.score for r in store.unapplied_results()] == [9.0]
+    store.mark_applied([jobs[0].job_id])
+    assert store.unapplied_results() == []
+    assert store.statuses([j.job_id for j in jobs]) == {jobs[0].job_id: "done", jobs[1].job_id: "running"}
+
+
+def test_stale_claims_are_requeued(store):
+    store.add(_job(0))
+    store.mark_running([_job(0).job_id], "crashed-worker")
+    assert store.requeue_stale(3600) == 0
+    assert store.requeue_stale(0) == 1
+    assert [job.turn_index for job in store.claim("w", 5)] == [0]
+
+
+def test_jobs_survive_reopening(store):
+    store.add(_job(0))
+    reopened = SQLiteJobStore(store.path)
+    reopened.init()
+    assert [job.job_id for job in reopened.load_pending()] == [_job(0).job_id]
+
+
+@pytest.mark.parametrize("response", ["[1, 2]", "7", '{"results": "none"}'])
+def test_analysis_without_a_json_object_yields_no_results(monkeypatch, response):
+    class Client:
+        async def generate(self, *args, **kwargs):
+            return response
+
+    monkeypatch.setattr(response_analyzer, "get_llm_client", lambda: Client())
+    assert asyncio.run(response_analyzer.run_batch_in_depth_analysis([_job(0), _job(1)])) == {}
+    if response != '{"results": "none"}':
+        assert asyncio.run(response_analyzer.run_batch_in_depth_analysis([_job(0)])) == {}
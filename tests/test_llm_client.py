@@ -0,0 +1,73 @@
+# tests/test_llm_client.py
+
+"""
+The priority semaphore that schedules LLM requests.
+"""
+
+import asyncio
+
+import pytest
+
+from ai_interviewer.core_logic.llm_client import PrioritySemaphore
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def scenario():
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire()
+        order = []
+
+        async def take(name, priority):
+            await semaphore.acquire(priority)
+            order.append(name)
+
+        tasks = []
+        for name, priority in (("analysis-1", 2), ("triage-1", 0), ("analysis-2", 2), ("triage-2", 0)):
+            tasks.append(asyncio.create_task(take(name, priority)))
+            await _settle()
+        assert semaphore.waiting == 4
+        for _ in tasks:
+            semaphore.release()
+            await _settle()
+        await asyncio.gather(*tasks)
+        assert order == ["triage-1", "triage-2", "analysis-1", "analysis-2"]
+
+    asyncio.run(scenario())
+
+
+def test_free_slots_are_not_taken_past_waiters():
+    async def scenario():
+        semaphore = PrioritySemaphore(2)
+        async with semaphore.slot():
+            async with semaphore.slot():
+                waiter = asyncio.create_task(semaphore.acquire(5))
+                await _settle()
+                assert not waiter.done()
+            await asyncio.wait_for(waiter, 1)
+            semaphore.release()
+        assert semaphore._value == 2 and semaphore.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_waiter_passes_its_slot_on():
+    async def scenario():
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire()
+        cancelled = asyncio.create_task(semaphore.acquire(0))
+        later = asyncio.create_task(semaphore.acquire(1))
+        await _settle()
+        # The slot is handed to the first waiter just as it is cancelled.
+        semaphore.release()
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        await asyncio.wait_for(later, 1)
+        assert semaphore.waiting == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,152 @@
+# tests/test_model_workers.py
+
+"""
+Worker death and restart in the model worker pool. The worker processes are
+replaced by in-process fakes that speak the pool's pipe protocol, so the tests
+exercise the front-process dispatch without loading any model.
+"""
+
+import asyncio
+import queue
+
+import numpy as np
+import pytest
+
+from ai_interviewer.core_logic import model_workers
+from ai_interviewer.core_logic.model_workers import ModelWorkerError, ModelWorkerPool
+
+_EOF = object()
+
+
+class FakeConn:
+    """The front end of a pipe to a fake worker."""
+
+    def __init__(self):
+        self.inbox: "queue.Queue" = queue.Queue()
+        self.sent = []
+        self.closed = False
+
+    def send(self, message) -> None:
+        self.sent.append(message)
+
+    def recv(self):
+        message = self.inbox.get()
+        if message is _EOF:
+            raise EOFError
+        return message
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeProcess:
+    exitcode = None
+
+    def __init__(self, ctx: "FakeContext", args: tuple):
+        self.ctx = ctx
+        self.index = args[0]
+
+    def start(self) -> None:
+        conn = self.ctx.conns[-1]
+        if self.ctx.fail_start:
+            conn.inbox.put(_EOF)
+        else:
+            conn.inbox.put((model_workers._READY, self.index, (0, {})))
+
+    def join(self, timeout=None) -> None:
+        pass
+
+    def is_alive(self) -> bool:
+        return False
+
+
+class FakeContext:
+    """Stands in for the "spawn" multiprocessing context."""
+
+    def __init__(self):
+        self.conns = []
+        self.fail_start = False
+
+    def Pipe(self, duplex=True):
+        conn = FakeConn()
+        self.conns.append(conn)
+        return conn, FakeConn()
+
+    def Process(self, target, args, name, daemon):
+        return FakeProcess(self, args)
+
+
+async def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+def _requests(conn: FakeConn, kind: str):
+    return [message for message in conn.sent if message[0] == kind]
+
+
+async def _start_pool(slots: int = 2):
+    pool = ModelWorkerPool(workers=1, slots=slots)
+    ctx = pool._ctx = FakeContext()
+    await pool.start()
+    return pool, ctx
+
+
+def test_worker_killed_with_all_slots_busy():
+    async def scenario():
+        pool, ctx = await _start_pool(slots=2)
+        audio = np.zeros(1600, dtype=np.float32)
+        try:
+            busy = [asyncio.create_task(pool.transcribe(audio)) for _ in range(2)]
+            queued = [asyncio.create_task(pool.transcribe(audio)) for _ in range(2)]
+            first = ctx.conns[0]
+            await _wait_for(lambda: len(_requests(first, model_workers._TRANSCRIBE)) == 2)
+            worker = pool._workers[0]
+            await _wait_for(lambda: worker.waiting == 2)
+
+            first.inbox.put(_EOF)  # The worker process dies.
+            for task in busy:
+                with pytest.raises(ModelWorkerError):
+                    await asyncio.wait_for(task, 2)
+
+            # The calls that were waiting for a slot run on the restarted worker.
+            await _wait_for(lambda: len(ctx.conns) == 2)
+            second = ctx.conns[1]
+            await _wait_for(lambda: len(_requests(second, model_workers._TRANSCRIBE)) == 2)
+            for _, request_id, *_ in _requests(second, model_workers._TRANSCRIBE):
+                second.inbox.put((model_workers._RESULT, request_id, [(0.0, 0.1, "hello")]))
+            results = await asyncio.wait_for(asyncio.gather(*queued), 2)
+            assert results == [[(0.0, 0.1, "hello")]] * 2
+
+            assert worker.free_slots.qsize() == 2
+            assert worker.in_flight == 0
+        finally:
+            await pool.stop()
+
+    asyncio.run(scenario())
+
+
+def test_waiting_calls_fail_when_the_restart_fails():
+    async def scenario():
+        pool, ctx = await _start_pool(slots=1)
+        audio = np.zeros(1600, dtype=np.float32)
+        try:
+            busy = asyncio.create_task(pool.transcribe(audio))
+            queued = asyncio.create_task(pool.transcribe(audio))
+            await _wait_for(lambda: pool._workers[0].waiting == 1)
+
+            ctx.fail_start = True
+            ctx.conns[0].inbox.put(_EOF)
+            with pytest.raises(ModelWorkerError):
+                await asyncio.wait_for(busy, 2)
+            # The restarted worker dies while loading: nothing will free a slot.
+            with pytest.raises(ModelWorkerError):
+                await asyncio.wait_for(queued, 2)
+            with pytest.raises(ModelWorkerError):
+                await pool.transcribe(audio)
+        finally:
+            await pool.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,161 @@
+# tests/test_protocol.py
+
+"""
+Frame packing and parsing of the binary WebSocket protocol (protocol 1).
+"""
+
+import asyncio
+import io
+import json
+import wave
+
+import numpy as np
+import pytest
+
+from ai_interviewer.api.protocol import (
+    CODEC_OPUS,
+    CODEC_PCM_S16LE,
+    CODEC_WEBM_OPUS,
+    FLAG_END,
+    FLAG_START,
+    FRAME_AUDIO,
+    FRAME_CONTROL,
+    FRAME_TRIAGE,
+    PROTOCOL_VERSION,
+    FramedChannel,
+    join_opus_packets,
+    pack_audio,
+    pack_frame,
+    split_opus_packets,
+    unpack_audio,
+    unpack_frame,
+)
+from ai_interviewer.config import STT_SAMPLE_RATE
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.sent.append(data)
+
+
+def _channel(codec: int = CODEC_PCM_S16LE, sample_rate: int = 0) -> FramedChannel:
+    return FramedChannel(RecordingWebSocket(), codec, sample_rate)
+
+
+def _audio_frame(codec: int, audio: bytes, flags: int = 0, sequence: int = 0, rate: int = STT_SAMPLE_RATE) -> dict:
+    return {"bytes": pack_frame(FRAME_AUDIO, pack_audio(codec, rate, audio), flags, sequence)}
+
+
+# --- Framing ---
+
+def test_frame_round_trip():
+    frame = pack_frame(FRAME_TRIAGE, b'{"a": 1}', FLAG_START | FLAG_END, 7)
+    version, frame_type, flags, sequence, payload = unpack_frame(frame)
+    assert (version, frame_type, flags, sequence) == (PROTOCOL_VERSION, FRAME_TRIAGE, FLAG_START | FLAG_END, 7)
+    assert bytes(payload) == b'{"a": 1}'
+
+
+def test_sequence_numbers_wrap():
+    assert unpack_frame(pack_frame(FRAME_CONTROL, b"", sequence=2 ** 32 + 5))[3] == 5
+
+
+def test_short_frames_are_rejected():
+    with pytest.raises(ValueError):
+        unpack_frame(b"\x01\x01\x00")
+    with pytest.raises(ValueError):
+        unpack_audio(memoryview(b"\x00\x01"))
+
+
+def test_audio_payload_round_trip():
+    codec, channels, rate, audio = unpack_audio(memoryview(pack_audio(CODEC_OPUS, 24000, b"abc", channels=2)))
+    assert (codec, channels, rate, bytes(audio)) == (CODEC_OPUS, 2, 24000, b"abc")
+
+
+def test_opus_packets_round_trip():
+    packets = [b"", b"\x01", b"\x02" * 300]
+    assert split_opus_packets(memoryview(join_opus_packets(packets))) == packets
+    # A truncated trailing length prefix is ignored.
+    assert split_opus_packets(memoryview(join_opus_packets(packets) + b"\x05")) == packets
+
+
+# --- Inbound ---
+
+def test_parse_pcm_and_end_of_utterance():
+    channel = _channel()
+    pcm = np.arange(8, dtype="<i2").tobytes()
+    messages = channel.parse(_audio_frame(CODEC_PCM_S16LE, pcm, FLAG_END))
+    assert messages[0].audio == pcm
+    assert messages[1].control_type == "end_of_utterance"
+
+
+def test_parse_resamples_and_downmixes_pcm():
+    channel = _channel()
+    stereo = np.zeros(2 * 4800, dtype="<i2").tobytes()
+    frame = {"bytes": pack_frame(FRAME_AUDIO, pack_audio(CODEC_PCM_S16LE, 48000, stereo, channels=2))}
+    (message,) = channel.parse(frame)
+    assert abs(len(message.audio) // 2 - 1600) <= 16
+
+
+def test_parse_passes_webm_through():
+    (message,) = _channel().parse(_audio_frame(CODEC_WEBM_OPUS, b"\x1a\x45\xdf\xa3rest"))
+    assert message.audio == b"\x1a\x45\xdf\xa3rest"
+
+
+def test_unsupported_codec_still_ends_the_answer():
+    channel = _channel()
+    assert channel.parse(_audio_frame(CODEC_OPUS, b"\x00\x01x")) == []
+    (message,) = channel.parse(_audio_frame(CODEC_OPUS, b"\x00\x01x", FLAG_END, 1))
+    assert message.control_type == "end_of_utterance"
+
+
+def test_parse_control_frames_and_text():
+    channel = _channel()
+    frame = {"bytes": pack_frame(FRAME_CONTROL, json.dumps({"type": "interrupt"}).encode())}
+    assert channel.parse(frame)[0].control_type == "interrupt"
+    assert channel.parse({"text": '{"type": "end_of_utterance"}'})[0].control_type == "end_of_utterance"
+    assert channel.parse({"text": "not json"}) == []
+
+
+def test_invalid_frames_are_dropped():
+    channel = _channel()
+    assert channel.parse({"bytes": b"\x01"}) == []
+    assert channel.parse({"bytes": b"\x02" + pack_frame(FRAME_CONTROL, b"{}")[1:]}) == []
+    assert channel.parse({"bytes": pack_frame(99, b"")}) == []
+
+
+# --- Outbound ---
+
+def test_outbound_utterance_is_flagged_and_sequenced():
+    channel = _channel()
+
+    async def send():
+        await channel.send_event({"type": "hello"})
+        await channel.start_audio(22050)
+        await channel.send_audio(b"\x00\x00" * 10)
+        await channel.send_audio(b"\x00\x00" * 10)
+        await channel.end_audio()
+
+    asyncio.run(send())
+    frames = [unpack_frame(data) for data in channel.websocket.sent]
+    assert [sequence for _, _, _, sequence, _ in frames] == [0, 1, 2, 3]
+    assert [(frame_type, flags) for _, frame_type, flags, _, _ in frames] == [
+        (FRAME_CONTROL, 0), (FRAME_AUDIO, FLAG_START), (FRAME_AUDIO, 0), (FRAME_AUDIO, FLAG_END)]
+    assert unpack_audio(frames[1][4])[2] == 22050
+
+
+def test_send_wav_is_one_framed_utterance():
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(22050)
+        writer.writeframes(b"\x01\x00" * 100)
+    channel = _channel()
+    asyncio.run(channel.send_wav(buffer.getvalue()))
+    frames = [unpack_frame(data) for data in channel.websocket.sent]
+    assert [flags for _, _, flags, _, _ in frames] == [FLAG_START, FLAG_END]
+    codec, _, rate, audio = unpack_audio(frames[0][4])
+    assert (codec, rate, bytes(audio)) == (CODEC_PCM_S16LE, 22050, b"\x01\x00" * 100)
@@ -0,0 +1,35 @@
+# tests/test_recording_store.py
+
+"""
+The append-only session recordings: writing, reading back and shutdown.
+"""
+
+from ai_interviewer.audio_processing.recording_store import INBOUND, OUTBOUND_PCM, RecordingWriter, SessionRecording
+
+
+def test_recording_round_trip_across_segments(tmp_path):
+    writer = RecordingWriter(str(tmp_path), segment_bytes=8)
+    writer.start_session("s1", {"graph_id": "g"})
+    payloads = [b"answer-1", b"q", b"answer-2!"]
+    writer.append("s1", 0, INBOUND, payloads[0])
+    writer.append("s1", 0, OUTBOUND_PCM, payloads[1], sample_rate=22050)
+    writer.append("s1", 1, INBOUND, payloads[2])
+    assert writer.flush(5)
+
+    recording = SessionRecording("s1", str(tmp_path))
+    assert [bytes(p) for p in recording.payloads()] == payloads
+    assert [bytes(p) for p in recording.payloads(turn=0, kind=INBOUND)] == [b"answer-1"]
+    assert recording.turns() == [0, 1]
+    recording.close()
+
+
+def test_close_writes_the_queue_and_closes_every_session(tmp_path):
+    writer = RecordingWriter(str(tmp_path))
+    assert writer.close(1)  # Nothing was ever written.
+    for session_id in ("a", "b"):
+        writer.append(session_id, 0, INBOUND, b"audio")
+    assert writer.close(5)
+    assert writer.stats()["open_sessions"] == 0 and writer.stats()["written_bytes"] == 10
+    recording = SessionRecording("b", str(tmp_path))
+    assert [bytes(p) for p in recording.payloads()] == [b"audio"]
+    recording.close()
@@ -0,0 +1,99 @@
+# tests/test_response_analyzer.py
+
+"""
+Streamed triage: incremental parsing of the model's JSON and the early exit.
+"""
+
+import asyncio
+
+import pytest
+
+from ai_interviewer.core_logic import response_analyzer
+from ai_interviewer.core_logic.response_analyzer import TriageStreamParser, run_streaming_triage_analysis
+
+
+def _feed(parser: TriageStreamParser, text: str, step: int = 1) -> None:
+    for i in range(0, len(text), step):
+        parser.feed(text[i:i + step])
+
+
+# --- TriageStreamParser ---
+
+@pytest.mark.parametrize("prefix, signal", [('"c', "correct"), ('"p', "partial"), ('"I', "incorrect")])
+def test_signal_is_decided_by_its_first_character(prefix, signal):
+    parser = TriageStreamParser()
+    _feed(parser, '{"confidence": 0.8, "signal": ' + prefix)
+    assert (parser.signal, parser.confidence) == (signal, 0.8)
+    assert parser.decided
+
+
+def test_an_empty_or_unknown_signal_waits_for_the_closing_quote():
+    parser = TriageStreamParser()
+    _feed(parser, '{"confidence": 1, "signal": "')
+    assert parser.signal is None and not parser.decided
+    _feed(parser, 'maybe"')
+    assert parser.signal == "maybe"
+
+
+def test_confidence_needs_a_terminator():
+    parser = TriageStreamParser()
+    _feed(parser, '{"confidence": 0.7')
+    assert parser.confidence is None  # Could still become 0.75.
+    _feed(parser, '5,')
+    assert parser.confidence == 0.75
+
+
+def test_decision_waits_for_the_confidence(monkeypatch):
+    parser = TriageStreamParser()
+    _feed(parser, '{"signal": "correct"')
+    assert parser.signal == "correct" and not parser.decided
+    monkeypatch.setattr(response_analyzer, "TRIAGE_STREAM_WAIT_FOR_CONFIDENCE", False)
+    assert parser.decided
+
+
+def test_chunk_boundaries_do_not_matter():
+    text = '{"confidence": 0.25, "signal": "partial"}'
+    results = set()
+    for step in (1, 2, 5, len(text)):
+        parser = TriageStreamParser()
+        _feed(parser, text, step)
+        results.add((parser.signal, parser.confidence))
+    assert results == {("partial", 0.25)}
+
+
+# --- Streaming triage ---
+
+class StreamingClient:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.sent = 0
+        self.closed = False
+
+    def stream_generate(self, model, prompt, **kwargs):
+        async def stream():
+            try:
+                for token in self.tokens:
+                    self.sent += 1
+                    yield token
+            finally:
+                self.closed = True
+        return stream()
+
+
+def _triage(monkeypatch, tokens):
+    client = StreamingClient(tokens)
+    monkeypatch.setattr(response_analyzer, "get_llm_client", lambda: client)
+    return client, asyncio.run(run_streaming_triage_analysis("An answer.", "A question?"))
+
+
+def test_generation_stops_once_the_signal_is_decided(monkeypatch):
+    client, result = _triage(monkeypatch, ['{"confidence": 0.9,', ' "signal": "c', 'orrect"', '}', "\n"])
+    assert (result.signal, result.confidence) == ("correct", 0.9)
+    assert client.sent == 2 and client.closed
+
+
+def test_falls_back_to_the_full_text_without_a_signal(monkeypatch):
+    _, result = _triage(monkeypatch, ['{"confidence": 0.4}'])
+    assert (result.signal, result.confidence) == ("error", 0.4)
+    _, result = _triage(monkeypatch, ["not json"])
+    assert (result.signal, result.confidence) == ("error", 0.0)
@@ -0,0 +1,150 @@
+# tests/test_session_store.py
+
+"""
+The session persistence backends and the sharded in-memory session store.
+"""
+
+import threading
+import time
+
+import pytest
+
+from ai_interviewer.core_logic import session_store
+from ai_interviewer.core_logic.session_store import (
+    RedisSessionBackend,
+    SessionStore,
+    SQLiteSessionBackend,
+    create_session_backend,
+)
+from ai_interviewer.models.schemas import SessionState
+from ai_interviewer.utils.mock_redis import MockRedis
+
+
+def _state(session_id: str = "s1", node_id: str = "start") -> SessionState:
+    return SessionState(session_id=session_id, current_node_id=node_id, graph_id="g", graph_version="v1")
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteSessionBackend(str(tmp_path / "db" / "sessions.sqlite3"))
+    return RedisSessionBackend(MockRedis())
+
+
+# --- Backends ---
+
+def test_backend_round_trip(backend):
+    assert backend.load("s1") is None
+    backend.save("s1", "first", 60)
+    backend.save("s1", "second", 60)
+    assert backend.load("s1") == "second"
+    backend.delete("s1")
+    assert backend.load("s1") is None
+    backend.delete("s1")
+
+
+def test_backend_expiry(backend):
+    backend.save("old", "data", 1)
+    backend.save("new", "data", 60)
+    time.sleep(1.05)
+    assert backend.load("old") is None
+    assert backend.load("new") == "data"
+    backend.purge_expired()
+    assert backend.load("new") == "data"
+
+
+def test_sqlite_backend_purges_expired_rows(tmp_path):
+    backend = SQLiteSessionBackend(str(tmp_path / "sessions.sqlite3"))
+    backend.save("old", "data", 0)
+    backend.save("new", "data", 60)
+    assert backend.purge_expired() == 1
+
+
+def test_memory_backend_is_not_shared():
+    assert create_session_backend("memory").shared is False
+    assert create_session_backend("none") is None
+    with pytest.raises(ValueError):
+        create_session_backend("bogus")
+
+
+# --- SessionStore ---
+
+def test_acquire_creates_once_and_resumes_from_the_backend(backend):
+    store = SessionStore(backend, shards=4)
+    state = store.acquire("s1", lambda: _state())
+    assert store.acquire("s1", lambda: pytest.fail("created twice")) is state
+    state.current_node_id = "q2"
+    store.release("s1")
+    store.release("s1")
+
+    # Another worker (another store on the same backend) resumes it.
+    other = SessionStore(backend, shards=4)
+    resumed = other.acquire("s1", lambda: pytest.fail("not resumed"))
+    assert resumed.current_node_id == "q2"
+    assert other.stats()["resumed"] == 1
+
+
+def test_acquire_keeps_a_current_copy_and_reloads_a_stale_one(tmp_path):
+    backend = SQLiteSessionBackend(str(tmp_path / "sessions.sqlite3"))
+    here, there = SessionStore(backend), SessionStore(backend)
+    state = here.acquire("s1", lambda: _state())
+    here.release("s1")
+    assert here.acquire("s1", _state) is state
+    here.release("s1")
+    assert here.stats()["resumed"] == 0
+
+    moved = there.acquire("s1", _state)
+    moved.current_node_id = "elsewhere"
+    there.release("s1")
+    reloaded = here.acquire("s1", _state)
+    assert reloaded is not state and reloaded.current_node_id == "elsewhere"
+
+
+def test_concurrent_acquires_share_one_state(backend):
+    store = SessionStore(backend)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.acquire("s1", _state))) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(state) for state in results}) == 1
+
+
+def test_get_does_not_create(backend):
+    store = SessionStore(backend)
+    assert store.get("missing") is None
+    assert store.stats()["sessions"] == 0
+
+
+def test_remove_deletes_from_memory_and_backend(backend):
+    store = SessionStore(backend)
+    store.acquire("s1", _state)
+    store.release("s1")
+    assert store.remove("s1")
+    assert not store.remove("s1")
+    assert store.get("s1") is None
+
+
+def test_reap_evicts_idle_unheld_sessions(backend, monkeypatch):
+    monkeypatch.setattr(session_store, "SESSION_IDLE_TTL_SECONDS", 0)
+    store = SessionStore(backend)
+    store.acquire("held", lambda: _state("held"))
+    idle = store.acquire("idle", lambda: _state("idle", "q3"))
+    store.release("idle")
+    assert store.reap() == 1
+    assert store.stats()["sessions"] == 1
+    # The evicted session was persisted and can be resumed.
+    resumed = store.get("idle")
+    assert resumed is not idle and resumed.current_node_id == "q3"
+
+
+def test_reap_enforces_the_memory_budget(monkeypatch):
+    monkeypatch.setattr(session_store, "SESSION_MEMORY_LIMIT_BYTES", 1)
+    store = SessionStore(None)
+    for session_id in ("a", "b", "c"):
+        store.acquire(session_id, lambda: _state(session_id))
+        store.release(session_id)
+    store.acquire("a", _state)
+    assert store.reap() == 2
+    assert store.stats()["sessions"] == 1
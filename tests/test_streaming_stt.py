@@ -0,0 +1,110 @@
+# tests/test_streaming_stt.py
+
+"""
+The ring buffer and the energy VAD of the streaming transcriber.
+"""
+
+import numpy as np
+
+from ai_interviewer.audio_processing.streaming_stt import AudioRingBuffer, EnergyVAD
+from ai_interviewer.config import VAD_END_SILENCE_MS, VAD_FRAME_MS, VAD_MIN_SPEECH_MS
+
+RATE = 16000
+
+
+def _ramp(start: int, n: int) -> np.ndarray:
+    return np.arange(start, start + n, dtype=np.float32)
+
+
+# --- AudioRingBuffer ---
+
+def test_ring_buffer_reads_by_absolute_index():
+    ring = AudioRingBuffer(10)
+    ring.write(_ramp(0, 4))
+    ring.write(_ramp(4, 3))
+    assert (ring.start, ring.end, len(ring)) == (0, 7, 7)
+    np.testing.assert_array_equal(ring.read(2, 5), _ramp(2, 3))
+    np.testing.assert_array_equal(ring.read(5), _ramp(5, 2))
+
+
+def test_ring_buffer_returns_views_until_it_wraps():
+    ring = AudioRingBuffer(8)
+    ring.write(_ramp(0, 6))
+    assert np.shares_memory(ring.read(1, 5), ring._buf)
+
+    ring.write(_ramp(6, 5))  # Overwrites the three oldest samples.
+    assert (ring.start, ring.end) == (3, 11)
+    wrapped = ring.read(3)
+    np.testing.assert_array_equal(wrapped, _ramp(3, 8))
+    assert not np.shares_memory(wrapped, ring._buf)
+
+
+def test_ring_buffer_clamps_reads_to_retained_audio():
+    ring = AudioRingBuffer(4)
+    ring.write(_ramp(0, 6))
+    np.testing.assert_array_equal(ring.read(0, 100), _ramp(2, 4))
+    assert len(ring.read(6)) == 0
+    assert len(ring.read(5, 3)) == 0
+
+
+def test_ring_buffer_keeps_the_tail_of_an_oversized_write():
+    ring = AudioRingBuffer(4)
+    ring.write(_ramp(0, 10))
+    assert (ring.start, ring.end) == (6, 10)
+    np.testing.assert_array_equal(ring.read(0), _ramp(6, 4))
+
+
+def test_ring_buffer_discard_and_clear():
+    ring = AudioRingBuffer(8)
+    ring.write(_ramp(0, 6))
+    ring.discard_until(4)
+    assert (ring.start, len(ring)) == (4, 2)
+    ring.discard_until(100)
+    assert ring.start == ring.end == 6
+    ring.write(_ramp(6, 2))
+    ring.clear()
+    assert len(ring) == 0 and ring.end == 8
+
+
+# --- EnergyVAD ---
+
+def _speech(ms: float) -> np.ndarray:
+    t = np.arange(int(RATE * ms / 1000)) / RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(ms: float) -> np.ndarray:
+    return np.zeros(int(RATE * ms / 1000), dtype=np.float32)
+
+
+def test_vad_ignores_silence_and_short_noise():
+    vad = EnergyVAD(RATE)
+    vad.process(_silence(1000))
+    assert not vad.speech_started
+    vad.process(_speech(VAD_MIN_SPEECH_MS - 2 * VAD_FRAME_MS))
+    vad.process(_silence(VAD_END_SILENCE_MS * 2))
+    assert not vad.speech_started and not vad.end_of_utterance
+
+
+def test_vad_ends_the_utterance_after_trailing_silence():
+    vad = EnergyVAD(RATE)
+    vad.process(_speech(600))
+    assert vad.speech_started and not vad.end_of_utterance
+    vad.process(_silence(VAD_END_SILENCE_MS / 2))
+    assert not vad.end_of_utterance
+    vad.process(_silence(VAD_END_SILENCE_MS))
+    assert vad.end_of_utterance
+
+    vad.reset()
+    assert not vad.speech_started and vad.trailing_silence_ms == 0.0
+
+
+def test_vad_is_independent_of_chunk_boundaries():
+    audio = np.concatenate((_silence(200), _speech(500), _silence(900)))
+    whole = EnergyVAD(RATE)
+    whole.process(audio)
+    chunked = EnergyVAD(RATE)
+    for offset in range(0, len(audio), 333):
+        chunked.process(audio[offset:offset + 333])
+    assert chunked.speech_ms == whole.speech_ms
+    assert chunked.end_of_utterance and whole.end_of_utterance
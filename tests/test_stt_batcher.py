@@ -0,0 +1,93 @@
+# tests/test_stt_batcher.py
+
+"""
+The STT batch scheduler: batching by beam size and accounting in the STT lane.
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from ai_interviewer.audio_processing import stt_batcher
+from ai_interviewer.audio_processing.stt_batcher import STTBatchScheduler
+from ai_interviewer.core_logic.inference_executor import STT_LANE, ExecutorSaturatedError, InferenceExecutor
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = InferenceExecutor(thread_workers=2)
+    executor.register_lane(STT_LANE, max_concurrency=1, max_queue_depth=4)
+    monkeypatch.setattr(stt_batcher, "get_inference_executor", lambda: executor)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """A fake batched decoder that blocks until released and records its batches."""
+    gate = threading.Event()
+    batches = []
+
+    def transcribe_batch(audios, beam_size):
+        gate.wait(5)
+        batches.append((len(audios), beam_size))
+        return [[(0.0, 1.0, f"{len(audio)}")] for audio in audios]
+
+    monkeypatch.setattr(stt_batcher, "transcribe_batch", transcribe_batch)
+    monkeypatch.setattr(stt_batcher, "batching_supported", lambda: True)
+    return gate, batches
+
+
+async def _until(condition) -> None:
+    while not condition():
+        await asyncio.sleep(0.005)
+
+
+def _audio(samples: int) -> np.ndarray:
+    return np.zeros(samples, dtype=np.float32)
+
+
+def test_waiting_requests_are_batched_by_beam_size(executor, model):
+    gate, batches = model
+
+    async def scenario():
+        batcher = STTBatchScheduler(max_batch_size=8, max_wait=0.01)
+        first = asyncio.create_task(batcher.transcribe(_audio(1), 5))
+        await _until(lambda: batcher.stats()["running"] == 1)
+        rest = [asyncio.create_task(batcher.transcribe(_audio(n), beam)) for n, beam in ((2, 5), (3, 1), (4, 5))]
+        await asyncio.sleep(0.05)
+        gate.set()
+        results = await asyncio.gather(first, *rest)
+        assert [segments[0][2] for segments in results] == ["1", "2", "3", "4"]
+        assert batches == [(1, 5), (2, 5), (1, 1)]
+
+    asyncio.run(scenario())
+
+
+def test_waiting_requests_count_against_the_stt_lane(executor, model):
+    gate, _ = model
+
+    async def scenario():
+        batcher = STTBatchScheduler(max_batch_size=2, max_wait=0.01, max_concurrency=1)
+        first = asyncio.create_task(batcher.transcribe(_audio(1)))
+        await _until(lambda: batcher.stats()["running"] == 1)
+        waiting = [asyncio.create_task(batcher.transcribe(_audio(1))) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        # One running batch plus three waiting utterances fill the lane.
+        assert executor.queue_depths() == {STT_LANE: 4}
+        assert executor.utilization() == {STT_LANE: 1.0}
+        with pytest.raises(ExecutorSaturatedError):
+            await batcher.transcribe(_audio(1))
+
+        # An abandoned request gives its place back.
+        waiting[0].cancel()
+        await asyncio.sleep(0.01)
+        assert executor.queue_depths() == {STT_LANE: 3}
+
+        gate.set()
+        await asyncio.gather(first, *waiting[1:])
+        await _until(lambda: executor.queue_depths() == {STT_LANE: 0})
+
+    asyncio.run(scenario())
@@ -0,0 +1,113 @@
+# tests/test_triage_cache.py
+
+"""
+The semantic triage cache: the vector index, per-node lookups, the memory
+budget and the cache-aside triage path.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from ai_interviewer.config import TRIAGE_CACHE_MIN_CONFIDENCE, TRIAGE_CACHE_SIMILARITY_THRESHOLD, TRIAGE_MODEL_NAME
+from ai_interviewer.core_logic import triage_cache
+from ai_interviewer.core_logic.triage_cache import BruteForceIndex, SemanticTriageCache, triage_with_cache
+from ai_interviewer.models.schemas import TriageResult
+
+KEY = ("backend", "v1", "q1")
+
+
+def _unit(*values: float) -> np.ndarray:
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _result(signal: str = "correct", confidence: float = 0.95) -> TriageResult:
+    return TriageResult(signal=signal, confidence=confidence)
+
+
+# --- BruteForceIndex ---
+
+def test_index_returns_the_nearest_vectors_first():
+    index = BruteForceIndex(dim=2, initial_capacity=1)
+    for vector in (_unit(1, 0), _unit(0, 1), _unit(1, 1)):
+        index.add(vector)
+    assert len(index) == 3 and index.nbytes == 4 * 2 * 4  # Grown from 1 to 2 to 4 rows.
+    matches = index.search(_unit(1, 0.1), k=2)
+    assert [entry_id for _, entry_id in matches] == [0, 2]
+    assert matches[0][0] > matches[1][0]
+    assert len(index.search(_unit(1, 0), k=10)) == 3
+    assert BruteForceIndex(dim=2).search(_unit(1, 0)) == []
+
+
+# --- SemanticTriageCache ---
+
+def test_lookup_needs_a_similar_answer_to_the_same_node():
+    cache = SemanticTriageCache()
+    assert cache.add(KEY, _unit(1, 0, 0), _result("partial"))
+    hit = cache.lookup(KEY, _unit(1, 0.01, 0))
+    assert hit is not None and hit[0].signal == "partial" and hit[1] >= TRIAGE_CACHE_SIMILARITY_THRESHOLD
+    assert cache.lookup(KEY, _unit(0, 1, 0)) is None
+    assert cache.lookup(("backend", "v2", "q1"), _unit(1, 0, 0)) is None
+    assert cache.stats()["lookups"] == 3 and cache.stats()["hits"] == 1
+
+
+def test_only_confident_signals_are_stored():
+    cache = SemanticTriageCache()
+    assert not cache.add(KEY, _unit(1, 0), _result(confidence=TRIAGE_CACHE_MIN_CONFIDENCE / 2))
+    assert not cache.add(KEY, _unit(1, 0), _result(signal="error"))
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_indexes_are_evicted_over_the_budget():
+    cache = SemanticTriageCache(lambda dim: BruteForceIndex(dim, initial_capacity=4), max_bytes=2 * 4 * 2 * 4)
+    first, second, third = (("g", "v1", node) for node in ("a", "b", "c"))
+    cache.add(first, _unit(1, 0), _result())
+    cache.add(second, _unit(1, 0), _result())
+    cache.lookup(first, _unit(1, 0))  # "b" is now the least recently used.
+    cache.add(third, _unit(1, 0), _result())
+    assert cache.lookup(second, _unit(1, 0)) is None
+    assert cache.lookup(first, _unit(1, 0)) is not None
+    stats = cache.stats()
+    assert (stats["indexes"], stats["evictions"], stats["memory_bytes"]) == (2, 1, 2 * 4 * 2 * 4)
+
+
+# --- Cache-aside triage ---
+
+class EmbeddingClient:
+    async def embed(self, model, text, **kwargs):
+        return [1.0, 0.0] if "threads" in text else [0.0, 1.0]
+
+
+@pytest.fixture
+def triage(monkeypatch):
+    calls = []
+
+    async def run_triage_analysis(transcribed_text, question, model=TRIAGE_MODEL_NAME):
+        calls.append(model)
+        return _result()
+
+    monkeypatch.setattr(triage_cache, "_cache", SemanticTriageCache())
+    monkeypatch.setattr(triage_cache, "get_llm_client", lambda: EmbeddingClient())
+    monkeypatch.setattr(triage_cache, "run_triage_analysis", run_triage_analysis)
+    monkeypatch.setattr(triage_cache, "TRIAGE_CACHE_AUDIT_RATE", 0.0)
+    return calls
+
+
+def _ask(answer: str) -> TriageResult:
+    return asyncio.run(triage_with_cache(*KEY, "What is the GIL?", answer))
+
+
+def test_a_repeated_answer_skips_the_llm(triage):
+    assert _ask("It serializes threads.").signal == "correct"
+    assert _ask("It serializes threads!").signal == "correct"
+    _ask("Something else entirely.")
+    assert triage == [TRIAGE_MODEL_NAME, TRIAGE_MODEL_NAME]
+
+
+def test_degraded_triage_results_are_not_cached(triage, monkeypatch):
+    monkeypatch.setattr(triage_cache, "triage_model", lambda: "small-model")
+    _ask("It serializes threads.")
+    _ask("It serializes threads.")
+    assert triage == ["small-model", "small-model"]
@@ -0,0 +1,60 @@
+# tests/test_tts_cache.py
+
+"""
+The two-tier speech cache and the error handling of whole-utterance synthesis.
+"""
+
+import pytest
+
+from ai_interviewer.audio_processing import text_to_speech
+from ai_interviewer.audio_processing.text_to_speech import SpeechSynthesisError, synthesize_speech
+from ai_interviewer.audio_processing.tts_cache import TTSAudioCache
+from ai_interviewer.utils.wav_helper import add_wav_header
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    cache = TTSAudioCache(str(tmp_path), memory_budget_bytes=250)
+    cache.put("a", b"\x01" * 100, 22050)
+    cache.put("b", b"\x02" * 100, 22050)
+    assert cache.get("a") is not None  # "b" is now the least recently used.
+    cache.put("c", b"\x03" * 100, 22050)
+    stats = cache.stats()
+    assert (stats["memory_entries"], stats["memory_bytes"], stats["memory_hits"]) == (2, 200, 1)
+
+    # The evicted entry is served from disk and promoted again.
+    entry = cache.get("b")
+    assert bytes(entry.pcm) == b"\x02" * 100 and entry.sample_rate == 22050
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.get("missing") is None and cache.stats()["misses"] == 1
+
+
+def test_an_oversized_entry_stays_in_memory_alone(tmp_path):
+    cache = TTSAudioCache(str(tmp_path), memory_budget_bytes=10)
+    cache.put("a", b"\x01" * 4, 16000)
+    cache.put("big", b"\x02" * 100, 16000)
+    assert cache.stats()["memory_entries"] == 1
+    assert cache.get("big").sample_rate == 16000
+
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    TTSAudioCache(str(tmp_path), 1024).put_wav("q", add_wav_header(b"\x05\x00" * 8, sample_rate=24000))
+    entry = TTSAudioCache(str(tmp_path), 1024).get("q")
+    assert (bytes(entry.pcm), entry.sample_rate) == (b"\x05\x00" * 8, 24000)
+
+
+def test_put_wav_ignores_anything_but_audio(tmp_path):
+    cache = TTSAudioCache(str(tmp_path), 1024)
+    assert cache.put_wav("q", b"") is None
+    assert cache.put_wav("q", b"x" * 100) is None
+    assert cache.get("q") is None
+
+
+def test_synthesis_failure_raises_instead_of_returning_audio(monkeypatch):
+    class BrokenVoice:
+        def synthesize(self, text):
+            raise RuntimeError("voice crashed")
+            yield
+
+    monkeypatch.setattr(text_to_speech, "get_voice", lambda: BrokenVoice())
+    with pytest.raises(SpeechSynthesisError):
+        synthesize_speech("Hello.")